@@ -80,19 +80,17 @@ class ContentAgent(BaseAgent):
             problem = self._db.get_problem(problem_id)
             problems = [problem] if problem else []
         else:
-            problems = self._db.get_problems_by_filter(
-                year=year, exam=exam, status=status
-            )
+            problems = list(self._db.iter_problems(
+                year=year, exam=exam, status=status, fields="full"
+            ))
 
         if not problems:
             self.status = "idle"
             return {"success": True, "synced": 0, "total": 0, "message": "동기화 대상 없음"}
 
         # 힌트 포함 아이템 구성
-        items = []
-        for p in problems:
-            hints = self._db.get_hints(p["problem_id"])
-            items.append({"problem": p, "hints": hints})
+        hints_by_id = self._db.get_hints_for([p["problem_id"] for p in problems])
+        items = [{"problem": p, "hints": hints_by_id[p["problem_id"]]} for p in problems]
 
         # 통계
         with_solution = sum(1 for it in items if it["problem"].get("solution"))
@@ -205,15 +203,16 @@ class ContentAgent(BaseAgent):
         self.status = "working"
         self.log(f"데이터 검증 시작 (year={year}, exam={exam})")
 
-        problems = self._db.get_problems_by_filter(year=year, exam=exam)
+        problems = list(self._db.iter_problems(year=year, exam=exam, fields="integrity"))
 
         complete = []
         incomplete = []
         issues = []
+        hints_by_id = self._db.get_hints_for([p["problem_id"] for p in problems])
 
         for p in problems:
             pid = p["problem_id"]
-            hints = self._db.get_hints(pid)
+            hints = hints_by_id[pid]
             problems_list = []
 
             # 필수 필드 검증
@@ -629,7 +628,7 @@ class ContentAgent(BaseAgent):
             problem = self._db.get_problem(problem_id)
             problems = [problem] if problem else []
         else:
-            problems = self._db.get_problems_by_filter(year=year, exam=exam)
+            problems = list(self._db.iter_problems(year=year, exam=exam, fields="list"))
 
         if not problems:
             self.status = "idle"
@@ -664,18 +663,16 @@ class ContentAgent(BaseAgent):
             }
 
         # 실제 업데이트
-        updated = 0
-        errors = []
-        for p in problems:
-            pid = p["problem_id"]
-            try:
-                self._db.client.table("problems").update({
-                    "published_at": pub_time.isoformat(),
-                    "hint_interval_hours": interval_hours,
-                }).eq("problem_id", pid).execute()
-                updated += 1
-            except Exception as e:
-                errors.append({"problem_id": pid, "error": str(e)[:200]})
+        result = self._db.bulk_update_problems([
+            {
+                "problem_id": p["problem_id"],
+                "published_at": pub_time.isoformat(),
+                "hint_interval_hours": interval_hours,
+            }
+            for p in problems
+        ])
+        updated = result["written"]
+        errors = result["errors"]
 
         self.status = "idle"
         self.log(f"스케줄 설정 완료: {updated}개, 오류 {len(errors)}개")
@@ -709,7 +706,7 @@ class ContentAgent(BaseAgent):
         self.ensure_services()
         self.log(f"공개 스케줄 조회 (year={year}, exam={exam})")
 
-        problems = self._db.get_problems_by_filter(year=year, exam=exam)
+        problems = list(self._db.iter_problems(year=year, exam=exam, fields="admin"))
 
         scheduled = []
         unscheduled = []
@@ -78,7 +78,8 @@ class OpsAgent(BaseAgent):
             load_dotenv()
             from src.supabase_service import SupabaseService
             db = SupabaseService()
-            stats = db.get_stats()
+            # 캐시를 거치지 않고 실제 연결 확인
+            stats = db.get_stats(refresh=True)
             checks["supabase"] = {
                 "status": "ok",
                 "total_problems": stats["total"],
@@ -154,7 +155,7 @@ class OpsAgent(BaseAgent):
         self.ensure_services()
         self.log(f"문제 보고서 생성 (year={year})")
 
-        problems = self._db.get_problems_by_filter(year=year)
+        problems = list(self._db.iter_problems(year=year, fields="integrity"))
 
         if not problems:
             return {"success": True, "total": 0, "message": "문제 없음"}
@@ -221,8 +222,9 @@ class OpsAgent(BaseAgent):
         self.ensure_services()
         self.log("데이터 무결성 검증 시작")
 
-        problems = self._db.get_problems_by_filter()
+        problems = list(self._db.iter_problems(fields="integrity"))
         issues = []
+        hints_by_id = self._db.get_hints_for([p["problem_id"] for p in problems])
 
         seen_ids = set()
         for p in problems:
@@ -253,7 +255,7 @@ class OpsAgent(BaseAgent):
                 problem_issues.append(f"문항번호 범위 초과: {q_no}")
 
             # 힌트 검사
-            hints = self._db.get_hints(pid)
+            hints = hints_by_id[pid]
             if len(hints) < 3:
                 problem_issues.append(f"힌트 부족 ({len(hints)}/3)")
 
@@ -0,0 +1,166 @@
+"""
+Route Concurrency Benchmark
+Requests/sec of the FastAPI app under concurrent load with a slow upstream.
+
+A local PostgREST stand-in answers every request after a fixed delay
+(default 200 ms), so the numbers show how well a single worker overlaps
+upstream waits rather than how fast Supabase is today.
+
+Compared:
+    blocking  async def route calling supabase-py directly (previous pattern)
+    async     /problem/view/{id} on the AsyncDataAccess layer
+
+Usage:
+    python benchmarks/bench_async_routes.py
+    python benchmarks/bench_async_routes.py --latency 0.2 --concurrency 10 50 --requests 200
+"""
+
+import io
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import threading
+import contextlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+UPSTREAM_PORT = 54329
+PROBLEM_ID = "2026_CSAT_Q01"
+
+# Point every client at the stand-in before the app (and src.config) is imported
+os.environ["SUPABASE_URL"] = f"http://127.0.0.1:{UPSTREAM_PORT}"
+os.environ["SUPABASE_KEY"] = os.environ["SUPABASE_SERVICE_KEY"] = "bench.bench.bench"
+# Measure upstream round trips, not the problem/viewer caches / local replica
+os.environ["PROBLEM_CACHE_TTL"] = "0"
+os.environ["VIEWER_CACHE_TTL"] = "0"
+os.environ["READ_REPLICA_ENABLED"] = "false"
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import httpx
+
+PROBLEM_ROW = {
+    "problem_id": PROBLEM_ID, "year": 2026, "exam": "CSAT", "question_no": 1,
+    "score": 3, "unit": "지수함수", "answer": "5",
+    "problem_image_url": f"http://127.0.0.1:{UPSTREAM_PORT}/img.png",
+}
+
+
+def start_upstream(latency: float) -> ThreadingHTTPServer:
+    """PostgREST stand-in: every response is delayed by `latency` seconds"""
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def _reply(self, payload):
+            time.sleep(latency)
+            body = json.dumps(payload).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            single = "object+json" in self.headers.get("Accept", "")
+            self._reply(PROBLEM_ROW if single else [PROBLEM_ROW])
+
+        def do_POST(self):
+            self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            self._reply([])
+
+        do_PATCH = do_POST
+
+        def log_message(self, *args):
+            pass
+
+    class Server(ThreadingHTTPServer):
+        daemon_threads = True
+        request_queue_size = 256  # default backlog (5) drops bursts of new connections
+
+    server = Server(("127.0.0.1", UPSTREAM_PORT), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def build_app():
+    from server.main import app
+    from src.supabase_service import get_shared_service
+
+    @app.get("/_bench/blocking/{problem_id}")
+    async def blocking_problem(problem_id: str):
+        # Previous pattern: sync supabase-py call inside an async handler
+        return get_shared_service().get_problem(problem_id)
+
+    return app
+
+
+async def run(app, path: str, concurrency: int, total: int) -> dict:
+    latencies = []
+    queue = asyncio.Queue()
+    for _ in range(total):
+        queue.put_nowait(path)
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        async def worker():
+            while not queue.empty():
+                url = queue.get_nowait()
+                start = time.perf_counter()
+                response = await client.get(url)
+                response.raise_for_status()
+                latencies.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "rps": total / elapsed,
+        "p50_ms": latencies[len(latencies) // 2] * 1000,
+        "p95_ms": latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] * 1000,
+    }
+
+
+async def sweep(app, args, out):
+    scenarios = [
+        ("blocking", f"/_bench/blocking/{PROBLEM_ID}"),
+        ("async", f"/problem/view/{PROBLEM_ID}"),
+    ]
+
+    print(f"Upstream latency: {args.latency * 1000:.0f} ms | requests/run: {args.requests}", file=out)
+    print(f"{'route':>9} {'conc':>5} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8}", file=out)
+
+    for name, path in scenarios:
+        # Warm-up: open the upstream connection pool before measuring
+        if name == "async":
+            await run(app, path, max(args.concurrency), max(args.concurrency))
+
+        for concurrency in args.concurrency:
+            # Blocking runs serialize; cap them so the sweep finishes quickly
+            total = min(args.requests, 25) if name == "blocking" else args.requests
+            r = await run(app, path, concurrency, total)
+            print(f"{name:>9} {concurrency:>5} {r['rps']:>8.1f} {r['p50_ms']:>8.0f} {r['p95_ms']:>8.0f}", file=out)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Route concurrency benchmark")
+    parser.add_argument("--latency", type=float, default=0.2, help="Upstream latency in seconds")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 10, 50])
+    parser.add_argument("--requests", type=int, default=100, help="Requests per run")
+    args = parser.parse_args()
+
+    start_upstream(args.latency)
+    app = build_app()
+
+    # Route handlers log every request; keep the table readable
+    out = sys.stdout
+    with contextlib.redirect_stdout(io.StringIO()):
+        asyncio.run(sweep(app, args, out))
+
+
+if __name__ == "__main__":
+    main()
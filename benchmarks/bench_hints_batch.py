@@ -0,0 +1,124 @@
+"""
+Hint Loading Benchmark
+Per-problem get_hints() (N+1) vs one batched get_hints_for() call.
+
+A local PostgREST stand-in serves an in-memory hints table (3 hints per
+problem) and delays every request by a fixed round trip (default 20 ms), the
+cost that dominates the agents and sync_to_notion.py when they walk the
+whole problem bank.
+
+Usage:
+    python benchmarks/bench_hints_batch.py
+    python benchmarks/bench_hints_batch.py --problems 50 300 1500 --latency 0.02
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import urlsplit, parse_qs
+
+UPSTREAM_PORT = 54330
+
+# Point the client at the stand-in before src.config is imported
+os.environ["SUPABASE_URL"] = f"http://127.0.0.1:{UPSTREAM_PORT}"
+os.environ["SUPABASE_KEY"] = os.environ["SUPABASE_SERVICE_KEY"] = "bench.bench.bench"
+# Measure upstream round trips, not the problem cache / local replica
+os.environ["PROBLEM_CACHE_TTL"] = "0"
+os.environ["READ_REPLICA_ENABLED"] = "false"
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+HINTS = []
+REQUESTS = {"count": 0}
+
+
+def make_hints(problem_ids: list):
+    HINTS.clear()
+    for pid in problem_ids:
+        for stage in (1, 2, 3):
+            HINTS.append({"problem_id": pid, "stage": stage, "hint_text": f"{pid} hint {stage}"})
+
+
+def start_upstream(latency: float) -> ThreadingHTTPServer:
+    """PostgREST stand-in for GET /rest/v1/hints (eq./in. filters, offset/limit)"""
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            time.sleep(latency)
+            REQUESTS["count"] += 1
+
+            query = parse_qs(urlsplit(self.path).query)
+            rows = HINTS
+            cond = query.get("problem_id", [""])[0]
+            if cond.startswith("eq."):
+                rows = [h for h in rows if h["problem_id"] == cond[3:]]
+            elif cond.startswith("in.("):
+                wanted = set(v.strip('"') for v in cond[4:-1].split(","))
+                rows = [h for h in rows if h["problem_id"] in wanted]
+            offset = int(query.get("offset", ["0"])[0])
+            limit = int(query.get("limit", ["1000"])[0])
+            rows = rows[offset:offset + min(limit, 1000)]
+
+            body = json.dumps(rows).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    class Server(ThreadingHTTPServer):
+        daemon_threads = True
+        request_queue_size = 256
+
+    server = Server(("127.0.0.1", UPSTREAM_PORT), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def measure(fn) -> tuple:
+    REQUESTS["count"] = 0
+    start = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - start, REQUESTS["count"], result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Hint loading benchmark")
+    parser.add_argument("--problems", type=int, nargs="+", default=[50, 200, 1200])
+    parser.add_argument("--latency", type=float, default=0.02, help="Upstream latency in seconds")
+    args = parser.parse_args()
+
+    start_upstream(args.latency)
+    from src.supabase_service import SupabaseService
+
+    db = SupabaseService()
+    db.get_hints("warmup")
+
+    print(f"Upstream latency: {args.latency * 1000:.0f} ms")
+    print(f"{'problems':>8} {'mode':>8} {'requests':>9} {'seconds':>8}")
+
+    for n in args.problems:
+        ids = [f"2026_CSAT_Q{i:04d}" for i in range(n)]
+        make_hints(ids)
+
+        elapsed, count, looped = measure(lambda: {pid: db.get_hints(pid) for pid in ids})
+        print(f"{n:>8} {'N+1':>8} {count:>9} {elapsed:>8.2f}")
+
+        elapsed, count, batched = measure(lambda: db.get_hints_for(ids))
+        print(f"{n:>8} {'batched':>8} {count:>9} {elapsed:>8.2f}")
+
+        assert batched == looped, "batched result differs from per-problem reads"
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+Image Bytes-per-View Benchmark
+Bytes a viewer open downloads for the problem image, before and after
+responsive variants (src/image_variants.py).
+
+For each device profile (CSS viewport width x device pixel ratio) the
+browser's srcset choice is simulated: with sizes="100vw" it takes the
+smallest candidate whose width covers viewport x DPR, else the largest.
+
+Compared per profile:
+    original   the full problem_image_url PNG (previous behaviour)
+    png        PNG srcset (clients without WebP)
+    webp       WebP <source> (Android/iOS webviews)
+
+Plus the Kakao feed image (800px PNG derivative vs the original).
+
+Input images: --images, else problem PNGs under output/, else one
+synthetic 1600x2100 text page.
+
+Usage:
+    python benchmarks/bench_image_bytes.py
+    python benchmarks/bench_image_bytes.py --images output/2026_CSAT_questions/*.png --limit 20
+"""
+
+import io
+import sys
+import time
+import random
+import argparse
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from PIL import Image, ImageDraw, ImageFont
+
+from src.config import KAKAO_FEED_IMAGE_WIDTH
+from src.image_variants import render_variants
+
+# (name, CSS viewport width, device pixel ratio)
+PROFILES = [
+    ("iPhone SE", 375, 2.0),
+    ("Galaxy S", 360, 3.0),
+    ("iPhone 15", 393, 3.0),
+    ("Pixel", 412, 2.625),
+    ("tablet", 768, 2.0),
+]
+
+
+def synthetic_page() -> bytes:
+    """Black-on-white text and figure, sized like a pipeline problem image"""
+    random.seed(1)
+    img = Image.new("RGB", (1600, 2100), "white")
+    draw = ImageDraw.Draw(img)
+    try:
+        font = ImageFont.truetype("DejaVuSans.ttf", 38)
+    except OSError:
+        font = ImageFont.load_default()
+    for y in range(60, 1500, 70):
+        line = "".join(random.choice("abcdefxyz+-=()0123456789 ") for _ in range(48))
+        draw.text((80, y), line, fill="black", font=font)
+    draw.ellipse((400, 1550, 1100, 2000), outline="black", width=4)
+    draw.line((100, 1800, 1500, 1700), fill="black", width=3)
+    out = io.BytesIO()
+    img.save(out, "PNG", optimize=True)
+    return out.getvalue()
+
+
+def pick(sizes: list, fmt: str, needed_px: float) -> int:
+    """Bytes of the srcset candidate a browser would choose"""
+    for s in sizes:
+        if s["w"] >= needed_px:
+            return len(s[fmt])
+    return len(sizes[-1][fmt])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Image bytes-per-view benchmark")
+    parser.add_argument("--images", nargs="*", help="Problem PNGs (default: output/**/*_Q*.png)")
+    parser.add_argument("--limit", type=int, default=10, help="Max images from output/")
+    args = parser.parse_args()
+
+    if args.images:
+        sources = [(Path(p).name, Path(p).read_bytes()) for p in args.images]
+    else:
+        found = sorted((ROOT / "output").glob("**/*_Q[0-9]*.png"))[:args.limit]
+        sources = [(p.name, p.read_bytes()) for p in found] or [("synthetic", synthetic_page())]
+
+    totals = {name: {"original": 0, "png": 0, "webp": 0} for name, _, _ in PROFILES}
+    feed = {"original": 0, "png": 0}
+    render_s = 0.0
+
+    for _, data in sources:
+        start = time.perf_counter()
+        _, _, rendered = render_variants(data)
+        render_s += time.perf_counter() - start
+        rendered.sort(key=lambda s: s["w"])
+
+        for name, css_width, dpr in PROFILES:
+            totals[name]["original"] += len(data)
+            totals[name]["png"] += pick(rendered, "png", css_width * dpr)
+            totals[name]["webp"] += pick(rendered, "webp", css_width * dpr)
+        feed["original"] += len(data)
+        feed["png"] += pick(rendered, "png", KAKAO_FEED_IMAGE_WIDTH)
+
+    n = len(sources)
+    print(f"Images: {n} | render {render_s / n * 1000:.0f} ms/image (all widths, WebP + PNG)")
+    print(f"{'profile':>10} {'viewport':>10} {'original KB':>12} {'png KB':>8} {'webp KB':>8} {'saved':>7}")
+    for name, css_width, dpr in PROFILES:
+        t = totals[name]
+        saved = 1 - t["webp"] / t["original"]
+        print(f"{name:>10} {f'{css_width}@{dpr:g}x':>10} {t['original'] / n / 1024:>12.0f} "
+              f"{t['png'] / n / 1024:>8.0f} {t['webp'] / n / 1024:>8.0f} {saved:>7.0%}")
+    print(f"{'kakao feed':>10} {f'{KAKAO_FEED_IMAGE_WIDTH}px':>10} {feed['original'] / n / 1024:>12.0f} "
+          f"{feed['png'] / n / 1024:>8.0f} {'-':>8} {1 - feed['png'] / feed['original']:>7.0%}")
+
+
+if __name__ == "__main__":
+    main()
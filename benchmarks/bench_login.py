@@ -0,0 +1,201 @@
+"""
+Kakao Login Latency Benchmark
+End-to-end /auth/kakao/callback latency against local Kakao + PostgREST stand-ins.
+
+Each upstream request is delayed by a fixed round trip (Kakao 80 ms,
+Supabase 30 ms by default), so the numbers show how many sequential round
+trips the callback makes rather than how fast the real services are.
+
+Compared:
+    legacy  GET users -> PATCH/POST -> GET users (previous UserService.upsert_user)
+    upsert  one POST users?on_conflict=kakao_id, overlapped with session creation
+
+Usage:
+    python benchmarks/bench_login.py
+    python benchmarks/bench_login.py --logins 50 --kakao-latency 0.08 --db-latency 0.03
+"""
+
+import io
+import os
+import sys
+import json
+import time
+import asyncio
+import socket
+import argparse
+import threading
+import contextlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import urlsplit, parse_qs
+
+UPSTREAM_PORT = 54331
+
+# Point every client at the stand-in before the app (and src.config) is imported
+os.environ["SUPABASE_URL"] = f"http://127.0.0.1:{UPSTREAM_PORT}"
+os.environ["SUPABASE_KEY"] = os.environ["SUPABASE_SERVICE_KEY"] = "bench.bench.bench"
+os.environ["READ_REPLICA_ENABLED"] = "false"
+os.environ["SESSION_BACKEND"] = "memory"
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import httpx
+
+USERS = {}  # kakao_id -> row
+COUNTS = {}
+
+
+def start_upstream(kakao_latency: float, db_latency: float) -> ThreadingHTTPServer:
+    """Kakao token/user endpoints + PostgREST users table"""
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def setup(self):
+            super().setup()
+            # Small JSON replies: don't let Nagle/delayed ACK add 40 ms per request
+            self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+        def _reply(self, payload, status=200):
+            body = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _body(self):
+            return self.rfile.read(int(self.headers.get("Content-Length", 0)))
+
+        def _count(self, name, latency):
+            COUNTS[name] = COUNTS.get(name, 0) + 1
+            time.sleep(latency)
+
+        def do_GET(self):
+            url = urlsplit(self.path)
+            query = parse_qs(url.query)
+            if url.path == "/v2/user/me":
+                self._count("kakao", kakao_latency)
+                kakao_id = self.headers["Authorization"].split("token-")[-1]
+                return self._reply({"id": int(kakao_id), "properties": {"nickname": f"user{kakao_id}"}})
+            self._count("db", db_latency)
+            kakao_id = query.get("kakao_id", ["eq."])[0][3:]
+            row = USERS.get(kakao_id)
+            self._reply([row] if row else [])
+
+        def do_POST(self):
+            url = urlsplit(self.path)
+            if url.path == "/oauth/token":
+                self._count("kakao", kakao_latency)
+                code = parse_qs(self._body().decode())["code"][0]
+                return self._reply({"access_token": f"token-{code}", "refresh_token": "r", "expires_in": 21600})
+            self._count("db", db_latency)
+            row = json.loads(self._body())
+            existing = USERS.get(row["kakao_id"])
+            if existing and "on_conflict" not in url.query:
+                return self._reply({"code": "23505", "message": "duplicate key"}, 409)
+            merged = {**(existing or {"id": f"id-{row['kakao_id']}", "current_level": 3,
+                                       "current_score_level": 3, "subscription_type": "free"}), **row}
+            USERS[row["kakao_id"]] = merged
+            self._reply([merged], 201)
+
+        def do_PATCH(self):
+            self._count("db", db_latency)
+            kakao_id = parse_qs(urlsplit(self.path).query)["kakao_id"][0][3:]
+            USERS[kakao_id].update(json.loads(self._body()))
+            self._reply([USERS[kakao_id]])
+
+        def log_message(self, *args):
+            pass
+
+    class Server(ThreadingHTTPServer):
+        daemon_threads = True
+        request_queue_size = 256
+
+    server = Server(("127.0.0.1", UPSTREAM_PORT), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+async def legacy_upsert_user(self, user_data: dict):
+    """Previous flow: existence check, PATCH or POST, then re-read"""
+    kakao_id = user_data["kakao_id"]
+    existing = await self.select_one("users", {"select": "*", "kakao_id": f"eq.{kakao_id}"})
+    if existing:
+        await self.update("users", user_data, {"kakao_id": kakao_id})
+    else:
+        await self.insert("users", {**user_data, "current_level": 3, "current_score_level": 3,
+                                    "subscription_type": "free"})
+    return await self.select_one("users", {"select": "*", "kakao_id": f"eq.{kakao_id}"})
+
+
+async def login(client, kakao_id: int) -> float:
+    start = time.perf_counter()
+    response = await client.get(
+        "/auth/kakao/callback",
+        params={"code": str(kakao_id), "state": "bench"},
+        cookies={"oauth_state": "bench"},
+    )
+    elapsed = time.perf_counter() - start
+    assert response.status_code == 302, response.text[:200]
+    return elapsed
+
+
+async def run(app, logins: int) -> dict:
+    latencies = []
+    COUNTS.clear()
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        await login(client, 1)  # warm-up: open upstream connections
+        COUNTS.clear()
+        for i in range(logins):
+            # Half first-time logins, half returning users
+            kakao_id = 1000 + (i // 2)
+            latencies.append(await login(client, kakao_id))
+    latencies.sort()
+    return {
+        "p50_ms": latencies[len(latencies) // 2] * 1000,
+        "p95_ms": latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] * 1000,
+        "db_per_login": COUNTS.get("db", 0) / logins,
+        "kakao_per_login": COUNTS.get("kakao", 0) / logins,
+    }
+
+
+async def sweep(app, args, out):
+    from server.async_data import AsyncDataAccess
+    current = AsyncDataAccess.upsert_user
+
+    print(f"Latency: Kakao {args.kakao_latency * 1000:.0f} ms, Supabase {args.db_latency * 1000:.0f} ms"
+          f" | logins/run: {args.logins}", file=out)
+    print(f"{'flow':>7} {'p50 ms':>8} {'p95 ms':>8} {'db/login':>9} {'kakao/login':>12}", file=out)
+    async with app.router.lifespan_context(app):
+        for name, impl in (("legacy", legacy_upsert_user), ("upsert", current)):
+            AsyncDataAccess.upsert_user = impl
+            USERS.clear()
+            r = await run(app, args.logins)
+            print(f"{name:>7} {r['p50_ms']:>8.0f} {r['p95_ms']:>8.0f} {r['db_per_login']:>9.1f} "
+                  f"{r['kakao_per_login']:>12.1f}", file=out)
+    AsyncDataAccess.upsert_user = current
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Kakao login latency benchmark")
+    parser.add_argument("--logins", type=int, default=40)
+    parser.add_argument("--kakao-latency", type=float, default=0.08, help="Kakao API latency in seconds")
+    parser.add_argument("--db-latency", type=float, default=0.03, help="Supabase latency in seconds")
+    args = parser.parse_args()
+
+    start_upstream(args.kakao_latency, args.db_latency)
+
+    from server.main import app
+    import server.auth as auth
+    auth.KAKAO_TOKEN_URL = f"http://127.0.0.1:{UPSTREAM_PORT}/oauth/token"
+    auth.KAKAO_USER_URL = f"http://127.0.0.1:{UPSTREAM_PORT}/v2/user/me"
+
+    # Route handlers log every login; keep the table readable
+    out = sys.stdout
+    with contextlib.redirect_stdout(io.StringIO()):
+        asyncio.run(sweep(app, args, out))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Storage Upload Benchmark
+Measures upload throughput of the StorageClient with reproducible inputs.
+
+Payloads are generated from a fixed seed (same sizes and bytes every run),
+so numbers are comparable across machines and commits.
+
+Usage:
+    # Offline, no credentials (local filesystem backend)
+    python benchmarks/bench_storage.py
+
+    # Against the live bucket (uses SUPABASE_URL / SUPABASE_SERVICE_KEY)
+    python benchmarks/bench_storage.py --backend supabase --files 22
+
+    # Sweep worker counts
+    python benchmarks/bench_storage.py --workers 1 4 8 16
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.storage_client import StorageClient, create_storage_client, LocalStorageBackend
+
+
+def make_payloads(count: int, min_kb: int, max_kb: int, seed: int, out_dir: Path) -> list:
+    """Write deterministic pseudo-image files; returns their paths"""
+    rng = random.Random(seed)
+    paths = []
+    for i in range(count):
+        size = rng.randint(min_kb, max_kb) * 1024
+        path = out_dir / f"bench_Q{i + 1:02d}.png"
+        path.write_bytes(rng.randbytes(size))
+        paths.append(path)
+    return paths
+
+
+def run(client: StorageClient, paths: list, workers: int, prefix: str) -> dict:
+    client.max_workers = workers
+    items = [(str(p), f"{prefix}/w{workers}/{p.name}") for p in paths]
+    total_bytes = sum(p.stat().st_size for p in paths)
+
+    start = time.perf_counter()
+    results = client.upload_many(items)
+    elapsed = time.perf_counter() - start
+
+    ok = sum(1 for r in results if r["success"])
+    return {
+        "workers": workers,
+        "ok": ok,
+        "total": len(items),
+        "seconds": elapsed,
+        "files_per_sec": ok / elapsed if elapsed else 0,
+        "mb_per_sec": total_bytes / 1024 / 1024 / elapsed if elapsed else 0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="StorageClient upload benchmark")
+    parser.add_argument("--backend", default="local", choices=["local", "supabase"])
+    parser.add_argument("--files", type=int, default=44, help="Files per run (default: 22 problems + 22 cards)")
+    parser.add_argument("--min-kb", type=int, default=150)
+    parser.add_argument("--max-kb", type=int, default=600)
+    parser.add_argument("--seed", type=int, default=2026)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4, 8])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        src_dir = tmp / "src"
+        src_dir.mkdir()
+        paths = make_payloads(args.files, args.min_kb, args.max_kb, args.seed, src_dir)
+
+        if args.backend == "local":
+            client = StorageClient(LocalStorageBackend(tmp / "bucket", "http://localhost:8000/storage/v1/object/public"))
+        else:
+            client = create_storage_client("supabase")
+
+        print(f"Backend: {client.backend.name} | files: {len(paths)} | seed: {args.seed}")
+        print(f"{'workers':>8} {'ok':>7} {'seconds':>9} {'files/s':>9} {'MB/s':>8}")
+
+        for workers in args.workers:
+            r = run(client, paths, workers, prefix=f"_bench/{os.getpid()}")
+            print(f"{r['workers']:>8} {r['ok']:>3}/{r['total']:<3} {r['seconds']:>9.3f} "
+                  f"{r['files_per_sec']:>9.1f} {r['mb_per_sec']:>8.1f}")
+
+        print("\nPer-operation latency (ms):")
+        for op, stats in client.metrics.snapshot().items():
+            print(f"  {op}: avg={stats['avg_ms']} p50={stats['p50_ms']} "
+                  f"p95={stats['p95_ms']} max={stats['max_ms']} errors={stats['errors']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+"""
+Problem Viewer Benchmark
+/problem/view/{id} under concurrent load, as after a broadcast when many
+users open the same problem at once.
+
+A local PostgREST stand-in answers every request after a fixed delay
+(default 50 ms) and counts them.
+
+Compared:
+    render   no viewer/problem cache: fetch the row and render on every hit (previous behaviour)
+    cached   pre-rendered page from the viewer cache
+    304      conditional request with the page's ETag (webview revalidation)
+
+Usage:
+    python benchmarks/bench_viewer.py
+    python benchmarks/bench_viewer.py --latency 0.05 --concurrency 10 100 --requests 1000
+"""
+
+import io
+import os
+import sys
+import json
+import time
+import socket
+import asyncio
+import argparse
+import threading
+import contextlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+UPSTREAM_PORT = 54332
+PROBLEM_ID = "2026_CSAT_Q01"
+
+# Point every client at the stand-in before the app (and src.config) is imported
+os.environ["SUPABASE_URL"] = f"http://127.0.0.1:{UPSTREAM_PORT}"
+os.environ["SUPABASE_KEY"] = os.environ["SUPABASE_SERVICE_KEY"] = "bench.bench.bench"
+os.environ["READ_REPLICA_ENABLED"] = "false"
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import httpx
+
+PROBLEM_ROW = {
+    "problem_id": PROBLEM_ID, "year": 2026, "exam": "CSAT", "question_no": 1,
+    "score": 3, "unit": "지수함수", "answer": "5", "updated_at": "2026-01-01T00:00:00+00:00",
+    "problem_image_url": f"http://127.0.0.1:{UPSTREAM_PORT}/img.png",
+}
+
+UPSTREAM_REQUESTS = [0]
+
+
+def start_upstream(latency: float) -> ThreadingHTTPServer:
+    """PostgREST stand-in: every response is delayed by `latency` seconds"""
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def setup(self):
+            super().setup()
+            self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+        def do_GET(self):
+            UPSTREAM_REQUESTS[0] += 1
+            time.sleep(latency)
+            body = json.dumps([PROBLEM_ROW]).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    class Server(ThreadingHTTPServer):
+        daemon_threads = True
+        request_queue_size = 256
+
+    server = Server(("127.0.0.1", UPSTREAM_PORT), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+async def run(app, concurrency: int, total: int, headers: dict, expect: int) -> dict:
+    latencies = []
+    sent_bytes = [0]
+    remaining = [total]
+    path = f"/problem/view/{PROBLEM_ID}"
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        async def worker():
+            while remaining[0] > 0:
+                remaining[0] -= 1
+                start = time.perf_counter()
+                response = await client.get(path, headers=headers)
+                assert response.status_code == expect, response.status_code
+                latencies.append(time.perf_counter() - start)
+                sent_bytes[0] += len(response.content)
+
+        UPSTREAM_REQUESTS[0] = 0
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "rps": total / elapsed,
+        "p50_ms": latencies[len(latencies) // 2] * 1000,
+        "p95_ms": latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] * 1000,
+        "db_per_req": UPSTREAM_REQUESTS[0] / total,
+        "kb_per_req": sent_bytes[0] / total / 1024,
+    }
+
+
+async def sweep(app, args, out):
+    from src.problem_cache import problem_cache, viewer_cache
+
+    print(f"Upstream latency: {args.latency * 1000:.0f} ms | requests/run: {args.requests}", file=out)
+    print(f"{'mode':>7} {'conc':>5} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'db/req':>7} {'KB/req':>7}", file=out)
+
+    async with app.router.lifespan_context(app):
+        cache_ttls = (problem_cache.ttl, viewer_cache.ttl)
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+            etag = (await client.get(f"/problem/view/{PROBLEM_ID}")).headers["etag"]
+
+        for mode in ("render", "cached", "304"):
+            problem_cache.clear()
+            viewer_cache.clear()
+            problem_cache.ttl, viewer_cache.ttl = (0, 0) if mode == "render" else cache_ttls
+            headers = {"If-None-Match": etag} if mode == "304" else {}
+            for concurrency in args.concurrency:
+                r = await run(app, concurrency, args.requests, headers, 304 if mode == "304" else 200)
+                print(f"{mode:>7} {concurrency:>5} {r['rps']:>8.0f} {r['p50_ms']:>8.1f} {r['p95_ms']:>8.1f} "
+                      f"{r['db_per_req']:>7.3f} {r['kb_per_req']:>7.1f}", file=out)
+        problem_cache.ttl, viewer_cache.ttl = cache_ttls
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Problem viewer benchmark")
+    parser.add_argument("--latency", type=float, default=0.05, help="Upstream latency in seconds")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[10, 100])
+    parser.add_argument("--requests", type=int, default=500, help="Requests per run")
+    args = parser.parse_args()
+
+    start_upstream(args.latency)
+    from server.main import app
+
+    # Startup/route logging; keep the table readable
+    out = sys.stdout
+    with contextlib.redirect_stdout(io.StringIO()):
+        asyncio.run(sweep(app, args, out))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+Submit Load Test
+Fires concurrent /problem/submit requests for one user and checks that the
+user's counters moved by exactly the number of submissions.
+
+Runs the FastAPI app in-process against the Supabase project in .env, so
+sql/submit_answer.sql must be applied there. Use a test account: its
+total_problems_solved / correct_count are incremented for real.
+
+Checked after the run:
+    total_problems_solved  +N
+    correct_count          +(number of responses with is_correct = true)
+
+Usage:
+    python benchmarks/load_submit.py --kakao-id 1234567890 --problem-id 2026_CSAT_Q01
+    python benchmarks/load_submit.py --kakao-id 1234567890 --problem-id 2026_CSAT_Q01 \\
+        --requests 200 --concurrency 50 --answers 1 2 3 4 5
+"""
+
+import io
+import sys
+import time
+import asyncio
+import argparse
+import contextlib
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import httpx
+
+COUNTERS = ("total_problems_solved", "correct_count", "consecutive_correct", "consecutive_wrong")
+
+
+def read_counters(supabase, kakao_id: str) -> dict:
+    row = supabase.client.table("users").select(",".join(COUNTERS)).eq("kakao_id", kakao_id).single().execute().data
+    return {k: row.get(k) or 0 for k in COUNTERS}
+
+
+async def fire(app, session_token: str, problem_id: str, answers: list, total: int, concurrency: int) -> list:
+    results = []
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url="http://load",
+        cookies={"session_token": session_token},
+    ) as client:
+        async def submit(i: int):
+            async with semaphore:
+                response = await client.post("/problem/submit", json={
+                    "problem_id": problem_id,
+                    "user_answer": answers[i % len(answers)],
+                })
+                response.raise_for_status()
+                results.append(response.json())
+
+        await asyncio.gather(*(submit(i) for i in range(total)))
+    return results
+
+
+async def run(args) -> int:
+    from server.main import app
+    from server.users import UserService
+    from src.supabase_service import get_shared_service
+
+    supabase = get_shared_service()
+    session_token = UserService().create_session(args.kakao_id)
+
+    before = read_counters(supabase, args.kakao_id)
+    start = time.perf_counter()
+    # Route handlers log every submission; keep the report readable
+    with contextlib.redirect_stdout(io.StringIO()):
+        async with app.router.lifespan_context(app):
+            results = await fire(app, session_token, args.problem_id, args.answers, args.requests, args.concurrency)
+    elapsed = time.perf_counter() - start
+    after = read_counters(supabase, args.kakao_id)
+
+    correct = sum(1 for r in results if r["is_correct"])
+    saved = sum(1 for r in results if r["saved"])
+    expected = {
+        "total_problems_solved": before["total_problems_solved"] + len(results),
+        "correct_count": before["correct_count"] + correct,
+    }
+
+    print(f"Submitted {len(results)} answers ({correct} correct, {saved} saved) "
+          f"in {elapsed:.2f}s at concurrency {args.concurrency} -> {len(results) / elapsed:.1f} req/s")
+    failed = False
+    for key, want in expected.items():
+        got = after[key]
+        status = "OK" if got == want else "LOST UPDATES"
+        failed |= got != want
+        print(f"  {key:<22} before={before[key]:<6} after={got:<6} expected={want:<6} {status}")
+    print(f"  streak after run: correct={after['consecutive_correct']} wrong={after['consecutive_wrong']}")
+    return 1 if failed or saved != len(results) else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent /problem/submit load test")
+    parser.add_argument("--kakao-id", required=True, help="Test user's kakao_id (counters are modified)")
+    parser.add_argument("--problem-id", required=True)
+    parser.add_argument("--answers", nargs="+", default=["1", "2", "3", "4", "5"],
+                        help="Answers cycled across requests (mix of right and wrong)")
+    parser.add_argument("--requests", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=20)
+    args = parser.parse_args()
+
+    sys.exit(asyncio.run(run(args)))
+
+
+if __name__ == "__main__":
+    main()
@@ -11,11 +11,12 @@ import os
 import re
 import io
 import base64
-import requests
 from typing import Optional, Tuple
 from urllib.parse import quote
 from dotenv import load_dotenv
 
+from src import http_transport
+
 load_dotenv()
 
 
@@ -264,7 +265,7 @@ class MathImageGenerator:
             "remhost": "quicklatex.com"
         }
         try:
-            response = requests.post(self.QUICKLATEX_URL, data=data, timeout=10)
+            response = http_transport.post(self.QUICKLATEX_URL, data=data, idempotent=True)
             if response.status_code == 200:
                 # 응답에서 이미지 URL 추출
                 lines = response.text.split('\n')
@@ -306,29 +307,22 @@ class MathImageGenerator:
 
         try:
             # 이미지 다운로드
-            response = requests.get(image_url, timeout=10)
+            response = http_transport.get(image_url)
             if response.status_code != 200:
                 return image_url
 
             image_data = response.content
 
-            # Supabase Storage에 업로드
-            upload_url = f"{self.supabase_url}/storage/v1/object/math-images/{filename}"
-            headers = {
-                "Authorization": f"Bearer {self.supabase_key}",
-                "Content-Type": "image/png"
-            }
+            # Supabase Storage에 업로드 (공유 StorageClient: 연결 풀, 재시도, 타임아웃)
+            from src.storage_client import get_storage_client
 
-            upload_response = requests.post(
-                upload_url,
-                headers=headers,
-                data=image_data,
-                timeout=30
+            upload = get_storage_client().upload_bytes(
+                image_data, filename, "image/png", bucket="math-images", upsert=False
             )
 
-            if upload_response.status_code in [200, 201]:
+            if upload["success"]:
                 # 공개 URL 반환
-                return f"{self.supabase_url}/storage/v1/object/public/math-images/{filename}"
+                return upload["url"]
 
         except Exception:
             pass
@@ -432,7 +426,7 @@ class KakaoMessageService:
         # 메시지 템플릿 구성
         template = self._build_problem_template(problem)
 
-        response = requests.post(
+        response = http_transport.post(
             url,
             headers={
                 "Authorization": f"Bearer {self.access_token}",
@@ -457,7 +451,7 @@ class KakaoMessageService:
 
         template = self._build_problem_template(problem)
 
-        response = requests.post(
+        response = http_transport.post(
             url,
             headers={
                 "Authorization": f"Bearer {self.access_token}",
@@ -502,7 +496,7 @@ class KakaoMessageService:
             "#{배점}": str(problem["score"]),
         }
 
-        response = requests.post(
+        response = http_transport.post(
             url,
             headers={
                 "Content-Type": "application/json;charset=UTF-8",
@@ -618,7 +612,7 @@ class KakaoMessageService:
         url = f"{self.base_url}/v2/api/talk/memo/default/send"
         template = self._build_hint_template(problem, hint_stage, hint_text)
 
-        response = requests.post(
+        response = http_transport.post(
             url,
             headers={
                 "Authorization": f"Bearer {self.access_token}",
@@ -633,7 +627,7 @@ class KakaoMessageService:
         url = f"{self.base_url}/v2/api/talk/memo/default/send"
         template = self._build_solution_template(problem, solution)
 
-        response = requests.post(
+        response = http_transport.post(
             url,
             headers={
                 "Authorization": f"Bearer {self.access_token}",
@@ -728,7 +722,7 @@ class KakaoMessageService:
             # 일반 텍스트 발송 (기존 방식)
             template = self._build_hint_template(problem, hint_stage, hint_text)
 
-        response = requests.post(
+        response = http_transport.post(
             url,
             headers={
                 "Authorization": f"Bearer {self.access_token}",
@@ -774,7 +768,7 @@ class KakaoMessageService:
                     image_url=images[0],
                     link_url=problem.get("solve_url")
                 )
-                response = requests.post(
+                response = http_transport.post(
                     url,
                     headers={
                         "Authorization": f"Bearer {self.access_token}",
@@ -793,7 +787,7 @@ class KakaoMessageService:
                         image_url=img_url,
                         link_url=problem.get("solve_url")
                     )
-                    response = requests.post(
+                    response = http_transport.post(
                         url,
                         headers={
                             "Authorization": f"Bearer {self.access_token}",
@@ -806,7 +800,7 @@ class KakaoMessageService:
         else:
             # 일반 텍스트 발송 (기존 방식)
             template = self._build_solution_template(problem, solution)
-            response = requests.post(
+            response = http_transport.post(
                 url,
                 headers={
                     "Authorization": f"Bearer {self.access_token}",
@@ -901,7 +895,7 @@ class KakaoMessageService:
             image_url=image_url
         )
 
-        response = requests.post(
+        response = http_transport.post(
             url,
             headers={
                 "Authorization": f"Bearer {self.access_token}",
@@ -944,7 +938,7 @@ class KakaoAuth:
 
     def get_access_token(self, auth_code: str) -> dict:
         """인가 코드로 액세스 토큰 발급"""
-        response = requests.post(
+        response = http_transport.post(
             "https://kauth.kakao.com/oauth/token",
             data={
                 "grant_type": "authorization_code",
@@ -957,7 +951,7 @@ class KakaoAuth:
 
     def refresh_access_token(self, refresh_token: str) -> dict:
         """리프레시 토큰으로 액세스 토큰 갱신"""
-        response = requests.post(
+        response = http_transport.post(
             "https://kauth.kakao.com/oauth/token",
             data={
                 "grant_type": "refresh_token",
@@ -969,7 +963,7 @@ class KakaoAuth:
 
     def get_user_info(self, access_token: str) -> dict:
         """사용자 정보 조회"""
-        response = requests.get(
+        response = http_transport.get(
             "https://kapi.kakao.com/v2/user/me",
             headers={"Authorization": f"Bearer {access_token}"}
         )
@@ -1033,7 +1027,7 @@ class AdaptiveLearningService:
         """
         url = f"{self.supabase_url}/rest/v1/rpc/process_answer"
 
-        response = requests.post(
+        response = http_transport.post(
             url,
             headers=self.headers,
             json={
@@ -1065,10 +1059,12 @@ class AdaptiveLearningService:
         if subject:
             params["p_subject"] = subject
 
-        response = requests.post(
+        # 추천 조회만 하는 RPC: 재시도해도 안전
+        response = http_transport.post(
             url,
             headers=self.headers,
-            json=params
+            json=params,
+            idempotent=True
         )
 
         if response.status_code == 200:
@@ -1091,7 +1087,7 @@ class AdaptiveLearningService:
         """
         url = f"{self.supabase_url}/rest/v1/user_learning_dashboard"
 
-        response = requests.get(
+        response = http_transport.get(
             url,
             headers=self.headers,
             params={"user_id": f"eq.{user_id}"}
@@ -36,6 +36,7 @@ from src.google_drive_service import GoogleDriveService
 from src.pdf_converter import PDFConverter
 from src.supabase_service import SupabaseService
 from src.supabase_storage import SupabaseStorageService
+from src.image_variants import with_variants
 from src.answer_parser import AnswerParser
 
 
@@ -174,31 +175,32 @@ class UnifiedPipeline:
             # DB 등록
             print("\n  [Step 5b] DB 문제 레코드 등록")
             url_map = {}
+            variants_map = {}
             for r in upload_results:
                 if r.get("success"):
                     url_map[r.get("filename", "")] = r.get("url")
+                    variants_map[r.get("filename", "")] = r.get("image_variants")
 
-            saved = 0
+            rows = []
             for result in split_summary.get("results", []):
                 q_no = result["question_no"]
                 problem_id = f"{year}_{exam}_Q{q_no:02d}"
                 filename = f"{problem_id}.png"
                 image_url = url_map.get(filename, "")
 
-                problem_data = {
+                rows.append(with_variants({
                     "problem_id": problem_id,
                     "year": year,
                     "exam": exam,
                     "question_no": q_no,
                     "problem_image_url": image_url,
                     "status": "ready",
-                }
+                }, variants_map.get(filename)))
 
-                try:
-                    self.db.upsert_problem(problem_data)
-                    saved += 1
-                except Exception as e:
-                    print(f"    DB 오류: {problem_id} - {e}")
+            db_result = self.db.bulk_upsert_problems(rows)
+            for err in db_result["errors"]:
+                print(f"    DB 오류: {err['problem_id']} - {err['error']}")
+            saved = db_result["written"]
 
             print(f"    {saved}개 문제 DB 등록 완료")
 
@@ -250,16 +252,10 @@ class UnifiedPipeline:
             records = self.answer_parser.to_db_records(parsed, year, exam, elective)
             print(f"\n  DB 업데이트: {len(records)}문제")
 
-            updated = 0
-            errors = 0
-            for rec in records:
-                pid = rec.pop("problem_id")
-                try:
-                    self.db.client.table("problems").update(rec).eq("problem_id", pid).execute()
-                    updated += 1
-                except Exception as e:
-                    errors += 1
-                    print(f"    오류: {pid} - {e}")
+            result = self.db.bulk_update_problems(records)
+            for err in result["errors"]:
+                print(f"    오류: {err['problem_id']} - {err['error']}")
+            updated, errors = result["written"], len(result["errors"])
 
             print(f"    {updated}개 정답 업데이트 완료 (에러: {errors})")
 
@@ -412,16 +408,11 @@ class UnifiedPipeline:
             records = self.answer_parser.to_db_records(parsed, year, exam, elective)
             print(f"\n  DB 업데이트: {len(records)}문제")
 
-            updated = 0
-            for rec in records:
-                pid = rec.pop("problem_id")
-                try:
-                    self.db.client.table("problems").update(rec).eq("problem_id", pid).execute()
-                    updated += 1
-                except Exception as e:
-                    print(f"    오류: {pid} - {e}")
+            result = self.db.bulk_update_problems(records)
+            for err in result["errors"]:
+                print(f"    오류: {err['problem_id']} - {err['error']}")
 
-            print(f"  {updated}개 정답 업데이트 완료")
+            print(f"  {result['written']}개 정답 업데이트 완료")
         else:
             # 문제 PDF 처리
             print("\n  PDF → 이미지 변환...")
@@ -455,24 +446,23 @@ class UnifiedPipeline:
 
             print("\n  DB 등록...")
             url_map = {r.get("filename", ""): r.get("url") for r in upload_results if r.get("success")}
-            saved = 0
+            variants_map = {r.get("filename", ""): r.get("image_variants") for r in upload_results if r.get("success")}
+            rows = []
             for result in split_summary.get("results", []):
                 q_no = result["question_no"]
                 problem_id = f"{year}_{exam}_Q{q_no:02d}"
-                problem_data = {
+                rows.append(with_variants({
                     "problem_id": problem_id,
                     "year": year,
                     "exam": exam,
                     "question_no": q_no,
                     "problem_image_url": url_map.get(f"{problem_id}.png", ""),
                     "status": "ready",
-                }
-                try:
-                    self.db.upsert_problem(problem_data)
-                    saved += 1
-                except Exception as e:
-                    print(f"    오류: {problem_id} - {e}")
-            print(f"  {saved}개 문제 DB 등록 완료")
+                }, variants_map.get(f"{problem_id}.png")))
+            db_result = self.db.bulk_upsert_problems(rows)
+            for err in db_result["errors"]:
+                print(f"    오류: {err['problem_id']} - {err['error']}")
+            print(f"  {db_result['written']}개 문제 DB 등록 완료")
 
 
 def main():
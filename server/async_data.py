@@ -0,0 +1,338 @@
+"""
+Async Data Access Layer
+Non-blocking PostgREST / Storage / Kakao API calls for FastAPI route handlers.
+
+supabase-py and requests block the event loop, so one slow upstream call
+stalls every request on the worker. Routes use this layer instead; each
+upstream gets one pooled httpx.AsyncClient per worker, created in the app
+lifespan and injected with Depends(get_data) (server/dependencies.py).
+"""
+
+import sys
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Optional, Union
+
+import httpx
+from starlette.concurrency import run_in_threadpool
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.config import (
+    SUPABASE_URL, SUPABASE_KEY, SUPABASE_SERVICE_KEY,
+    SUPABASE_POOL_SIZE, SUPABASE_TIMEOUT,
+    HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT,
+)
+from src.http_transport import create_async_transport
+from src.problem_cache import (
+    MISSING, get_cached_problem, cache_problem,
+    get_cached_hints, cache_hints, invalidate_problem,
+    get_cached_hint_set, cache_hint_set,
+)
+from src.read_replica import get_replica
+
+
+class AsyncDataAccess:
+    """Pooled async clients for PostgREST, Storage and the Kakao API"""
+
+    def __init__(
+        self,
+        supabase_url: Optional[str] = None,
+        service_key: Optional[str] = None,
+        pool_size: int = SUPABASE_POOL_SIZE,
+        timeout: float = SUPABASE_TIMEOUT,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        """
+        Args:
+            supabase_url: Supabase 프로젝트 URL
+            service_key: Supabase service role key (anon key fallback)
+            pool_size: 업스트림별 최대 연결 수
+            timeout: 요청 타임아웃(초)
+            transport: 테스트/벤치마크용 httpx transport
+        """
+        url = (supabase_url or SUPABASE_URL or "").rstrip("/")
+        key = service_key or SUPABASE_SERVICE_KEY or SUPABASE_KEY or ""
+
+        auth_headers = {"apikey": key, "Authorization": f"Bearer {key}"}
+
+        # Pooled, connect-retrying transports that report per-host metrics (/health -> "http")
+        self.rest = httpx.AsyncClient(
+            base_url=f"{url}/rest/v1", headers=auth_headers, timeout=timeout,
+            transport=transport or create_async_transport(pool_size),
+        )
+        self.storage = httpx.AsyncClient(
+            base_url=f"{url}/storage/v1", headers=auth_headers, timeout=timeout,
+            transport=transport or create_async_transport(pool_size),
+        )
+        self.kakao = httpx.AsyncClient(
+            timeout=httpx.Timeout(HTTP_READ_TIMEOUT, connect=HTTP_CONNECT_TIMEOUT),
+            transport=transport or create_async_transport(pool_size),
+        )
+
+    async def aclose(self):
+        for client in (self.rest, self.storage, self.kakao):
+            await client.aclose()
+
+    # ============================================
+    # PostgREST
+    # ============================================
+
+    async def select(self, table: str, params: dict) -> list:
+        """GET /rest/v1/{table} with PostgREST query params"""
+        response = await self.rest.get(f"/{table}", params=params)
+        response.raise_for_status()
+        return response.json()
+
+    async def select_one(self, table: str, params: dict) -> Optional[dict]:
+        """First matching row or None"""
+        rows = await self.select(table, {**params, "limit": 1})
+        return rows[0] if rows else None
+
+    async def insert(self, table: str, rows: Union[dict, list], returning: bool = False) -> list:
+        """POST /rest/v1/{table}"""
+        prefer = "return=representation" if returning else "return=minimal"
+        response = await self.rest.post(f"/{table}", json=rows, headers={"Prefer": prefer})
+        response.raise_for_status()
+        return response.json() if returning and response.content else []
+
+    async def upsert(self, table: str, rows: Union[dict, list], on_conflict: str,
+                     returning: bool = True) -> list:
+        """POST /rest/v1/{table}?on_conflict=... (merge duplicates, returns rows)"""
+        prefer = "return=representation" if returning else "return=minimal"
+        response = await self.rest.post(
+            f"/{table}", params={"on_conflict": on_conflict}, json=rows,
+            headers={"Prefer": f"resolution=merge-duplicates,{prefer}"},
+        )
+        response.raise_for_status()
+        return response.json() if returning and response.content else []
+
+    async def update(self, table: str, values: dict, filters: dict) -> None:
+        """PATCH /rest/v1/{table}?col=eq.value"""
+        params = {col: f"eq.{value}" for col, value in filters.items()}
+        response = await self.rest.patch(
+            f"/{table}", params=params, json=values, headers={"Prefer": "return=minimal"}
+        )
+        response.raise_for_status()
+
+    async def rpc(self, function: str, params: dict):
+        """POST /rest/v1/rpc/{function}"""
+        response = await self.rest.post(f"/rpc/{function}", json=params)
+        response.raise_for_status()
+        return response.json() if response.content else None
+
+    # ============================================
+    # 도메인 조회
+    # ============================================
+
+    async def get_problem(self, problem_id: str, fresh: bool = False) -> Optional[dict]:
+        """
+        문제 조회 (캐시 -> 로컬 복제본 -> Supabase)
+
+        Args:
+            problem_id: 문제 ID
+            fresh: True면 캐시/복제본을 건너뛰고 Supabase에서 읽음 (결과는 캐시에 저장)
+        """
+        if not fresh:
+            cached = get_cached_problem(problem_id)
+            if cached is not MISSING:
+                return cached
+
+            replica = get_replica()
+            row = replica.get_problem(problem_id) if replica else None
+            if row is not None:
+                cache_problem(problem_id, row)
+                return row
+
+        row = await self.select_one("problems", {"select": "*", "problem_id": f"eq.{problem_id}"})
+        cache_problem(problem_id, row)
+        return row
+
+    async def get_problem_version(self, problem_id: str) -> Optional[str]:
+        """문제의 updated_at만 조회 (뷰어 캐시 검증용, 캐시/복제본 미사용)"""
+        row = await self.select_one("problems", {"select": "updated_at", "problem_id": f"eq.{problem_id}"})
+        return row.get("updated_at") if row else None
+
+    async def update_problem(self, problem_id: str, values: dict) -> None:
+        """문제 업데이트 (캐시 무효화)"""
+        values = {**values, "updated_at": datetime.now().isoformat()}
+        await self.update("problems", values, {"problem_id": problem_id})
+        invalidate_problem(problem_id)
+
+    async def get_hints(self, problem_id: str) -> list:
+        """문제의 힌트 목록 조회 (캐시 -> 로컬 복제본 -> Supabase)"""
+        cached = get_cached_hints(problem_id)
+        if cached is not MISSING:
+            return cached
+
+        replica = get_replica()
+        hints = replica.get_hints(problem_id) if replica else None
+        if hints is not None:
+            cache_hints(problem_id, hints)
+            return hints
+
+        hints = await self.select("hints", {
+            "select": "*",
+            "problem_id": f"eq.{problem_id}",
+            "order": "stage",
+        })
+        cache_hints(problem_id, hints)
+        return hints
+
+    async def get_hint(self, problem_id: str, stage: int) -> Optional[dict]:
+        """단계별 힌트 조회"""
+        for hint in await self.get_hints(problem_id):
+            if hint.get("stage") == stage:
+                return hint
+        return None
+
+    async def get_hint_set(self, problem_id: str) -> Optional[dict]:
+        """
+        힌트 세트 + 공개 일정 (/problem/hint)
+
+        캐시 -> 문제/힌트 캐시·로컬 복제본 -> Supabase 1회 (problems + hints 임베드)
+
+        Returns:
+            {"hints": {stage: {"hint_text", "hint_type"}}, "unlock_at": {stage: datetime}}
+            문제가 없으면 None. unlock_at에 없는 단계는 즉시 공개.
+        """
+        cached = get_cached_hint_set(problem_id)
+        if cached is not MISSING:
+            return cached
+
+        replica = get_replica()
+        problem = get_cached_problem(problem_id)
+        if problem is MISSING and replica:
+            problem = replica.get_problem(problem_id) or MISSING
+        hints = get_cached_hints(problem_id)
+        if hints is MISSING and problem is not MISSING and replica:
+            hints = replica.get_hints(problem_id)
+            hints = MISSING if hints is None else hints
+
+        if problem is MISSING or hints is MISSING:
+            # Unlock fields and hints in one round trip via the hints -> problems FK
+            problem = await self.select_one("problems", {
+                "select": "*,hints(*)",
+                "problem_id": f"eq.{problem_id}",
+            })
+            if not problem:
+                return None
+            hints = sorted(problem.pop("hints", None) or [], key=lambda h: h.get("stage") or 0)
+            cache_problem(problem_id, problem)
+            cache_hints(problem_id, hints)
+
+        hint_set = _build_hint_set(problem, hints)
+        cache_hint_set(problem_id, hint_set)
+        return hint_set
+
+    async def get_user_by_kakao_id(self, kakao_id: str) -> Optional[dict]:
+        """카카오 ID로 사용자 조회 (워커별 캐시 -> Supabase)"""
+        from server.users import get_cached_user, cache_user
+
+        cached = get_cached_user(kakao_id)
+        if cached is not MISSING:
+            return cached
+
+        user = await self.select_one("users", {"select": "*", "kakao_id": f"eq.{kakao_id}"})
+        cache_user(user)
+        return user
+
+    async def upsert_user(self, user_data: dict) -> Optional[dict]:
+        """로그인 사용자 생성/갱신 (1회 왕복, 신규 기본값은 컬럼 DEFAULT)"""
+        from server.users import cache_user, invalidate_user
+
+        invalidate_user(user_data.get("kakao_id"))
+        rows = await self.upsert("users", user_data, on_conflict="kakao_id")
+        user = rows[0] if rows else None
+        cache_user(user)
+        return user
+
+    async def submit_answer(self, problem_id: str, user_answer: str,
+                            user_id: Optional[str] = None, hints_used: int = 0) -> dict:
+        """
+        채점 + 풀이 기록 + 사용자 통계 갱신 (submit_answer RPC, 1회 왕복)
+
+        Returns:
+            {"found", "is_correct", "correct_answer", "solution", "score", "recorded", "stats"}
+
+        Raises:
+            httpx.HTTPStatusError: RPC 실패 (미설치 시 응답 본문에 PGRST202)
+        """
+        return await self.rpc("submit_answer", {
+            "p_problem_id": problem_id,
+            "p_user_answer": user_answer,
+            "p_user_id": user_id,
+            "p_hints_used": hints_used,
+        })
+
+    async def get_session_kakao_id(self, session_token: str) -> Optional[str]:
+        """세션 토큰의 kakao_id (세션 저장소만 조회, users 조회 없음)"""
+        from server.session_store import get_session_store
+
+        return await run_in_threadpool(get_session_store().get, session_token)
+
+    async def get_user_by_session(self, session_token: str) -> Optional[dict]:
+        """세션 토큰으로 사용자 조회 (세션 저장소 -> 사용자 캐시)"""
+        kakao_id = await self.get_session_kakao_id(session_token)
+        if not kakao_id:
+            return None
+        return await self.get_user_by_kakao_id(kakao_id)
+
+    # ============================================
+    # Storage
+    # ============================================
+
+    async def upload_object(self, bucket: str, remote_path: str, data: bytes,
+                            content_type: str = "image/png") -> bool:
+        """Upload (upsert) an object to Supabase Storage"""
+        response = await self.storage.post(
+            f"/object/{bucket}/{remote_path}",
+            content=data,
+            headers={"Content-Type": content_type, "x-upsert": "true"},
+        )
+        return response.status_code in [200, 201]
+
+    # ============================================
+    # Kakao API
+    # ============================================
+
+    async def kakao_post(self, url: str, data: dict, access_token: Optional[str] = None) -> httpx.Response:
+        """Form-encoded POST to a Kakao endpoint"""
+        headers = {"Content-Type": "application/x-www-form-urlencoded"}
+        if access_token:
+            headers["Authorization"] = f"Bearer {access_token}"
+        return await self.kakao.post(url, data=data, headers=headers)
+
+    async def kakao_get(self, url: str, access_token: str) -> httpx.Response:
+        """Authorized GET to a Kakao endpoint"""
+        return await self.kakao.get(url, headers={"Authorization": f"Bearer {access_token}"})
+
+
+def _build_hint_set(problem: dict, hints: list) -> dict:
+    """
+    Hint texts by stage plus unlock times
+
+    Time-based unlock (if published_at is set): stage N opens at
+    published_at + hint_interval_hours * (N - 1). Stage 1 and problems
+    without published_at are open immediately.
+    """
+    unlock_at = {}
+    published_at = problem.get("published_at")
+    if published_at:
+        try:
+            published = datetime.fromisoformat(str(published_at).replace("Z", "+00:00"))
+            if published.tzinfo is None:
+                published = published.replace(tzinfo=timezone.utc)
+            interval = problem.get("hint_interval_hours", 24) or 24
+            unlock_at = {stage: published + timedelta(hours=interval * (stage - 1)) for stage in (2, 3)}
+        except (TypeError, ValueError):
+            pass  # Unparseable schedule: all hints open, as before
+
+    return {
+        "problem_id": problem.get("problem_id"),
+        "hints": {
+            h["stage"]: {"hint_text": h.get("hint_text"), "hint_type": h.get("hint_type")}
+            for h in hints if h.get("stage") is not None
+        },
+        "unlock_at": unlock_at,
+    }
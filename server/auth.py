@@ -4,15 +4,23 @@ Handles login, callback, and logout
 """
 
 import os
+import asyncio
 import secrets
 from datetime import datetime, timedelta
 from typing import Optional
 
-import requests
-from fastapi import APIRouter, Request, HTTPException
+import httpx
+from fastapi import APIRouter, Request, HTTPException, Depends
 from fastapi.responses import RedirectResponse, HTMLResponse
+from starlette.concurrency import run_in_threadpool
 from dotenv import load_dotenv
 
+from src.config import SESSION_TTL
+from server.async_data import AsyncDataAccess
+from server.dependencies import get_data
+from server.users import invalidate_user, build_user_upsert
+from server.session_store import get_session_store
+
 load_dotenv()
 
 router = APIRouter()
@@ -135,7 +143,8 @@ async def kakao_callback(
     code: Optional[str] = None,
     state: Optional[str] = None,
     error: Optional[str] = None,
-    error_description: Optional[str] = None
+    error_description: Optional[str] = None,
+    data: AsyncDataAccess = Depends(get_data)
 ):
     """
     Step 2: Handle Kakao OAuth callback
@@ -189,12 +198,7 @@ async def kakao_callback(
         if KAKAO_CLIENT_SECRET:
             token_data_request["client_secret"] = KAKAO_CLIENT_SECRET
 
-        token_response = requests.post(
-            KAKAO_TOKEN_URL,
-            data=token_data_request,
-            headers={"Content-Type": "application/x-www-form-urlencoded"},
-            timeout=10
-        )
+        token_response = await data.kakao_post(KAKAO_TOKEN_URL, token_data_request)
 
         if token_response.status_code != 200:
             error_data = token_response.json()
@@ -215,7 +219,7 @@ async def kakao_callback(
         refresh_token = token_data.get("refresh_token")
         expires_in = token_data.get("expires_in", 21600)
 
-    except requests.RequestException as e:
+    except httpx.HTTPError as e:
         return HTMLResponse(
             content=get_html_response(
                 "Network Error",
@@ -228,11 +232,7 @@ async def kakao_callback(
 
     # Get user info from Kakao
     try:
-        user_response = requests.get(
-            KAKAO_USER_URL,
-            headers={"Authorization": f"Bearer {access_token}"},
-            timeout=10
-        )
+        user_response = await data.kakao_get(KAKAO_USER_URL, access_token)
 
         if user_response.status_code != 200:
             return HTMLResponse(
@@ -254,7 +254,7 @@ async def kakao_callback(
         profile_image = properties.get("profile_image")
         email = kakao_account.get("email")
 
-    except requests.RequestException as e:
+    except httpx.HTTPError as e:
         return HTMLResponse(
             content=get_html_response(
                 "Network Error",
@@ -265,29 +265,34 @@ async def kakao_callback(
             status_code=500
         )
 
-    # Save user to database
-    from server.users import UserService
+    # Save user (single upsert) and create the session concurrently
     print(f"[Debug] Saving user: kakao_id={kakao_id}, nickname={nickname}")
+    store = get_session_store()
+    user_data = build_user_upsert(
+        kakao_id=kakao_id,
+        nickname=nickname,
+        email=email,
+        profile_image=profile_image,
+        access_token=access_token,
+        refresh_token=refresh_token,
+        token_expires_at=datetime.now() + timedelta(seconds=expires_in)
+    )
 
-    try:
-        user_service = UserService()
-        user = user_service.upsert_user(
-            kakao_id=kakao_id,
-            nickname=nickname,
-            email=email,
-            profile_image=profile_image,
-            access_token=access_token,
-            refresh_token=refresh_token,
-            token_expires_at=datetime.now() + timedelta(seconds=expires_in)
-        )
-        print(f"[Debug] User save result: {user}")
-    except Exception as e:
-        print(f"[Debug] Database error: {e}")
-        import traceback
-        traceback.print_exc()
-        user = None
-
-    if not user:
+    user_result, session_result = await asyncio.gather(
+        data.upsert_user(user_data),
+        run_in_threadpool(store.create, kakao_id),
+        return_exceptions=True,
+    )
+    user = None if isinstance(user_result, BaseException) else user_result
+    session_token = None if isinstance(session_result, BaseException) else session_result
+    if isinstance(user_result, BaseException):
+        print(f"[Debug] Database error: {user_result}")
+    if isinstance(session_result, BaseException):
+        print(f"[Debug] Session error: {session_result}")
+
+    if not user or not session_token:
+        if session_token:
+            await run_in_threadpool(store.delete, session_token)
         return HTMLResponse(
             content=get_html_response(
                 "Database Error",
@@ -298,15 +303,12 @@ async def kakao_callback(
             status_code=500
         )
 
-    # Create session
-    session_token = user_service.create_session(kakao_id)
-
     # Redirect to dashboard with session cookie
     response = RedirectResponse(url="/dashboard", status_code=302)
     response.set_cookie(
         key="session_token",
         value=session_token,
-        max_age=86400 * 7,  # 7 days
+        max_age=SESSION_TTL,  # sliding: renewed by SessionRenewalMiddleware
         httponly=True,
         samesite="lax"
     )
@@ -334,7 +336,7 @@ async def logout(request: Request):
 
 
 @router.get("/me")
-async def get_current_user(request: Request):
+async def get_current_user(request: Request, data: AsyncDataAccess = Depends(get_data)):
     """
     Get current logged-in user info (API endpoint)
     """
@@ -343,9 +345,7 @@ async def get_current_user(request: Request):
     if not session_token:
         raise HTTPException(status_code=401, detail="Not authenticated")
 
-    from server.users import UserService
-    user_service = UserService()
-    user = user_service.get_user_by_session(session_token)
+    user = await data.get_user_by_session(session_token)
 
     if not user:
         raise HTTPException(status_code=401, detail="Session expired")
@@ -365,7 +365,7 @@ async def get_current_user(request: Request):
 
 
 @router.post("/refresh")
-async def refresh_token(request: Request):
+async def refresh_token(request: Request, data: AsyncDataAccess = Depends(get_data)):
     """
     Refresh Kakao access token
     """
@@ -374,9 +374,7 @@ async def refresh_token(request: Request):
     if not session_token:
         raise HTTPException(status_code=401, detail="Not authenticated")
 
-    from server.users import UserService
-    user_service = UserService()
-    user = user_service.get_user_by_session(session_token)
+    user = await data.get_user_by_session(session_token)
 
     if not user:
         raise HTTPException(status_code=401, detail="Session expired")
@@ -387,14 +385,13 @@ async def refresh_token(request: Request):
 
     # Refresh token with Kakao
     try:
-        response = requests.post(
+        response = await data.kakao_post(
             KAKAO_TOKEN_URL,
-            data={
+            {
                 "grant_type": "refresh_token",
                 "client_id": KAKAO_CLIENT_ID,
                 "refresh_token": refresh_token,
-            },
-            timeout=10
+            }
         )
 
         if response.status_code != 200:
@@ -406,14 +403,15 @@ async def refresh_token(request: Request):
         expires_in = token_data.get("expires_in", 21600)
 
         # Update user tokens
-        user_service.update_tokens(
-            kakao_id=user.get("kakao_id"),
-            access_token=new_access_token,
-            refresh_token=new_refresh_token,
-            token_expires_at=datetime.now() + timedelta(seconds=expires_in)
-        )
+        await data.update("users", {
+            "access_token": new_access_token,
+            "refresh_token": new_refresh_token,
+            "token_expires_at": (datetime.now() + timedelta(seconds=expires_in)).isoformat(),
+            "updated_at": datetime.now().isoformat()
+        }, {"kakao_id": user.get("kakao_id")})
+        invalidate_user(user.get("kakao_id"))
 
         return {"message": "Token refreshed successfully"}
 
-    except requests.RequestException as e:
+    except httpx.HTTPError as e:
         raise HTTPException(status_code=500, detail=f"Network error: {str(e)}")
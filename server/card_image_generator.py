@@ -5,9 +5,10 @@ Generates composite card images with problem + metadata
 
 from PIL import Image, ImageDraw, ImageFont
 import io
-import requests
 from typing import Optional
 
+from src import http_transport
+
 
 class CardImageGenerator:
     """Generate KakaoTalk-optimized card images"""
@@ -133,7 +134,7 @@ class CardImageGenerator:
 
         # 2. Load and resize problem image (middle section)
         try:
-            response = requests.get(problem_image_url, timeout=10)
+            response = http_transport.get(problem_image_url)
             response.raise_for_status()
             problem_img = Image.open(io.BytesIO(response.content))
 
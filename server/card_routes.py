@@ -3,12 +3,18 @@ Card Upload Routes
 Handles uploading and saving problem cards from the card maker UI
 """
 
-from fastapi import APIRouter, File, UploadFile, Form, HTTPException
+from fastapi import APIRouter, File, UploadFile, Form, HTTPException, Depends
 from fastapi.responses import JSONResponse
+from starlette.concurrency import run_in_threadpool
 import os
 from pathlib import Path
 from dotenv import load_dotenv
-import requests
+
+from src.storage_client import get_storage_client
+from src.image_variants import build_and_upload_variants, with_variants
+from src.supabase_service import SupabaseService
+from server.dependencies import get_supabase
+from server.uploads import spool_upload, MAX_IMAGE_UPLOAD_BYTES
 
 load_dotenv()
 
@@ -26,7 +32,8 @@ async def upload_card(
     category: str = Form(...),
     subject: str = Form(None),
     answer: str = Form(None),
-    solution: str = Form(None)
+    solution: str = Form(None),
+    supabase: SupabaseService = Depends(get_supabase)
 ):
     """
     Upload a problem card image and save to database
@@ -44,38 +51,28 @@ async def upload_card(
         JSON with success status and image URL
     """
     try:
-        # Read file content
-        file_content = await file.read()
-
-        # Upload to Supabase Storage
-        url = os.getenv("SUPABASE_URL")
-        service_key = os.getenv("SUPABASE_SERVICE_KEY")
-        bucket = "problem-images-v2"
+        # Stream file to disk, then upload from the file handle (constant memory)
+        spooled = await spool_upload(file, MAX_IMAGE_UPLOAD_BYTES, suffix=".png")
 
-        # Filename: problem_id.png
+        # Upload to Supabase Storage, then the 480/800/1200 WebP + PNG derivatives
         filename = f"{problem_id}.png"
-        upload_url = f"{url}/storage/v1/object/{bucket}/{filename}"
-
-        headers = {
-            "Authorization": f"Bearer {service_key}",
-            "Content-Type": "image/png",
-            "x-upsert": "true"
-        }
-
-        resp = requests.post(upload_url, headers=headers, data=file_content)
-
-        if resp.status_code not in [200, 201]:
-            raise HTTPException(status_code=500, detail=f"Upload failed: {resp.text}")
-
-        # Generate public URL
-        image_url = f"{url}/storage/v1/object/public/{bucket}/{filename}"
+        variants = None
+        try:
+            with spooled.open() as f:
+                upload = await run_in_threadpool(
+                    get_storage_client().upload_file, f, filename, "image/png", size=spooled.size
+                )
+            if upload["success"]:
+                variants = await run_in_threadpool(build_and_upload_variants, problem_id, spooled.path)
+        finally:
+            spooled.cleanup()
+
+        if not upload["success"]:
+            raise HTTPException(status_code=500, detail=f"Upload failed: {upload.get('error')}")
+
+        image_url = upload["url"]
 
         # Save to database
-        from supabase import create_client
-        supabase = create_client(
-            os.getenv("SUPABASE_URL"),
-            os.getenv("SUPABASE_KEY")
-        )
 
         # Map exam names
         exam_map = {
@@ -103,6 +100,7 @@ async def upload_card(
             "status": "ready",  # Card maker = ready to send
             "unit": category,  # Use category as unit
         }
+        with_variants(problem_data, variants)
 
         # Add optional metadata if provided
         if subject:
@@ -113,10 +111,7 @@ async def upload_card(
         if solution:
             problem_data["solution"] = solution
 
-        supabase.table("problems").upsert(
-            problem_data,
-            on_conflict="problem_id"
-        ).execute()
+        supabase.upsert_problem(problem_data)
 
         return {
             "success": True,
@@ -125,6 +120,10 @@ async def upload_card(
             "message": "Card uploaded and saved successfully"
         }
 
+    except HTTPException as e:
+        if e.status_code != 413:
+            raise
+        return JSONResponse(status_code=413, content={"success": False, "error": e.detail})
     except Exception as e:
         import traceback
         error_details = traceback.format_exc()
@@ -4,10 +4,15 @@ Provides API endpoints and HTML dashboard for system analytics.
 """
 
 from datetime import date, datetime, timedelta
-from fastapi import APIRouter, Request, HTTPException
+from typing import Optional
+
+from fastapi import APIRouter, Request, HTTPException, Depends
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import HTMLResponse
 
-from src.supabase_service import SupabaseService
+from src.supabase_service import SupabaseService, get_shared_service
+from server.dependencies import get_supabase
+from server.dashboard_snapshot import DashboardSnapshot, get_snapshot
 
 router = APIRouter()
 
@@ -24,18 +29,13 @@ def _require_auth(request: Request):
     return user
 
 
-def get_dashboard_stats() -> dict:
+def get_dashboard_stats(supabase: Optional[SupabaseService] = None) -> dict:
     """Gather all dashboard statistics from the database"""
-    supabase = SupabaseService()
+    supabase = supabase or get_shared_service()
     stats = {}
 
     # 1. Problem stats
-    problems = supabase.client.table("problems").select(
-        "problem_id, year, exam, status, score, score_verified, "
-        "answer_verified, problem_image_url, difficulty, subject, unit"
-    ).execute()
-
-    all_problems = problems.data
+    all_problems = list(supabase.iter_problems(fields="admin"))
     stats["total_problems"] = len(all_problems)
     stats["ready_problems"] = sum(1 for p in all_problems if p["status"] == "ready")
     stats["with_images"] = sum(1 for p in all_problems if p.get("problem_image_url"))
@@ -63,13 +63,13 @@ def get_dashboard_stats() -> dict:
         unit_counts[unit] = unit_counts.get(unit, 0) + 1
     stats["by_unit"] = unit_counts
 
-    # 2. Hint stats
-    hints = supabase.client.table("hints").select("problem_id, stage", count="exact").execute()
-    stats["total_hints"] = hints.count if hints.count else len(hints.data)
+    # 2. Hint stats (counts only, no rows transferred)
     stats["hints_per_stage"] = {}
-    for h in hints.data:
-        stage = h["stage"]
-        stats["hints_per_stage"][stage] = stats["hints_per_stage"].get(stage, 0) + 1
+    for stage in (1, 2, 3):
+        count = _count(supabase.client.table("hints").select("id", count="exact", head=True).eq("stage", stage))
+        if count:
+            stats["hints_per_stage"][stage] = count
+    stats["total_hints"] = sum(stats["hints_per_stage"].values())
 
     # 3. User stats
     users = supabase.client.table("users").select(
@@ -94,21 +94,17 @@ def get_dashboard_stats() -> dict:
             "streak_wrong": u.get("consecutive_wrong", 0) or 0,
         })
 
-    # 4. Delivery stats
-    deliveries = supabase.client.table("deliveries").select(
-        "id, problem_id, status, is_correct, delivered_at, "
-        "hint_1_viewed_at, hint_2_viewed_at, hint_3_viewed_at"
-    ).execute()
+    # 4. Delivery stats (counts only: deliveries grows without bound)
+    def deliveries():
+        return supabase.client.table("deliveries").select("id", count="exact", head=True)
 
-    all_deliveries = deliveries.data
-    stats["total_deliveries"] = len(all_deliveries)
-    stats["answered"] = sum(1 for d in all_deliveries if d.get("is_correct") is not None)
-    stats["correct_answers"] = sum(1 for d in all_deliveries if d.get("is_correct") is True)
-    stats["wrong_answers"] = sum(1 for d in all_deliveries if d.get("is_correct") is False)
+    stats["total_deliveries"] = _count(deliveries())
+    stats["answered"] = _count(deliveries().not_.is_("is_correct", "null"))
+    stats["correct_answers"] = _count(deliveries().is_("is_correct", "true"))
+    stats["wrong_answers"] = _count(deliveries().is_("is_correct", "false"))
     stats["hint_usage"] = {
-        "hint_1": sum(1 for d in all_deliveries if d.get("hint_1_viewed_at")),
-        "hint_2": sum(1 for d in all_deliveries if d.get("hint_2_viewed_at")),
-        "hint_3": sum(1 for d in all_deliveries if d.get("hint_3_viewed_at")),
+        f"hint_{stage}": _count(deliveries().not_.is_(f"hint_{stage}_viewed_at", "null"))
+        for stage in (1, 2, 3)
     }
 
     # 5. Schedule stats (today)
@@ -127,18 +123,41 @@ def get_dashboard_stats() -> dict:
     return stats
 
 
+def _count(query) -> int:
+    """Exact row count of a head=True select"""
+    return query.execute().count or 0
+
+
+def dashboard_snapshot(supabase: Optional[SupabaseService] = None) -> DashboardSnapshot:
+    """Shared snapshot of get_dashboard_stats (revalidated on demand)"""
+    return get_snapshot(lambda: get_dashboard_stats(supabase))
+
+
 @router.get("/api")
-async def dashboard_api(request: Request):
-    """JSON API for dashboard statistics (requires auth)"""
+async def dashboard_api(
+    request: Request,
+    refresh: bool = False,
+    supabase: SupabaseService = Depends(get_supabase),
+):
+    """
+    JSON API for dashboard statistics (requires auth)
+
+    Serves the last snapshot (recomputed in the background once it is older
+    than DASHBOARD_REFRESH_INTERVAL); computed_at / age_seconds tell how
+    fresh it is. ?refresh=true recomputes before answering.
+    """
     _require_auth(request)
-    return get_dashboard_stats()
+    snapshot = dashboard_snapshot(supabase)
+    if refresh:
+        return await run_in_threadpool(snapshot.refresh)
+    return await run_in_threadpool(snapshot.get)
 
 
 @router.get("", response_class=HTMLResponse)
-async def dashboard_page(request: Request):
+async def dashboard_page(request: Request, supabase: SupabaseService = Depends(get_supabase)):
     """HTML dashboard page (requires auth)"""
     _require_auth(request)
-    stats = get_dashboard_stats()
+    stats = await run_in_threadpool(dashboard_snapshot(supabase).get)
 
     # Build year/exam table rows
     year_exam_rows = ""
@@ -212,7 +231,7 @@ async def dashboard_page(request: Request):
 <body>
     <div class="header">
         <h1>수능 수학 분석</h1>
-        <p>시스템 대시보드 - {date.today().isoformat()}</p>
+        <p>시스템 대시보드 - {date.today().isoformat()} · 집계 {stats['computed_at'][:19].replace('T', ' ')} UTC ({stats['age_seconds']:.0f}초 전)</p>
     </div>
     <div class="container">
         <!-- Summary Cards -->
@@ -0,0 +1,126 @@
+"""
+Dashboard Snapshot
+Cached copy of the analytics dashboard aggregates, refreshed on demand.
+
+get_dashboard_stats() scans problems, users and today's schedules and counts
+hints/deliveries; doing that on every /analytics load makes the page cost
+grow with the tables. Requests read the last snapshot instead
+(stale-while-revalidate): once it is older than DASHBOARD_REFRESH_INTERVAL
+seconds, the request still gets it immediately and one background run
+recomputes it. Nothing runs while nobody opens the dashboard.
+
+    snapshot.get()       last snapshot (computed on first use if none yet)
+    snapshot.refresh()   recompute now; concurrent callers share one run
+"""
+
+import time
+import threading
+from datetime import datetime, timezone
+from typing import Callable, Optional
+
+from src.config import DASHBOARD_REFRESH_INTERVAL
+
+
+class DashboardSnapshot:
+    """Cached dashboard aggregates, revalidated in the background when stale"""
+
+    def __init__(self, compute: Callable[[], dict], interval: float = DASHBOARD_REFRESH_INTERVAL):
+        """
+        Args:
+            compute: 집계 함수 (get_dashboard_stats)
+            interval: 스냅샷 최대 수명(초), 지나면 다음 요청이 백그라운드 재계산
+        """
+        self.compute = compute
+        self.interval = interval
+
+        self._data: Optional[dict] = None
+        self._computed_at: Optional[float] = None
+        self._refresh_lock = threading.Lock()
+        self._state_lock = threading.Lock()
+        self._revalidating = False
+
+        self.refreshes = 0
+        self.last_duration: Optional[float] = None
+        self.last_error: Optional[str] = None
+
+    def get(self) -> dict:
+        """Last snapshot with freshness fields (a stale one triggers a background refresh)"""
+        if self._data is None:
+            return self.refresh()
+        if time.time() - self._computed_at >= self.interval:
+            self._revalidate()
+        return self._view()
+
+    def refresh(self) -> dict:
+        """Recompute now (single flight: waits for and reuses a run already in progress)"""
+        requested_at = time.time()
+        with self._refresh_lock:
+            if self._computed_at is not None and self._computed_at >= requested_at:
+                return self._view()
+
+            start = time.perf_counter()
+            data = self.compute()
+            self._data = data
+            self._computed_at = time.time()
+            self.last_duration = round(time.perf_counter() - start, 3)
+            self.refreshes += 1
+            return self._view()
+
+    def _revalidate(self):
+        """Start one background refresh unless one is already running"""
+        with self._state_lock:
+            if self._revalidating:
+                return
+            self._revalidating = True
+        threading.Thread(target=self._background_refresh, name="dashboard-snapshot", daemon=True).start()
+
+    def _background_refresh(self):
+        try:
+            self.refresh()
+            self.last_error = None
+        except Exception as e:
+            self.last_error = str(e)
+            print(f"  [Dashboard] Snapshot refresh failed (serving last snapshot): {e}")
+        finally:
+            with self._state_lock:
+                self._revalidating = False
+
+    def _view(self) -> dict:
+        computed_at = self._computed_at
+        return {
+            **self._data,
+            "computed_at": datetime.fromtimestamp(computed_at, timezone.utc).isoformat(),
+            "age_seconds": round(time.time() - computed_at, 1),
+        }
+
+    def stats(self) -> dict:
+        return {
+            "computed_at": (
+                datetime.fromtimestamp(self._computed_at, timezone.utc).isoformat()
+                if self._computed_at else None
+            ),
+            "interval_seconds": self.interval,
+            "revalidating": self._revalidating,
+            "refreshes": self.refreshes,
+            "last_duration_seconds": self.last_duration,
+            "last_error": self.last_error,
+        }
+
+
+# ============================================
+# 공유 인스턴스 (워커 프로세스당 1개)
+# ============================================
+
+_snapshot: Optional[DashboardSnapshot] = None
+
+
+def get_snapshot(compute: Callable[[], dict]) -> DashboardSnapshot:
+    """Shared snapshot (created on the first dashboard request)"""
+    global _snapshot
+    if _snapshot is None:
+        _snapshot = DashboardSnapshot(compute)
+    return _snapshot
+
+
+def get_snapshot_stats() -> Optional[dict]:
+    return _snapshot.stats() if _snapshot else None
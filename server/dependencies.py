@@ -0,0 +1,24 @@
+"""
+Shared FastAPI Dependencies
+Process-wide clients created in the app lifespan and injected into routes
+"""
+
+from fastapi import Request
+
+from src.supabase_service import SupabaseService, get_shared_service
+from server.async_data import AsyncDataAccess
+
+
+def get_supabase(request: Request) -> SupabaseService:
+    """Shared SupabaseService (one pooled client per worker)"""
+    service = getattr(request.app.state, "supabase", None)
+    return service or get_shared_service()
+
+
+def get_data(request: Request) -> AsyncDataAccess:
+    """Shared AsyncDataAccess (created in lifespan; lazily as a fallback)"""
+    data = getattr(request.app.state, "data", None)
+    if data is None:
+        data = AsyncDataAccess()
+        request.app.state.data = data
+    return data
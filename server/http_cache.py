@@ -0,0 +1,56 @@
+"""
+HTTP Cache Helpers
+ETag generation and conditional-request matching for cacheable responses.
+"""
+
+import hashlib
+from typing import Optional
+
+
+def strong_etag(body: bytes) -> str:
+    """Strong validator: changes with any byte of the representation"""
+    return f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+
+
+def weak_etag(*parts: str) -> str:
+    """
+    Weak validator from whatever determines the representation (e.g. a
+    collection version plus the query string): semantically equivalent
+    bodies, whatever their Content-Encoding, share it
+    """
+    digest = hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()[:32]
+    return f'W/"{digest}"'
+
+
+def encoded_etag(etag: str, encoding: str) -> str:
+    """
+    Strong validator of one Content-Encoding of a representation
+
+    Each encoding is its own byte sequence, so it gets its own tag
+    ("<hash>-gzip", "<hash>-br"); identity keeps the plain one.
+    """
+    if encoding == "identity":
+        return etag
+    return f'{etag[:-1]}-{encoding}"'
+
+
+def etag_matches(if_none_match: Optional[str], *etags: str) -> bool:
+    """
+    If-None-Match check (RFC 9110: weak comparison, "*" matches anything)
+
+    Args:
+        if_none_match: 요청 헤더 값 (콤마로 구분된 ETag 목록)
+        etags: 현재 표현의 ETag (인코딩별 ETag가 있으면 모두)
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    current = {etag[2:] if etag.startswith("W/") else etag for etag in etags}
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate in current:
+            return True
+    return False
@@ -4,10 +4,15 @@ Sends math problems to users via KakaoTalk
 """
 
 import os
+import json
+import time
+import httpx
 import requests
 from typing import Optional, Dict, Any
 from dotenv import load_dotenv
 
+from src import http_transport
+
 load_dotenv()
 
 
@@ -19,24 +24,8 @@ class KakaoMessageService:
     def __init__(self):
         pass
 
-    def send_text_to_me(self, access_token: str, text: str, button_title: str = None, button_url: str = None) -> Dict[str, Any]:
-        """
-        Send text message to user (나에게 보내기)
-
-        Args:
-            access_token: User's Kakao access token
-            text: Message text
-            button_title: Optional button text
-            button_url: Optional button URL
-
-        Returns:
-            API response dict
-        """
-        headers = {
-            "Authorization": f"Bearer {access_token}",
-            "Content-Type": "application/x-www-form-urlencoded"
-        }
-
+    def build_text_template(self, text: str, button_title: str = None, button_url: str = None) -> Dict[str, Any]:
+        """Text template (나에게 보내기)"""
         template = {
             "object_type": "text",
             "text": text,
@@ -52,61 +41,84 @@ class KakaoMessageService:
             template["link"]["mobile_web_url"] = button_url
             template["button_title"] = button_title
 
-        import json
+        return template
+
+    def send_template(self, access_token: str, template: Dict[str, Any]) -> Dict[str, Any]:
+        """POST a message template to the 나에게 보내기 API"""
+        headers = {
+            "Authorization": f"Bearer {access_token}",
+            "Content-Type": "application/x-www-form-urlencoded"
+        }
         data = {
             "template_object": json.dumps(template)
         }
 
         try:
-            response = requests.post(
+            response = http_transport.post(self.SEND_ME_URL, headers=headers, data=data)
+            return self._parse_response(response)
+
+        except requests.RequestException as e:
+            return {"success": False, "error": str(e)}
+
+    async def send_template_async(self, data, access_token: str, template: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Non-blocking send_template for async route handlers
+
+        Args:
+            data: AsyncDataAccess (pooled Kakao client)
+            access_token: User's Kakao access token
+            template: Message template
+        """
+        try:
+            response = await data.kakao_post(
                 self.SEND_ME_URL,
-                headers=headers,
-                data=data,
-                timeout=10
+                data={"template_object": json.dumps(template)},
+                access_token=access_token,
             )
+            return self._parse_response(response)
 
-            if response.status_code == 200:
-                return {"success": True, "result": response.json()}
-            else:
-                return {
-                    "success": False,
-                    "error": response.json(),
-                    "status_code": response.status_code
-                }
-
-        except requests.RequestException as e:
+        except httpx.HTTPError as e:
             return {"success": False, "error": str(e)}
 
-    def send_feed_with_image(
-        self,
-        access_token: str,
-        title: str,
-        description: str,
-        image_url: str,
-        button_title: str = None,
-        button_url: str = None
-    ) -> Dict[str, Any]:
+    @staticmethod
+    def _parse_response(response) -> Dict[str, Any]:
+        """requests/httpx response -> result dict (non-JSON bodies, e.g. gateway error pages, kept as text)"""
+        try:
+            body = response.json()
+        except ValueError:
+            body = response.text
+        if response.status_code == 200:
+            return {"success": True, "result": body}
+        return {
+            "success": False,
+            "error": body,
+            "status_code": response.status_code
+        }
+
+    def send_text_to_me(self, access_token: str, text: str, button_title: str = None, button_url: str = None) -> Dict[str, Any]:
         """
-        Send list message with image (이미지가 포함된 리스트 메시지)
+        Send text message to user (나에게 보내기)
 
         Args:
             access_token: User's Kakao access token
-            title: Feed title
-            description: Feed description
-            image_url: Image URL (must be publicly accessible)
-            button_title: Button text
-            button_url: Button URL
+            text: Message text
+            button_title: Optional button text
+            button_url: Optional button URL
 
         Returns:
             API response dict
         """
-        import json
-
-        headers = {
-            "Authorization": f"Bearer {access_token}",
-            "Content-Type": "application/x-www-form-urlencoded"
-        }
+        return self.send_template(access_token, self.build_text_template(text, button_title, button_url))
 
+    def build_feed_template(
+        self,
+        title: str,
+        description: str,
+        image_url: str,
+        button_title: str = None,
+        button_url: str = None
+    ) -> Dict[str, Any]:
+        """Feed template with image (이미지가 포함된 리스트 메시지)"""
         # Feed template with minimal config
         # Use button_url for both content link and button link (clicking anywhere opens the problem)
         default_url = button_url if button_url else "https://kice.re.kr"
@@ -137,35 +149,39 @@ class KakaoMessageService:
         else:
             print(f"[Kakao Button Debug] No button added (missing title or url)")
 
-        data = {
-            "template_object": json.dumps(template)
-        }
         # Use ensure_ascii=True to avoid cp949 encoding errors with emojis
         print(f"[Kakao Template Debug] Template length: {len(json.dumps(template))} chars, has buttons: {'buttons' in template}")
 
-        try:
-            response = requests.post(
-                self.SEND_ME_URL,
-                headers=headers,
-                data=data,
-                timeout=10
-            )
+        return template
 
-            if response.status_code == 200:
-                return {"success": True, "result": response.json()}
-            else:
-                return {
-                    "success": False,
-                    "error": response.json(),
-                    "status_code": response.status_code
-                }
+    def send_feed_with_image(
+        self,
+        access_token: str,
+        title: str,
+        description: str,
+        image_url: str,
+        button_title: str = None,
+        button_url: str = None
+    ) -> Dict[str, Any]:
+        """
+        Send list message with image (이미지가 포함된 리스트 메시지)
 
-        except requests.RequestException as e:
-            return {"success": False, "error": str(e)}
+        Args:
+            access_token: User's Kakao access token
+            title: Feed title
+            description: Feed description
+            image_url: Image URL (must be publicly accessible)
+            button_title: Button text
+            button_url: Button URL
 
-    def send_math_problem(
+        Returns:
+            API response dict
+        """
+        template = self.build_feed_template(title, description, image_url, button_title, button_url)
+        return self.send_template(access_token, template)
+
+    def build_problem_template(
         self,
-        access_token: str,
         problem_id: str,
         problem_text: str,
         problem_image_url: str = None,
@@ -178,10 +194,9 @@ class KakaoMessageService:
         button_url: str = None
     ) -> Dict[str, Any]:
         """
-        Send math problem to user (이미지 우선, 없으면 텍스트)
+        Build math problem message template (이미지 우선, 없으면 텍스트)
 
         Args:
-            access_token: User's Kakao access token
             problem_id: Problem ID
             problem_text: Problem description
             problem_image_url: URL to problem image
@@ -194,7 +209,7 @@ class KakaoMessageService:
             button_url: Optional button URL (problem viewer)
 
         Returns:
-            API response dict
+            Message template dict
         """
         # Build title with clean format
         exam_emoji = {
@@ -234,12 +249,10 @@ class KakaoMessageService:
         # Send as feed with image (card format)
         if problem_image_url:
             # Add timestamp to bypass Kakao CDN cache
-            import time
             cache_buster = f"?t={int(time.time())}"
             image_url_with_cache_buster = problem_image_url + cache_buster
 
-            return self.send_feed_with_image(
-                access_token=access_token,
+            return self.build_feed_template(
                 title=title,
                 description=desc,
                 image_url=image_url_with_cache_buster,
@@ -250,10 +263,23 @@ class KakaoMessageService:
         # Fallback to text message without image
         message = f"[{title}]\n\n{problem_text}\n\n{desc}"
 
-        return self.send_text_to_me(
-            access_token=access_token,
-            text=message
-        )
+        return self.build_text_template(text=message)
+
+    def send_math_problem(self, access_token: str, problem_id: str, problem_text: str, **kwargs) -> Dict[str, Any]:
+        """
+        Send math problem to user (see build_problem_template for kwargs)
+
+        Returns:
+            API response dict
+        """
+        template = self.build_problem_template(problem_id, problem_text, **kwargs)
+        return self.send_template(access_token, template)
+
+    async def send_math_problem_async(self, data, access_token: str, problem_id: str,
+                                      problem_text: str, **kwargs) -> Dict[str, Any]:
+        """send_math_problem over the pooled async Kakao client"""
+        template = self.build_problem_template(problem_id, problem_text, **kwargs)
+        return await self.send_template_async(data, access_token, template)
 
     def send_hint(
         self,
@@ -272,15 +298,24 @@ class KakaoMessageService:
         Returns:
             API response dict
         """
+        return self.send_text_to_me(
+            access_token=access_token,
+            text=self._hint_message(hint_level, hint_text)
+        )
+
+    async def send_hint_async(self, data, access_token: str, hint_level: int, hint_text: str) -> Dict[str, Any]:
+        """send_hint over the pooled async Kakao client"""
+        template = self.build_text_template(self._hint_message(hint_level, hint_text))
+        return await self.send_template_async(data, access_token, template)
+
+    @staticmethod
+    def _hint_message(hint_level: int, hint_text: str) -> str:
         message = f"[힌트 {hint_level}단계]\n\n{hint_text}"
 
         if hint_level < 3:
             message += f"\n\n다음 힌트가 필요하면 '힌트'라고 답해주세요."
 
-        return self.send_text_to_me(
-            access_token=access_token,
-            text=message
-        )
+        return message
 
     def send_answer(
         self,
@@ -301,6 +336,19 @@ class KakaoMessageService:
         Returns:
             API response dict
         """
+        return self.send_text_to_me(
+            access_token=access_token,
+            text=self._answer_message(answer, solution, is_correct)
+        )
+
+    async def send_answer_async(self, data, access_token: str, answer: str, solution: str,
+                                is_correct: bool = None) -> Dict[str, Any]:
+        """send_answer over the pooled async Kakao client"""
+        template = self.build_text_template(self._answer_message(answer, solution, is_correct))
+        return await self.send_template_async(data, access_token, template)
+
+    @staticmethod
+    def _answer_message(answer: str, solution: str, is_correct: bool = None) -> str:
         if is_correct is True:
             header = "정답입니다!\n\n"
         elif is_correct is False:
@@ -308,12 +356,7 @@ class KakaoMessageService:
         else:
             header = ""
 
-        message = f"{header}[정답] {answer}\n\n[풀이]\n{solution}\n\n다음 문제를 원하시면 '다음'이라고 답해주세요."
-
-        return self.send_text_to_me(
-            access_token=access_token,
-            text=message
-        )
+        return f"{header}[정답] {answer}\n\n[풀이]\n{solution}\n\n다음 문제를 원하시면 '다음'이라고 답해주세요."
 
 
 # Test
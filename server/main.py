@@ -5,15 +5,16 @@ KICE Math KakaoTalk Service Web Server
 
 import os
 import sys
-import io
 from pathlib import Path
 from contextlib import asynccontextmanager
 
 # Force UTF-8 encoding for stdout/stderr to avoid cp949 codec errors with emojis
-sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
-sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8', errors='replace')
+# (reconfigured in place: replacing the streams breaks captured output, e.g. pytest)
+for _stream in (sys.stdout, sys.stderr):
+    if hasattr(_stream, "reconfigure"):
+        _stream.reconfigure(encoding='utf-8', errors='replace')
 
-from fastapi import FastAPI, Request
+from fastapi import FastAPI, Request, HTTPException
 from fastapi.responses import HTMLResponse, RedirectResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
@@ -29,6 +30,7 @@ from server.problem_routes import router as problem_router
 from server.card_routes import router as card_router
 from server.scheduler import scheduler_router
 from server.dashboard_routes import router as dashboard_analytics_router
+from server.static_assets import get_assets
 
 
 @asynccontextmanager
@@ -37,8 +39,42 @@ async def lifespan(app: FastAPI):
     print("=" * 50)
     print("KICE Math KakaoTalk Service - Server Starting")
     print("=" * 50)
+
+    # One pooled Supabase client per worker, shared by all requests
+    from src.supabase_service import init_shared_service, close_shared_service
+    try:
+        app.state.supabase = init_shared_service()
+    except Exception as e:
+        print(f"[Startup] Supabase client init failed (will retry on first request): {e}")
+        app.state.supabase = None
+
+    # Local SQLite mirror of problems/hints for the serving path
+    from src.read_replica import start_replica, stop_replica
+    if app.state.supabase is not None:
+        start_replica(app.state.supabase.client)
+
+    # Async clients (PostgREST / Storage / Kakao) for non-blocking route handlers
+    from server.async_data import AsyncDataAccess
+    app.state.data = AsyncDataAccess()
+
+    # Tracking rows (user_problems / hint_requests / deliveries) inserted in batches;
+    # the shutdown drain below journals anything upstream cannot take
+    from server.write_behind import start_write_behind, stop_write_behind
+    start_write_behind(app.state.data)
+
+    # Admin / card-maker shells and their scripts: fingerprinted, pre-compressed, in memory
+    from server.static_assets import load_assets
+    load_assets()
+
     yield
+
     print("Server shutting down...")
+    await stop_write_behind()
+    await app.state.data.aclose()
+    from src.http_transport import close_sessions
+    close_sessions()
+    stop_replica()
+    close_shared_service()
 
 
 app = FastAPI(
@@ -48,6 +84,21 @@ app = FastAPI(
     lifespan=lifespan,
 )
 
+# Reject oversized uploads before their bodies are read
+from server.uploads import UploadSizeLimitMiddleware
+app.add_middleware(UploadSizeLimitMiddleware)
+
+# Sliding session expiry (re-issues the session cookie when renewed)
+from server.session_store import SessionRenewalMiddleware
+app.add_middleware(SessionRenewalMiddleware)
+
+# gzip for JSON/HTML (outermost). Responses that already carry Content-Encoding
+# (the pre-compressed /assets and shell responses) are passed through untouched
+# (Starlette >= 0.24; requirements.txt pins starlette>=0.27.0).
+from fastapi.middleware.gzip import GZipMiddleware
+from src.config import GZIP_MINIMUM_SIZE, GZIP_COMPRESS_LEVEL
+app.add_middleware(GZipMiddleware, minimum_size=GZIP_MINIMUM_SIZE, compresslevel=GZIP_COMPRESS_LEVEL)
+
 # Include routers
 app.include_router(auth_router, prefix="/auth", tags=["Authentication"])
 app.include_router(message_router, prefix="/message", tags=["Message"])
@@ -61,6 +112,13 @@ static_dir = Path(__file__).parent / "static"
 static_dir.mkdir(exist_ok=True)
 app.mount("/static", StaticFiles(directory=str(static_dir)), name="static")
 
+# Local storage backend (STORAGE_BACKEND=local): serve uploaded objects at the
+# same URL shape as Supabase public objects, so viewer/card/Kakao flows work offline
+from src.storage_client import STORAGE_BACKEND, LOCAL_STORAGE_PATH, LOCAL_PUBLIC_PREFIX
+if STORAGE_BACKEND == "local":
+    LOCAL_STORAGE_PATH.mkdir(parents=True, exist_ok=True)
+    app.mount(LOCAL_PUBLIC_PREFIX, StaticFiles(directory=str(LOCAL_STORAGE_PATH)), name="local-storage")
+
 
 # Simple HTML templates (inline for simplicity)
 def get_html_template(title: str, content: str) -> str:
@@ -290,16 +348,49 @@ async def dashboard(request: Request):
 
 
 @app.get("/card-maker", response_class=HTMLResponse)
-async def card_maker():
+async def card_maker(request: Request):
     """Card maker UI"""
-    with open(Path(__file__).parent / "static" / "simple-crop.html", "r", encoding="utf-8") as f:
-        return HTMLResponse(content=f.read())
+    return get_assets().shell_response(request, "simple-crop.html")
+
+
+@app.get("/assets/{name}")
+async def static_asset(request: Request, name: str):
+    """Fingerprinted static asset (immutable, pre-compressed)"""
+    response = get_assets().asset_response(request, name)
+    if response is None:
+        raise HTTPException(status_code=404, detail="Asset not found")
+    return response
 
 
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
-    return {"status": "healthy", "service": "KICE Math KakaoTalk"}
+    from src.storage_client import get_storage_metrics
+    from src.supabase_service import get_pool_stats
+    from src.problem_cache import get_cache_stats
+    from src.read_replica import get_replica_stats
+    from server.dashboard_snapshot import get_snapshot_stats
+    from server.session_store import get_session_store
+    from server.users import user_cache
+    from src.http_transport import get_http_stats
+    from server.write_behind import get_write_behind_stats
+    from server.static_assets import get_asset_stats
+    from server.thumbnails import get_thumbnail_stats
+    return {
+        "status": "healthy",
+        "service": "KICE Math KakaoTalk",
+        "storage": get_storage_metrics(),
+        "supabase_pool": get_pool_stats(),
+        "cache": get_cache_stats(),
+        "replica": get_replica_stats(),
+        "dashboard": get_snapshot_stats(),
+        "sessions": get_session_store().stats(),
+        "user_cache": user_cache.stats(),
+        "http": get_http_stats(),
+        "write_behind": get_write_behind_stats(),
+        "assets": get_asset_stats(),
+        "thumbnails": get_thumbnail_stats(),
+    }
 
 
 # No custom error handlers - FastAPI's default returns JSON for all errors
@@ -3,23 +3,38 @@ Problem API Routes
 Manage and send math problems via KakaoTalk
 """
 
-from fastapi import APIRouter, Request, HTTPException, Form, UploadFile, File
-from fastapi.responses import HTMLResponse, JSONResponse
+from fastapi import APIRouter, Request, HTTPException, Form, UploadFile, File, Depends
+from fastapi.responses import HTMLResponse, JSONResponse, Response, FileResponse
+from starlette.concurrency import run_in_threadpool
 from pydantic import BaseModel
 from typing import Optional, List
 from html import escape as html_escape
 import json
 import sys
 import os
+import httpx
 from pathlib import Path
 
 # Add project root to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from server.users import UserService
 from server.kakao_message import KakaoMessageService
-from src.supabase_service import SupabaseService
+from src.supabase_service import SupabaseService, _is_missing_function
+from server.dependencies import get_supabase, get_data
+from server.async_data import AsyncDataAccess
+from server.users import cache_user, invalidate_user
+from server.write_behind import record_event
+from server.http_cache import strong_etag, weak_etag, etag_matches
+from server.static_assets import get_assets
+from server.thumbnails import get_thumbnails, manifest_etag
+from src.config import VIEWER_MAX_AGE, KAKAO_FEED_IMAGE_WIDTH
+from src.problem_cache import MISSING, get_cached_viewer, cache_viewer
+from src.storage_client import get_storage_client
+from src.image_variants import (
+    build_and_upload_variants, build_many as build_variants_many, srcset, variant_url, with_variants,
+)
 from server.card_image_generator import CardImageGenerator
+from server.uploads import spool_upload, MAX_PDF_UPLOAD_BYTES, MAX_IMAGE_UPLOAD_BYTES
 
 router = APIRouter()
 message_service = KakaoMessageService()
@@ -38,14 +53,13 @@ class SendBulkRequest(BaseModel):
     problem_ids: List[str]
 
 
-def get_user_from_session(request: Request):
+async def get_user_from_session(request: Request):
     """Get authenticated user from session"""
     session_token = request.cookies.get("session_token")
     if not session_token:
         raise HTTPException(status_code=401, detail="Not authenticated")
 
-    user_service = UserService()
-    user = user_service.get_user_by_session(session_token)
+    user = await get_data(request).get_user_by_session(session_token)
 
     if not user:
         raise HTTPException(status_code=401, detail="Session expired")
@@ -57,6 +71,26 @@ def get_user_from_session(request: Request):
 # Problem List APIs
 # ===========================================
 
+def _collection_etag(request: Request, version: str) -> dict:
+    """
+    Conditional-response headers for an endpoint whose body depends only on
+    the problems collection and the query string
+
+    The version is read before the body is built, so a write in between can
+    only make the body newer than its ETag (the next poll refetches), never older.
+    """
+    return {
+        "ETag": weak_etag(version, request.url.path, str(request.query_params)),
+        "Cache-Control": "private, no-cache",
+    }
+
+
+def _not_modified(request: Request, headers: dict) -> Optional[Response]:
+    if etag_matches(request.headers.get("if-none-match"), headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+    return None
+
+
 @router.get("/list")
 async def list_problems(
     request: Request,
@@ -64,1110 +98,154 @@ async def list_problems(
     year: Optional[int] = None,
     exam: Optional[str] = None,
     score: Optional[int] = None,
-    limit: int = 50
+    limit: int = 50,
+    cursor: Optional[str] = None,
+    fields: str = "list",
+    supabase: SupabaseService = Depends(get_supabase)
 ):
     """
-    Get problem list with filters
+    Get problem list with filters (keyset pagination)
+
+    Pass the returned next_cursor as ?cursor= to fetch the following page;
+    next_cursor is null on the last page. fields selects a column profile
+    (list, admin, integrity, full). 304 while the collection is unchanged.
     """
-    user = get_user_from_session(request)
+    user = await get_user_from_session(request)
 
     try:
-        supabase = SupabaseService()
-        problems = supabase.get_problems_by_filter(
+        headers = _collection_etag(request, await run_in_threadpool(supabase.get_collection_version))
+        not_modified = _not_modified(request, headers)
+        if not_modified:
+            return not_modified
+
+        page = await run_in_threadpool(
+            supabase.get_problems_page,
             status=status,
             year=year,
             exam=exam,
             score=score,
-            limit=limit
+            fields=fields,
+            limit=limit,
+            cursor=cursor,
         )
-        return {"problems": problems, "count": len(problems)}
+        return JSONResponse(
+            content={"problems": page["problems"], "count": len(page["problems"]), "next_cursor": page["next_cursor"]},
+            headers=headers,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.get("/ready")
-async def get_ready_problems(request: Request):
+async def get_ready_problems(request: Request, supabase: SupabaseService = Depends(get_supabase)):
     """
-    Get problems ready to send
+    Get problems ready to send (304 while the collection is unchanged)
     """
-    user = get_user_from_session(request)
+    user = await get_user_from_session(request)
 
     try:
-        supabase = SupabaseService()
-        problems = supabase.get_ready_problems()
-        return {"problems": problems, "count": len(problems)}
+        headers = _collection_etag(request, await run_in_threadpool(supabase.get_collection_version))
+        not_modified = _not_modified(request, headers)
+        if not_modified:
+            return not_modified
+
+        problems = await run_in_threadpool(supabase.get_ready_problems)
+        return JSONResponse(content={"problems": problems, "count": len(problems)}, headers=headers)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.get("/stats")
-async def get_problem_stats(request: Request):
+async def get_problem_stats(request: Request, supabase: SupabaseService = Depends(get_supabase)):
     """
-    Get problem statistics
+    Get problem statistics (304 while the collection is unchanged)
     """
-    user = get_user_from_session(request)
+    user = await get_user_from_session(request)
 
     try:
-        supabase = SupabaseService()
-        stats = supabase.get_stats()
-        return stats
+        version = await run_in_threadpool(supabase.get_collection_version)
+        headers = _collection_etag(request, version)
+        not_modified = _not_modified(request, headers)
+        if not_modified:
+            return not_modified
+
+        stats = await run_in_threadpool(supabase.get_stats, version=version)
+        return JSONResponse(content=stats, headers=headers)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@router.get("/admin")
-async def admin_dashboard(request: Request):
-    """
-    Admin dashboard for problem management
-    """
-    user = get_user_from_session(request)
+# Problem image identity for the thumbnail sheets (image_variants: sql/add_image_variants.sql)
+THUMB_COLUMNS = "problem_id,question_no,problem_image_url,updated_at"
 
-    html = """
-<!DOCTYPE html>
-<html lang="ko">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <meta http-equiv="Cache-Control" content="no-cache, no-store, must-revalidate">
-    <meta http-equiv="Pragma" content="no-cache">
-    <title>Problem Admin v2 - KICE Math</title>
-    <style>
-        * { margin: 0; padding: 0; box-sizing: border-box; }
-        body {
-            font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif;
-            background: #f5f5f5;
-            min-height: 100vh;
-        }
-        .header {
-            background: linear-gradient(135deg, #1e40af 0%, #4f46e5 100%);
-            color: white;
-            padding: 20px;
-            text-align: center;
-        }
-        .container {
-            max-width: 1200px;
-            margin: 20px auto;
-            padding: 20px;
-        }
-        .stats-grid {
-            display: grid;
-            grid-template-columns: repeat(auto-fit, minmax(200px, 1fr));
-            gap: 20px;
-            margin-bottom: 30px;
-        }
-        .stat-card {
-            background: white;
-            padding: 20px;
-            border-radius: 10px;
-            box-shadow: 0 2px 10px rgba(0,0,0,0.1);
-            text-align: center;
-        }
-        .stat-card h3 { color: #4f46e5; font-size: 32px; }
-        .stat-card p { color: #666; margin-top: 5px; }
-        .problem-table {
-            background: white;
-            border-radius: 10px;
-            box-shadow: 0 2px 10px rgba(0,0,0,0.1);
-            overflow: hidden;
-        }
-        table { width: 100%; border-collapse: collapse; }
-        th, td { padding: 12px 15px; text-align: left; border-bottom: 1px solid #eee; }
-        th { background: #4f46e5; color: white; }
-        tr:hover { background: #f8f9fa; }
-        .status-badge { padding: 4px 12px; border-radius: 20px; font-size: 12px; font-weight: bold; }
-        .status-ready { background: #e8f5e9; color: #2e7d32; }
-        .status-needs_review { background: #fff3e0; color: #ef6c00; }
-        .status-sent { background: #e3f2fd; color: #1565c0; }
-        .btn { padding: 8px 16px; border: none; border-radius: 5px; cursor: pointer; font-weight: bold; margin: 2px; }
-        .btn-send { background: #FEE500; color: #000; }
-        .btn-send:hover { background: #e6cf00; }
-        .btn-view { background: #4f46e5; color: white; }
-        .btn-view:hover { background: #4338ca; }
-        .filter-bar { background: white; padding: 20px; border-radius: 10px; margin-bottom: 20px; box-shadow: 0 2px 10px rgba(0,0,0,0.08); }
-        .filter-bar .filter-row { display: flex; gap: 15px; flex-wrap: wrap; align-items: center; margin-bottom: 10px; }
-        .filter-bar .filter-hint { font-size: 12px; color: #666; margin-top: 8px; }
-        .filter-bar select { padding: 8px 12px; border: 1px solid #ddd; border-radius: 5px; min-width: 120px; }
-        .filter-bar label { display: flex; flex-direction: column; gap: 4px; font-size: 13px; font-weight: 600; color: #444; }
-        .nav-links { margin-top: 10px; }
-        .nav-links a { color: white; margin: 0 10px; text-decoration: none; }
-        .nav-links a:hover { text-decoration: underline; }
-        .loading { text-align: center; padding: 40px; color: #666; }
-        .result-message { padding: 15px; margin-bottom: 20px; border-radius: 10px; display: none; }
-        .result-success { background: #e8f5e9; color: #2e7d32; }
-        .result-error { background: #ffebee; color: #c62828; }
-        .btn-crop { background: #10B981; color: white; margin-left: 4px; }
-        .btn-crop:hover { background: #059669; }
-
-        /* Progress bars */
-        .progress-section { background: white; padding: 20px; border-radius: 10px; box-shadow: 0 2px 10px rgba(0,0,0,0.08); margin-bottom: 20px; }
-        .progress-section h3 { font-size: 15px; color: #333; margin-bottom: 14px; }
-        .progress-row { display: flex; align-items: center; gap: 12px; margin-bottom: 10px; }
-        .progress-label { min-width: 50px; font-size: 13px; font-weight: 600; color: #555; }
-        .progress-bar-bg { flex: 1; height: 22px; background: #f0f0f0; border-radius: 11px; overflow: hidden; position: relative; }
-        .progress-bar-fill { height: 100%; border-radius: 11px; transition: width 0.6s ease; }
-        .progress-bar-fill.done { background: linear-gradient(90deg, #10B981, #34D399); }
-        .progress-bar-fill.review { background: linear-gradient(90deg, #F59E0B, #FBBF24); }
-        .progress-text { min-width: 80px; font-size: 12px; color: #888; text-align: right; }
-
-        /* Thumbnail */
-        .thumb { width: 40px; height: 40px; object-fit: cover; border-radius: 4px; border: 1px solid #eee; cursor: pointer; }
-        .thumb:hover { transform: scale(3); position: relative; z-index: 10; box-shadow: 0 4px 20px rgba(0,0,0,0.3); }
-
-        /* Crop Modal Styles */
-        .crop-modal-overlay {
-            position: fixed;
-            top: 0; left: 0; right: 0; bottom: 0;
-            background: rgba(0,0,0,0.7);
-            z-index: 1000;
-            display: flex;
-            align-items: center;
-            justify-content: center;
-            animation: fadeIn 0.2s;
-        }
-        @keyframes fadeIn {
-            from { opacity: 0; }
-            to { opacity: 1; }
-        }
-        .crop-modal-dialog {
-            background: white;
-            border-radius: 16px;
-            width: 95%;
-            max-width: 1200px;
-            max-height: 95vh;
-            overflow: auto;
-            box-shadow: 0 25px 50px rgba(0,0,0,0.5);
-            padding: 24px;
-            animation: slideUp 0.3s;
-        }
-        @keyframes slideUp {
-            from { transform: translateY(50px); opacity: 0; }
-            to { transform: translateY(0); opacity: 1; }
-        }
-        .crop-modal-header {
-            display: flex;
-            justify-content: space-between;
-            align-items: center;
-            margin-bottom: 20px;
-        }
-        .crop-modal-close {
-            background: none;
-            border: none;
-            font-size: 32px;
-            cursor: pointer;
-            color: #666;
-            line-height: 1;
-            padding: 0;
-            width: 32px;
-            height: 32px;
-        }
-        .crop-modal-close:hover {
-            color: #000;
-        }
 
-        /* C1: Mobile responsive */
-        @media (max-width: 768px) {
-            .header { padding: 12px; }
-            .header h1 { font-size: 18px; }
-            .container { padding: 10px; }
-            .stats-grid { grid-template-columns: repeat(2, 1fr); gap: 10px; }
-            .stat-card { padding: 12px; }
-            .stat-card h3 { font-size: 22px; }
-            .problem-table { overflow-x: auto; -webkit-overflow-scrolling: touch; }
-            table { min-width: 700px; }
-            th, td { padding: 8px 10px; font-size: 13px; }
-            .filter-bar .filter-row { flex-direction: column; gap: 8px; }
-            .filter-bar select, .filter-bar input { width: 100% !important; min-width: unset; }
-            .btn { padding: 6px 10px; font-size: 12px; }
-            .crop-modal-dialog { width: 98%; padding: 12px; }
-            .nav-links a { margin: 0 5px; font-size: 13px; }
-        }
-    </style>
-</head>
-<body>
-    <div class="header">
-        <h1>수학 문제 관리</h1>
-        <div class="nav-links">
-            <a href="/dashboard">대시보드</a>
-            <a href="/message/test-page">메시지 테스트</a>
-            <a href="/auth/logout">로그아웃</a>
-        </div>
-    </div>
-    <div class="container">
-        <div id="result-message" class="result-message"></div>
-        <div class="stats-grid">
-            <div class="stat-card"><h3 id="stat-total">-</h3><p>전체 문제</p></div>
-            <div class="stat-card"><h3 id="stat-ready">-</h3><p>발송 준비</p></div>
-            <div class="stat-card"><h3 id="stat-review">-</h3><p>검토 필요</p></div>
-            <div class="stat-card"><h3 id="stat-sent">-</h3><p>발송 완료</p></div>
-        </div>
-        <div class="progress-section" id="progress-section" style="display:none;">
-            <h3>연도별 검수 진행률</h3>
-            <div id="progress-bars"></div>
-        </div>
-        <div class="filter-bar">
-            <div class="filter-row">
-                <label>검색
-                    <input type="text" id="filter-search" placeholder="문제 ID..." style="padding: 8px 12px; border: 1px solid #ddd; border-radius: 5px; width: 180px;" onkeyup="if(event.key==='Enter') loadProblems()" oninput="if(this.value==='') loadProblems()">
-                </label>
-                <label>연도
-                    <select id="filter-year" onchange="loadProblems()">
-                        <option value="">전체</option><option value="2026">2026</option><option value="2025">2025</option>
-                        <option value="2024">2024</option><option value="2023">2023</option>
-                    </select>
-                </label>
-                <label>시험
-                    <select id="filter-exam" onchange="loadProblems()">
-                        <option value="">전체</option><option value="CSAT">수능</option>
-                        <option value="KICE6">6월 평가원</option><option value="KICE9">9월 평가원</option>
-                    </select>
-                </label>
-                <label>배점
-                    <select id="filter-score" onchange="loadProblems()">
-                        <option value="">전체</option><option value="2">2점</option>
-                        <option value="3">3점</option><option value="4">4점</option>
-                    </select>
-                </label>
-                <label>상태
-                    <select id="filter-status" onchange="loadProblems()">
-                        <option value="">전체</option><option value="ready">준비</option>
-                        <option value="needs_review">검토 필요</option><option value="sent">발송됨</option>
-                    </select>
-                </label>
-                <button class="btn btn-view" onclick="loadProblems()">새로고침</button>
-                <button class="btn" onclick="openAddProblemModal()" style="background: #10B981; color: white; margin-left: 10px;">➕ PDF 업로드</button>
-            </div>
-            <div class="filter-row">
-                <button class="btn btn-send" onclick="sendSelectedProblems()">📤 선택 문제 발송</button>
-                <span id="selected-count" style="color: #666; font-size: 14px;"></span>
-            </div>
-            <div class="filter-hint">💡 Tip: <strong>PDF 업로드</strong> 버튼으로 새 문제 추가 | <strong>크롭</strong> 버튼에서 마우스 휠(확대) + 우클릭 드래그(이동) 사용 가능</div>
-        </div>
-        <div id="add-problem-modal-root"></div>
-        <div class="problem-table">
-            <table>
-                <thead><tr><th><input type="checkbox" id="select-all" onchange="toggleSelectAll()"></th><th>이미지</th><th>문제 ID</th><th>연도</th><th>시험</th><th>번호</th><th>배점</th><th>정답</th><th>상태</th><th>Notion</th><th>관리</th></tr></thead>
-                <tbody id="problem-tbody"><tr><td colspan="6" class="loading">Loading...</td></tr></tbody>
-            </table>
-        </div>
-    </div>
-    <script>
-        async function loadStats() {
-            try {
-                const res = await fetch('/problem/stats', {credentials:'include'});
-                const data = await res.json();
-                document.getElementById('stat-total').textContent = data.total || 0;
-                document.getElementById('stat-ready').textContent = data.by_status?.ready || 0;
-                document.getElementById('stat-review').textContent = data.by_status?.needs_review || 0;
-                document.getElementById('stat-sent').textContent = data.by_status?.sent || 0;
-                // 연도별 진행률 바
-                const yrs = data.by_year_status;
-                if (yrs && Object.keys(yrs).length > 0) {
-                    const section = document.getElementById('progress-section');
-                    const container = document.getElementById('progress-bars');
-                    section.style.display = 'block';
-                    container.innerHTML = Object.keys(yrs).sort((a,b)=>b-a).map(y => {
-                        const s = yrs[y];
-                        const done = (s.ready||0) + (s.sent||0);
-                        const pct = s.total > 0 ? Math.round(done / s.total * 100) : 0;
-                        return '<div class="progress-row"><span class="progress-label">' + y + '</span><div class="progress-bar-bg"><div class="progress-bar-fill done" style="width:' + pct + '%"></div></div><span class="progress-text">' + done + '/' + s.total + ' (' + pct + '%)</span></div>';
-                    }).join('');
-                }
-            } catch(e) { console.error(e); }
-        }
-        async function loadProblems() {
-            const tbody = document.getElementById('problem-tbody');
-            tbody.innerHTML = '<tr><td colspan="11" class="loading">Loading...</td></tr>';
-            let url = '/problem/list?limit=100';
-            const search = document.getElementById('filter-search').value.trim();
-            const status = document.getElementById('filter-status').value;
-            const year = document.getElementById('filter-year').value;
-            const exam = document.getElementById('filter-exam').value;
-            const score = document.getElementById('filter-score').value;
-            if (status) url += '&status=' + status;
-            if (year) url += '&year=' + year;
-            if (exam) url += '&exam=' + exam;
-            if (score) url += '&score=' + score;
-            try {
-                const res = await fetch(url, {credentials:'include'});
-                const data = await res.json();
-                let problems = data.problems || [];
-
-                // Client-side search filter
-                if (search) {
-                    problems = problems.filter(p =>
-                        p.problem_id.toLowerCase().includes(search.toLowerCase())
-                    );
-                }
-
-                if (problems.length > 0) {
-                    const notionUrl = (pid) => pid ? 'https://notion.so/' + pid.replace(/-/g, '') : '';
-                    const thumbHtml = (url) => url ? '<img src="'+url+'" class="thumb" onerror="this.style.display=\\'none\\'">' : '<span style="color:#ccc;font-size:11px;">-</span>';
-                    tbody.innerHTML = problems.map(p => '<tr><td><input type="checkbox" class="problem-checkbox" value="'+p.problem_id+'" onchange="updateSelectedCount()"></td><td>'+thumbHtml(p.problem_image_url)+'</td><td>'+p.problem_id+'</td><td>'+(p.year||'-')+'</td><td>'+(p.exam||'-')+'</td><td>'+(p.question_no||'-')+'</td><td>'+(p.score||'-')+'점</td><td>'+(p.answer||'-')+'</td><td><span class="status-badge status-'+p.status+'">'+p.status+'</span></td><td>'+(p.notion_page_id ? '<a href="'+notionUrl(p.notion_page_id)+'" target="_blank" style="color:#2563eb;text-decoration:none;" title="Notion에서 보기">📄</a>' : '-')+'</td><td><button class="btn btn-send" onclick="sendProblem(\\''+p.problem_id+'\\')">발송</button><button class="btn btn-crop" onclick="openCropModal(\\''+p.problem_id+'\\', \\''+( p.problem_image_url||'')+'\\')">크롭</button></td></tr>').join('');
-                    updateSelectedCount();
-                } else {
-                    tbody.innerHTML = '<tr><td colspan="11" class="loading">No problems found</td></tr>';
-                }
-            } catch(e) { tbody.innerHTML = '<tr><td colspan="11" class="loading">Error</td></tr>'; }
-        }
-        async function sendProblem(id) {
-            // Show preview modal first
-            showPreviewModal(id);
-        }
-
-        async function sendProblemConfirmed(id) {
-            closePreviewModal();
-            const msg = document.getElementById('result-message');
-            msg.className = 'result-message';
-            msg.textContent = '발송 중...';
-            msg.style.display = 'block';
-            try {
-                const res = await fetch('/problem/send', {method:'POST', headers:{'Content-Type':'application/json', 'Accept':'application/json'}, credentials:'include', body:JSON.stringify({problem_id:id})});
-                let data;
-                const text = await res.text();
-                try { data = JSON.parse(text); } catch { data = {detail: text.substring(0, 200)}; }
-                msg.className = res.ok ? 'result-message result-success' : 'result-message result-error';
-                msg.textContent = res.ok ? 'Sent!' : ('Error: '+(data.detail||'Failed'));
-                if(res.ok) { loadProblems(); loadStats(); }
-            } catch(e) { msg.className='result-message result-error'; msg.textContent='발송 실패: '+e.message; }
-            setTimeout(() => msg.style.display='none', 8000);
-        }
-
-        async function showPreviewModal(problemId) {
-            // Fetch problem metadata
-            try {
-                const res = await fetch(`/problem/${problemId}/metadata`, {credentials:'include'});
-                const problem = await res.json();
-
-                // Build preview content - use image_url from metadata, fallback to constructed URL
-                const cardImageUrl = problem.image_url
-                    ? `${problem.image_url}?t=${Date.now()}`
-                    : `https://gusahlxqyyqmaalwdtjw.supabase.co/storage/v1/object/public/problem-images-v2/${problemId}.png?t=${Date.now()}`;
-
-                const previewHtml = `
-                    <div class="crop-modal-overlay" id="preview-modal" onclick="if(event.target===this) closePreviewModal()">
-                        <div class="crop-modal-dialog" style="max-width: 600px;">
-                            <div class="crop-modal-header">
-                                <h2>📤 발송 미리보기</h2>
-                                <button class="crop-modal-close" onclick="closePreviewModal()">&times;</button>
-                            </div>
-                            <div style="padding: 20px; text-align: center;">
-                                <h3 style="margin-bottom: 15px; color: #333;">${problem.year || ''} ${problem.exam || ''} ${problem.question_no || ''}번</h3>
-                                <img src="${cardImageUrl}" alt="Card Preview" style="max-width: 100%; border-radius: 12px; box-shadow: 0 4px 12px rgba(0,0,0,0.15);" onerror="this.style.display='none'; this.nextElementSibling.style.display='block';">
-                                <div style="display: none; padding: 40px; background: #f5f5f5; border-radius: 12px; color: #666;">카드 이미지 로드 실패</div>
-                                <div style="margin-top: 20px; padding: 15px; background: #f8f9fa; border-radius: 10px; text-align: left;">
-                                    <p><strong>난이도:</strong> ${problem.difficulty || '-'}</p>
-                                    <p><strong>단원:</strong> ${problem.category || '-'}</p>
-                                    <p style="margin-top: 10px; font-size: 13px; color: #666;">이 카드가 카카오톡으로 발송됩니다.</p>
-                                </div>
-                                <div style="margin-top: 20px; display: flex; gap: 10px; justify-content: center;">
-                                    <button onclick="sendProblemConfirmed('${problemId}')" style="padding: 12px 24px; background: #FEE500; color: #000; border: none; border-radius: 8px; font-weight: bold; cursor: pointer; font-size: 15px;">✓ 확인 및 발송</button>
-                                    <button onclick="closePreviewModal()" style="padding: 12px 24px; background: #e0e0e0; color: #333; border: none; border-radius: 8px; font-weight: bold; cursor: pointer; font-size: 15px;">취소</button>
-                                </div>
-                            </div>
-                        </div>
-                    </div>
-                `;
-
-                document.body.insertAdjacentHTML('beforeend', previewHtml);
-            } catch (e) {
-                console.error('Preview failed:', e);
-                // Fallback to direct send
-                sendProblemConfirmed(problemId);
-            }
-        }
-
-        function closePreviewModal() {
-            const modal = document.getElementById('preview-modal');
-            if (modal) modal.remove();
-        }
-        function showSuccessMessage(text) {
-            const msg = document.getElementById('result-message');
-            msg.className = 'result-message result-success';
-            msg.textContent = text;
-            msg.style.display = 'block';
-            setTimeout(() => msg.style.display='none', 5000);
-        }
-
-        let cropModalRoot = null;
+@router.get("/thumbs/sprite/{name}")
+async def get_thumbnail_sprite(name: str):
+    """Sprite sheet image (content-hashed name, cached by the browser for a year)"""
+    path = get_thumbnails().sheet_path(name)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Sprite not found")
+    return FileResponse(path, media_type="image/webp",
+                        headers={"Cache-Control": "public, max-age=31536000, immutable"})
 
-        function openCropModal(problemId, imageUrl) {
-            if (!cropModalRoot) {
-                cropModalRoot = ReactDOM.createRoot(document.getElementById('crop-modal-root'));
-            }
-
-            cropModalRoot.render(
-                React.createElement(window.CropModal, {
-                    problemId: problemId,
-                    existingImageUrl: imageUrl,
-                    onClose: () => cropModalRoot.render(null),
-                    onSuccess: (result) => {
-                        cropModalRoot.render(null);
-                        loadProblems();
-                        loadStats();
-                        showSuccessMessage('이미지 업데이트 완료!');
-                    }
-                })
-            );
-        }
-
-        function toggleSelectAll() {
-            const selectAll = document.getElementById('select-all');
-            const checkboxes = document.querySelectorAll('.problem-checkbox');
-            checkboxes.forEach(cb => cb.checked = selectAll.checked);
-            updateSelectedCount();
-        }
-
-        function updateSelectedCount() {
-            const checkboxes = document.querySelectorAll('.problem-checkbox:checked');
-            const count = checkboxes.length;
-            const countSpan = document.getElementById('selected-count');
-            if (count > 0) {
-                countSpan.textContent = `${count}개 선택됨`;
-                countSpan.style.fontWeight = 'bold';
-                countSpan.style.color = '#4f46e5';
-            } else {
-                countSpan.textContent = '';
-            }
-
-            // Update select-all checkbox state
-            const allCheckboxes = document.querySelectorAll('.problem-checkbox');
-            const selectAll = document.getElementById('select-all');
-            if (allCheckboxes.length > 0) {
-                selectAll.checked = count === allCheckboxes.length;
-                selectAll.indeterminate = count > 0 && count < allCheckboxes.length;
-            }
-        }
-
-        async function sendSelectedProblems() {
-            const checkboxes = document.querySelectorAll('.problem-checkbox:checked');
-            const problemIds = Array.from(checkboxes).map(cb => cb.value);
-
-            if (problemIds.length === 0) {
-                alert('발송할 문제를 선택해주세요.');
-                return;
-            }
-
-            if (!confirm(`선택한 ${problemIds.length}개의 문제를 발송하시겠습니까?`)) {
-                return;
-            }
-
-            const msg = document.getElementById('result-message');
-            msg.className = 'result-message';
-            msg.textContent = `${problemIds.length}개의 문제 발송 중...`;
-            msg.style.display = 'block';
-
-            try {
-                const res = await fetch('/problem/send-bulk', {
-                    method: 'POST',
-                    headers: { 'Content-Type': 'application/json' },
-                    credentials: 'include',
-                    body: JSON.stringify({ problem_ids: problemIds })
-                });
-
-                const data = await res.json();
-
-                if (res.ok) {
-                    msg.className = 'result-message result-success';
-                    msg.textContent = `성공: ${data.success_count}개, 실패: ${data.failure_count}개`;
-                    loadProblems();
-                    loadStats();
-
-                    // Clear selection
-                    document.getElementById('select-all').checked = false;
-                    updateSelectedCount();
-                } else {
-                    msg.className = 'result-message result-error';
-                    msg.textContent = 'Error: ' + (data.detail || 'Failed');
-                }
-            } catch (e) {
-                msg.className = 'result-message result-error';
-                msg.textContent = '발송 중 오류 발생: ' + e.message;
-            }
-
-            setTimeout(() => msg.style.display = 'none', 5000);
-        }
-
-        function openAddProblemModal() {
-            console.log('[Modal] Opening add problem modal');
-            const modalHtml = `
-                <div class="crop-modal-overlay" id="add-problem-modal" onclick="if(event.target===this) closeAddProblemModal()">
-                    <div class="crop-modal-dialog" style="max-width: 800px;">
-                        <div class="crop-modal-header">
-                            <h2>➕ 문제 추가</h2>
-                            <button class="crop-modal-close" onclick="closeAddProblemModal()">&times;</button>
-                        </div>
-                        <div style="padding: 24px;">
-                            <!-- Tab buttons - 큰 버튼으로 변경 -->
-                            <div style="display: flex; gap: 12px; margin-bottom: 24px; background: linear-gradient(135deg, #f0f4ff 0%, #e8f0fe 100%); padding: 12px; border-radius: 16px; border: 2px solid #c7d2fe;">
-                                <button type="button" id="tab-single" onclick="switchTab('single')" style="flex: 1; padding: 16px 24px; background: linear-gradient(135deg, #4f46e5 0%, #4f46e5 100%); color: white; border: none; border-radius: 12px; font-weight: 700; cursor: pointer; font-size: 16px; box-shadow: 0 4px 12px rgba(102,126,234,0.4); transition: all 0.2s;">📷 개별 문제</button>
-                                <button type="button" id="tab-pdf" onclick="switchTab('pdf')" style="flex: 1; padding: 16px 24px; background: white; color: #4b5563; border: 2px solid #d1d5db; border-radius: 12px; font-weight: 700; cursor: pointer; font-size: 16px; transition: all 0.2s;">📄 PDF 일괄 업로드</button>
-                            </div>
-
-                            <!-- Single problem form -->
-                            <div id="form-single">
-                                <form id="add-problem-form" onsubmit="handleAddProblem(event)">
-                                    <div style="display: grid; grid-template-columns: 1fr 1fr; gap: 15px; margin-bottom: 20px;">
-                                        <div>
-                                            <label style="display: block; margin-bottom: 5px; font-weight: 600;">연도</label>
-                                            <input type="number" name="year" required min="2000" max="2030" value="2026" style="width: 100%; padding: 10px; border: 1px solid #ddd; border-radius: 6px;">
-                                        </div>
-                                        <div>
-                                            <label style="display: block; margin-bottom: 5px; font-weight: 600;">시험 유형</label>
-                                            <select name="exam" required style="width: 100%; padding: 10px; border: 1px solid #ddd; border-radius: 6px;">
-                                                <option value="CSAT">수능 (CSAT)</option>
-                                                <option value="KICE6">6월 평가원</option>
-                                                <option value="KICE9">9월 평가원</option>
-                                            </select>
-                                        </div>
-                                        <div>
-                                            <label style="display: block; margin-bottom: 5px; font-weight: 600;">문제 번호</label>
-                                            <input type="number" name="question_no" required min="1" max="30" value="1" style="width: 100%; padding: 10px; border: 1px solid #ddd; border-radius: 6px;">
-                                        </div>
-                                        <div>
-                                            <label style="display: block; margin-bottom: 5px; font-weight: 600;">난이도</label>
-                                            <select name="score" required style="width: 100%; padding: 10px; border: 1px solid #ddd; border-radius: 6px;">
-                                                <option value="2">2점</option>
-                                                <option value="3" selected>3점</option>
-                                                <option value="4">4점</option>
-                                            </select>
-                                        </div>
-                                    </div>
-                                    <div style="margin-bottom: 15px;">
-                                        <label style="display: block; margin-bottom: 5px; font-weight: 600;">단원</label>
-                                        <input type="text" name="unit" placeholder="예: 미분, 적분, 수열" style="width: 100%; padding: 10px; border: 1px solid #ddd; border-radius: 6px;">
-                                    </div>
-                                    <div style="margin-bottom: 15px;">
-                                        <label style="display: block; margin-bottom: 5px; font-weight: 600;">정답</label>
-                                        <input type="text" name="answer" placeholder="예: 5" style="width: 100%; padding: 10px; border: 1px solid #ddd; border-radius: 6px;">
-                                    </div>
-                                    <div style="margin-bottom: 20px;">
-                                        <label style="display: block; margin-bottom: 5px; font-weight: 600;">문제 이미지 또는 PDF</label>
-                                        <input type="file" id="single-file-input" name="image" accept="image/*,.pdf" required style="width: 100%; padding: 10px; border: 1px solid #ddd; border-radius: 6px;" onchange="handleSingleFileChange(event)">
-                                        <p style="font-size: 12px; color: #666; margin-top: 5px;">이미지 또는 PDF 파일 (PDF는 페이지 선택 가능)</p>
-                                    </div>
-                                    <!-- PDF page selector and crop area -->
-                                    <div id="single-pdf-pages" style="display: none; margin-bottom: 20px;">
-                                        <div style="padding: 16px; background: linear-gradient(135deg, #4f46e5 0%, #4f46e5 100%); border-radius: 10px; margin-bottom: 12px;">
-                                            <div style="display: flex; align-items: center; justify-content: center; gap: 12px;">
-                                                <button type="button" onclick="singlePdfPrevPage()" id="single-prev-btn" style="padding: 8px 16px; background: white; color: #4f46e5; border: none; border-radius: 6px; font-weight: 600; cursor: pointer;">◀ 이전</button>
-                                                <select id="single-page-select" onchange="singlePdfGoToPage(this.value)" style="padding: 8px 12px; border: none; border-radius: 6px; font-weight: 600;"></select>
-                                                <span id="single-page-info" style="color: white; font-weight: 600;"></span>
-                                                <button type="button" onclick="singlePdfNextPage()" id="single-next-btn" style="padding: 8px 16px; background: white; color: #4f46e5; border: none; border-radius: 6px; font-weight: 600; cursor: pointer;">다음 ▶</button>
-                                            </div>
-                                        </div>
-                                        <div style="background: #f8fafc; border-radius: 10px; padding: 16px;">
-                                            <div style="font-size: 14px; font-weight: 600; color: #475569; margin-bottom: 12px;">🖱️ 마우스로 드래그하여 문제 영역을 선택하세요</div>
-                                            <div id="single-crop-wrapper" style="position: relative; display: inline-block; max-width: 100%; cursor: crosshair;">
-                                                <canvas id="single-pdf-canvas" style="max-width: 100%; display: block;"></canvas>
-                                                <div id="single-crop-selection" style="display: none; position: absolute; border: 2px dashed #4f46e5; background: rgba(102, 126, 234, 0.1); pointer-events: none;"></div>
-                                            </div>
-                                            <div style="margin-top: 12px; display: flex; gap: 10px; justify-content: center;">
-                                                <button type="button" id="single-crop-btn" onclick="applySingleCrop()" style="display: none; padding: 10px 24px; background: #10B981; color: white; border: none; border-radius: 8px; font-weight: 600; cursor: pointer;">✂️ 이 영역 크롭</button>
-                                            </div>
-                                        </div>
-                                    </div>
-                                    <!-- Cropped image preview -->
-                                    <div id="single-cropped-area" style="display: none; margin-bottom: 20px; padding: 16px; background: #ecfdf5; border-radius: 10px; border: 1px solid #10b981;">
-                                        <div style="font-size: 14px; font-weight: 600; color: #065f46; margin-bottom: 12px;">✅ 크롭 완료</div>
-                                        <div style="text-align: center;">
-                                            <img id="single-cropped-preview" src="" style="max-width: 100%; max-height: 200px; border-radius: 8px; box-shadow: 0 2px 8px rgba(0,0,0,0.1);">
-                                        </div>
-                                        <div style="margin-top: 12px; text-align: center;">
-                                            <button type="button" onclick="resetSingleCrop()" style="padding: 8px 16px; background: #e5e7eb; color: #374151; border: none; border-radius: 6px; font-weight: 600; cursor: pointer;">다시 크롭</button>
-                                        </div>
-                                    </div>
-                                    <!-- Hidden input for cropped image data -->
-                                    <input type="hidden" id="single-converted-image" name="converted_image">
-                                    <div style="display: flex; gap: 10px; justify-content: flex-end;">
-                                        <button type="submit" id="single-submit-btn" style="padding: 12px 24px; background: #10B981; color: white; border: none; border-radius: 8px; font-weight: bold; cursor: pointer; font-size: 15px;">✓ 추가</button>
-                                        <button type="button" onclick="closeAddProblemModal()" style="padding: 12px 24px; background: #e0e0e0; color: #333; border: none; border-radius: 8px; font-weight: bold; cursor: pointer; font-size: 15px;">취소</button>
-                                    </div>
-                                </form>
-                            </div>
-
-                            <!-- PDF batch upload form -->
-                            <div id="form-pdf" style="display: none;">
-                                <form id="pdf-upload-form" onsubmit="handlePdfUpload(event)">
-                                    <div style="background: #f0f9ff; padding: 16px; border-radius: 10px; margin-bottom: 20px; border-left: 4px solid #0ea5e9;">
-                                        <h4 style="margin: 0 0 8px 0; color: #0369a1;">📄 PDF 일괄 처리</h4>
-                                        <p style="margin: 0; font-size: 14px; color: #0c4a6e;">수능/평가원 PDF 파일을 업로드하면 자동으로 문제별로 분리하여 저장합니다.</p>
-                                        <ul style="margin: 10px 0 0 0; padding-left: 20px; font-size: 13px; color: #0c4a6e;">
-                                            <li>2026 수능: 2열 레이아웃 자동 인식</li>
-                                            <li>2022-2025: 기존 레이아웃 지원</li>
-                                            <li>Q1~Q22 수학 공통 자동 분리</li>
-                                        </ul>
-                                    </div>
-                                    <div style="display: grid; grid-template-columns: 1fr 1fr; gap: 15px; margin-bottom: 20px;">
-                                        <div>
-                                            <label style="display: block; margin-bottom: 5px; font-weight: 600;">연도</label>
-                                            <input type="number" name="year" required min="2000" max="2030" value="2026" style="width: 100%; padding: 10px; border: 1px solid #ddd; border-radius: 6px;">
-                                        </div>
-                                        <div>
-                                            <label style="display: block; margin-bottom: 5px; font-weight: 600;">시험 유형</label>
-                                            <select name="exam" required style="width: 100%; padding: 10px; border: 1px solid #ddd; border-radius: 6px;">
-                                                <option value="CSAT">수능 (CSAT)</option>
-                                                <option value="KICE6">6월 평가원</option>
-                                                <option value="KICE9">9월 평가원</option>
-                                            </select>
-                                        </div>
-                                    </div>
-                                    <div style="margin-bottom: 20px;">
-                                        <label style="display: block; margin-bottom: 5px; font-weight: 600;">PDF 파일</label>
-                                        <input type="file" name="pdf" accept=".pdf" required style="width: 100%; padding: 10px; border: 1px solid #ddd; border-radius: 6px;">
-                                        <p style="font-size: 12px; color: #666; margin-top: 5px;">수능/평가원 수학 영역 PDF 파일</p>
-                                    </div>
-                                    <div id="pdf-progress" style="display: none; margin-bottom: 20px;">
-                                        <div style="background: #e5e7eb; border-radius: 10px; overflow: hidden;">
-                                            <div id="pdf-progress-bar" style="width: 0%; height: 24px; background: linear-gradient(90deg, #4f46e5, #4f46e5); transition: width 0.3s;"></div>
-                                        </div>
-                                        <p id="pdf-progress-text" style="text-align: center; margin-top: 8px; font-size: 14px; color: #4b5563;">처리 중...</p>
-                                    </div>
-                                    <div style="display: flex; gap: 10px; justify-content: flex-end;">
-                                        <button type="submit" id="pdf-submit-btn" style="padding: 12px 24px; background: #4f46e5; color: white; border: none; border-radius: 8px; font-weight: bold; cursor: pointer; font-size: 15px;">📤 업로드 및 처리</button>
-                                        <button type="button" onclick="closeAddProblemModal()" style="padding: 12px 24px; background: #e0e0e0; color: #333; border: none; border-radius: 8px; font-weight: bold; cursor: pointer; font-size: 15px;">취소</button>
-                                    </div>
-                                </form>
-                            </div>
-                        </div>
-                    </div>
-                </div>
-            `;
-            document.body.insertAdjacentHTML('beforeend', modalHtml);
-        }
-
-        function switchTab(tab) {
-            console.log('[Tab] Switching to:', tab);
-            const tabSingle = document.getElementById('tab-single');
-            const tabPdf = document.getElementById('tab-pdf');
-            const formSingle = document.getElementById('form-single');
-            const formPdf = document.getElementById('form-pdf');
-            console.log('[Tab] Elements found:', {tabSingle: !!tabSingle, tabPdf: !!tabPdf, formSingle: !!formSingle, formPdf: !!formPdf});
-
-            if (tab === 'single') {
-                tabSingle.style.background = 'linear-gradient(135deg, #4f46e5 0%, #4f46e5 100%)';
-                tabSingle.style.color = 'white';
-                tabSingle.style.border = 'none';
-                tabSingle.style.boxShadow = '0 4px 12px rgba(102,126,234,0.4)';
-                tabPdf.style.background = 'white';
-                tabPdf.style.color = '#4b5563';
-                tabPdf.style.border = '2px solid #d1d5db';
-                tabPdf.style.boxShadow = 'none';
-                formSingle.style.display = 'block';
-                formPdf.style.display = 'none';
-            } else {
-                tabPdf.style.background = 'linear-gradient(135deg, #4f46e5 0%, #4f46e5 100%)';
-                tabPdf.style.color = 'white';
-                tabPdf.style.border = 'none';
-                tabPdf.style.boxShadow = '0 4px 12px rgba(102,126,234,0.4)';
-                tabSingle.style.background = 'white';
-                tabSingle.style.color = '#4b5563';
-                tabSingle.style.border = '2px solid #d1d5db';
-                tabSingle.style.boxShadow = 'none';
-                formSingle.style.display = 'none';
-                formPdf.style.display = 'block';
-            }
-        }
-
-        // Single problem PDF handling
-        let singlePdfDoc = null;
-        let singleCurrentPage = 1;
-        let singleTotalPages = 0;
-        let singleCropRect = null;
-        let singleIsCropping = false;
-        let singleCropStart = null;
-
-        async function handleSingleFileChange(event) {
-            const file = event.target.files[0];
-            if (!file) return;
-
-            const pdfPagesDiv = document.getElementById('single-pdf-pages');
-            const croppedArea = document.getElementById('single-cropped-area');
-
-            // Reset crop state
-            croppedArea.style.display = 'none';
-            singleCropRect = null;
-            document.getElementById('single-crop-btn').style.display = 'none';
-            document.getElementById('single-crop-selection').style.display = 'none';
-
-            if (file.type === 'application/pdf') {
-                // Show PDF page selector
-                pdfPagesDiv.style.display = 'block';
-
-                try {
-                    if (!window.pdfjsLib) {
-                        alert('PDF 라이브러리를 불러오는 중입니다. 잠시 후 다시 시도해주세요.');
-                        return;
-                    }
-
-                    const arrayBuffer = await file.arrayBuffer();
-                    const loadingTask = window.pdfjsLib.getDocument({ data: arrayBuffer });
-                    singlePdfDoc = await loadingTask.promise;
-                    singleTotalPages = singlePdfDoc.numPages;
-                    singleCurrentPage = 1;
-
-                    // Populate page selector
-                    const pageSelect = document.getElementById('single-page-select');
-                    pageSelect.innerHTML = '';
-                    for (let i = 1; i <= singleTotalPages; i++) {
-                        const option = document.createElement('option');
-                        option.value = i;
-                        option.textContent = i + '페이지';
-                        pageSelect.appendChild(option);
-                    }
-
-                    document.getElementById('single-page-info').textContent = '/ ' + singleTotalPages + '페이지';
-
-                    // Render first page
-                    await renderSinglePdfPage(1);
-
-                    // Setup crop handlers
-                    setupSingleCropHandlers();
-                } catch (error) {
-                    console.error('PDF load error:', error);
-                    alert('PDF 로드 실패: ' + error.message);
-                    pdfPagesDiv.style.display = 'none';
-                }
-            } else {
-                // For images, also show crop interface
-                pdfPagesDiv.style.display = 'block';
-                singlePdfDoc = null;
-
-                // Hide page navigation for images
-                document.querySelector('#single-pdf-pages > div:first-child').style.display = 'none';
-
-                const reader = new FileReader();
-                reader.onload = function(e) {
-                    const img = new Image();
-                    img.onload = function() {
-                        const canvas = document.getElementById('single-pdf-canvas');
-                        const context = canvas.getContext('2d');
-
-                        // Scale down if too large
-                        let scale = 1;
-                        if (img.width > 800) scale = 800 / img.width;
-
-                        canvas.width = img.width * scale;
-                        canvas.height = img.height * scale;
-                        context.drawImage(img, 0, 0, canvas.width, canvas.height);
-
-                        setupSingleCropHandlers();
-                    };
-                    img.src = e.target.result;
-                };
-                reader.readAsDataURL(file);
-            }
-        }
-
-        function setupSingleCropHandlers() {
-            const canvas = document.getElementById('single-pdf-canvas');
-            const selection = document.getElementById('single-crop-selection');
-            const wrapper = document.getElementById('single-crop-wrapper');
-
-            // Remove old handlers
-            canvas.onmousedown = null;
-            canvas.onmousemove = null;
-            canvas.onmouseup = null;
-
-            canvas.onmousedown = function(e) {
-                const rect = canvas.getBoundingClientRect();
-                singleCropStart = {
-                    x: e.clientX - rect.left,
-                    y: e.clientY - rect.top
-                };
-                singleIsCropping = true;
-                selection.style.display = 'block';
-                selection.style.left = singleCropStart.x + 'px';
-                selection.style.top = singleCropStart.y + 'px';
-                selection.style.width = '0px';
-                selection.style.height = '0px';
-            };
-
-            canvas.onmousemove = function(e) {
-                if (!singleIsCropping) return;
-                const rect = canvas.getBoundingClientRect();
-                const currentX = e.clientX - rect.left;
-                const currentY = e.clientY - rect.top;
-
-                const left = Math.min(singleCropStart.x, currentX);
-                const top = Math.min(singleCropStart.y, currentY);
-                const width = Math.abs(currentX - singleCropStart.x);
-                const height = Math.abs(currentY - singleCropStart.y);
-
-                selection.style.left = left + 'px';
-                selection.style.top = top + 'px';
-                selection.style.width = width + 'px';
-                selection.style.height = height + 'px';
-
-                singleCropRect = { left, top, width, height };
-            };
-
-            canvas.onmouseup = function(e) {
-                if (singleIsCropping && singleCropRect && singleCropRect.width > 10 && singleCropRect.height > 10) {
-                    document.getElementById('single-crop-btn').style.display = 'inline-block';
-                }
-                singleIsCropping = false;
-            };
-        }
-
-        function applySingleCrop() {
-            if (!singleCropRect) return;
-
-            const canvas = document.getElementById('single-pdf-canvas');
-            const context = canvas.getContext('2d');
-
-            // Get the actual scale between display and canvas
-            const displayWidth = canvas.clientWidth;
-            const actualWidth = canvas.width;
-            const scale = actualWidth / displayWidth;
-
-            // Scale crop coordinates
-            const cropX = singleCropRect.left * scale;
-            const cropY = singleCropRect.top * scale;
-            const cropW = singleCropRect.width * scale;
-            const cropH = singleCropRect.height * scale;
-
-            // Create cropped canvas
-            const croppedCanvas = document.createElement('canvas');
-            croppedCanvas.width = cropW;
-            croppedCanvas.height = cropH;
-            const croppedCtx = croppedCanvas.getContext('2d');
-            croppedCtx.drawImage(canvas, cropX, cropY, cropW, cropH, 0, 0, cropW, cropH);
-
-            // Store cropped image
-            const dataUrl = croppedCanvas.toDataURL('image/png');
-            document.getElementById('single-converted-image').value = dataUrl;
-
-            // Show preview
-            document.getElementById('single-cropped-preview').src = dataUrl;
-            document.getElementById('single-cropped-area').style.display = 'block';
-            document.getElementById('single-pdf-pages').style.display = 'none';
-        }
-
-        function resetSingleCrop() {
-            document.getElementById('single-cropped-area').style.display = 'none';
-            document.getElementById('single-pdf-pages').style.display = 'block';
-            document.getElementById('single-converted-image').value = '';
-            document.getElementById('single-crop-selection').style.display = 'none';
-            document.getElementById('single-crop-btn').style.display = 'none';
-            singleCropRect = null;
-
-            // Re-show page nav if PDF
-            if (singlePdfDoc) {
-                document.querySelector('#single-pdf-pages > div:first-child').style.display = 'block';
-            }
-        }
-
-        async function renderSinglePdfPage(pageNum) {
-            if (!singlePdfDoc) return;
-
-            try {
-                const page = await singlePdfDoc.getPage(pageNum);
-                const viewport = page.getViewport({ scale: 2.0 });
-
-                const canvas = document.getElementById('single-pdf-canvas');
-                const context = canvas.getContext('2d');
-                canvas.width = viewport.width;
-                canvas.height = viewport.height;
-
-                await page.render({
-                    canvasContext: context,
-                    viewport: viewport
-                }).promise;
-
-                // Reset crop selection
-                document.getElementById('single-crop-selection').style.display = 'none';
-                document.getElementById('single-crop-btn').style.display = 'none';
-                singleCropRect = null;
-
-                // Update UI
-                document.getElementById('single-page-select').value = pageNum;
-                document.getElementById('single-prev-btn').disabled = pageNum <= 1;
-                document.getElementById('single-next-btn').disabled = pageNum >= singleTotalPages;
-
-                // Show page nav
-                document.querySelector('#single-pdf-pages > div:first-child').style.display = 'flex';
-            } catch (error) {
-                console.error('Page render error:', error);
-            }
-        }
-
-        function singlePdfPrevPage() {
-            if (singleCurrentPage > 1) {
-                singleCurrentPage--;
-                renderSinglePdfPage(singleCurrentPage);
-            }
-        }
-
-        function singlePdfNextPage() {
-            if (singleCurrentPage < singleTotalPages) {
-                singleCurrentPage++;
-                renderSinglePdfPage(singleCurrentPage);
-            }
-        }
-
-        function singlePdfGoToPage(pageNum) {
-            singleCurrentPage = parseInt(pageNum);
-            renderSinglePdfPage(singleCurrentPage);
-        }
 
-        async function handlePdfUpload(event) {
-            event.preventDefault();
-            console.log('[PDF Upload] Form submitted');
-            const form = event.target;
-            const formData = new FormData(form);
-
-            // Debug: Check form data
-            console.log('[PDF Upload] Year:', formData.get('year'));
-            console.log('[PDF Upload] Exam:', formData.get('exam'));
-            console.log('[PDF Upload] PDF file:', formData.get('pdf'));
-
-            const submitBtn = document.getElementById('pdf-submit-btn');
-            const progressDiv = document.getElementById('pdf-progress');
-            const progressBar = document.getElementById('pdf-progress-bar');
-            const progressText = document.getElementById('pdf-progress-text');
-
-            submitBtn.disabled = true;
-            submitBtn.textContent = '처리 중...';
-            progressDiv.style.display = 'block';
-            progressBar.style.width = '10%';
-            progressText.textContent = 'PDF 업로드 중...';
-
-            try {
-                const response = await fetch('/problem/upload-pdf', {
-                    method: 'POST',
-                    credentials: 'include',
-                    body: formData
-                });
-
-                progressBar.style.width = '50%';
-                progressText.textContent = '문제 분리 중...';
-
-                const data = await response.json();
-
-                if (response.ok) {
-                    progressBar.style.width = '100%';
-                    progressText.textContent = '완료!';
-
-                    setTimeout(() => {
-                        alert('PDF 처리 완료!\\n\\n' +
-                            '총 문제: ' + data.total_problems + '개\\n' +
-                            '업로드 성공: ' + data.uploaded + '개' +
-                            (data.skipped_pages > 0 ? '\\n\\n(선택과목 ' + data.skipped_pages + '페이지는 스킵됨)' : ''));
-                        closeAddProblemModal();
-                        loadProblems();
-                        loadStats();
-                    }, 500);
-                } else {
-                    throw new Error(data.detail || 'PDF 처리 실패');
-                }
-            } catch (error) {
-                console.error('Error:', error);
-                progressBar.style.background = '#ef4444';
-                progressText.textContent = '오류: ' + error.message;
-                alert('PDF 처리 중 오류가 발생했습니다: ' + error.message);
-            } finally {
-                submitBtn.disabled = false;
-                submitBtn.textContent = '📤 업로드 및 처리';
-            }
-        }
+@router.get("/thumbs/{year}/{exam}")
+async def get_thumbnail_sheet(request: Request, year: int, exam: str, data: AsyncDataAccess = Depends(get_data)):
+    """
+    Sprite sheet manifest for one exam (admin grid thumbnails)
 
-        function closeAddProblemModal() {
-            const modal = document.getElementById('add-problem-modal');
-            if (modal) modal.remove();
-        }
+    Revalidated on every grid load; 304 while the sheet is unchanged (no problem
+    image of the exam changed and no incomplete sheet was rebuilt).
+    """
+    await get_user_from_session(request)
 
-        async function handleAddProblem(event) {
-            event.preventDefault();
-            const form = event.target;
-            const formData = new FormData(form);
+    params = {"year": f"eq.{year}", "exam": f"eq.{exam}", "order": "question_no"}
+    try:
+        try:
+            problems = await data.select("problems", {**params, "select": THUMB_COLUMNS + ",image_variants"})
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code != 400:
+                raise
+            # image_variants column not added yet
+            problems = await data.select("problems", {**params, "select": THUMB_COLUMNS})
+        manifest = await get_thumbnails().manifest(year, exam, problems)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
 
-            const submitBtn = form.querySelector('button[type="submit"]');
-            submitBtn.disabled = true;
-            submitBtn.textContent = '업로드 중...';
-
-            try {
-                // Check if we have a cropped image (from PDF or image)
-                const convertedImage = document.getElementById('single-converted-image').value;
-                if (convertedImage) {
-                    // Convert data URL to Blob and replace the file
-                    const response = await fetch(convertedImage);
-                    const blob = await response.blob();
-                    formData.delete('image');
-                    formData.append('image', blob, 'cropped_problem.png');
-                }
-
-                const uploadResponse = await fetch('/problem/add', {
-                    method: 'POST',
-                    credentials: 'include',
-                    body: formData
-                });
-
-                const data = await uploadResponse.json();
-
-                if (uploadResponse.ok) {
-                    alert('문제가 추가되었습니다: ' + data.problem_id);
-                    closeAddProblemModal();
-                    loadProblems();
-                    loadStats();
-                } else {
-                    alert('오류: ' + (data.detail || 'Failed'));
-                }
-            } catch (error) {
-                console.error('Error:', error);
-                alert('문제 추가 중 오류가 발생했습니다: ' + error.message);
-            } finally {
-                submitBtn.disabled = false;
-                submitBtn.textContent = '✓ 추가';
-            }
-        }
+    etag = manifest_etag(manifest)
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    return JSONResponse(content=manifest, headers=headers)
 
-        loadStats(); loadProblems();
-    </script>
 
-    <!-- Crop Modal Root -->
-    <div id="crop-modal-root"></div>
+@router.get("/admin")
+async def admin_dashboard(request: Request):
+    """
+    Admin dashboard for problem management
 
-    <!-- PDF.js for PDF rendering -->
-    <script src="https://cdnjs.cloudflare.com/ajax/libs/pdf.js/3.11.174/pdf.min.js"></script>
-    <script>
-      // Set PDF.js worker
-      if (window.pdfjsLib) {
-        pdfjsLib.GlobalWorkerOptions.workerSrc = 'https://cdnjs.cloudflare.com/ajax/libs/pdf.js/3.11.174/pdf.worker.min.js';
-      }
-    </script>
+    Shell: server/shells/admin.html (fingerprinted scripts, pre-compressed,
+    served from memory - see server/static_assets.py)
+    """
+    await get_user_from_session(request)
 
-    <!-- React and Babel -->
-    <script crossorigin src="https://unpkg.com/react@18/umd/react.production.min.js"></script>
-    <script crossorigin src="https://unpkg.com/react-dom@18/umd/react-dom.production.min.js"></script>
-    <script src="https://unpkg.com/@babel/standalone/babel.min.js"></script>
-
-    <!-- Shared Crop Components -->
-    <script type="text/babel" src="/static/shared-crop-components.jsx?v=20"></script>
-
-    <!-- Crop Modal Component -->
-    <script type="text/babel" src="/static/crop-modal.jsx?v=20"></script>
-</body>
-</html>
-"""
-    return HTMLResponse(
-        content=html,
-        headers={"Cache-Control": "no-cache, no-store, must-revalidate"}
-    )
+    return get_assets().shell_response(request, "admin.html")
 
 
 # NOTE: This route must come AFTER /admin, /list, /ready, /stats
 @router.get("/{problem_id}/metadata")
-async def get_problem_metadata(request: Request, problem_id: str):
+async def get_problem_metadata(request: Request, problem_id: str, data: AsyncDataAccess = Depends(get_data)):
     """
     Get problem metadata for crop modal
     """
-    user = get_user_from_session(request)
+    user = await get_user_from_session(request)
     if not user:
         raise HTTPException(status_code=401, detail="Not authenticated")
 
     try:
-        supabase = SupabaseService()
-        problem = supabase.get_problem(problem_id)
+        problem = await data.get_problem(problem_id)
         if not problem:
             raise HTTPException(status_code=404, detail="Problem not found")
 
@@ -1176,7 +254,9 @@ async def get_problem_metadata(request: Request, problem_id: str):
             "year": problem.get("year"),
             "exam": problem.get("exam"),
             "question_no": problem.get("question_no"),
-            "image_url": problem.get("problem_image_url") or problem.get("image_url") or f"https://gusahlxqyyqmaalwdtjw.supabase.co/storage/v1/object/public/problem-images-v2/{problem_id}.png",
+            "image_url": problem.get("problem_image_url") or problem.get("image_url") or get_storage_client().public_url(f"{problem_id}.png"),
+            # Changes when the image is replaced (crop re-upload keeps the same URL)
+            "image_version": (problem.get("image_variants") or {}).get("version") or problem.get("updated_at"),
             "difficulty": f"{problem.get('score', 3)}점",
             "category": problem.get("unit", "미분"),
             "subject": problem.get("subject", "수1"),
@@ -1190,15 +270,14 @@ async def get_problem_metadata(request: Request, problem_id: str):
 
 
 @router.get("/{problem_id}")
-async def get_problem(request: Request, problem_id: str):
+async def get_problem(request: Request, problem_id: str, data: AsyncDataAccess = Depends(get_data)):
     """
     Get single problem by ID
     """
-    user = get_user_from_session(request)
+    user = await get_user_from_session(request)
 
     try:
-        supabase = SupabaseService()
-        problem = supabase.get_problem(problem_id)
+        problem = await data.get_problem(problem_id)
         if not problem:
             raise HTTPException(status_code=404, detail="Problem not found")
         return problem
@@ -1213,19 +292,18 @@ async def get_problem(request: Request, problem_id: str):
 # ===========================================
 
 @router.post("/send")
-async def send_problem(request: Request, body: SendProblemRequest):
+async def send_problem(request: Request, body: SendProblemRequest, data: AsyncDataAccess = Depends(get_data)):
     """
     Send a single problem to logged-in user
     """
-    user = get_user_from_session(request)
+    user = await get_user_from_session(request)
 
     access_token = user.get("access_token")
     if not access_token:
         raise HTTPException(status_code=400, detail="No access token")
 
     try:
-        supabase = SupabaseService()
-        problem = supabase.get_problem(body.problem_id)
+        problem = await data.get_problem(body.problem_id)
 
         if not problem:
             raise HTTPException(status_code=404, detail="Problem not found")
@@ -1245,8 +323,9 @@ async def send_problem(request: Request, body: SendProblemRequest):
         try:
             card_generator = CardImageGenerator()
 
-            # Generate card image bytes
-            card_bytes = card_generator.generate_card(
+            # Generate card image bytes (image download + PIL; off the event loop)
+            card_bytes = await run_in_threadpool(
+                card_generator.generate_card,
                 problem_image_url=problem_image,
                 title=f"{problem.get('year')} {problem.get('exam')} {problem.get('question_no')}번",
                 year=problem.get("year"),
@@ -1259,29 +338,17 @@ async def send_problem(request: Request, body: SendProblemRequest):
             print(f"[Send Card] Generated {len(card_bytes)} bytes")
 
             # Upload card to Supabase Storage
-            import requests
-            supabase_url = os.getenv("SUPABASE_URL")
-            service_key = os.getenv("SUPABASE_SERVICE_KEY")
-            bucket = "problem-images-v2"
             card_filename = f"{body.problem_id}_card.png"
-            upload_url = f"{supabase_url}/storage/v1/object/{bucket}/{card_filename}"
-
-            headers = {
-                "Authorization": f"Bearer {service_key}",
-                "Content-Type": "image/png",
-                "x-upsert": "true"
-            }
-
-            upload_resp = requests.post(upload_url, headers=headers, data=card_bytes)
-
-            print(f"[Send Card] Upload response: {upload_resp.status_code}")
+            upload = await run_in_threadpool(
+                get_storage_client().upload_bytes, card_bytes, card_filename, "image/png"
+            )
 
-            if upload_resp.status_code in [200, 201]:
+            if upload["success"]:
                 # Use card image for KakaoTalk message
-                card_image_url = f"{supabase_url}/storage/v1/object/public/{bucket}/{card_filename}"
+                card_image_url = upload["url"]
                 print(f"[Send Card] Success! URL: {card_image_url}")
             else:
-                print(f"[Send Card] Upload failed: {upload_resp.text}")
+                print(f"[Send Card] Upload failed: {upload.get('error')}")
                 card_image_url = problem_image
 
         except Exception as e:
@@ -1290,10 +357,10 @@ async def send_problem(request: Request, body: SendProblemRequest):
             print(traceback.format_exc())
             card_image_url = problem_image
 
-        # Fallback to original if card generation failed
-        if not card_image_url:
-            card_image_url = problem_image
-            print(f"[Send Card] Using original image")
+        # Fallback if card generation failed: feed-sized derivative, else the original
+        if not card_image_url or card_image_url == problem_image:
+            card_image_url = variant_url(problem.get("image_variants"), KAKAO_FEED_IMAGE_WIDTH) or problem_image
+            print(f"[Send Card] Using problem image")
 
         # Build problem viewer URL
         base_url = os.getenv("BASE_URL", "http://localhost:8000")
@@ -1308,7 +375,8 @@ async def send_problem(request: Request, body: SendProblemRequest):
         sys.stdout.flush()
 
         try:
-            result = message_service.send_math_problem(
+            result = await message_service.send_math_problem_async(
+                data,
                 access_token=access_token,
                 problem_id=body.problem_id,
                 problem_text=problem.get("extract_text", "")[:500],
@@ -1334,16 +402,13 @@ async def send_problem(request: Request, body: SendProblemRequest):
 
         if result.get("success"):
             # Update problem status
-            supabase.update_problem(body.problem_id, {"status": "sent"})
+            await data.update_problem(body.problem_id, {"status": "sent"})
 
-            # Record user history (optional - if table exists)
-            try:
-                supabase.client.table("user_problems").insert({
-                    "user_id": user.get("id"),
-                    "problem_id": body.problem_id
-                }).execute()
-            except:
-                pass  # Ignore if table doesn't exist
+            # Record user history (buffered; failures are counted in /health)
+            await record_event(data, "user_problems", {
+                "user_id": user.get("id"),
+                "problem_id": body.problem_id
+            })
 
             return {"message": "Problem sent successfully", "problem_id": body.problem_id}
         else:
@@ -1365,11 +430,11 @@ async def send_problem(request: Request, body: SendProblemRequest):
 
 
 @router.post("/send-bulk")
-async def send_bulk_problems(request: Request, body: BulkSendRequest):
+async def send_bulk_problems(request: Request, body: BulkSendRequest, data: AsyncDataAccess = Depends(get_data)):
     """
     Send multiple problems to logged-in user
     """
-    user = get_user_from_session(request)
+    user = await get_user_from_session(request)
 
     access_token = user.get("access_token")
     if not access_token:
@@ -1389,7 +454,7 @@ async def send_bulk_problems(request: Request, body: BulkSendRequest):
         try:
             # Reuse the single send logic
             req = SendProblemRequest(problem_id=problem_id)
-            await send_problem(request, req)
+            await send_problem(request, req, data)
             success_count += 1
             print(f"[Bulk Send] Success: {problem_id}")
         except Exception as e:
@@ -1411,13 +476,14 @@ async def upload_pdf_batch(
     request: Request,
     year: int = Form(...),
     exam: str = Form(...),
-    pdf: UploadFile = File(...)
+    pdf: UploadFile = File(...),
+    supabase: SupabaseService = Depends(get_supabase)
 ):
     """
     Upload and process entire PDF exam file
     Automatically splits into individual problems using templates
     """
-    user = get_user_from_session(request)
+    user = await get_user_from_session(request)
 
     try:
         import tempfile
@@ -1425,13 +491,11 @@ async def upload_pdf_batch(
 
         print(f"[PDF Upload] Starting: {year} {exam}, file: {pdf.filename}")
 
-        # Save uploaded PDF to temp file
-        pdf_bytes = await pdf.read()
-        with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as tmp:
-            tmp.write(pdf_bytes)
-            tmp_pdf_path = tmp.name
+        # Stream uploaded PDF to temp file in chunks (constant memory)
+        spooled = await spool_upload(pdf, MAX_PDF_UPLOAD_BYTES, suffix=".pdf")
+        tmp_pdf_path = str(spooled.path)
 
-        print(f"[PDF Upload] Saved to temp: {tmp_pdf_path}, size: {len(pdf_bytes)} bytes")
+        print(f"[PDF Upload] Saved to temp: {tmp_pdf_path}, size: {spooled.size} bytes, sha256: {spooled.sha256[:12]}")
 
         # Import pipeline components
         import sys
@@ -1468,66 +532,55 @@ async def upload_pdf_batch(
 
         print(f"[PDF Upload] Split complete: {summary['total_problems']} problems")
 
-        # Step 3: Upload to Supabase Storage
-        supabase_url = os.getenv("SUPABASE_URL")
-        service_key = os.getenv("SUPABASE_SERVICE_KEY")
-        bucket = "problem-images-v2"
-
-        import requests as http_requests
-
+        # Step 3: Upload to Supabase Storage (pooled, bounded parallelism)
         uploaded_count = 0
-        supabase = SupabaseService()
 
+        # Skip pages without templates (Q00 = 선택과목 등)
+        to_upload = []
         for result in summary.get("results", []):
+            if result["question_no"] == 0:
+                print(f"[PDF Upload] Skipping {result['problem_id']} (no template)")
+                continue
+            to_upload.append(result)
+
+        upload_results = await run_in_threadpool(
+            get_storage_client().upload_many,
+            [(r["filepath"], f"{r['problem_id']}.png") for r in to_upload],
+        )
+
+        # Responsive derivatives (480/800/1200 WebP + PNG) for the viewer srcset
+        uploaded = [(r, u) for r, u in zip(to_upload, upload_results) if u["success"]]
+        variants = await run_in_threadpool(
+            build_variants_many, [(r["problem_id"], r["filepath"]) for r, _ in uploaded]
+        )
+        variants_by_id = {r["problem_id"]: v for (r, _), v in zip(uploaded, variants)}
+
+        rows = []
+        for result, upload in zip(to_upload, upload_results):
             problem_id = result["problem_id"]
-            filepath = result["filepath"]
-            question_no = result["question_no"]
 
-            # Skip pages without templates (Q00 = 선택과목 등)
-            if question_no == 0:
-                print(f"[PDF Upload] Skipping {problem_id} (no template)")
+            if not upload["success"]:
+                print(f"[PDF Upload] Upload failed for {problem_id}: {upload.get('error')}")
                 continue
 
-            try:
-                # Read image file
-                with open(filepath, "rb") as f:
-                    image_bytes = f.read()
-
-                # Upload to storage
-                filename = f"{problem_id}.png"
-                upload_url = f"{supabase_url}/storage/v1/object/{bucket}/{filename}"
-
-                headers = {
-                    "Authorization": f"Bearer {service_key}",
-                    "Content-Type": "image/png",
-                    "x-upsert": "true"
-                }
-
-                upload_resp = http_requests.post(upload_url, headers=headers, data=image_bytes)
-
-                if upload_resp.status_code in [200, 201]:
-                    image_url = f"{supabase_url}/storage/v1/object/public/{bucket}/{filename}"
-
-                    # Save to database
-                    problem_data = {
-                        "problem_id": problem_id,
-                        "year": year,
-                        "exam": exam,
-                        "question_no": question_no,
-                        "score": 3,  # Default score
-                        "image_url": image_url,
-                        "problem_image_url": image_url,
-                        "status": "needs_review" if result.get("needs_review") else "ready"
-                    }
-
-                    supabase.client.table("problems").upsert(problem_data).execute()
-                    uploaded_count += 1
-                    print(f"[PDF Upload] Uploaded: {problem_id}")
-                else:
-                    print(f"[PDF Upload] Upload failed for {problem_id}: {upload_resp.text}")
-
-            except Exception as e:
-                print(f"[PDF Upload] Error processing {problem_id}: {e}")
+            image_url = upload["url"]
+            rows.append(with_variants({
+                "problem_id": problem_id,
+                "year": year,
+                "exam": exam,
+                "question_no": result["question_no"],
+                "score": 3,  # Default score
+                "image_url": image_url,
+                "problem_image_url": image_url,
+                "status": "needs_review" if result.get("needs_review") else "ready"
+            }, variants_by_id.get(problem_id)))
+
+        # Save to database (chunked multi-row upsert)
+        if rows:
+            db_result = await run_in_threadpool(supabase.bulk_upsert_problems, rows)
+            uploaded_count = db_result["written"]
+            for err in db_result["errors"]:
+                print(f"[PDF Upload] Error processing {err['problem_id']}: {err['error']}")
 
         # Cleanup temp files
         try:
@@ -1549,6 +602,8 @@ async def upload_pdf_batch(
             "skipped_pages": summary["needs_review_count"]
         }
 
+    except HTTPException:
+        raise
     except Exception as e:
         import traceback
         print(f"[PDF Upload Error] {traceback.format_exc()}")
@@ -1564,47 +619,45 @@ async def add_problem(
     score: int = Form(...),
     unit: str = Form(None),
     answer: str = Form(None),
-    image: UploadFile = File(...)
+    image: UploadFile = File(...),
+    supabase: SupabaseService = Depends(get_supabase)
 ):
     """
     Add a new problem manually via admin interface
     """
-    user = get_user_from_session(request)
+    user = await get_user_from_session(request)
 
     try:
         # Generate problem_id
         problem_id = f"{year}_{exam}_Q{question_no:02d}"
         print(f"[Add Problem] Creating problem: {problem_id}")
 
-        # Read image file
-        image_bytes = await image.read()
-        print(f"[Add Problem] Image size: {len(image_bytes)} bytes, type: {image.content_type}")
+        # Stream image to temp file, then upload from the file handle
+        spooled = await spool_upload(image, MAX_IMAGE_UPLOAD_BYTES, suffix=".png")
+        print(f"[Add Problem] Image size: {spooled.size} bytes, type: {image.content_type}")
 
-        # Upload to Supabase Storage
-        supabase_url = os.getenv("SUPABASE_URL")
-        service_key = os.getenv("SUPABASE_SERVICE_KEY")
-        bucket = "problem-images-v2"
+        # Upload to Supabase Storage, then the 480/800/1200 WebP + PNG derivatives
         filename = f"{problem_id}.png"
-        upload_url = f"{supabase_url}/storage/v1/object/{bucket}/{filename}"
-
-        headers = {
-            "Authorization": f"Bearer {service_key}",
-            "Content-Type": image.content_type or "image/png",
-            "x-upsert": "true"
-        }
-
-        import requests
-        upload_resp = requests.post(upload_url, headers=headers, data=image_bytes)
-
-        if upload_resp.status_code not in [200, 201]:
-            print(f"[Add Problem] Upload failed: {upload_resp.text}")
+        variants = None
+        try:
+            with spooled.open() as f:
+                upload = await run_in_threadpool(
+                    get_storage_client().upload_file,
+                    f, filename, image.content_type or "image/png", size=spooled.size,
+                )
+            if upload["success"]:
+                variants = await run_in_threadpool(build_and_upload_variants, problem_id, spooled.path)
+        finally:
+            spooled.cleanup()
+
+        if not upload["success"]:
+            print(f"[Add Problem] Upload failed: {upload.get('error')}")
             raise HTTPException(status_code=500, detail="Image upload failed")
 
-        image_url = f"{supabase_url}/storage/v1/object/public/{bucket}/{filename}"
+        image_url = upload["url"]
         print(f"[Add Problem] Image uploaded: {image_url}")
 
         # Insert into database
-        supabase = SupabaseService()
         problem_data = {
             "problem_id": problem_id,
             "year": year,
@@ -1615,10 +668,11 @@ async def add_problem(
             "answer": answer,
             "image_url": image_url,
             "status": "ready",
-            "problem_image_url": image_url  # For compatibility
+            "problem_image_url": image_url,  # For compatibility
         }
+        with_variants(problem_data, variants)
 
-        result = supabase.client.table("problems").upsert(problem_data).execute()
+        supabase.upsert_problem(problem_data)
         print(f"[Add Problem] Database insert successful")
 
         return {
@@ -1636,11 +690,11 @@ async def add_problem(
 
 
 @router.post("/send-hint/{problem_id}/{level}")
-async def send_hint(request: Request, problem_id: str, level: int):
+async def send_hint(request: Request, problem_id: str, level: int, data: AsyncDataAccess = Depends(get_data)):
     """
     Send hint for a problem (level 1, 2, or 3)
     """
-    user = get_user_from_session(request)
+    user = await get_user_from_session(request)
 
     if level not in [1, 2, 3]:
         raise HTTPException(status_code=400, detail="Hint level must be 1, 2, or 3")
@@ -1650,8 +704,7 @@ async def send_hint(request: Request, problem_id: str, level: int):
         raise HTTPException(status_code=400, detail="No access token")
 
     try:
-        supabase = SupabaseService()
-        problem = supabase.get_problem(problem_id)
+        problem = await data.get_problem(problem_id)
 
         if not problem:
             raise HTTPException(status_code=404, detail="Problem not found")
@@ -1663,7 +716,8 @@ async def send_hint(request: Request, problem_id: str, level: int):
         if not hint_text:
             raise HTTPException(status_code=404, detail=f"Hint {level} not available")
 
-        result = message_service.send_hint(
+        result = await message_service.send_hint_async(
+            data,
             access_token=access_token,
             hint_level=level,
             hint_text=hint_text
@@ -1684,19 +738,18 @@ async def send_hint(request: Request, problem_id: str, level: int):
 
 
 @router.post("/send-answer/{problem_id}")
-async def send_answer(request: Request, problem_id: str, user_answer: Optional[str] = None):
+async def send_answer(request: Request, problem_id: str, user_answer: Optional[str] = None, data: AsyncDataAccess = Depends(get_data)):
     """
     Send answer and solution for a problem
     """
-    user = get_user_from_session(request)
+    user = await get_user_from_session(request)
 
     access_token = user.get("access_token")
     if not access_token:
         raise HTTPException(status_code=400, detail="No access token")
 
     try:
-        supabase = SupabaseService()
-        problem = supabase.get_problem(problem_id)
+        problem = await data.get_problem(problem_id)
 
         if not problem:
             raise HTTPException(status_code=404, detail="Problem not found")
@@ -1709,7 +762,8 @@ async def send_answer(request: Request, problem_id: str, user_answer: Optional[s
         if user_answer:
             is_correct = str(user_answer).strip() == str(answer).strip()
 
-        result = message_service.send_answer(
+        result = await message_service.send_answer_async(
+            data,
             access_token=access_token,
             answer=answer,
             solution=solution,
@@ -1768,19 +822,92 @@ async def test_view():
 
 
 @router.get("/view/{problem_id}", response_class=HTMLResponse)
-async def view_problem(request: Request, problem_id: str):
+async def view_problem(
+    request: Request,
+    problem_id: str,
+    data: AsyncDataAccess = Depends(get_data),
+    supabase: SupabaseService = Depends(get_supabase),
+):
     """
     Problem viewer page - opens in webview from KakaoTalk
+
+    The page depends only on the problem row, so it is rendered once per
+    content version and served from the viewer cache with a strong ETag.
+    Edits on this worker drop the cached page (invalidate_problem); edits on
+    other workers are caught by the collection version (one probe per
+    COLLECTION_VERSION_TTL): when it moves, the page's updated_at is checked
+    against the row and the page is re-rendered from a fresh read if it
+    changed. Matching revalidations get 304.
     """
-    print(f"[Problem Viewer] Accessed for problem_id: {problem_id}")
-    print(f"[Problem Viewer] User-Agent: {request.headers.get('user-agent', 'N/A')}")
+    try:
+        collection = await run_in_threadpool(supabase.get_collection_version)
+    except Exception as e:
+        print(f"  [Viewer] collection version unavailable: {e}")
+        collection = None
+
+    page = get_cached_viewer(problem_id)
+    fresh = False
+    if page is not MISSING and collection is not None and page["collection"] != collection:
+        if await data.get_problem_version(problem_id) == page["version"]:
+            page = {**page, "collection": collection}
+            cache_viewer(problem_id, page)
+        else:
+            page, fresh = MISSING, True
 
-    supabase = SupabaseService()
-    problem = supabase.get_problem(problem_id)
+    if page is MISSING:
+        problem = await data.get_problem(problem_id, fresh=fresh)
+        if not problem:
+            raise HTTPException(status_code=404, detail="Problem not found")
 
-    if not problem:
-        raise HTTPException(status_code=404, detail="Problem not found")
+        body = _render_viewer_html(problem_id, problem).encode("utf-8")
+        page = {
+            "version": problem.get("updated_at"),
+            # A row from the cache/replica may predate the probe: verify it on the next request
+            "collection": collection if fresh else None,
+            "etag": strong_etag(body),
+            "body": body,
+        }
+        cache_viewer(problem_id, page)
+
+    headers = {"ETag": page["etag"], "Cache-Control": f"public, max-age={VIEWER_MAX_AGE}"}
+    if etag_matches(request.headers.get("if-none-match"), page["etag"]):
+        return Response(status_code=304, headers=headers)
+    return HTMLResponse(content=page["body"], headers=headers)
+
+
+# The image spans the viewport (.image-container is width: 100%)
+VIEWER_IMAGE_SIZES = "100vw"
 
+
+def _problem_image_html(image_url: str, variants: Optional[dict]) -> str:
+    """
+    Problem image markup: <picture> with WebP/PNG srcsets when derivatives exist
+
+    The browser picks the smallest width covering viewport x DPR (480w-800w on
+    most phones instead of the 1600px original). It is the first thing on the
+    page (LCP), so it stays eager + high priority; width/height reserve the
+    space before it loads.
+    """
+    onerror = "this.closest('.image-container').innerHTML='<p style=color:red;>이미지를 불러올 수 없습니다</p>'"
+    webp_srcset = srcset(variants, "webp")
+    png_srcset = srcset(variants, "png")
+    if not png_srcset:
+        return (f'<img src="{html_escape(image_url)}" alt="문제 이미지" loading="eager" '
+                f'fetchpriority="high" onerror="{onerror}">')
+
+    fallback = variant_url(variants, 800) or image_url
+    webp_source = (f'<source type="image/webp" srcset="{html_escape(webp_srcset)}" '
+                   f'sizes="{VIEWER_IMAGE_SIZES}">') if webp_srcset else ""
+    return (
+        f'<picture>{webp_source}'
+        f'<img src="{html_escape(fallback)}" srcset="{html_escape(png_srcset)}" sizes="{VIEWER_IMAGE_SIZES}" '
+        f'width="{int(variants["width"])}" height="{int(variants["height"])}" alt="문제 이미지" '
+        f'loading="eager" fetchpriority="high" decoding="async" onerror="{onerror}"></picture>'
+    )
+
+
+def _render_viewer_html(problem_id: str, problem: dict) -> str:
+    """Viewer page for a problem row (no per-user content, safe to share between users)"""
     # Build problem metadata
     problem_data = {
         "problem_id": problem_id,
@@ -1790,14 +917,11 @@ async def view_problem(request: Request, problem_id: str):
         "score": problem.get("score", 3),
         "difficulty": f"{problem.get('score', 3)}점",
         "unit": problem.get("unit"),
-        "image_url": problem.get("problem_image_url") or problem.get("image_url") or f"https://gusahlxqyyqmaalwdtjw.supabase.co/storage/v1/object/public/problem-images-v2/{problem_id}.png",
+        "image_url": problem.get("problem_image_url") or problem.get("image_url") or get_storage_client().public_url(f"{problem_id}.png"),
         "answer": problem.get("answer_verified") or problem.get("answer"),
         "solution": problem.get("solution"),
     }
 
-    print(f"[Problem Viewer] Loaded problem: {problem_data['year']} {problem_data['exam']} Q{problem_data['number']}")
-    print(f"[Problem Viewer] Image URL: {problem_data['image_url']}")
-
     # Simple HTML viewer (KakaoTalk webview compatible)
     exam_name = {'CSAT': '수능', 'KICE6': '6월 평가원', 'KICE9': '9월 평가원'}.get(problem_data['exam'], problem_data['exam'])
 
@@ -1806,6 +930,7 @@ async def view_problem(request: Request, problem_id: str):
     safe_exam = html_escape(exam_name)
     # JS string context: use json.dumps for safe embedding
     js_problem_id = json.dumps(problem_data['problem_id'])
+    problem_image = _problem_image_html(problem_data['image_url'], problem.get("image_variants"))
 
     html = f"""<!DOCTYPE html>
 <html lang="ko">
@@ -1851,6 +976,7 @@ async def view_problem(request: Request, problem_id: str):
             width: 100%;
             box-shadow: 0 2px 12px rgba(0,0,0,0.08);
         }}
+        .image-container picture {{ display: block; }}
         .image-container img {{
             width: 100%;
             max-width: 100%;
@@ -2141,7 +1267,7 @@ async def view_problem(request: Request, problem_id: str):
     </div>
 
     <div class="image-container">
-        <img src="{safe['image_url']}" alt="문제 이미지" loading="eager" fetchpriority="high" onerror="this.parentElement.innerHTML='<p style=color:red;>이미지를 불러올 수 없습니다</p>'">
+        {problem_image}
     </div>
 
     <div class="answer-section">
@@ -2465,8 +1591,7 @@ async def view_problem(request: Request, problem_id: str):
 </body>
 </html>"""
 
-    print(f"[Problem Viewer] Returning HTML ({len(html)} bytes)")
-    return HTMLResponse(content=html)
+    return html
 
 
 class SubmitAnswerRequest(BaseModel):
@@ -2478,87 +1603,117 @@ class HintRequest(BaseModel):
     problem_id: str
 
 
+def _grade(problem: dict, user_answer: str) -> dict:
+    """Grade locally against a (cached) problem row - same rules as the submit_answer RPC"""
+    correct_answer = problem.get("answer_verified") or problem.get("answer")
+    is_correct = str(user_answer).strip() == str(correct_answer).strip()
+    return {
+        "found": True,
+        "is_correct": is_correct,
+        "correct_answer": correct_answer,
+        "solution": problem.get("solution"),
+        "score": (problem.get("score") or 3) if is_correct else 0,
+        "recorded": False,
+    }
+
+
+async def _submit_legacy(data: AsyncDataAccess, user: dict, body: "SubmitAnswerRequest") -> dict:
+    """Pre-RPC path (sql/submit_answer.sql not applied): grade, record, read-modify-write stats"""
+    problem = await data.get_problem(body.problem_id)
+    if not problem:
+        return {"found": False}
+    result = _grade(problem, body.user_answer)
+    is_correct = result["is_correct"]
+
+    await record_event(data, "user_problems", {
+        "user_id": user.get("id"),
+        "problem_id": body.problem_id,
+        "user_answer": body.user_answer,
+        "is_correct": is_correct,
+        "hints_used": 0,
+    })
+
+    try:
+        consecutive_correct = user.get("consecutive_correct", 0)
+        consecutive_wrong = user.get("consecutive_wrong", 0)
+        if is_correct:
+            consecutive_correct += 1
+            consecutive_wrong = 0
+        else:
+            consecutive_correct = 0
+            consecutive_wrong += 1
+
+        await data.update("users", {
+            "total_problems_solved": user.get("total_problems_solved", 0) + 1,
+            "correct_count": user.get("correct_count", 0) + (1 if is_correct else 0),
+            "consecutive_correct": consecutive_correct,
+            "consecutive_wrong": consecutive_wrong,
+            "updated_at": "now()"
+        }, {"id": user.get("id")})
+        invalidate_user(user.get("kakao_id"))
+        result["recorded"] = True
+    except Exception as e:
+        print(f"[Submit Answer] Error saving to database: {e}")
+
+    return result
+
+
 @router.post("/submit")
-async def submit_answer(request: Request, body: SubmitAnswerRequest):
+async def submit_answer(request: Request, body: SubmitAnswerRequest, data: AsyncDataAccess = Depends(get_data)):
     """
     Submit answer and check correctness (for problem viewer)
-    Saves to user_problems and updates user statistics
+
+    Logged-in users: one submit_answer RPC grades, saves to user_problems and
+    increments user statistics atomically (sql/submit_answer.sql).
+    Anonymous viewers are graded against the cached problem row.
     """
     # Get user from session (optional - viewer works without login)
     session_token = request.cookies.get("session_token")
     user = None
     if session_token:
-        user_service = UserService()
-        user = user_service.get_user_by_session(session_token)
-
-    supabase = SupabaseService()
-    problem = supabase.get_problem(body.problem_id)
+        user = await data.get_user_by_session(session_token)
 
-    if not problem:
-        raise HTTPException(status_code=404, detail="Problem not found")
-
-    correct_answer = problem.get("answer_verified") or problem.get("answer")
-    solution = problem.get("solution") or "풀이가 준비되지 않았습니다."
-
-    # Check if answer is correct
-    is_correct = str(body.user_answer).strip() == str(correct_answer).strip()
-    score = problem.get("score", 3) if is_correct else 0
-
-    print(f"[Submit Answer] problem={body.problem_id}, user_answer={body.user_answer}, correct={is_correct}")
-
-    # Save attempt to database (if user is logged in)
+    result = None
     if user:
         try:
-            # Save to user_problems table
-            supabase.client.table("user_problems").insert({
-                "user_id": user.get("id"),
-                "problem_id": body.problem_id,
-                "user_answer": body.user_answer,
-                "is_correct": is_correct,
-                "hint_used": 0,  # TODO: track hint usage
-            }).execute()
-
-            # Update user statistics
-            current_correct = user.get("correct_count", 0)
-            current_total = user.get("total_problems_solved", 0)
-            consecutive_correct = user.get("consecutive_correct", 0)
-            consecutive_wrong = user.get("consecutive_wrong", 0)
-
-            if is_correct:
-                consecutive_correct += 1
-                consecutive_wrong = 0
+            result = await data.submit_answer(body.problem_id, body.user_answer, user_id=user.get("id"))
+            if result.get("stats"):
+                # Keep the cached user row in step with the counters just written
+                cache_user({**user, **result["stats"]})
+        except httpx.HTTPStatusError as e:
+            if _is_missing_function(e.response.text):
+                result = await _submit_legacy(data, user, body)
             else:
-                consecutive_correct = 0
-                consecutive_wrong += 1
+                print(f"[Submit Answer] Error saving to database: {e.response.text}")
+        except httpx.HTTPError as e:
+            print(f"[Submit Answer] Error saving to database: {e}")
 
-            supabase.client.table("users").update({
-                "total_problems_solved": current_total + 1,
-                "correct_count": current_correct + (1 if is_correct else 0),
-                "consecutive_correct": consecutive_correct,
-                "consecutive_wrong": consecutive_wrong,
-                "updated_at": "now()"
-            }).eq("id", user.get("id")).execute()
+    if result is None:
+        # Anonymous, or the RPC failed: grade without saving (don't fail the submission)
+        problem = await data.get_problem(body.problem_id)
+        result = _grade(problem, body.user_answer) if problem else {"found": False}
 
-            print(f"[Submit Answer] Saved to database for user {user.get('kakao_id')}")
+    if not result.get("found"):
+        raise HTTPException(status_code=404, detail="Problem not found")
 
-        except Exception as e:
-            print(f"[Submit Answer] Error saving to database: {e}")
-            # Continue anyway - don't fail the submission
+    is_correct = result["is_correct"]
+    print(f"[Submit Answer] problem={body.problem_id}, user_answer={body.user_answer}, "
+          f"correct={is_correct}, recorded={result.get('recorded')}")
 
     response_data = {
         "is_correct": is_correct,
-        "solution": solution,
-        "score": score,
-        "saved": user is not None
+        "solution": result.get("solution") or "풀이가 준비되지 않았습니다.",
+        "score": result["score"],
+        "saved": bool(result.get("recorded")),
     }
     # Only reveal correct_answer when user got it wrong (needed for UX feedback)
     if not is_correct:
-        response_data["correct_answer"] = correct_answer
+        response_data["correct_answer"] = result.get("correct_answer")
     return response_data
 
 
 @router.post("/hint/{level}")
-async def get_hint(request: Request, level: int, body: HintRequest):
+async def get_hint(request: Request, level: int, body: HintRequest, data: AsyncDataAccess = Depends(get_data)):
     """
     Get hint for a problem (for problem viewer).
     Progressive hints: level 1, 2, or 3.
@@ -2568,90 +1723,69 @@ async def get_hint(request: Request, level: int, body: HintRequest):
       - Hint 2: published_at + hint_interval_hours
       - Hint 3 + solution: published_at + hint_interval_hours * 2
     If published_at is NULL, all hints are available immediately.
+
+    Hint texts and unlock times come from one cached hint set, and the
+    hint_requests row is written behind the response, so a warm request
+    makes no upstream call.
     """
     if level not in [1, 2, 3]:
         raise HTTPException(status_code=400, detail="Hint level must be 1, 2, or 3")
 
-    supabase = SupabaseService()
+    try:
+        hint_set = await data.get_hint_set(body.problem_id)
+    except Exception as e:
+        print(f"[Get Hint] Error: {e}")
+        raise HTTPException(status_code=500, detail=f"Failed to get hint: {str(e)}")
+
+    if not hint_set:
+        raise HTTPException(status_code=404, detail=f"Hint {level} not available for this problem")
 
     # ── Time-based unlock check ──
-    try:
-        problem_result = supabase.client.table("problems") \
-            .select("published_at, hint_interval_hours") \
-            .eq("problem_id", body.problem_id) \
-            .single() \
-            .execute()
-
-        if problem_result.data:
-            published_at = problem_result.data.get("published_at")
-            if published_at and level > 1:
-                from datetime import datetime, timedelta, timezone
-                if isinstance(published_at, str):
-                    published = datetime.fromisoformat(published_at.replace("Z", "+00:00"))
-                else:
-                    published = published_at
-                if published.tzinfo is None:
-                    published = published.replace(tzinfo=timezone.utc)
-
-                interval = problem_result.data.get("hint_interval_hours", 24) or 24
-                unlock_at = published + timedelta(hours=interval * (level - 1))
-                now = datetime.now(timezone.utc)
-
-                if now < unlock_at:
-                    remaining = unlock_at - now
-                    hours_left = int(remaining.total_seconds() // 3600)
-                    mins_left = int((remaining.total_seconds() % 3600) // 60)
-                    time_msg = f"{hours_left}시간 {mins_left}분 후" if hours_left > 0 else f"{mins_left}분 후"
-
-                    print(f"[Get Hint] LOCKED: problem={body.problem_id}, level={level}, unlocks in {time_msg}")
-                    return {
-                        "locked": True,
-                        "level": level,
-                        "unlock_at": unlock_at.isoformat(),
-                        "message": f"힌트 {level}단계는 {time_msg} 공개됩니다."
-                    }
-    except Exception:
-        pass  # Column may not exist yet — skip time check, allow all hints
-
-    # ── Get hint from hints table ──
-    try:
-        result = supabase.client.table("hints") \
-            .select("hint_text, hint_type, stage") \
-            .eq("problem_id", body.problem_id) \
-            .eq("stage", level) \
-            .single() \
-            .execute()
-
-        if not result.data:
-            raise HTTPException(status_code=404, detail=f"Hint {level} not available for this problem")
-
-        hint_data = result.data
-        print(f"[Get Hint] problem={body.problem_id}, level={level}, hint={hint_data.get('hint_text')[:50]}...")
-
-        # Track hint request (optional - if user is logged in)
-        session_token = request.cookies.get("session_token")
-        if session_token:
-            user_service = UserService()
-            user = user_service.get_user_by_session(session_token)
-            if user:
-                try:
-                    supabase.client.table("hint_requests").insert({
-                        "user_id": user.get("id"),
-                        "problem_id": body.problem_id,
-                        "hint_level": level,
-                    }).execute()
-                    print(f"[Get Hint] Tracked hint request for user {user.get('kakao_id')}")
-                except Exception as e:
-                    print(f"[Get Hint] Error tracking hint request: {e}")
+    unlock_at = hint_set["unlock_at"].get(level)
+    if unlock_at:
+        from datetime import datetime, timezone
+        now = datetime.now(timezone.utc)
+
+        if now < unlock_at:
+            remaining = unlock_at - now
+            hours_left = int(remaining.total_seconds() // 3600)
+            mins_left = int((remaining.total_seconds() % 3600) // 60)
+            time_msg = f"{hours_left}시간 {mins_left}분 후" if hours_left > 0 else f"{mins_left}분 후"
+
+            print(f"[Get Hint] LOCKED: problem={body.problem_id}, level={level}, unlocks in {time_msg}")
+            return {
+                "locked": True,
+                "level": level,
+                "unlock_at": unlock_at.isoformat(),
+                "message": f"힌트 {level}단계는 {time_msg} 공개됩니다."
+            }
 
-        return {
-            "locked": False,
-            "hint_text": hint_data.get("hint_text"),
-            "hint_type": hint_data.get("hint_type"),
-            "level": level
-        }
+    hint_data = hint_set["hints"].get(level)
+    if not hint_data:
+        raise HTTPException(status_code=404, detail=f"Hint {level} not available for this problem")
+
+    print(f"[Get Hint] problem={body.problem_id}, level={level}, hint={(hint_data.get('hint_text') or '')[:50]}...")
+
+    # Track hint request (optional - if user is logged in), written behind the response
+    session_token = request.cookies.get("session_token")
+    if session_token:
+        await _track_hint_request(data, session_token, body.problem_id, level)
+
+    return {
+        "locked": False,
+        "hint_text": hint_data.get("hint_text"),
+        "hint_type": hint_data.get("hint_type"),
+        "level": level
+    }
 
+
+async def _track_hint_request(data: AsyncDataAccess, session_token: str, problem_id: str, level: int):
+    """Queue a hint_requests row (users.id is resolved by the write-behind queue)"""
+    try:
+        kakao_id = await data.get_session_kakao_id(session_token)
+        if kakao_id:
+            await record_event(data, "hint_requests",
+                               {"kakao_id": kakao_id, "problem_id": problem_id, "hint_level": level})
     except Exception as e:
-        print(f"[Get Hint] Error: {e}")
-        raise HTTPException(status_code=500, detail=f"Failed to get hint: {str(e)}")
+        print(f"[Get Hint] Error tracking hint request: {e}")
 
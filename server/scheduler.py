@@ -25,8 +25,12 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 from dotenv import load_dotenv
 load_dotenv()
 
-from src.supabase_service import SupabaseService
+from src import http_transport
+from src.config import KAKAO_FEED_IMAGE_WIDTH
+from src.image_variants import variant_url
+from src.supabase_service import SupabaseService, get_shared_service
 from server.kakao_message import KakaoMessageService
+from server.write_behind import get_write_behind
 
 # Kakao OAuth config
 KAKAO_CLIENT_ID = os.getenv("KAKAO_REST_API_KEY", "")
@@ -36,8 +40,8 @@ KAKAO_TOKEN_URL = "https://kauth.kakao.com/oauth/token"
 class DailyScheduler:
     """Manages daily problem delivery to users with adaptive selection and token refresh"""
 
-    def __init__(self):
-        self.supabase = SupabaseService()
+    def __init__(self, supabase: Optional[SupabaseService] = None):
+        self.supabase = supabase or get_shared_service()
         self.messenger = KakaoMessageService()
         self.base_url = os.getenv("BASE_URL", "http://localhost:8000")
 
@@ -83,14 +87,13 @@ class DailyScheduler:
             return access_token
 
         try:
-            response = requests.post(
+            response = http_transport.post(
                 KAKAO_TOKEN_URL,
                 data={
                     "grant_type": "refresh_token",
                     "client_id": KAKAO_CLIENT_ID,
                     "refresh_token": refresh_token,
                 },
-                timeout=10
             )
 
             if response.status_code == 200:
@@ -279,7 +282,9 @@ class DailyScheduler:
             return False
 
         problem = problem_result.data[0]
-        image_url = problem.get("problem_image_url") or problem.get("image_url")
+        # Feed card: 800px PNG derivative when available, not the full-size original
+        image_url = (variant_url(problem.get("image_variants"), KAKAO_FEED_IMAGE_WIDTH)
+                     or problem.get("problem_image_url") or problem.get("image_url"))
 
         # Build viewer URL
         viewer_url = f"{self.base_url}/problem/view/{problem_id}"
@@ -306,14 +311,20 @@ class DailyScheduler:
 
                 # Create delivery record
                 hint_available = datetime.now() + timedelta(minutes=hint_delay)
-                self.supabase.client.table("deliveries").insert({
+                delivery = {
                     "user_id": schedule["user_id"],
                     "problem_id": problem_id,
                     "delivery_method": "kakao",
                     "hint_available_at": hint_available.isoformat(),
                     "kakao_send_result": result,
                     "status": "pending",
-                }).execute()
+                }
+                # Inside the app: batched with the other tracking rows; standalone: inline
+                buffer = get_write_behind()
+                if buffer is not None:
+                    buffer.enqueue("deliveries", delivery)
+                else:
+                    self.supabase.client.table("deliveries").insert(delivery).execute()
 
                 print(f"  Sent {problem_id} to {nickname}")
                 return True
@@ -390,7 +401,8 @@ class DailyScheduler:
 
 
 # FastAPI router for scheduler endpoints
-from fastapi import APIRouter, Request, HTTPException
+from fastapi import APIRouter, Request, HTTPException, Depends
+from server.dependencies import get_supabase
 scheduler_router = APIRouter()
 
 
@@ -407,28 +419,27 @@ def _require_auth(request: Request):
 
 
 @scheduler_router.post("/create-daily")
-async def create_daily_schedules(request: Request):
+async def create_daily_schedules(request: Request, supabase: SupabaseService = Depends(get_supabase)):
     """Manually trigger daily schedule creation (requires auth)"""
     _require_auth(request)
-    sched = DailyScheduler()
+    sched = DailyScheduler(supabase)
     created = sched.create_all_daily_schedules()
     return {"created": created, "date": date.today().isoformat()}
 
 
 @scheduler_router.post("/execute")
-async def execute_schedules(request: Request):
+async def execute_schedules(request: Request, supabase: SupabaseService = Depends(get_supabase)):
     """Manually trigger pending schedule execution (requires auth)"""
     _require_auth(request)
-    sched = DailyScheduler()
+    sched = DailyScheduler(supabase)
     stats = sched.execute_pending_schedules()
     return stats
 
 
 @scheduler_router.get("/status")
-async def schedule_status(request: Request):
+async def schedule_status(request: Request, supabase: SupabaseService = Depends(get_supabase)):
     """Get today's schedule status (requires auth)"""
     _require_auth(request)
-    supabase = SupabaseService()
     today = date.today().isoformat()
 
     result = supabase.client.table("daily_schedules").select(
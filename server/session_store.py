@@ -0,0 +1,359 @@
+"""
+Session Store
+Login sessions that survive restarts and are shared by every uvicorn worker.
+
+Backends (SESSION_BACKEND):
+    sqlite    SQLite file at SESSION_DB_PATH, shared by the workers on one host (default)
+    supabase  `sessions` table (sql/create_sessions_table.sql) for multi-host deployments
+    memory    per-process dict (single worker / local experiments)
+
+Sessions expire SESSION_TTL seconds after their last renewal. Renewal is
+sliding but throttled: SessionRenewalMiddleware extends a session (and
+re-issues the cookie) at most once per SESSION_RENEW_INTERVAL, so steady
+traffic does not write on every request. Tokens are stored as SHA-256 hashes.
+
+With the supabase backend, lookups are cached per worker for
+SESSION_CACHE_TTL seconds; a logout on another worker is honoured here
+within that window.
+"""
+
+import time
+import sqlite3
+import hashlib
+import secrets
+import threading
+from abc import ABC, abstractmethod
+from datetime import datetime, timezone
+from http.cookies import SimpleCookie
+from pathlib import Path
+from typing import Optional, Tuple
+
+from starlette.concurrency import run_in_threadpool
+
+from src.config import (
+    SESSION_BACKEND, SESSION_DB_PATH, SESSION_TTL,
+    SESSION_RENEW_INTERVAL, SESSION_CACHE_TTL,
+)
+from src.problem_cache import MISSING, TTLCache
+
+SESSION_COOKIE = "session_token"
+
+# Expired sessions are deleted at most this often (per worker)
+PURGE_INTERVAL = 3600
+
+
+def _hash(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+class SessionStore(ABC):
+    """Session lifecycle shared by all backends (storage hooks below)"""
+
+    def __init__(self, ttl: float = SESSION_TTL, renew_interval: float = SESSION_RENEW_INTERVAL,
+                 cache_ttl: float = 0):
+        """
+        Args:
+            ttl: 세션 유효 시간(초, 마지막 갱신 기준)
+            renew_interval: 최소 갱신 간격(초)
+            cache_ttl: 워커별 조회 캐시 TTL(초, 0이면 캐시 없음)
+        """
+        self.ttl = ttl
+        self.renew_interval = renew_interval
+        self._cache = TTLCache(4096, cache_ttl) if cache_ttl > 0 else None
+        self._next_purge = 0.0
+
+    # ============================================
+    # 세션 API
+    # ============================================
+
+    def create(self, kakao_id: str) -> str:
+        """New session token for a user"""
+        token = secrets.token_urlsafe(32)
+        now = time.time()
+        self._insert(_hash(token), kakao_id, now + self.ttl)
+        if now >= self._next_purge:
+            self._next_purge = now + PURGE_INTERVAL
+            try:
+                self._purge(now)
+            except Exception as e:
+                print(f"  [Session] Purge failed: {e}")
+        return token
+
+    def get(self, token: str) -> Optional[str]:
+        """kakao_id of a live session, or None"""
+        entry = self._lookup(_hash(token))
+        return entry[0] if entry else None
+
+    def renew(self, token: str) -> bool:
+        """Extend a live session if its last renewal is older than renew_interval"""
+        key = _hash(token)
+        entry = self._lookup(key)
+        if not entry:
+            return False
+        kakao_id, expires_at = entry
+        now = time.time()
+        if now - (expires_at - self.ttl) < self.renew_interval:
+            return False
+        expires_at = now + self.ttl
+        self._touch(key, expires_at)
+        if self._cache is not None:
+            self._cache.set(key, (kakao_id, expires_at))
+        return True
+
+    def delete(self, token: str) -> bool:
+        key = _hash(token)
+        if self._cache is not None:
+            self._cache.invalidate(key)
+        return self._delete(key)
+
+    def _lookup(self, key: str) -> Optional[Tuple[str, float]]:
+        entry = self._cache.get(key) if self._cache is not None else MISSING
+        if entry is MISSING:
+            entry = self._load(key)
+            if entry and self._cache is not None:
+                self._cache.set(key, entry)
+        if entry and entry[1] <= time.time():
+            if self._cache is not None:
+                self._cache.invalidate(key)
+            return None
+        return entry
+
+    def stats(self) -> dict:
+        return {
+            "backend": type(self).__name__,
+            "ttl_seconds": self.ttl,
+            "renew_interval_seconds": self.renew_interval,
+            "cache": self._cache.stats() if self._cache is not None else None,
+        }
+
+    # ============================================
+    # 저장소 hooks
+    # ============================================
+
+    @abstractmethod
+    def _insert(self, key: str, kakao_id: str, expires_at: float):
+        ...
+
+    @abstractmethod
+    def _load(self, key: str) -> Optional[Tuple[str, float]]:
+        ...
+
+    @abstractmethod
+    def _touch(self, key: str, expires_at: float):
+        ...
+
+    @abstractmethod
+    def _delete(self, key: str) -> bool:
+        ...
+
+    @abstractmethod
+    def _purge(self, now: float):
+        ...
+
+
+class MemorySessionStore(SessionStore):
+    """Per-process sessions (lost on restart, not shared between workers)"""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self._sessions = {}  # token hash -> (kakao_id, expires_at)
+        self._lock = threading.Lock()
+
+    def _insert(self, key, kakao_id, expires_at):
+        with self._lock:
+            self._sessions[key] = (kakao_id, expires_at)
+
+    def _load(self, key):
+        return self._sessions.get(key)
+
+    def _touch(self, key, expires_at):
+        with self._lock:
+            if key in self._sessions:
+                self._sessions[key] = (self._sessions[key][0], expires_at)
+
+    def _delete(self, key):
+        with self._lock:
+            return self._sessions.pop(key, None) is not None
+
+    def _purge(self, now):
+        with self._lock:
+            for key in [k for k, (_, exp) in self._sessions.items() if exp <= now]:
+                del self._sessions[key]
+
+
+class SQLiteSessionStore(SessionStore):
+    """Sessions in a local SQLite file (WAL), shared by the workers on one host"""
+
+    def __init__(self, path: Path = SESSION_DB_PATH, **kwargs):
+        super().__init__(**kwargs)
+        self.path = Path(path)
+        self._local = threading.local()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._conn() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS sessions ("
+                " token_hash TEXT PRIMARY KEY,"
+                " kakao_id TEXT NOT NULL,"
+                " expires_at REAL NOT NULL,"
+                " created_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_sessions_expires ON sessions(expires_at)")
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _insert(self, key, kakao_id, expires_at):
+        with self._conn() as conn:
+            conn.execute("INSERT OR REPLACE INTO sessions VALUES (?, ?, ?, ?)",
+                         (key, kakao_id, expires_at, time.time()))
+
+    def _load(self, key):
+        row = self._conn().execute(
+            "SELECT kakao_id, expires_at FROM sessions WHERE token_hash = ?", (key,)
+        ).fetchone()
+        return (row[0], row[1]) if row else None
+
+    def _touch(self, key, expires_at):
+        with self._conn() as conn:
+            conn.execute("UPDATE sessions SET expires_at = ? WHERE token_hash = ?", (expires_at, key))
+
+    def _delete(self, key):
+        with self._conn() as conn:
+            return conn.execute("DELETE FROM sessions WHERE token_hash = ?", (key,)).rowcount > 0
+
+    def _purge(self, now):
+        with self._conn() as conn:
+            conn.execute("DELETE FROM sessions WHERE expires_at <= ?", (now,))
+
+
+class SupabaseSessionStore(SessionStore):
+    """Sessions in the Supabase `sessions` table (shared by every host)"""
+
+    def __init__(self, client=None, **kwargs):
+        kwargs.setdefault("cache_ttl", SESSION_CACHE_TTL)
+        super().__init__(**kwargs)
+        self._client = client
+
+    @property
+    def client(self):
+        if self._client is None:
+            from src.supabase_service import get_shared_service
+            self._client = get_shared_service().client
+        return self._client
+
+    def _insert(self, key, kakao_id, expires_at):
+        self.client.table("sessions").insert({
+            "token_hash": key,
+            "kakao_id": kakao_id,
+            "expires_at": _iso(expires_at),
+        }).execute()
+
+    def _load(self, key):
+        rows = self.client.table("sessions").select("kakao_id,expires_at") \
+            .eq("token_hash", key).limit(1).execute().data
+        if not rows:
+            return None
+        expires_at = datetime.fromisoformat(rows[0]["expires_at"].replace("Z", "+00:00"))
+        return rows[0]["kakao_id"], expires_at.timestamp()
+
+    def _touch(self, key, expires_at):
+        self.client.table("sessions").update({"expires_at": _iso(expires_at)}) \
+            .eq("token_hash", key).execute()
+
+    def _delete(self, key):
+        rows = self.client.table("sessions").delete().eq("token_hash", key).execute().data
+        return bool(rows)
+
+    def _purge(self, now):
+        self.client.table("sessions").delete().lt("expires_at", _iso(now)).execute()
+
+
+def _iso(timestamp: float) -> str:
+    return datetime.fromtimestamp(timestamp, timezone.utc).isoformat()
+
+
+# ============================================
+# 공유 인스턴스 (워커 프로세스당 1개)
+# ============================================
+
+_BACKENDS = {
+    "sqlite": SQLiteSessionStore,
+    "supabase": SupabaseSessionStore,
+    "memory": MemorySessionStore,
+}
+
+_store: Optional[SessionStore] = None
+_store_lock = threading.Lock()
+
+
+def get_session_store() -> SessionStore:
+    """Shared store for SESSION_BACKEND"""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                if SESSION_BACKEND not in _BACKENDS:
+                    raise ValueError(f"Unknown SESSION_BACKEND: {SESSION_BACKEND} (use {', '.join(_BACKENDS)})")
+                _store = _BACKENDS[SESSION_BACKEND]()
+    return _store
+
+
+class SessionRenewalMiddleware:
+    """Sliding expiry: renew the session and re-issue its cookie (throttled by the store)"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        token = _session_cookie(scope)
+        renewed = False
+        if token:
+            try:
+                renewed = await run_in_threadpool(get_session_store().renew, token)
+            except Exception as e:
+                print(f"  [Session] Renewal failed: {e}")
+
+        if not renewed:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_cookie(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                # Login/logout responses set the cookie themselves
+                if not any(k == b"set-cookie" and v.startswith(SESSION_COOKIE.encode() + b"=")
+                           for k, v in headers):
+                    cookie = SimpleCookie()
+                    cookie[SESSION_COOKIE] = token
+                    cookie[SESSION_COOKIE].update({
+                        "max-age": int(get_session_store().ttl), "path": "/",
+                        "httponly": True, "samesite": "lax",
+                    })
+                    headers.append((b"set-cookie", cookie.output(header="").strip().encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        await self.app(scope, receive, send_with_cookie)
+
+
+def _session_cookie(scope) -> Optional[str]:
+    for key, value in scope.get("headers", []):
+        if key == b"cookie":
+            cookie = SimpleCookie()
+            try:
+                cookie.load(value.decode("latin-1"))
+            except Exception:
+                return None
+            morsel = cookie.get(SESSION_COOKIE)
+            return morsel.value if morsel else None
+    return None
@@ -0,0 +1,231 @@
+"""
+Static Asset Pipeline
+Fingerprinted, pre-compressed files from server/static and HTML shells from
+server/shells, served from memory.
+
+Built once per worker (app lifespan, or lazily on first use):
+
+    scripts/styles  /assets/<name>.<hash>.<ext>
+                    Cache-Control: public, max-age=31536000, immutable
+                    (a new deploy changes the hash, so the URL never goes stale)
+    HTML shells     server/shells/admin.html, simple-crop.html
+                    references to /static/<file> rewritten to the fingerprinted
+                    URL; served with ETag + Cache-Control: no-cache, so browsers
+                    revalidate and get a 304 until the shell changes. Kept
+                    outside the /static mount: only their routes serve them,
+                    after the route's own checks (the admin session)
+
+Every file is compressed up front (gzip, plus brotli when the optional
+`brotli` package is installed) and the encoding is picked per request from
+Accept-Encoding (br > gzip > identity), with Vary: Accept-Encoding. Each
+encoding has its own strong ETag ("<hash>", "<hash>-gzip", "<hash>-br"); a
+cached copy in any encoding revalidates to 304.
+
+The plain /static mount stays for old links; it is uncompressed and uncached.
+
+    get_assets().shell_response(request, "admin.html")
+"""
+
+import re
+import gzip
+import mimetypes
+from pathlib import Path
+from typing import Dict, Optional
+
+from fastapi import Request
+from fastapi.responses import Response
+
+from server.http_cache import strong_etag, encoded_etag, etag_matches
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+STATIC_DIR = Path(__file__).parent / "static"
+SHELLS_DIR = Path(__file__).parent / "shells"
+ASSET_PREFIX = "/assets"
+
+FINGERPRINTED_SUFFIXES = {".jsx", ".js", ".css", ".svg"}
+SHELL_SUFFIXES = {".html"}
+
+IMMUTABLE = "public, max-age=31536000, immutable"
+REVALIDATE = "no-cache"
+
+# Not worth a compressed copy below this size
+MIN_COMPRESS_BYTES = 512
+
+# src="/static/x.jsx?v=20" / href="/static/x.css"
+_STATIC_REF = re.compile(r'(src|href)="/static/([^"?#]+)(?:\?[^"#]*)?"')
+
+mimetypes.add_type("text/babel", ".jsx")
+
+
+class Asset:
+    """One file: identity bytes plus pre-compressed variants"""
+
+    def __init__(self, name: str, body: bytes, content_type: str):
+        self.name = name
+        self.content_type = content_type
+        self.etag = strong_etag(body)
+        self.variants: Dict[str, bytes] = {"identity": body}
+
+        if len(body) >= MIN_COMPRESS_BYTES:
+            compressed = gzip.compress(body, compresslevel=9, mtime=0)
+            if len(compressed) < len(body):
+                self.variants["gzip"] = compressed
+            if brotli is not None:
+                compressed = brotli.compress(body, quality=11)
+                if len(compressed) < len(body):
+                    self.variants["br"] = compressed
+
+    @property
+    def fingerprint(self) -> str:
+        return self.etag.strip('"')[:12]
+
+    def negotiate(self, accept_encoding: Optional[str]) -> str:
+        """Best available encoding the client accepts (br > gzip > identity)"""
+        accepted = _parse_accept_encoding(accept_encoding)
+        for encoding in ("br", "gzip"):
+            if encoding in self.variants and accepted.get(encoding, accepted.get("*", 0)) > 0:
+                return encoding
+        return "identity"
+
+    def response(self, request: Request, cache_control: str) -> Response:
+        encoding = self.negotiate(request.headers.get("accept-encoding"))
+        headers = {
+            "ETag": encoded_etag(self.etag, encoding),
+            "Cache-Control": cache_control,
+            "Vary": "Accept-Encoding",
+        }
+        # Every encoding decodes to the same content: any of them is still valid
+        etags = [encoded_etag(self.etag, e) for e in self.variants]
+        if etag_matches(request.headers.get("if-none-match"), *etags):
+            return Response(status_code=304, headers=headers)
+
+        if encoding != "identity":
+            headers["Content-Encoding"] = encoding
+        return Response(content=self.variants[encoding], media_type=self.content_type, headers=headers)
+
+
+def _parse_accept_encoding(header: Optional[str]) -> Dict[str, float]:
+    """{"gzip": 1.0, "br": 0.5, ...} from an Accept-Encoding header"""
+    accepted = {}
+    for part in (header or "").split(","):
+        token, _, params = part.strip().partition(";")
+        token = token.strip().lower()
+        if not token:
+            continue
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[token] = quality
+    return accepted
+
+
+def _content_type(name: str) -> str:
+    content_type = mimetypes.guess_type(name)[0] or "application/octet-stream"
+    if content_type.startswith("text/") or content_type in ("application/javascript", "image/svg+xml"):
+        content_type += "; charset=utf-8"
+    return content_type
+
+
+class AssetPipeline:
+    """Fingerprinted assets of a static directory and the HTML shells that use them"""
+
+    def __init__(self, directory: Path = STATIC_DIR, shells_directory: Path = SHELLS_DIR,
+                 prefix: str = ASSET_PREFIX):
+        """
+        Args:
+            directory: 정적 파일 디렉토리
+            shells_directory: HTML 셸 디렉토리 (/static 마운트 밖)
+            prefix: 지문 URL 경로 접두사
+        """
+        self.directory = Path(directory)
+        self.shells_directory = Path(shells_directory)
+        self.prefix = prefix
+        self.assets: Dict[str, Asset] = {}   # fingerprinted name -> asset
+        self.urls: Dict[str, str] = {}       # original name -> fingerprinted URL
+        self.shells: Dict[str, Asset] = {}   # original name -> rewritten shell
+
+    def build(self) -> "AssetPipeline":
+        for path in sorted(self.directory.iterdir()):
+            if not path.is_file() or path.suffix not in FINGERPRINTED_SUFFIXES:
+                continue
+            asset = Asset(path.name, path.read_bytes(), _content_type(path.name))
+            hashed = f"{path.stem}.{asset.fingerprint}{path.suffix}"
+            self.assets[hashed] = asset
+            self.urls[path.name] = f"{self.prefix}/{hashed}"
+
+        # Shells last: they embed the fingerprinted URLs
+        for path in sorted(self.shells_directory.iterdir()):
+            if not path.is_file() or path.suffix not in SHELL_SUFFIXES:
+                continue
+            html = self.rewrite(path.read_text(encoding="utf-8"))
+            self.shells[path.name] = Asset(path.name, html.encode("utf-8"), _content_type(path.name))
+
+        return self
+
+    def rewrite(self, html: str) -> str:
+        """Point /static/<file> references at the fingerprinted URL"""
+
+        def replace(match):
+            url = self.urls.get(match.group(2))
+            return f'{match.group(1)}="{url}"' if url else match.group(0)
+
+        return _STATIC_REF.sub(replace, html)
+
+    def url(self, name: str) -> str:
+        """Fingerprinted URL for a static file (plain /static path if unknown)"""
+        return self.urls.get(name, f"/static/{name}")
+
+    def asset_response(self, request: Request, hashed_name: str) -> Optional[Response]:
+        asset = self.assets.get(hashed_name)
+        return asset.response(request, IMMUTABLE) if asset else None
+
+    def shell_response(self, request: Request, name: str) -> Response:
+        return self.shells[name].response(request, REVALIDATE)
+
+    def stats(self) -> dict:
+        everything = list(self.assets.values()) + list(self.shells.values())
+        return {
+            "assets": len(self.assets),
+            "shells": len(self.shells),
+            "brotli": brotli is not None,
+            # Bytes on the wire if every client picked this encoding
+            "bytes": {
+                encoding: sum(len(a.variants.get(encoding, a.variants["identity"])) for a in everything)
+                for encoding in ("identity", "gzip", "br") if encoding != "br" or brotli is not None
+            },
+        }
+
+
+# ============================================
+# 공유 인스턴스 (워커 프로세스당 1개)
+# ============================================
+
+_pipeline: Optional[AssetPipeline] = None
+
+
+def load_assets() -> AssetPipeline:
+    """Read, fingerprint and compress server/static and server/shells (app lifespan)"""
+    global _pipeline
+    _pipeline = AssetPipeline().build()
+    stats = _pipeline.stats()
+    print(f"[Assets] {stats['assets']} assets, {stats['shells']} shells "
+          f"({stats['bytes']['identity'] // 1024} KB, gzip {stats['bytes']['gzip'] // 1024} KB"
+          f"{', br %d KB' % (stats['bytes']['br'] // 1024) if brotli else ''})")
+    return _pipeline
+
+
+def get_assets() -> AssetPipeline:
+    """Shared pipeline, built on first use outside the lifespan (scripts, tests)"""
+    return _pipeline or load_assets()
+
+
+def get_asset_stats() -> Optional[dict]:
+    return _pipeline.stats() if _pipeline else None
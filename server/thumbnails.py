@@ -0,0 +1,283 @@
+"""
+Problem Thumbnail Sprites
+Per-exam sprite sheets for the admin problem grid.
+
+The grid used to put each problem's full-size storage image (hundreds of KB)
+into a 40px cell. Now every exam (year + exam) gets one WebP sheet of
+THUMBNAIL_SIZE px square tiles, cropped from the top of the problem:
+
+    GET /problem/thumbs/{year}/{exam}         manifest, ETag = sheet version + sheet URL
+        {"version", "url", "tile", "columns", "rows", "items": {problem_id: [col, row]}}
+    GET /problem/thumbs/sprite/{name}         the sheet (immutable, name = content hash)
+
+The version hashes every problem's image identity (image_variants.version,
+else URL + updated_at), so a crop or re-upload produces a new sheet URL and
+the grid needs no cache buster. Tiles are cached on disk per image identity:
+rebuilding a sheet after one crop downloads one image, from the 480px
+derivative when it exists. Sheets and tiles live under THUMBNAIL_CACHE_PATH,
+shared by the workers on a host.
+"""
+
+import io
+import os
+import re
+import json
+import math
+import time
+import asyncio
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from PIL import Image, ImageOps
+from starlette.concurrency import run_in_threadpool
+
+from src import http_transport
+from src.config import THUMBNAIL_SIZE, THUMBNAIL_QUALITY, THUMBNAIL_CACHE_PATH
+from src.image_variants import variant_url
+
+SPRITE_URL_PREFIX = "/problem/thumbs/sprite"
+SPRITE_NAME = re.compile(r"^[0-9a-f]{8}_[0-9a-f]{12}\.webp$")
+
+FETCH_WORKERS = 8
+# A sheet with missing tiles (download failed) is rebuilt after this long
+INCOMPLETE_RETRY = 60  # seconds
+# Replaced sheets stay this long for pages still holding the old manifest
+OLD_SHEET_GRACE = 3600  # seconds
+
+
+def image_identity(problem: dict) -> Optional[str]:
+    """Changes whenever the problem image does (None without an image)"""
+    version = (problem.get("image_variants") or {}).get("version")
+    if version:
+        return version
+    url = problem.get("problem_image_url")
+    return f"{url}|{problem.get('updated_at')}" if url else None
+
+
+def manifest_etag(manifest: dict) -> str:
+    """
+    ETag for a manifest response
+
+    The version only covers the problems' image identities; a rebuild of an
+    incomplete sheet keeps it but changes the (content-named) sheet URL and
+    the placed items, so those are part of the tag too.
+    """
+    parts = [manifest["version"], manifest.get("url") or "", str(len(manifest["items"]))]
+    if manifest.get("incomplete"):
+        parts.append("incomplete")
+    return f'"{_digest("|".join(parts), 24)}"'
+
+
+def _digest(value: str, length: int) -> str:
+    return hashlib.sha256(value.encode("utf-8")).hexdigest()[:length]
+
+
+def _write_atomic(path: Path, data: bytes):
+    tmp_path = path.with_name(f".{path.name}.{threading.get_ident()}.tmp")
+    tmp_path.write_bytes(data)
+    os.replace(tmp_path, path)
+
+
+class ThumbnailSprites:
+    """Builds and caches per-exam sprite sheets"""
+
+    def __init__(self, root: Path = THUMBNAIL_CACHE_PATH, tile: int = THUMBNAIL_SIZE,
+                 quality: int = THUMBNAIL_QUALITY):
+        """
+        Args:
+            root: 타일/시트 디스크 캐시 디렉토리
+            tile: 타일 한 변 크기(px)
+            quality: WebP 품질
+        """
+        self.root = Path(root)
+        self.tiles_dir = self.root / "tiles"
+        self.sheets_dir = self.root / "sheets"
+        self.tile = tile
+        self.quality = quality
+
+        self._manifests: Dict[str, dict] = {}  # exam key -> latest manifest
+        self._locks: Dict[str, asyncio.Lock] = {}
+
+        self.hits = 0
+        self.builds = 0
+        self.tiles_fetched = 0
+        self.tiles_cached = 0
+        self.fetch_errors = 0
+        self.last_build_ms: Optional[float] = None
+
+    async def manifest(self, year: int, exam: str, problems: List[dict]) -> dict:
+        """
+        Sheet manifest for one exam (built on first request or when an image changed)
+
+        Args:
+            year: 연도
+            exam: 시험 코드
+            problems: 해당 시험의 문제 행 (problem_id, problem_image_url, image_variants, updated_at)
+        """
+        problems = sorted(
+            (p for p in problems if image_identity(p)),
+            key=lambda p: (p.get("question_no") or 0, p["problem_id"]),
+        )
+        key = _digest(f"{year}/{exam}", 8)
+        version = _digest(json.dumps(
+            [self.tile, self.quality] + [[p["problem_id"], image_identity(p)] for p in problems]
+        ), 12)
+
+        cached = self._fresh(key, version)
+        if cached:
+            self.hits += 1
+            return cached
+
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            cached = self._fresh(key, version)
+            if cached:
+                self.hits += 1
+                return cached
+            manifest = await run_in_threadpool(self._load_or_build, key, version, problems)
+            self._manifests[key] = manifest
+            return manifest
+
+    def _fresh(self, key: str, version: str) -> Optional[dict]:
+        manifest = self._manifests.get(key)
+        if not manifest or manifest["version"] != version:
+            return None
+        if manifest.get("incomplete") and time.time() >= manifest["built_at"] + INCOMPLETE_RETRY:
+            return None
+        return manifest
+
+    # ============================================
+    # 빌드 (스레드 풀)
+    # ============================================
+
+    def _load_or_build(self, key: str, version: str, problems: List[dict]) -> dict:
+        # Another worker on this host may have built it already
+        manifest_path = self.sheets_dir / f"{key}_{version}.json"
+        try:
+            with open(manifest_path, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            pass
+        return self._build(key, version, problems, manifest_path)
+
+    def _build(self, key: str, version: str, problems: List[dict], manifest_path: Path) -> dict:
+        start = time.perf_counter()
+        self.tiles_dir.mkdir(parents=True, exist_ok=True)
+        self.sheets_dir.mkdir(parents=True, exist_ok=True)
+
+        with ThreadPoolExecutor(max_workers=FETCH_WORKERS) as executor:
+            tiles = list(executor.map(self._tile, problems)) if problems else []
+        placed = [(p, t) for p, t in zip(problems, tiles) if t is not None]
+
+        manifest = {
+            "version": version, "url": None, "tile": self.tile,
+            "columns": 0, "rows": 0, "items": {},
+            "incomplete": len(placed) < len(problems), "built_at": time.time(),
+        }
+        if placed:
+            columns = math.ceil(math.sqrt(len(placed)))
+            rows = math.ceil(len(placed) / columns)
+            sheet = Image.new("RGB", (columns * self.tile, rows * self.tile), "white")
+            for i, (problem, tile) in enumerate(placed):
+                col, row = i % columns, i // columns
+                sheet.paste(tile, (col * self.tile, row * self.tile))
+                manifest["items"][problem["problem_id"]] = [col, row]
+
+            out = io.BytesIO()
+            sheet.save(out, "WEBP", quality=self.quality, method=4)
+            body = out.getvalue()
+            # Named by content: a URL never changes meaning, even across incomplete rebuilds
+            name = f"{key}_{hashlib.sha256(body).hexdigest()[:12]}.webp"
+            _write_atomic(self.sheets_dir / name, body)
+            manifest.update(url=f"{SPRITE_URL_PREFIX}/{name}", columns=columns, rows=rows, bytes=len(body))
+
+        if not manifest["incomplete"]:
+            _write_atomic(manifest_path, json.dumps(manifest).encode("utf-8"))
+        self._prune(key)
+
+        self.builds += 1
+        self.last_build_ms = (time.perf_counter() - start) * 1000
+        print(f"  [Thumbs] {key}: {len(placed)}/{len(problems)} tiles, "
+              f"{manifest.get('bytes', 0) // 1024} KB sheet, {self.last_build_ms:.0f} ms")
+        return manifest
+
+    def _tile(self, problem: dict) -> Optional[Image.Image]:
+        """Square tile from the top of the problem image (disk cache -> download)"""
+        tile_key = f"{problem['problem_id']}|{image_identity(problem)}|{self.tile}"
+        tile_path = self.tiles_dir / f"{_digest(tile_key, 16)}.webp"
+        try:
+            with Image.open(tile_path) as cached:
+                cached.load()
+                self.tiles_cached += 1
+                return cached.convert("RGB")
+        except OSError:
+            pass
+
+        source = variant_url(problem.get("image_variants"), self.tile) or problem["problem_image_url"]
+        try:
+            response = http_transport.get(source)
+            response.raise_for_status()
+            with Image.open(io.BytesIO(response.content)) as img:
+                img = img.convert("RGBA")
+                flat = Image.new("RGB", img.size, "white")
+                flat.paste(img, mask=img.getchannel("A"))
+            tile = ImageOps.fit(flat, (self.tile, self.tile), Image.Resampling.LANCZOS, centering=(0.5, 0.0))
+        except Exception as e:
+            self.fetch_errors += 1
+            print(f"  [Thumbs] {problem['problem_id']}: {e}")
+            return None
+
+        out = io.BytesIO()
+        tile.save(out, "WEBP", quality=90)
+        _write_atomic(tile_path, out.getvalue())
+        self.tiles_fetched += 1
+        return tile
+
+    def _prune(self, key: str):
+        """Drop this exam's replaced sheets once no page is likely to still use them"""
+        cutoff = time.time() - OLD_SHEET_GRACE
+        for path in self.sheets_dir.glob(f"{key}_*"):
+            try:
+                if path.stat().st_mtime < cutoff:
+                    path.unlink()
+            except OSError:
+                pass
+
+    def sheet_path(self, name: str) -> Optional[Path]:
+        """Sheet file for a sprite URL name (None if invalid or gone)"""
+        if not SPRITE_NAME.match(name):
+            return None
+        path = self.sheets_dir / name
+        return path if path.is_file() else None
+
+    def stats(self) -> dict:
+        return {
+            "exams": len(self._manifests),
+            "hits": self.hits,
+            "builds": self.builds,
+            "tiles_fetched": self.tiles_fetched,
+            "tiles_cached": self.tiles_cached,
+            "fetch_errors": self.fetch_errors,
+            "last_build_ms": round(self.last_build_ms, 1) if self.last_build_ms is not None else None,
+        }
+
+
+# ============================================
+# 공유 인스턴스 (워커 프로세스당 1개)
+# ============================================
+
+_sprites: Optional[ThumbnailSprites] = None
+
+
+def get_thumbnails() -> ThumbnailSprites:
+    global _sprites
+    if _sprites is None:
+        _sprites = ThumbnailSprites()
+    return _sprites
+
+
+def get_thumbnail_stats() -> Optional[dict]:
+    return _sprites.stats() if _sprites else None
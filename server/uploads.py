@@ -0,0 +1,109 @@
+"""
+Streaming Upload Helpers
+Spool multipart uploads to disk in fixed-size chunks (hashing as we go)
+so concurrent PDF/card uploads stay at constant memory.
+"""
+
+import os
+import hashlib
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import BinaryIO, Dict
+
+from fastapi import HTTPException, UploadFile
+from fastapi.responses import JSONResponse
+
+UPLOAD_CHUNK_SIZE = 1024 * 1024  # 1MB
+
+# Per-request size caps (override via .env)
+MAX_PDF_UPLOAD_BYTES = int(os.getenv("MAX_PDF_UPLOAD_MB", "50")) * 1024 * 1024
+MAX_IMAGE_UPLOAD_BYTES = int(os.getenv("MAX_IMAGE_UPLOAD_MB", "10")) * 1024 * 1024
+
+# Request paths checked against Content-Length before the body is read
+UPLOAD_LIMITS: Dict[str, int] = {
+    "/problem/upload-pdf": MAX_PDF_UPLOAD_BYTES,
+    "/problem/add": MAX_IMAGE_UPLOAD_BYTES,
+    "/api/card/upload": MAX_IMAGE_UPLOAD_BYTES,
+}
+
+
+@dataclass
+class SpooledUpload:
+    """Upload written to a temp file"""
+    path: Path
+    size: int
+    sha256: str
+
+    def open(self) -> BinaryIO:
+        return open(self.path, "rb")
+
+    def cleanup(self):
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+
+async def spool_upload(upload: UploadFile, max_bytes: int, suffix: str = "") -> SpooledUpload:
+    """
+    Copy an UploadFile to a temp file chunk by chunk
+
+    Args:
+        upload: FastAPI UploadFile
+        max_bytes: Size cap; exceeding it raises 413
+        suffix: Temp file suffix (e.g. ".pdf")
+
+    Returns:
+        SpooledUpload (caller must call cleanup())
+    """
+    fd, tmp_path = tempfile.mkstemp(suffix=suffix)
+    digest = hashlib.sha256()
+    size = 0
+
+    try:
+        with os.fdopen(fd, "wb") as out:
+            while True:
+                chunk = await upload.read(UPLOAD_CHUNK_SIZE)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > max_bytes:
+                    raise HTTPException(
+                        status_code=413,
+                        detail=f"File too large (max {max_bytes // (1024 * 1024)}MB)"
+                    )
+                digest.update(chunk)
+                out.write(chunk)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+
+    return SpooledUpload(path=Path(tmp_path), size=size, sha256=digest.hexdigest())
+
+
+class UploadSizeLimitMiddleware:
+    """Reject oversized uploads by Content-Length before the multipart body is parsed"""
+
+    def __init__(self, app, limits: Dict[str, int] = None):
+        self.app = app
+        self.limits = limits or UPLOAD_LIMITS
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and scope["method"] == "POST":
+            limit = self.limits.get(scope["path"])
+            if limit:
+                headers = dict(scope["headers"])
+                try:
+                    length = int(headers.get(b"content-length", b"0"))
+                except ValueError:
+                    length = 0
+                if length > limit:
+                    response = JSONResponse(
+                        status_code=413,
+                        content={"detail": f"File too large (max {limit // (1024 * 1024)}MB)"}
+                    )
+                    await response(scope, receive, send)
+                    return
+
+        await self.app(scope, receive, send)
@@ -1,29 +1,84 @@
 """
 User Management Service
 Handles user CRUD and session management with Supabase
+
+Sessions live in the shared session store (server/session_store.py); user
+rows are cached per worker for USER_CACHE_TTL seconds and dropped whenever
+this worker writes them.
 """
 
 import os
-import secrets
 from datetime import datetime, timedelta
-from typing import Optional, Dict, Any
+from typing import Optional, Any
 
 import requests
 from dotenv import load_dotenv
 
 load_dotenv()
 
+from src import http_transport
+from src.config import USER_CACHE_SIZE, USER_CACHE_TTL
+from src.problem_cache import MISSING, TTLCache
+from server.session_store import get_session_store
+
 SUPABASE_URL = os.getenv("SUPABASE_URL")
 SUPABASE_KEY = os.getenv("SUPABASE_KEY")
 SUPABASE_SERVICE_KEY = os.getenv("SUPABASE_SERVICE_KEY", SUPABASE_KEY)
 
 
+# ============================================
+# 사용자 행 캐시 (워커 프로세스당 1개)
+# ============================================
+
+user_cache = TTLCache(USER_CACHE_SIZE, USER_CACHE_TTL)
+
+
+def get_cached_user(kakao_id: str) -> Any:
+    """Cached user row (copy) or MISSING"""
+    user = user_cache.get(kakao_id)
+    return dict(user) if user is not MISSING else MISSING
+
+
+def cache_user(user: Optional[dict]):
+    if user and user.get("kakao_id"):
+        user_cache.set(user["kakao_id"], dict(user))
+
+
+def invalidate_user(kakao_id: Optional[str]):
+    if kakao_id:
+        user_cache.invalidate(kakao_id)
+
+
+# Login upsert: insert, or update only the supplied columns of the existing row
+USER_UPSERT_PREFER = "resolution=merge-duplicates,return=representation"
+
+
+def build_user_upsert(
+    kakao_id: str,
+    nickname: str,
+    email: Optional[str] = None,
+    profile_image: Optional[str] = None,
+    access_token: Optional[str] = None,
+    refresh_token: Optional[str] = None,
+    token_expires_at: Optional[datetime] = None
+) -> dict:
+    """Row for the login upsert (None values omitted so existing columns are kept)"""
+    user_data = {
+        "kakao_id": kakao_id,
+        "nickname": nickname,
+        "email": email,
+        "profile_image": profile_image,
+        "access_token": access_token,
+        "refresh_token": refresh_token,
+        "token_expires_at": token_expires_at.isoformat() if token_expires_at else None,
+        "updated_at": datetime.now().isoformat()
+    }
+    return {k: v for k, v in user_data.items() if v is not None}
+
+
 class UserService:
     """User management with Supabase"""
 
-    # Class-level session storage (shared across all instances)
-    _sessions: Dict[str, str] = {}  # session_token -> kakao_id
-
     def __init__(self):
         self.base_url = SUPABASE_URL
         self.headers = {
@@ -39,13 +94,13 @@ class UserService:
 
         try:
             if method == "GET":
-                response = requests.get(url, headers=self.headers, params=data, timeout=10)
+                response = http_transport.get(url, headers=self.headers, params=data)
             elif method == "POST":
-                response = requests.post(url, headers=self.headers, json=data, timeout=10)
+                response = http_transport.post(url, headers=self.headers, json=data)
             elif method == "PATCH":
-                response = requests.patch(url, headers=self.headers, json=data, timeout=10)
+                response = http_transport.patch(url, headers=self.headers, json=data)
             elif method == "DELETE":
-                response = requests.delete(url, headers=self.headers, timeout=10)
+                response = http_transport.delete(url, headers=self.headers)
             else:
                 return None
 
@@ -63,14 +118,20 @@ class UserService:
             return None
 
     def get_user_by_kakao_id(self, kakao_id: str) -> Optional[dict]:
-        """Get user by Kakao ID"""
+        """Get user by Kakao ID (per-worker cache, USER_CACHE_TTL)"""
+        cached = get_cached_user(kakao_id)
+        if cached is not MISSING:
+            return cached
+
         url = f"{self.base_url}/rest/v1/users?kakao_id=eq.{kakao_id}"
 
         try:
-            response = requests.get(url, headers=self.headers, timeout=10)
+            response = http_transport.get(url, headers=self.headers)
             if response.status_code == 200:
                 users = response.json()
-                return users[0] if users else None
+                user = users[0] if users else None
+                cache_user(user)
+                return user
         except requests.RequestException:
             pass
         return None
@@ -85,65 +146,38 @@ class UserService:
         refresh_token: Optional[str] = None,
         token_expires_at: Optional[datetime] = None
     ) -> Optional[dict]:
-        """Create or update user"""
-        # Check if user exists
-        existing_user = self.get_user_by_kakao_id(kakao_id)
-
-        user_data = {
-            "kakao_id": kakao_id,
-            "nickname": nickname,
-            "email": email,
-            "profile_image": profile_image,
-            "access_token": access_token,
-            "refresh_token": refresh_token,
-            "token_expires_at": token_expires_at.isoformat() if token_expires_at else None,
-            "updated_at": datetime.now().isoformat()
-        }
-
-        # Remove None values
-        user_data = {k: v for k, v in user_data.items() if v is not None}
-
-        if existing_user:
-            # Update existing user
-            url = f"{self.base_url}/rest/v1/users?kakao_id=eq.{kakao_id}"
-            try:
-                response = requests.patch(
-                    url,
-                    headers=self.headers,
-                    json=user_data,
-                    timeout=10
-                )
-                if response.status_code in [200, 204]:
-                    return self.get_user_by_kakao_id(kakao_id)
-            except requests.RequestException as e:
-                print(f"Update error: {e}")
-                return None
-        else:
-            # Create new user
-            user_data["created_at"] = datetime.now().isoformat()
-            user_data["current_level"] = 3  # Default difficulty level
-            user_data["current_score_level"] = 3  # Default score level (3-point problems)
-            user_data["subscription_type"] = "free"
-
-            url = f"{self.base_url}/rest/v1/users"
-            print(f"[Debug] Creating user at: {url}")
-            print(f"[Debug] User data: {user_data}")
-            try:
-                response = requests.post(
-                    url,
-                    headers=self.headers,
-                    json=user_data,
-                    timeout=10
-                )
-                print(f"[Debug] Response status: {response.status_code}")
-                print(f"[Debug] Response body: {response.text[:500]}")
-                if response.status_code in [200, 201]:
-                    result = response.json()
-                    return result[0] if isinstance(result, list) else result
-            except requests.RequestException as e:
-                print(f"Create error: {e}")
-                return None
+        """
+        Create or update user in one request
+
+        POST users?on_conflict=kakao_id with merge-duplicates: existing users
+        get only the supplied columns updated; new users take the column
+        defaults (current_level, current_score_level, subscription_type) -
+        see sql/users_login_upsert.sql.
+        """
+        invalidate_user(kakao_id)
+        user_data = build_user_upsert(
+            kakao_id, nickname, email, profile_image,
+            access_token, refresh_token, token_expires_at,
+        )
 
+        url = f"{self.base_url}/rest/v1/users"
+        try:
+            # Merge upsert: replaying it leaves the same row, so it may be retried
+            response = http_transport.post(
+                url,
+                headers={**self.headers, "Prefer": USER_UPSERT_PREFER},
+                params={"on_conflict": "kakao_id"},
+                json=user_data,
+                idempotent=True,
+            )
+            if response.status_code in [200, 201]:
+                result = response.json()
+                user = result[0] if isinstance(result, list) and result else None
+                cache_user(user)
+                return user
+            print(f"Supabase error: {response.status_code} - {response.text}")
+        except requests.RequestException as e:
+            print(f"Upsert error: {e}")
         return None
 
     def update_tokens(
@@ -154,6 +188,7 @@ class UserService:
         token_expires_at: datetime
     ) -> bool:
         """Update user's OAuth tokens"""
+        invalidate_user(kakao_id)
         url = f"{self.base_url}/rest/v1/users?kakao_id=eq.{kakao_id}"
 
         data = {
@@ -164,34 +199,25 @@ class UserService:
         }
 
         try:
-            response = requests.patch(url, headers=self.headers, json=data, timeout=10)
+            response = http_transport.patch(url, headers=self.headers, json=data, idempotent=True)
             return response.status_code in [200, 204]
         except requests.RequestException:
             return False
 
     def create_session(self, kakao_id: str) -> str:
-        """Create a new session for user"""
-        session_token = secrets.token_urlsafe(32)
-        self._sessions[session_token] = kakao_id
-
-        # Also store in database for persistence (optional)
-        # self._store_session_in_db(session_token, kakao_id)
-
-        return session_token
+        """Create a new session for user (persisted in the session store)"""
+        return get_session_store().create(kakao_id)
 
     def get_user_by_session(self, session_token: str) -> Optional[dict]:
         """Get user by session token"""
-        kakao_id = self._sessions.get(session_token)
+        kakao_id = get_session_store().get(session_token)
         if not kakao_id:
             return None
         return self.get_user_by_kakao_id(kakao_id)
 
     def delete_session(self, session_token: str) -> bool:
         """Delete session"""
-        if session_token in self._sessions:
-            del self._sessions[session_token]
-            return True
-        return False
+        return get_session_store().delete(session_token)
 
     def update_user_level(
         self,
@@ -200,6 +226,7 @@ class UserService:
         current_score_level: int
     ) -> bool:
         """Update user's difficulty level"""
+        invalidate_user(kakao_id)
         url = f"{self.base_url}/rest/v1/users?kakao_id=eq.{kakao_id}"
 
         data = {
@@ -209,7 +236,7 @@ class UserService:
         }
 
         try:
-            response = requests.patch(url, headers=self.headers, json=data, timeout=10)
+            response = http_transport.patch(url, headers=self.headers, json=data, idempotent=True)
             return response.status_code in [200, 204]
         except requests.RequestException:
             return False
@@ -221,6 +248,7 @@ class UserService:
         subscription_expires_at: Optional[datetime] = None
     ) -> bool:
         """Update user's subscription"""
+        invalidate_user(kakao_id)
         url = f"{self.base_url}/rest/v1/users?kakao_id=eq.{kakao_id}"
 
         data = {
@@ -232,7 +260,7 @@ class UserService:
             data["subscription_expires_at"] = subscription_expires_at.isoformat()
 
         try:
-            response = requests.patch(url, headers=self.headers, json=data, timeout=10)
+            response = http_transport.patch(url, headers=self.headers, json=data, idempotent=True)
             return response.status_code in [200, 204]
         except requests.RequestException:
             return False
@@ -246,7 +274,7 @@ class UserService:
         }
 
         try:
-            response = requests.get(url, headers=self.headers, params=params, timeout=10)
+            response = http_transport.get(url, headers=self.headers, params=params)
             if response.status_code == 200:
                 return response.json()
         except requests.RequestException:
@@ -0,0 +1,399 @@
+"""
+Write-Behind Event Buffer
+Deferred, batched inserts for tracking rows that a response does not depend on:
+user_problems (/problem/send, legacy /submit), hint_requests (/problem/hint)
+and deliveries (DailyScheduler).
+
+Producers enqueue a row and return; enqueue() is thread-safe, so the sync
+scheduler can use it as well as async route handlers. One background task
+per worker flushes the buffer when WRITE_BEHIND_BATCH_SIZE rows are waiting
+or every WRITE_BEHIND_FLUSH_INTERVAL seconds, with one multi-row POST per
+table (rows grouped by column set, as PostgREST requires).
+
+Tables with a unique key (user_problems: UNIQUE(user_id, problem_id)) are
+upserted on that key, so a repeated /send or a legacy /submit after a /send
+merges into the existing row instead of failing the whole batch.
+
+Upstream down (connection error, 429, 5xx): the rows are appended to a local
+journal (WRITE_BEHIND_JOURNAL_PATH, JSON lines) and replayed on a later
+flush. Any other 4xx rejects the whole multi-row statement, so the batch is
+retried row by row and only the offending rows are counted and logged -
+retrying those would never succeed. On shutdown the lifespan drains the
+buffer; anything that still cannot be written lands in the journal. Workers
+on one host may share the journal file: appends are line-sized and the
+replaying worker moves the file aside first.
+
+Tables can register a preparer that runs in the background before the
+insert - hint_requests rows carry the session's kakao_id and get their
+users.id there, so the hint route itself never looks the user up.
+
+    get_write_behind().enqueue("hint_requests", {...})
+"""
+
+import json
+import time
+import asyncio
+import threading
+from collections import deque
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, List, Optional
+
+import httpx
+
+from src.config import (
+    WRITE_BEHIND_BATCH_SIZE, WRITE_BEHIND_MAX_PENDING,
+    WRITE_BEHIND_FLUSH_INTERVAL, WRITE_BEHIND_JOURNAL_PATH,
+)
+
+Preparer = Callable[[list], Awaitable[list]]
+
+# After a spill, wait this long before replaying the journal
+JOURNAL_RETRY_INTERVAL = 30  # seconds
+
+# Tables written with an upsert on their unique key (on_conflict columns)
+UPSERT_KEYS = {
+    "user_problems": "user_id,problem_id",
+}
+
+
+def _upstream_down(error: Exception) -> bool:
+    """Worth journaling and retrying later (vs. a request that will never succeed)"""
+    if isinstance(error, httpx.TransportError):
+        return True
+    if isinstance(error, httpx.HTTPStatusError):
+        status = error.response.status_code
+        return status == 429 or status >= 500
+    return False
+
+
+def _rejected(error: Exception) -> bool:
+    """Client error (constraint, bad value): some row in the statement can never be written"""
+    return isinstance(error, httpx.HTTPStatusError) and 400 <= error.response.status_code < 500 \
+        and not _upstream_down(error)
+
+
+def _merge_duplicates(rows: list, on_conflict: str) -> list:
+    """One row per conflict key (Postgres rejects an upsert that hits a row twice)"""
+    key_columns = on_conflict.split(",")
+    merged: Dict[tuple, dict] = {}
+    for row in rows:
+        key = tuple(row.get(col) for col in key_columns)
+        merged[key] = {**merged.get(key, {}), **row}
+    return list(merged.values())
+
+
+class WriteBehindQueue:
+    """Thread-safe row buffer flushed by size or time through AsyncDataAccess"""
+
+    WINDOW = 512  # recent flush durations kept for percentiles
+
+    def __init__(self, data, batch_size: int = WRITE_BEHIND_BATCH_SIZE,
+                 max_pending: int = WRITE_BEHIND_MAX_PENDING,
+                 flush_interval: float = WRITE_BEHIND_FLUSH_INTERVAL,
+                 journal_path: Optional[Path] = WRITE_BEHIND_JOURNAL_PATH):
+        """
+        Args:
+            data: AsyncDataAccess (pooled PostgREST client)
+            batch_size: 이 행 수가 쌓이면 즉시 flush, 요청당 최대 행 수
+            max_pending: 대기 행 상한 (초과 시 버림)
+            flush_interval: 주기적 flush 간격(초)
+            journal_path: 업스트림 장애 시 행을 보관할 JSONL 파일 (None이면 버림)
+        """
+        self.data = data
+        self.batch_size = batch_size
+        self.max_pending = max_pending
+        self.flush_interval = flush_interval
+        self.journal_path = Path(journal_path) if journal_path else None
+
+        self._pending = deque()
+        self._lock = threading.Lock()
+        self._preparers: Dict[str, Preparer] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wake: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._flush_lock: Optional[asyncio.Lock] = None
+        self._journal_retry_at = 0.0
+
+        self.enqueued = 0
+        self.written = 0
+        self.batches = 0
+        self.dropped = 0
+        self.failed = 0
+        self.spilled = 0
+        self.replayed = 0
+        self.journal_rows = self._count_journal()
+        self._flush_ms = deque(maxlen=self.WINDOW)
+        self.last_flush_at: Optional[float] = None
+
+    def register(self, table: str, prepare: Preparer):
+        """Transform a table's rows (async, in the background) before they are inserted"""
+        self._preparers[table] = prepare
+
+    def enqueue(self, table: str, row: dict) -> bool:
+        """Buffer a row (never blocks, any thread); False if the buffer is full"""
+        with self._lock:
+            if len(self._pending) >= self.max_pending:
+                self.dropped += 1
+                full = True
+            else:
+                self._pending.append((table, row))
+                self.enqueued += 1
+                full = False
+                depth = len(self._pending)
+        if full:
+            print(f"  [WriteBehind] Buffer full, dropped {table} row")
+            return False
+
+        if depth >= self.batch_size and self._loop is not None:
+            try:
+                self._loop.call_soon_threadsafe(self._wake.set)
+            except RuntimeError:
+                pass  # Loop closed: the shutdown drain picks the row up
+        return True
+
+    def _take(self, limit: int) -> list:
+        with self._lock:
+            return [self._pending.popleft() for _ in range(min(limit, len(self._pending)))]
+
+    # ============================================
+    # Flush
+    # ============================================
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            try:
+                await self.flush()
+            except Exception as e:
+                print(f"  [WriteBehind] Flush failed: {e}")
+
+    async def flush(self):
+        """Write everything buffered now (and replay the journal if it is due)"""
+        async with self._flush_lock:
+            start = time.perf_counter()
+            wrote = await self._replay_journal()
+            while True:
+                batch = self._take(self.batch_size)
+                if not batch:
+                    break
+                await self._write(batch)
+                wrote = True
+            if wrote:
+                self._flush_ms.append((time.perf_counter() - start) * 1000)
+                self.last_flush_at = time.time()
+
+    async def _write(self, batch: list):
+        groups: Dict[tuple, List[dict]] = {}
+        for table, row in batch:
+            groups.setdefault((table, tuple(sorted(row))), []).append(row)
+
+        for (table, _), rows in groups.items():
+            await self._write_rows(table, rows)
+
+    async def _write_rows(self, table: str, rows: list, split: bool = True):
+        """
+        One statement for rows of one table and column set
+
+        Args:
+            table: 테이블 이름
+            rows: 준비 전 원본 행 (저널에는 이 형태로 기록)
+            split: 4xx 거부 시 한 행씩 다시 시도할지 여부
+        """
+        try:
+            prepare = self._preparers.get(table)
+            prepared = await prepare(rows) if prepare else rows
+            if prepared:
+                on_conflict = UPSERT_KEYS.get(table)
+                if on_conflict:
+                    prepared = _merge_duplicates(prepared, on_conflict)
+                    await self.data.upsert(table, prepared, on_conflict=on_conflict, returning=False)
+                else:
+                    await self.data.insert(table, prepared)
+                self.written += len(prepared)
+                self.batches += 1
+        except Exception as e:
+            if _upstream_down(e) and self._spill(table, rows):
+                print(f"  [WriteBehind] {table} upstream unavailable, journaled {len(rows)} rows: {e}")
+            elif split and len(rows) > 1 and _rejected(e):
+                # One bad row fails the whole statement: isolate it so the rest still land
+                print(f"  [WriteBehind] {table} batch rejected, retrying {len(rows)} rows one by one: {e}")
+                for row in rows:
+                    await self._write_rows(table, [row], split=False)
+            else:
+                self.failed += len(rows)
+                print(f"  [WriteBehind] {table} insert failed ({len(rows)} rows): {e}")
+
+    # ============================================
+    # 로컬 저널 (업스트림 장애 시)
+    # ============================================
+
+    def _spill(self, table: str, rows: list) -> bool:
+        """Append raw (unprepared) rows to the journal"""
+        if self.journal_path is None:
+            return False
+        try:
+            self.journal_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.journal_path, "a", encoding="utf-8") as f:
+                for row in rows:
+                    f.write(json.dumps({"table": table, "row": row}, ensure_ascii=False, default=str) + "\n")
+        except OSError as e:
+            print(f"  [WriteBehind] Journal write failed: {e}")
+            return False
+        self.spilled += len(rows)
+        self.journal_rows += len(rows)
+        self._journal_retry_at = time.time() + JOURNAL_RETRY_INTERVAL
+        return True
+
+    def _count_journal(self) -> int:
+        if self.journal_path is None or not self.journal_path.exists():
+            return 0
+        with open(self.journal_path, encoding="utf-8") as f:
+            return sum(1 for line in f if line.strip())
+
+    async def _replay_journal(self, force: bool = False) -> bool:
+        """Re-submit journaled rows; ones that fail again are journaled again"""
+        if not self.journal_rows or (not force and time.time() < self._journal_retry_at):
+            return False
+        try:
+            # Detach the file first so rows that fail again start a fresh journal
+            replay_path = self.journal_path.with_suffix(self.journal_path.suffix + ".replay")
+            self.journal_path.replace(replay_path)
+            with open(replay_path, encoding="utf-8") as f:
+                entries = [json.loads(line) for line in f if line.strip()]
+        except FileNotFoundError:
+            self.journal_rows = 0  # Another worker sharing the journal replayed it
+            return False
+        except (OSError, ValueError) as e:
+            print(f"  [WriteBehind] Journal read failed: {e}")
+            return False
+
+        self.journal_rows = 0
+        batch = [(entry["table"], entry["row"]) for entry in entries]
+        for i in range(0, len(batch), self.batch_size):
+            await self._write(batch[i:i + self.batch_size])
+        replay_path.unlink(missing_ok=True)
+        self.replayed += len(batch)
+        print(f"  [WriteBehind] Replayed {len(batch)} journaled rows")
+        return True
+
+    # ============================================
+    # 수명 주기
+    # ============================================
+
+    def start(self):
+        if self._task is None:
+            self._loop = asyncio.get_running_loop()
+            self._wake = asyncio.Event()
+            self._flush_lock = asyncio.Lock()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the flusher and drain the buffer (unwritable rows go to the journal)"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._flush_lock is None:
+            self._flush_lock = asyncio.Lock()
+        await self.flush()
+        self._loop = None
+
+    def stats(self) -> dict:
+        recent = sorted(self._flush_ms)
+        return {
+            "pending": len(self._pending),
+            "journal_rows": self.journal_rows,
+            "enqueued": self.enqueued,
+            "written": self.written,
+            "batches": self.batches,
+            "dropped": self.dropped,
+            "failed": self.failed,
+            "spilled": self.spilled,
+            "replayed": self.replayed,
+            "flush_p50_ms": round(recent[len(recent) // 2], 1) if recent else 0,
+            "flush_p95_ms": round(recent[min(len(recent) - 1, int(len(recent) * 0.95))], 1) if recent else 0,
+            "flush_max_ms": round(recent[-1], 1) if recent else 0,
+            "last_flush_at": self.last_flush_at,
+        }
+
+
+# ============================================
+# 테이블별 준비 단계
+# ============================================
+
+def _resolve_user_ids(data) -> Preparer:
+    """hint_requests: kakao_id -> users.id (user cache, Supabase on miss)"""
+
+    async def prepare(rows: list) -> list:
+        kakao_ids = list({row["kakao_id"] for row in rows})
+        users = await asyncio.gather(*(data.get_user_by_kakao_id(k) for k in kakao_ids))
+        user_ids = {k: u.get("id") for k, u in zip(kakao_ids, users) if u}
+        return [
+            {**{k: v for k, v in row.items() if k != "kakao_id"}, "user_id": user_ids[row["kakao_id"]]}
+            for row in rows if row["kakao_id"] in user_ids
+        ]
+
+    return prepare
+
+
+_PREPARERS = {
+    "hint_requests": _resolve_user_ids,
+}
+
+
+# ============================================
+# 공유 인스턴스 (워커 프로세스당 1개)
+# ============================================
+
+_queue: Optional[WriteBehindQueue] = None
+
+
+def start_write_behind(data) -> WriteBehindQueue:
+    """Create the shared buffer and start its flusher task (app lifespan)"""
+    global _queue
+    if _queue is None:
+        _queue = WriteBehindQueue(data)
+        for table, factory in _PREPARERS.items():
+            _queue.register(table, factory(data))
+    _queue.start()
+    return _queue
+
+
+def get_write_behind() -> Optional[WriteBehindQueue]:
+    """Shared buffer, or None outside the app (scripts write inline)"""
+    return _queue
+
+
+async def record_event(data, table: str, row: dict):
+    """Buffer a tracking row; without the app lifespan, write it inline"""
+    if _queue is not None:
+        _queue.enqueue(table, row)
+        return
+    try:
+        rows = [row]
+        if table in _PREPARERS:
+            rows = await _PREPARERS[table](data)(rows)
+        if rows and table in UPSERT_KEYS:
+            await data.upsert(table, rows, on_conflict=UPSERT_KEYS[table], returning=False)
+        elif rows:
+            await data.insert(table, rows)
+    except Exception as e:
+        print(f"  [WriteBehind] {table} inline insert failed: {e}")
+
+
+async def stop_write_behind():
+    global _queue
+    if _queue is not None:
+        await _queue.stop()
+        _queue = None
+
+
+def get_write_behind_stats() -> Optional[dict]:
+    return _queue.stats() if _queue else None
@@ -0,0 +1,16 @@
+-- =============================================
+-- 반응형 이미지 파생본 (src/image_variants.py)
+-- =============================================
+-- 문제 이미지의 너비별 WebP + PNG 파생본 목록.
+-- 뷰어는 srcset/sizes로 화면에 맞는 크기만 받고, 카카오 피드는 800px PNG를 사용.
+-- NULL이면 원본(problem_image_url)만 사용 (기존 동작).
+--
+-- 형식:
+--   {"version": "3f2a9c1e0b7d", "width": 1600, "height": 2100,
+--    "sizes": [{"w": 480, "h": 630, "webp": "<url>", "png": "<url>"}, ...]}
+--
+-- 기존 문제 채우기: python src/image_variants.py
+
+ALTER TABLE problems ADD COLUMN IF NOT EXISTS image_variants JSONB;
+
+COMMENT ON COLUMN problems.image_variants IS '너비별 WebP/PNG 파생본 (NULL=원본만)';
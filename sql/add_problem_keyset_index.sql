@@ -0,0 +1,13 @@
+-- =============================================
+-- 문제 목록 키셋 페이지네이션 인덱스
+-- =============================================
+
+-- SupabaseService.get_problems_page / iter_problems 정렬 순서와 동일
+--   ORDER BY year DESC, exam, question_no, problem_id
+-- 다음 페이지는 이전 페이지 마지막 행 이후부터 조회 (OFFSET 없음)
+CREATE INDEX IF NOT EXISTS idx_problems_keyset
+    ON problems (year DESC, exam, question_no, problem_id);
+
+-- 상태 필터 목록 (/problem/ready, 검수 대기 목록)
+CREATE INDEX IF NOT EXISTS idx_problems_status_keyset
+    ON problems (status, year DESC, exam, question_no, problem_id);
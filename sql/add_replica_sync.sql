@@ -0,0 +1,31 @@
+-- =============================================
+-- 로컬 읽기 복제본 증분 동기화 (src/read_replica.py)
+-- =============================================
+
+-- 구 스키마(create_problems_table.sql)의 hints에는 updated_at이 없음
+ALTER TABLE hints ADD COLUMN IF NOT EXISTS updated_at TIMESTAMPTZ DEFAULT NOW();
+
+-- 모든 UPDATE에서 updated_at 갱신 (스크립트가 직접 update해도 복제본에 반영되도록)
+CREATE OR REPLACE FUNCTION touch_updated_at()
+RETURNS TRIGGER AS $$
+BEGIN
+    NEW.updated_at = NOW();
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS touch_problems_updated_at ON problems;
+CREATE TRIGGER touch_problems_updated_at
+    BEFORE UPDATE ON problems
+    FOR EACH ROW
+    EXECUTE FUNCTION touch_updated_at();
+
+DROP TRIGGER IF EXISTS touch_hints_updated_at ON hints;
+CREATE TRIGGER touch_hints_updated_at
+    BEFORE UPDATE ON hints
+    FOR EACH ROW
+    EXECUTE FUNCTION touch_updated_at();
+
+-- 인덱스: updated_at >= watermark 증분 조회용
+CREATE INDEX IF NOT EXISTS idx_problems_updated_at ON problems (updated_at);
+CREATE INDEX IF NOT EXISTS idx_hints_updated_at ON hints (updated_at);
@@ -0,0 +1,62 @@
+-- =============================================
+-- 일괄 업데이트 RPC (SupabaseService.bulk_update)
+-- =============================================
+-- PostgREST는 행마다 다른 값의 multi-row UPDATE를 지원하지 않고,
+-- upsert는 NOT NULL 컬럼(year, exam, question_no)이 없는 부분 행을 거부함.
+-- 이 함수는 JSON 배열을 받아 한 번의 호출로 행별 UPDATE를 수행하고
+-- 행별 결과(성공 / not found / 오류 메시지)를 반환함.
+--
+-- 사용 예:
+--   SELECT * FROM bulk_update_rows('problems', 'problem_id',
+--       '[{"problem_id": "2026_CSAT_Q01", "answer": "3"}]');
+
+CREATE OR REPLACE FUNCTION bulk_update_rows(
+    p_table TEXT,
+    p_key TEXT,
+    p_rows JSONB
+)
+RETURNS TABLE (key TEXT, ok BOOLEAN, error TEXT)
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    r JSONB;
+    set_clause TEXT;
+    affected INTEGER;
+BEGIN
+    IF p_table NOT IN ('problems', 'hints', 'users') THEN
+        RAISE EXCEPTION 'bulk_update_rows: table % is not allowed', p_table;
+    END IF;
+
+    FOR r IN SELECT value FROM jsonb_array_elements(p_rows) LOOP
+        key := r ->> p_key;
+        ok := FALSE;
+        error := NULL;
+
+        BEGIN
+            SELECT string_agg(format('%I = src.%I', col, col), ', ')
+              INTO set_clause
+              FROM jsonb_object_keys(r - p_key) AS col;
+
+            IF set_clause IS NULL THEN
+                error := 'no columns to update';
+            ELSE
+                EXECUTE format(
+                    'UPDATE %I AS t SET %s FROM jsonb_populate_record(NULL::%I, $1) AS src WHERE t.%I = $2',
+                    p_table, set_clause, p_table, p_key
+                ) USING r, key;
+                GET DIAGNOSTICS affected = ROW_COUNT;
+                ok := affected > 0;
+                IF NOT ok THEN
+                    error := 'not found';
+                END IF;
+            END IF;
+        EXCEPTION WHEN OTHERS THEN
+            -- 행 단위 오류는 해당 행만 실패 처리 (나머지 행은 계속)
+            ok := FALSE;
+            error := SQLERRM;
+        END;
+
+        RETURN NEXT;
+    END LOOP;
+END;
+$$;
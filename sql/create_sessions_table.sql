@@ -0,0 +1,21 @@
+-- =============================================
+-- 로그인 세션 테이블 (SESSION_BACKEND=supabase)
+-- =============================================
+-- server/session_store.py SupabaseSessionStore가 사용.
+-- 토큰 원문은 저장하지 않고 SHA-256 해시만 저장.
+-- expires_at은 사용 시 SESSION_RENEW_INTERVAL마다 연장 (sliding expiry),
+-- 만료 행은 워커가 주기적으로 삭제.
+-- 로그인 시 사용자 upsert와 동시에 생성되므로 users FK는 두지 않음.
+
+CREATE TABLE IF NOT EXISTS sessions (
+    token_hash TEXT PRIMARY KEY,
+    kakao_id TEXT NOT NULL,
+    expires_at TIMESTAMPTZ NOT NULL,
+    created_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_sessions_expires_at ON sessions(expires_at);
+CREATE INDEX IF NOT EXISTS idx_sessions_kakao_id ON sessions(kakao_id);
+
+-- 서비스 키로만 접근 (anon 접근 차단)
+ALTER TABLE sessions ENABLE ROW LEVEL SECURITY;
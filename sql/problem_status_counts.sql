@@ -0,0 +1,22 @@
+-- =============================================
+-- 문제 통계 집계 RPC (SupabaseService.get_stats)
+-- =============================================
+-- 문제 전체를 내려받아 Python에서 세는 대신 DB에서 GROUP BY로 집계.
+-- 결과 행 수 = (연도 x 시험 x 상태) 조합 수 -> 문제 수와 무관.
+--
+-- 사용 예:
+--   SELECT * FROM problem_status_counts();
+
+CREATE OR REPLACE FUNCTION problem_status_counts()
+RETURNS TABLE (year INTEGER, exam TEXT, status TEXT, count BIGINT)
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT p.year, p.exam::TEXT, p.status::TEXT, COUNT(*)
+    FROM problems p
+    GROUP BY p.year, p.exam, p.status;
+$$;
+
+-- 연도별 상태 집계용 (keyset 인덱스가 있으면 생략 가능)
+CREATE INDEX IF NOT EXISTS idx_problems_year_exam_status
+    ON problems (year, exam, status);
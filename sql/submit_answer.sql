@@ -0,0 +1,87 @@
+-- =============================================
+-- 답안 제출 RPC (/problem/submit)
+-- =============================================
+-- 채점 + user_problems 기록 + users 통계 갱신을 한 트랜잭션, 한 번의 호출로 처리.
+-- 통계는 세션에 저장된 사용자 사본이 아니라 현재 행 값 기준으로 증가시키므로
+-- 같은 사용자가 동시에 여러 번 제출해도 카운터가 유실되지 않음.
+--
+-- 기존 process_answer(delivery_id, ...)는 카카오 발송 건(deliveries) 기준이라
+-- 발송 기록 없이 열리는 뷰어 제출에는 이 함수를 사용.
+--
+-- 사용 예:
+--   SELECT submit_answer('2026_CSAT_Q01', '5', '<user uuid>');
+--   SELECT submit_answer('2026_CSAT_Q01', '5');  -- 비로그인: 채점만
+
+CREATE OR REPLACE FUNCTION submit_answer(
+    p_problem_id VARCHAR(50),
+    p_user_answer VARCHAR(50),
+    p_user_id UUID DEFAULT NULL,
+    p_hints_used INTEGER DEFAULT 0
+) RETURNS JSONB
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_correct_answer VARCHAR(50);
+    v_solution TEXT;
+    v_score INTEGER;
+    v_is_correct BOOLEAN;
+    v_user users%ROWTYPE;
+BEGIN
+    -- 1. 채점
+    SELECT COALESCE(p.answer_verified, p.answer), p.solution, COALESCE(p.score, 3)
+    INTO v_correct_answer, v_solution, v_score
+    FROM problems p
+    WHERE p.problem_id = p_problem_id;
+
+    IF NOT FOUND THEN
+        RETURN jsonb_build_object('found', false);
+    END IF;
+
+    v_is_correct := BTRIM(p_user_answer, E' \t\r\n') = BTRIM(COALESCE(v_correct_answer, ''), E' \t\r\n');
+
+    IF p_user_id IS NULL THEN
+        RETURN jsonb_build_object(
+            'found', true,
+            'is_correct', v_is_correct,
+            'correct_answer', v_correct_answer,
+            'solution', v_solution,
+            'score', CASE WHEN v_is_correct THEN v_score ELSE 0 END,
+            'recorded', false
+        );
+    END IF;
+
+    -- 2. 풀이 기록 (사용자·문제당 1행, 최신 답안으로 갱신)
+    INSERT INTO user_problems (user_id, problem_id, user_answer, is_correct, hints_used, answered_at)
+    VALUES (p_user_id, p_problem_id, p_user_answer, v_is_correct, COALESCE(p_hints_used, 0), NOW())
+    ON CONFLICT (user_id, problem_id) DO UPDATE
+    SET user_answer = EXCLUDED.user_answer,
+        is_correct = EXCLUDED.is_correct,
+        hints_used = GREATEST(user_problems.hints_used, EXCLUDED.hints_used),
+        answered_at = EXCLUDED.answered_at;
+
+    -- 3. 사용자 통계 (행 잠금 하에 현재 값 기준 증가)
+    UPDATE users
+    SET total_problems_solved = COALESCE(total_problems_solved, 0) + 1,
+        correct_count = COALESCE(correct_count, 0) + CASE WHEN v_is_correct THEN 1 ELSE 0 END,
+        consecutive_correct = CASE WHEN v_is_correct THEN COALESCE(consecutive_correct, 0) + 1 ELSE 0 END,
+        consecutive_wrong = CASE WHEN v_is_correct THEN 0 ELSE COALESCE(consecutive_wrong, 0) + 1 END,
+        updated_at = NOW()
+    WHERE id = p_user_id
+    RETURNING * INTO v_user;
+
+    RETURN jsonb_build_object(
+        'found', true,
+        'is_correct', v_is_correct,
+        'correct_answer', v_correct_answer,
+        'solution', v_solution,
+        'score', CASE WHEN v_is_correct THEN v_score ELSE 0 END,
+        'recorded', v_user.id IS NOT NULL,
+        'stats', jsonb_build_object(
+            'total_problems_solved', v_user.total_problems_solved,
+            'correct_count', v_user.correct_count,
+            'consecutive_correct', v_user.consecutive_correct,
+            'consecutive_wrong', v_user.consecutive_wrong
+        )
+    );
+END;
+$$;
@@ -0,0 +1,18 @@
+-- =============================================
+-- 로그인 사용자 upsert (UserService.upsert_user / AsyncDataAccess.upsert_user)
+-- =============================================
+-- 로그인 시 POST /rest/v1/users?on_conflict=kakao_id 한 번으로 생성/갱신.
+--   Prefer: resolution=merge-duplicates,return=representation
+-- 기존 사용자: 요청에 포함된 컬럼(닉네임, 토큰 등)만 갱신
+-- 신규 사용자: 나머지 컬럼은 아래 기본값으로 생성 (이전에는 Python에서 채움)
+
+ALTER TABLE users ADD COLUMN IF NOT EXISTS subscription_type TEXT;
+
+ALTER TABLE users ALTER COLUMN current_level SET DEFAULT 3;
+ALTER TABLE users ALTER COLUMN current_score_level SET DEFAULT 3;
+ALTER TABLE users ALTER COLUMN subscription_type SET DEFAULT 'free';
+ALTER TABLE users ALTER COLUMN created_at SET DEFAULT NOW();
+
+UPDATE users SET subscription_type = 'free' WHERE subscription_type IS NULL;
+
+-- on_conflict=kakao_id 에는 kakao_id UNIQUE 제약이 필요 (기존 스키마에 포함)
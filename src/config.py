@@ -30,6 +30,75 @@ SUPABASE_URL = os.getenv("SUPABASE_URL")
 SUPABASE_KEY = os.getenv("SUPABASE_KEY")
 SUPABASE_SERVICE_KEY = os.getenv("SUPABASE_SERVICE_KEY")
 
+# 공유 클라이언트 HTTP 연결 풀 (프로세스당 1개)
+SUPABASE_POOL_SIZE = int(os.getenv("SUPABASE_POOL_SIZE", "20"))
+SUPABASE_TIMEOUT = float(os.getenv("SUPABASE_TIMEOUT", "30"))
+
+# 일괄 쓰기 청크 크기 (bulk_upsert / bulk_update 요청당 행 수)
+BULK_CHUNK_SIZE = int(os.getenv("SUPABASE_BULK_CHUNK_SIZE", "500"))
+
+# 문제/힌트 캐시 (워커 프로세스별 LRU + TTL)
+PROBLEM_CACHE_SIZE = int(os.getenv("PROBLEM_CACHE_SIZE", "512"))
+PROBLEM_CACHE_TTL = float(os.getenv("PROBLEM_CACHE_TTL", "60"))
+
+# 워커 간 캐시 무효화 로그 (SQLite 파일 경로, 비우면 비활성화)
+CACHE_INVALIDATION_DB = os.getenv("CACHE_INVALIDATION_DB", "")
+CACHE_INVALIDATION_POLL = float(os.getenv("CACHE_INVALIDATION_POLL", "1"))
+
+# 문제 뷰어 HTML 캐시 (워커별, 렌더링된 페이지 + ETag) / 브라우저 캐시 max-age(초)
+VIEWER_CACHE_SIZE = int(os.getenv("VIEWER_CACHE_SIZE", "256"))
+VIEWER_CACHE_TTL = float(os.getenv("VIEWER_CACHE_TTL", "300"))
+VIEWER_MAX_AGE = int(os.getenv("VIEWER_MAX_AGE", "60"))
+
+# 반응형 이미지 파생본 (뷰어 srcset / 카카오 피드) - 너비 목록(px), WebP 손실 압축 품질
+IMAGE_VARIANT_WIDTHS = [int(w) for w in os.getenv("IMAGE_VARIANT_WIDTHS", "480,800,1200").split(",") if w.strip()]
+IMAGE_VARIANT_WEBP_QUALITY = int(os.getenv("IMAGE_VARIANT_WEBP_QUALITY", "85"))
+# 카카오 피드 이미지: 이 너비 이상인 가장 작은 PNG 파생본
+KAKAO_FEED_IMAGE_WIDTH = int(os.getenv("KAKAO_FEED_IMAGE_WIDTH", "800"))
+
+# 관리자 문제 그리드 썸네일 (시험별 스프라이트 시트) - 타일 크기(px), WebP 품질, 디스크 캐시 경로
+THUMBNAIL_SIZE = int(os.getenv("THUMBNAIL_SIZE", "120"))
+THUMBNAIL_QUALITY = int(os.getenv("THUMBNAIL_QUALITY", "80"))
+THUMBNAIL_CACHE_PATH = Path(os.getenv("THUMBNAIL_CACHE_PATH", OUTPUT_PATH / "thumbnails"))
+
+# 문제 통계 캐시 TTL(초) - get_stats 집계 결과
+STATS_CACHE_TTL = float(os.getenv("STATS_CACHE_TTL", "30"))
+
+# 문제 컬렉션 버전(max(updated_at) + 행 수) 캐시 TTL(초) - /problem/list, /ready, /stats ETag
+COLLECTION_VERSION_TTL = float(os.getenv("COLLECTION_VERSION_TTL", "2"))
+
+# 응답 gzip 압축 (GZipMiddleware) - 최소 크기(바이트), 압축 레벨(1-9)
+GZIP_MINIMUM_SIZE = int(os.getenv("GZIP_MINIMUM_SIZE", "1024"))
+GZIP_COMPRESS_LEVEL = int(os.getenv("GZIP_COMPRESS_LEVEL", "6"))
+
+# 분석 대시보드 스냅샷 최대 수명(초) - /analytics 집계, 지나면 다음 요청이 백그라운드 재계산
+DASHBOARD_REFRESH_INTERVAL = float(os.getenv("DASHBOARD_REFRESH_INTERVAL", "60"))
+
+# 로컬 읽기 복제본 (problems/hints -> SQLite)
+# 사전 작업 sql/add_replica_sync.sql 필요 -> 기본 비활성
+READ_REPLICA_ENABLED = os.getenv("READ_REPLICA_ENABLED", "false").lower() == "true"
+READ_REPLICA_PATH = Path(os.getenv("READ_REPLICA_PATH", OUTPUT_PATH / "read_replica.db"))
+REPLICA_POLL_INTERVAL = float(os.getenv("REPLICA_POLL_INTERVAL", "5"))
+REPLICA_FULL_RESYNC = float(os.getenv("REPLICA_FULL_RESYNC", "3600"))
+
+# 로그인 세션 저장소 (sqlite | supabase | memory)
+SESSION_BACKEND = os.getenv("SESSION_BACKEND", "sqlite").lower()
+SESSION_DB_PATH = Path(os.getenv("SESSION_DB_PATH", OUTPUT_PATH / "sessions.db"))
+SESSION_TTL = int(os.getenv("SESSION_TTL", str(86400 * 7)))  # 마지막 갱신 후 유효 시간(초)
+SESSION_RENEW_INTERVAL = float(os.getenv("SESSION_RENEW_INTERVAL", "3600"))
+SESSION_CACHE_TTL = float(os.getenv("SESSION_CACHE_TTL", "30"))  # supabase 백엔드 조회 캐시
+
+# 사용자 행 캐시 (워커별, 세션 인증 요청마다 users 조회 방지)
+USER_CACHE_SIZE = int(os.getenv("USER_CACHE_SIZE", "1024"))
+USER_CACHE_TTL = float(os.getenv("USER_CACHE_TTL", "15"))
+
+# 추적 기록 지연 쓰기 (user_problems / hint_requests / deliveries, 백그라운드 일괄 INSERT)
+WRITE_BEHIND_BATCH_SIZE = int(os.getenv("WRITE_BEHIND_BATCH_SIZE", "100"))  # 요청당 최대 행 수
+WRITE_BEHIND_MAX_PENDING = int(os.getenv("WRITE_BEHIND_MAX_PENDING", "10000"))  # 초과 시 버림
+WRITE_BEHIND_FLUSH_INTERVAL = float(os.getenv("WRITE_BEHIND_FLUSH_INTERVAL", "2"))  # 주기적 flush(초)
+# 업스트림 장애 시 행을 보관했다가 재전송하는 로컬 저널 (비우면 비활성화)
+WRITE_BEHIND_JOURNAL_PATH = os.getenv("WRITE_BEHIND_JOURNAL_PATH", str(OUTPUT_PATH / "write_behind_journal.jsonl")) or None
+
 # ============================================
 # Google Drive 설정
 # ============================================
@@ -69,6 +138,17 @@ KAKAO_REST_API_KEY = os.getenv("KAKAO_REST_API_KEY")
 KAKAO_ACCESS_TOKEN = os.getenv("KAKAO_ACCESS_TOKEN")
 KAKAO_REFRESH_TOKEN = os.getenv("KAKAO_REFRESH_TOKEN")
 
+# ============================================
+# 외부 HTTP 호출 (Kakao API, Supabase REST, 이미지 호스트)
+# ============================================
+# 호스트별 keep-alive 연결 풀 크기
+HTTP_POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", "10"))
+# 기본 타임아웃(초) - 연결 / 응답 대기
+HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "3.05"))
+HTTP_READ_TIMEOUT = float(os.getenv("HTTP_READ_TIMEOUT", "10"))
+# 재시도 횟수 (멱등 요청: 연결 오류·429·5xx / 비멱등 요청: 연결 실패·429만)
+HTTP_MAX_RETRIES = int(os.getenv("HTTP_MAX_RETRIES", "2"))
+
 # ============================================
 # 개발 설정
 # ============================================
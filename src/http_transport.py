@@ -0,0 +1,277 @@
+"""
+HTTP Transport
+Shared outbound HTTP for the Kakao API, Supabase REST and image hosts
+
+- One keep-alive requests.Session per upstream host (scheme://host:port),
+  pool sized by HTTP_POOL_SIZE, shared by every thread in the process
+- Default (connect, read) timeout on every call
+- Retries keyed by idempotency:
+    GET/HEAD/OPTIONS/PUT/DELETE  connection errors, timeouts, 429/5xx
+    POST/PATCH                   only when the request never reached the
+                                 server (connect failure) or was rejected
+                                 with 429 - a message send is never repeated
+  Callers can mark read-only POSTs (RPC lookups) with idempotent=True.
+- Per-host latency / error / retry counters (/health -> "http")
+
+Async route handlers use httpx clients (server/async_data.py); their
+transports come from create_async_transport() and report into the same
+per-host counters.
+
+Usage:
+    from src import http_transport
+
+    response = http_transport.post(url, headers=headers, data=data)
+    response = http_transport.post(rpc_url, json=params, idempotent=True)
+"""
+
+import time
+import random
+import threading
+from collections import deque
+from http.cookiejar import DefaultCookiePolicy
+from typing import Optional
+from urllib.parse import urlsplit
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import NewConnectionError
+
+try:
+    from .config import HTTP_POOL_SIZE, HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT, HTTP_MAX_RETRIES
+except ImportError:
+    from config import HTTP_POOL_SIZE, HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT, HTTP_MAX_RETRIES
+
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}
+
+# Status codes worth retrying: rate limit + transient server errors
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+# Non-idempotent requests: only statuses that guarantee nothing was processed
+REJECTED_STATUS = {429}
+BACKOFF_BASE = 0.5  # seconds
+BACKOFF_CAP = 8.0   # seconds
+
+DEFAULT_TIMEOUT = (HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT)
+
+
+def backoff_delay(attempt: int, retry_after: Optional[str] = None) -> float:
+    """Full-jitter exponential backoff, honoring a numeric Retry-After header"""
+    if retry_after:
+        try:
+            return min(float(retry_after), BACKOFF_CAP)
+        except ValueError:
+            pass
+    return random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * (2 ** attempt)))
+
+
+# ============================================
+# 메트릭
+# ============================================
+
+class HostMetrics:
+    """Thread-safe per-host latency/error/retry counters"""
+
+    WINDOW = 512  # recent samples kept per host for percentiles
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._hosts = {}
+
+    def _entry(self, host: str) -> dict:
+        return self._hosts.setdefault(host, {
+            "count": 0, "errors": 0, "retries": 0,
+            "total_ms": 0.0, "max_ms": 0.0,
+            "recent": deque(maxlen=self.WINDOW),
+        })
+
+    def record(self, host: str, seconds: float, ok: bool):
+        with self._lock:
+            stats = self._entry(host)
+            ms = seconds * 1000
+            stats["count"] += 1
+            stats["errors"] += 0 if ok else 1
+            stats["total_ms"] += ms
+            stats["max_ms"] = max(stats["max_ms"], ms)
+            stats["recent"].append(ms)
+
+    def record_retry(self, host: str):
+        with self._lock:
+            self._entry(host)["retries"] += 1
+
+    def snapshot(self) -> dict:
+        """Summary per host: count, errors, retries, avg/p50/p95/max latency (ms)"""
+        with self._lock:
+            result = {}
+            for host, stats in self._hosts.items():
+                recent = sorted(stats["recent"])
+                result[host] = {
+                    "count": stats["count"],
+                    "errors": stats["errors"],
+                    "retries": stats["retries"],
+                    "avg_ms": round(stats["total_ms"] / stats["count"], 1) if stats["count"] else 0,
+                    "p50_ms": round(recent[len(recent) // 2], 1) if recent else 0,
+                    "p95_ms": round(recent[min(len(recent) - 1, int(len(recent) * 0.95))], 1) if recent else 0,
+                    "max_ms": round(stats["max_ms"], 1),
+                }
+            return result
+
+
+_metrics = HostMetrics()
+
+
+def _host_key(url: str) -> str:
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}"
+
+
+# ============================================
+# 동기 세션 (requests)
+# ============================================
+
+_sessions = {}
+_sessions_lock = threading.Lock()
+
+
+def get_session(url: str) -> requests.Session:
+    """Pooled keep-alive session for the URL's host"""
+    key = _host_key(url)
+    session = _sessions.get(key)
+    if session is None:
+        with _sessions_lock:
+            session = _sessions.get(key)
+            if session is None:
+                session = requests.Session()
+                # Sessions are shared across users: never carry cookies between calls
+                session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+                # Retries are handled in request() where the method is known
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=HTTP_POOL_SIZE, max_retries=0)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                _sessions[key] = session
+    return session
+
+
+def _not_sent(error: requests.RequestException) -> bool:
+    """True if the request failed before reaching the server"""
+    if isinstance(error, requests.exceptions.ConnectTimeout):
+        return True
+    if isinstance(error, requests.ConnectionError) and error.args:
+        return isinstance(getattr(error.args[0], "reason", None), NewConnectionError)
+    return False
+
+
+def request(method: str, url: str, idempotent: Optional[bool] = None,
+            max_retries: int = HTTP_MAX_RETRIES, **kwargs) -> requests.Response:
+    """
+    Send through the host's pooled session with timeout and retry policy
+
+    Args:
+        method: HTTP 메서드
+        url: 요청 URL
+        idempotent: 재시도 정책 (None이면 메서드로 판단)
+        max_retries: 최대 재시도 횟수
+        **kwargs: requests 인자 (headers, params, data, json, timeout ...)
+
+    Returns:
+        마지막 응답 (재시도 후에도 실패한 상태 코드 포함)
+
+    Raises:
+        requests.RequestException: 재시도 후에도 연결/타임아웃 오류
+    """
+    method = method.upper()
+    if idempotent is None:
+        idempotent = method in IDEMPOTENT_METHODS
+    retry_status = RETRYABLE_STATUS if idempotent else REJECTED_STATUS
+    kwargs.setdefault("timeout", DEFAULT_TIMEOUT)
+
+    host = _host_key(url)
+    session = get_session(url)
+
+    for attempt in range(max_retries + 1):
+        start = time.perf_counter()
+        try:
+            response = session.request(method, url, **kwargs)
+        except requests.RequestException as e:
+            _metrics.record(host, time.perf_counter() - start, ok=False)
+            if attempt >= max_retries or not (idempotent or _not_sent(e)):
+                raise
+            _metrics.record_retry(host)
+            time.sleep(backoff_delay(attempt))
+            continue
+
+        _metrics.record(host, time.perf_counter() - start, ok=response.status_code < 500)
+        if response.status_code not in retry_status or attempt >= max_retries:
+            return response
+
+        _metrics.record_retry(host)
+        time.sleep(backoff_delay(attempt, response.headers.get("Retry-After")))
+
+    return response
+
+
+def get(url: str, **kwargs) -> requests.Response:
+    return request("GET", url, **kwargs)
+
+
+def post(url: str, **kwargs) -> requests.Response:
+    return request("POST", url, **kwargs)
+
+
+def patch(url: str, **kwargs) -> requests.Response:
+    return request("PATCH", url, **kwargs)
+
+
+def delete(url: str, **kwargs) -> requests.Response:
+    return request("DELETE", url, **kwargs)
+
+
+def close_sessions():
+    """Close every pooled session (worker shutdown)"""
+    with _sessions_lock:
+        for session in _sessions.values():
+            session.close()
+        _sessions.clear()
+
+
+# ============================================
+# 비동기 transport (httpx)
+# ============================================
+
+class InstrumentedAsyncTransport(httpx.AsyncBaseTransport):
+    """httpx async transport wrapper that records per-host metrics"""
+
+    def __init__(self, inner: httpx.AsyncBaseTransport):
+        self.inner = inner
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        host = f"{request.url.scheme}://{request.url.netloc.decode()}"
+        start = time.perf_counter()
+        try:
+            response = await self.inner.handle_async_request(request)
+        except Exception:
+            _metrics.record(host, time.perf_counter() - start, ok=False)
+            raise
+        _metrics.record(host, time.perf_counter() - start, ok=response.status_code < 500)
+        return response
+
+    async def aclose(self):
+        await self.inner.aclose()
+
+
+def create_async_transport(pool_size: int = HTTP_POOL_SIZE) -> InstrumentedAsyncTransport:
+    """
+    Pooled httpx transport for an AsyncClient
+
+    httpx only retries connection failures (nothing was sent), which is safe
+    for every method, so the same retry count applies to POSTs.
+    """
+    limits = httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size)
+    return InstrumentedAsyncTransport(httpx.AsyncHTTPTransport(limits=limits, retries=HTTP_MAX_RETRIES))
+
+
+def get_http_stats() -> dict:
+    """Per-host counters plus the number of pooled sync sessions"""
+    return {
+        "sessions": len(_sessions),
+        "hosts": _metrics.snapshot(),
+    }
@@ -0,0 +1,262 @@
+"""
+Responsive Image Variants
+Width-bucketed derivatives of a problem image for the viewer and the Kakao feed
+
+Pipeline PNGs are ~1600px wide, but a phone webview shows them at 360-430 CSS
+px, so every view downloaded far more than it displayed. For each width in
+IMAGE_VARIANT_WIDTHS this module writes a WebP (lossless or lossy, whichever
+is smaller) and a PNG fallback, and returns the manifest stored in
+problems.image_variants (sql/add_image_variants.sql):
+
+    {
+        "version": "3f2a9c1e0b7d",        # sha256 of the source image, 12 hex
+        "width": 1600, "height": 2100,    # source size
+        "sizes": [
+            {"w": 480, "h": 630, "webp": "<url>", "png": "<url>"},
+            {"w": 800, ...}, {"w": 1200, ...}
+        ]
+    }
+
+Objects are content-addressed (variants/<problem_id>/<version>_<w>.<ext>):
+a new source gets new URLs, so they are uploaded with a one-year immutable
+Cache-Control and never need a cache buster.
+
+Usage:
+    from src.image_variants import build_and_upload_variants, srcset
+
+    problem_data["image_variants"] = build_and_upload_variants(problem_id, "output/2026_CSAT_Q01.png")
+    srcset(problem["image_variants"], "webp")   # "<url> 480w, <url> 800w, <url> 1200w"
+
+Backfill problems uploaded before variants existed:
+    python src/image_variants.py [--limit N] [--force]
+"""
+
+import io
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import List, Optional, Tuple, Union
+
+from PIL import Image, ImageChops
+
+try:
+    from .config import IMAGE_VARIANT_WIDTHS, IMAGE_VARIANT_WEBP_QUALITY
+    from .storage_client import StorageClient, get_storage_client
+except ImportError:
+    from config import IMAGE_VARIANT_WIDTHS, IMAGE_VARIANT_WEBP_QUALITY
+    from storage_client import StorageClient, get_storage_client
+
+VARIANT_PREFIX = "variants"
+VARIANT_CACHE_CONTROL = "max-age=31536000, immutable"
+
+Source = Union[bytes, str, Path]
+
+
+def variant_widths(source_width: int, widths: List[int] = IMAGE_VARIANT_WIDTHS) -> List[int]:
+    """Buckets below the source width, plus the source itself if it is under the largest bucket"""
+    result = [w for w in sorted(widths) if w < source_width]
+    if not result or source_width <= max(widths):
+        result.append(source_width)
+    return result
+
+
+def _encode_png(img: Image.Image) -> bytes:
+    out = io.BytesIO()
+    img.save(out, "PNG", optimize=True)
+    return out.getvalue()
+
+
+def _encode_webp(img: Image.Image, quality: int = IMAGE_VARIANT_WEBP_QUALITY) -> bytes:
+    """Smaller of lossless (text/line art) and lossy (photos, gradients)"""
+    lossless = io.BytesIO()
+    img.save(lossless, "WEBP", lossless=True, method=4)
+    lossy = io.BytesIO()
+    img.save(lossy, "WEBP", quality=quality, method=4)
+    return min(lossless.getvalue(), lossy.getvalue(), key=len)
+
+
+def _normalize(img: Image.Image) -> Image.Image:
+    """RGB(A), or L for grayscale scans (halves the PNG fallback)"""
+    if img.mode in ("P", "LA", "PA"):
+        img = img.convert("RGBA")
+    elif img.mode not in ("RGB", "RGBA", "L"):
+        img = img.convert("RGB")
+
+    if img.mode == "RGB":
+        gray = img.convert("L")
+        if ImageChops.difference(img, gray.convert("RGB")).getbbox() is None:
+            return gray
+    return img
+
+
+def render_variants(source: Source) -> Tuple[str, Tuple[int, int], List[dict]]:
+    """
+    Resize and encode every width bucket (CPU only, no upload)
+
+    Returns:
+        (version, (width, height), [{"w", "h", "webp": bytes, "png": bytes}, ...])
+    """
+    data = source if isinstance(source, bytes) else Path(source).read_bytes()
+    version = hashlib.sha256(data).hexdigest()[:12]
+
+    with Image.open(io.BytesIO(data)) as opened:
+        img = _normalize(opened)
+        img.load()
+
+    rendered = []
+    for w in variant_widths(img.width):
+        h = max(1, round(img.height * w / img.width))
+        resized = img if w == img.width else img.resize((w, h), Image.Resampling.LANCZOS)
+        rendered.append({"w": w, "h": h, "webp": _encode_webp(resized), "png": _encode_png(resized)})
+
+    return version, img.size, rendered
+
+
+def upload_variants(problem_id: str, version: str, size: Tuple[int, int], rendered: List[dict],
+                    storage: Optional[StorageClient] = None) -> Optional[dict]:
+    """
+    Upload rendered variants and build the image_variants manifest
+
+    Returns:
+        manifest dict, or None if any upload failed (the row keeps only the original)
+    """
+    storage = storage or get_storage_client()
+    uploads = []
+    for variant in rendered:
+        for fmt, content_type in (("webp", "image/webp"), ("png", "image/png")):
+            remote_path = f"{VARIANT_PREFIX}/{problem_id}/{version}_{variant['w']}.{fmt}"
+            uploads.append((variant, fmt, remote_path, content_type))
+
+    with ThreadPoolExecutor(max_workers=min(storage.max_workers, len(uploads))) as executor:
+        results = list(executor.map(
+            lambda u: storage.upload_bytes(u[0][u[1]], u[2], u[3], cache_control=VARIANT_CACHE_CONTROL),
+            uploads,
+        ))
+
+    failed = [r for r in results if not r.get("success")]
+    if failed:
+        print(f"  [Variants] {problem_id}: {len(failed)}/{len(results)} uploads failed: {failed[0].get('error')}")
+        return None
+
+    sizes = {v["w"]: {"w": v["w"], "h": v["h"]} for v in rendered}
+    for (variant, fmt, _, _), result in zip(uploads, results):
+        sizes[variant["w"]][fmt] = result["url"]
+
+    return {"version": version, "width": size[0], "height": size[1], "sizes": list(sizes.values())}
+
+
+def build_and_upload_variants(problem_id: str, source: Source,
+                              storage: Optional[StorageClient] = None) -> Optional[dict]:
+    """Render + upload; None on any failure (variants are best-effort, never block an upload)"""
+    try:
+        version, size, rendered = render_variants(source)
+        return upload_variants(problem_id, version, size, rendered, storage)
+    except Exception as e:
+        print(f"  [Variants] {problem_id}: {e}")
+        return None
+
+
+def build_many(items: List[Tuple[str, Source]], max_workers: int = 4) -> List[Optional[dict]]:
+    """
+    Variants for several problems in parallel (Pillow releases the GIL while encoding)
+
+    Args:
+        items: [(problem_id, source), ...]
+
+    Returns:
+        manifests in the same order as items (None where it failed)
+    """
+    if not items:
+        return []
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(items))) as executor:
+        return list(executor.map(lambda item: build_and_upload_variants(*item), items))
+
+
+def with_variants(row: dict, variants: Optional[dict]) -> dict:
+    """
+    Set image_variants on a problems row (None when no derivatives were built)
+
+    Always written so a re-uploaded image without derivatives clears the old
+    manifest instead of keeping srcsets that point at the previous image.
+    SupabaseService drops the key while the column does not exist yet
+    (sql/add_image_variants.sql).
+    """
+    row["image_variants"] = variants or None
+    return row
+
+
+# ============================================
+# 조회 헬퍼 (뷰어 / 카카오 피드)
+# ============================================
+
+def srcset(variants: Optional[dict], fmt: str) -> str:
+    """Comma-separated "<url> <w>w" candidates for one format (empty without variants)"""
+    if not variants:
+        return ""
+    return ", ".join(f"{s[fmt]} {s['w']}w" for s in variants.get("sizes", []) if s.get(fmt))
+
+
+def variant_url(variants: Optional[dict], min_width: int, fmt: str = "png") -> Optional[str]:
+    """Smallest variant at least min_width wide (the largest if none is), None without variants"""
+    candidates = sorted(
+        (s for s in (variants or {}).get("sizes", []) if s.get(fmt)), key=lambda s: s["w"]
+    )
+    if not candidates:
+        return None
+    for s in candidates:
+        if s["w"] >= min_width:
+            return s[fmt]
+    return candidates[-1][fmt]
+
+
+# ============================================
+# 기존 문제 일괄 생성 (backfill)
+# ============================================
+
+def backfill(limit: Optional[int] = None, force: bool = False) -> int:
+    """Generate variants for problems that have an image but no image_variants"""
+    try:
+        from .supabase_service import get_shared_service
+        from . import http_transport
+    except ImportError:
+        from supabase_service import get_shared_service
+        import http_transport
+
+    db = get_shared_service()
+    query = db.client.table("problems").select("problem_id, problem_image_url, image_variants") \
+        .not_.is_("problem_image_url", "null")
+    if not force:
+        query = query.is_("image_variants", "null")
+    if limit:
+        query = query.limit(limit)
+    problems = [p for p in query.execute().data if p.get("problem_image_url")]
+    print(f"Generating variants for {len(problems)} problems")
+
+    def build(problem):
+        response = http_transport.get(problem["problem_image_url"])
+        if response.status_code != 200:
+            print(f"  [Variants] {problem['problem_id']}: download failed ({response.status_code})")
+            return None
+        return build_and_upload_variants(problem["problem_id"], response.content)
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        manifests = list(executor.map(build, problems))
+
+    updates = [
+        {"problem_id": p["problem_id"], "image_variants": m}
+        for p, m in zip(problems, manifests) if m
+    ]
+    if updates:
+        db.bulk_update_problems(updates)
+    print(f"Done: {len(updates)}/{len(problems)}")
+    return len(updates)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Generate responsive image variants for existing problems")
+    parser.add_argument("--limit", type=int, help="Max problems to process")
+    parser.add_argument("--force", action="store_true", help="Regenerate even if image_variants is set")
+    args = parser.parse_args()
+    backfill(limit=args.limit, force=args.force)
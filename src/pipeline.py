@@ -284,8 +284,8 @@ class KICEPipeline:
         print(f"Created {len(results)} question images")
         return results
 
-    def step6_upload_to_storage(self, image_dir: str) -> List[Dict]:
-        """Step 6: Upload images to Supabase Storage"""
+    def step6_upload_to_storage(self, image_dir: str, force: bool = False) -> List[Dict]:
+        """Step 6: Upload images to Supabase Storage (skips files unchanged per upload_manifest.json)"""
         print("\n" + "="*50)
         print("[STEP 6] Uploading to Supabase Storage")
         print("="*50)
@@ -295,23 +295,25 @@ class KICEPipeline:
         storage = SupabaseStorageService()
         storage.create_bucket_if_not_exists()
 
-        results = storage.upload_problem_images(image_dir)
+        results = storage.upload_problem_images(image_dir, force=force)
         success = sum(1 for r in results if r["success"])
+        skipped = sum(1 for r in results if r.get("skipped"))
         failed = [r for r in results if not r["success"]]
 
-        print(f"  Uploaded {success}/{len(results)} images")
+        print(f"  Uploaded {success - skipped}/{len(results) - skipped} images ({skipped} unchanged, skipped)")
 
         # ===== Edge Case 4: 업로드 실패 시 재시도 가이드 =====
         if failed:
             print(f"\n  ⚠️  WARNING: {len(failed)} uploads failed")
             print("  ───────────────────────────────────────")
             for f in failed[:3]:  # 처음 3개만 표시
-                print(f"  • {f.get('file', 'unknown')}: {f.get('error', 'Unknown error')}")
+                print(f"  • {f.get('filename', 'unknown')}: {f.get('error', 'Unknown error')}")
             if len(failed) > 3:
                 print(f"  • ... and {len(failed) - 3} more failures")
             print("")
             print("  Retry Options:")
             print(f"  1. Run again: python src/pipeline.py --upload-only --image-dir \"{image_dir}\"")
+            print("     (only failed/changed files are re-uploaded; add --force-upload to re-upload all)")
             print("  2. Check network connection and Supabase credentials")
             print("  3. Verify SUPABASE_URL and SUPABASE_KEY in .env")
             print("  ───────────────────────────────────────\n")
@@ -383,21 +385,21 @@ class KICEPipeline:
         print("[STEP 8] Saving to Supabase Database")
         print("="*50)
 
-        from supabase import create_client
+        from supabase_service import get_shared_service
+        from image_variants import with_variants
 
-        supabase = create_client(
-            os.getenv("SUPABASE_URL"),
-            os.getenv("SUPABASE_KEY")
-        )
+        db = get_shared_service()
 
         # Build URL mapping from upload results
         url_map = {}
+        variants_map = {}
         for r in upload_results:
             if r.get("success"):
                 filename = r.get("filename", "")
                 url_map[filename] = r.get("url")
+                variants_map[filename] = r.get("image_variants")
 
-        saved = 0
+        rows = []
         for q in question_results:
             problem_id = f"{year}_{exam}_Q{q['question_no']:02d}"
 
@@ -405,7 +407,7 @@ class KICEPipeline:
             filename = f"{problem_id}.png"
             image_url = url_map.get(filename, "")
 
-            problem_data = {
+            rows.append(with_variants({
                 "problem_id": problem_id,
                 "year": year,
                 "exam": exam,
@@ -413,19 +415,13 @@ class KICEPipeline:
                 "score": q.get("score", 3),
                 "problem_image_url": image_url,
                 "status": "needs_review"
-            }
+            }, variants_map.get(filename)))
 
-            try:
-                supabase.table("problems").upsert(
-                    problem_data,
-                    on_conflict="problem_id"
-                ).execute()
-                saved += 1
-                print(f"  Saved: {problem_id}")
-            except Exception as e:
-                print(f"  Failed: {problem_id} - {e}")
+        result = db.bulk_upsert_problems(rows)
+        for err in result["errors"]:
+            print(f"  Failed: {err['problem_id']} - {err['error']}")
 
-        print(f"\nSaved {saved} problems to database")
+        print(f"\nSaved {result['written']} problems to database")
 
     def run_full_pipeline(
         self,
@@ -547,6 +543,7 @@ def main():
     parser.add_argument("--upload-only", action="store_true", help="Only run upload step (retry failed uploads)")
     parser.add_argument("--notion-only", action="store_true", help="Only run Notion step (retry failed cards)")
     parser.add_argument("--image-dir", help="Image directory for --upload-only or --notion-only")
+    parser.add_argument("--force-upload", action="store_true", help="Ignore upload_manifest.json and re-upload all images")
 
     args = parser.parse_args()
 
@@ -576,7 +573,7 @@ def main():
 
         if args.upload_only:
             print(f"\n[RETRY] Upload-only mode for: {image_dir}")
-            results = pipeline.step6_upload_to_storage(image_dir)
+            results = pipeline.step6_upload_to_storage(image_dir, force=args.force_upload)
             success = sum(1 for r in results if r.get("success"))
             print(f"\nUpload complete: {success}/{len(results)} succeeded")
             return
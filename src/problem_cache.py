@@ -0,0 +1,335 @@
+"""
+Problem / Hint Cache
+In-process LRU + TTL cache for problem rows, hint lists, hint sets
+(hints keyed by stage plus their unlock schedule, for /problem/hint) and
+rendered viewer pages (/problem/view, with their ETag).
+
+After a daily send, thousands of users open the same few problems within
+minutes; without a cache every viewer/submit/hint request re-reads the row
+from Supabase. Entries expire after PROBLEM_CACHE_TTL seconds and are
+dropped immediately when SupabaseService / AsyncDataAccess write the row.
+The aggregated problem statistics (get_stats) are kept for STATS_CACHE_TTL
+seconds and dropped on any problem write. So is the collection version
+(get_collection_version, the /problem/list ETag source), for
+COLLECTION_VERSION_TTL seconds.
+
+Cross-worker invalidation (optional):
+    Set CACHE_INVALIDATION_DB to a SQLite file path shared by the workers on
+    a host. Every invalidation is appended to that log, and each worker
+    replays entries newer than its last-seen sequence number (checked at most
+    every CACHE_INVALIDATION_POLL seconds on cache reads).
+"""
+
+import copy
+import time
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, List, Optional
+
+try:
+    from .config import (
+        PROBLEM_CACHE_SIZE, PROBLEM_CACHE_TTL,
+        CACHE_INVALIDATION_DB, CACHE_INVALIDATION_POLL, STATS_CACHE_TTL,
+        VIEWER_CACHE_SIZE, VIEWER_CACHE_TTL, COLLECTION_VERSION_TTL,
+    )
+except ImportError:
+    from config import (
+        PROBLEM_CACHE_SIZE, PROBLEM_CACHE_TTL,
+        CACHE_INVALIDATION_DB, CACHE_INVALIDATION_POLL, STATS_CACHE_TTL,
+        VIEWER_CACHE_SIZE, VIEWER_CACHE_TTL, COLLECTION_VERSION_TTL,
+    )
+
+MISSING = object()
+
+# Invalidation log rows older than this are pruned
+INVALIDATION_RETENTION = 3600  # 1 hour
+
+
+class TTLCache:
+    """Thread-safe bounded LRU cache with per-entry expiry"""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[str, tuple]" = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: str) -> Any:
+        """Cached value or MISSING"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return MISSING
+            expires_at, value = entry
+            if expires_at <= now:
+                del self._data[key]
+                self.expirations += 1
+                self.misses += 1
+                return MISSING
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: str, value: Any):
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, key: str):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+
+
+class InvalidationLog:
+    """SQLite-backed invalidation log shared by workers on one host"""
+
+    def __init__(self, path: str, poll_interval: float = CACHE_INVALIDATION_POLL):
+        self.path = path
+        self.poll_interval = poll_interval
+        self._lock = threading.Lock()
+        self._next_poll = 0.0
+        self.published = 0
+        self.applied = 0
+
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS invalidations ("
+                " seq INTEGER PRIMARY KEY AUTOINCREMENT,"
+                " problem_id TEXT NOT NULL,"
+                " created_at REAL NOT NULL)"
+            )
+            row = conn.execute("SELECT COALESCE(MAX(seq), 0) FROM invalidations").fetchone()
+        # Start from the current head: this worker's cache is empty anyway
+        self._last_seq = row[0]
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=5)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def publish(self, problem_ids: list):
+        """Append problem IDs to the log (one transaction for the whole batch)"""
+        now = time.time()
+        try:
+            with self._connect() as conn:
+                conn.executemany(
+                    "INSERT INTO invalidations (problem_id, created_at) VALUES (?, ?)",
+                    [(problem_id, now) for problem_id in problem_ids],
+                )
+                conn.execute(
+                    "DELETE FROM invalidations WHERE created_at < ?",
+                    (now - INVALIDATION_RETENTION,),
+                )
+            self.published += len(problem_ids)
+        except sqlite3.Error as e:
+            print(f"  [Cache] Invalidation publish failed: {e}")
+
+    def poll(self) -> list:
+        """Problem IDs invalidated by other workers since the last poll"""
+        now = time.monotonic()
+        with self._lock:
+            if now < self._next_poll:
+                return []
+            self._next_poll = now + self.poll_interval
+            last_seq = self._last_seq
+
+        try:
+            with self._connect() as conn:
+                rows = conn.execute(
+                    "SELECT seq, problem_id FROM invalidations WHERE seq > ? ORDER BY seq",
+                    (last_seq,),
+                ).fetchall()
+        except sqlite3.Error as e:
+            print(f"  [Cache] Invalidation poll failed: {e}")
+            return []
+
+        if not rows:
+            return []
+        with self._lock:
+            self._last_seq = max(self._last_seq, rows[-1][0])
+        self.applied += len(rows)
+        return [problem_id for _, problem_id in rows]
+
+    def stats(self) -> dict:
+        return {
+            "path": self.path,
+            "last_seq": self._last_seq,
+            "published": self.published,
+            "applied": self.applied,
+        }
+
+
+# ============================================
+# Shared caches (one per worker process)
+# ============================================
+
+problem_cache = TTLCache(PROBLEM_CACHE_SIZE, PROBLEM_CACHE_TTL)
+hint_cache = TTLCache(PROBLEM_CACHE_SIZE, PROBLEM_CACHE_TTL)
+hint_set_cache = TTLCache(PROBLEM_CACHE_SIZE, PROBLEM_CACHE_TTL)
+viewer_cache = TTLCache(VIEWER_CACHE_SIZE, VIEWER_CACHE_TTL)
+stats_cache = TTLCache(4, STATS_CACHE_TTL)
+version_cache = TTLCache(1, COLLECTION_VERSION_TTL)
+
+_invalidation_log: Optional[InvalidationLog] = None
+_listeners: List[Callable[[list], None]] = []
+if CACHE_INVALIDATION_DB:
+    try:
+        _invalidation_log = InvalidationLog(CACHE_INVALIDATION_DB)
+    except sqlite3.Error as e:
+        print(f"  [Cache] Cross-worker invalidation disabled ({CACHE_INVALIDATION_DB}): {e}")
+
+
+def add_invalidation_listener(callback: Callable[[list], None]):
+    """Call callback(problem_ids) whenever problems are invalidated (e.g. read replica)"""
+    _listeners.append(callback)
+
+
+def _drop_local(problem_ids: list):
+    for problem_id in problem_ids:
+        problem_cache.invalidate(problem_id)
+        hint_cache.invalidate(problem_id)
+        hint_set_cache.invalidate(problem_id)
+        viewer_cache.invalidate(problem_id)
+    # Any problem write may move a status/year/exam count
+    stats_cache.clear()
+    version_cache.clear()
+    for callback in _listeners:
+        try:
+            callback(problem_ids)
+        except Exception as e:
+            print(f"  [Cache] Invalidation listener failed for {len(problem_ids)} problems: {e}")
+
+
+def _sync_invalidations():
+    if _invalidation_log is not None:
+        problem_ids = _invalidation_log.poll()
+        if problem_ids:
+            _drop_local(problem_ids)
+
+
+def get_cached_problem(problem_id: str) -> Any:
+    """Cached problem row (copy) or MISSING"""
+    _sync_invalidations()
+    row = problem_cache.get(problem_id)
+    return dict(row) if row is not MISSING else MISSING
+
+
+def cache_problem(problem_id: str, row: Optional[dict]):
+    # Misses are not cached so a newly added problem is visible immediately
+    if row:
+        problem_cache.set(problem_id, dict(row))
+
+
+def get_cached_hints(problem_id: str) -> Any:
+    """Cached hint list (copies, ordered by stage) or MISSING"""
+    _sync_invalidations()
+    hints = hint_cache.get(problem_id)
+    return [dict(h) for h in hints] if hints is not MISSING else MISSING
+
+
+def cache_hints(problem_id: str, hints: list):
+    if hints:
+        hint_cache.set(problem_id, [dict(h) for h in hints])
+
+
+def get_cached_hint_set(problem_id: str) -> Any:
+    """Cached hint set with unlock schedule (copy) or MISSING"""
+    _sync_invalidations()
+    hint_set = hint_set_cache.get(problem_id)
+    return copy.deepcopy(hint_set) if hint_set is not MISSING else MISSING
+
+
+def cache_hint_set(problem_id: str, hint_set: dict):
+    hint_set_cache.set(problem_id, copy.deepcopy(hint_set))
+
+
+def get_cached_viewer(problem_id: str) -> Any:
+    """Rendered viewer page {"version", "collection", "etag", "body"} or MISSING (read-only, not copied)"""
+    _sync_invalidations()
+    return viewer_cache.get(problem_id)
+
+
+def cache_viewer(problem_id: str, page: dict):
+    viewer_cache.set(problem_id, page)
+
+
+def get_cached_stats(key: str = "problems") -> Any:
+    """Cached aggregate (copy) or MISSING"""
+    _sync_invalidations()
+    stats = stats_cache.get(key)
+    return copy.deepcopy(stats) if stats is not MISSING else MISSING
+
+
+def cache_stats(stats: dict, key: str = "problems"):
+    stats_cache.set(key, copy.deepcopy(stats))
+
+
+def get_cached_collection_version() -> Any:
+    """Cached problems collection version or MISSING"""
+    _sync_invalidations()
+    return version_cache.get("problems")
+
+
+def cache_collection_version(version: str):
+    version_cache.set("problems", version)
+
+
+def invalidate_problem(problem_id: Optional[str]):
+    """Drop a problem's row and hint set here and (if enabled) on other workers"""
+    invalidate_problems([problem_id])
+
+
+def invalidate_problems(problem_ids: list):
+    """
+    Drop many problems at once (bulk writes)
+
+    One log publish and one aggregate clear for the whole batch instead of one
+    per row.
+    """
+    problem_ids = list(dict.fromkeys(pid for pid in problem_ids if pid))
+    if not problem_ids:
+        return
+    _drop_local(problem_ids)
+    if _invalidation_log is not None:
+        _invalidation_log.publish(problem_ids)
+
+
+def get_cache_stats() -> dict:
+    """Hit-ratio metrics for /health"""
+    return {
+        "problems": problem_cache.stats(),
+        "hints": hint_cache.stats(),
+        "hint_sets": hint_set_cache.stats(),
+        "viewer": viewer_cache.stats(),
+        "stats": stats_cache.stats(),
+        "collection_version": version_cache.stats(),
+        "cross_worker": _invalidation_log.stats() if _invalidation_log else None,
+    }
@@ -0,0 +1,397 @@
+"""
+Local Read Replica
+Mirrors the `problems` and `hints` tables into a local SQLite file so the
+viewer / hint / submit paths read without a round trip to Supabase (and keep
+working through a Supabase outage).
+
+Replication:
+    1. Initial snapshot: page through both tables and load them in one
+       transaction.
+    2. Incremental: every REPLICA_POLL_INTERVAL seconds fetch rows with
+       updated_at >= (watermark - REPLICA_OVERLAP) and upsert them.
+    3. Full resync every REPLICA_FULL_RESYNC seconds (picks up deletes).
+
+Workers on one host share the SQLite file. Only the worker holding the
+file lock (<path>.lock) syncs; the others just read, and take the lock over
+if that worker exits. A worker that starts while Supabase is down serves the
+copy already on disk.
+
+Writes made by this process drop the affected problem from the replica
+immediately (via problem_cache invalidation), so reads fall through to
+Supabase until the next poll brings the new version back. The problem_id
+is queued in the file, so the syncing worker refetches it by id.
+
+Requires updated_at maintained on both tables: sql/add_replica_sync.sql
+(without it the replica logs once and turns itself off).
+"""
+
+import json
+import time
+import sqlite3
+import threading
+try:
+    import fcntl
+except ImportError:  # Windows: no flock, every worker syncs the file itself
+    fcntl = None
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Optional
+
+try:
+    from .config import (
+        READ_REPLICA_ENABLED, READ_REPLICA_PATH,
+        REPLICA_POLL_INTERVAL, REPLICA_FULL_RESYNC,
+    )
+    from .problem_cache import add_invalidation_listener
+except ImportError:
+    from config import (
+        READ_REPLICA_ENABLED, READ_REPLICA_PATH,
+        REPLICA_POLL_INTERVAL, REPLICA_FULL_RESYNC,
+    )
+    from problem_cache import add_invalidation_listener
+
+PAGE_SIZE = 1000
+REPLICA_OVERLAP = 5  # seconds re-read behind the watermark (late commits)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS problems (
+    problem_id TEXT PRIMARY KEY,
+    updated_at TEXT,
+    data TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS hints (
+    problem_id TEXT NOT NULL,
+    stage INTEGER NOT NULL,
+    updated_at TEXT,
+    data TEXT NOT NULL,
+    PRIMARY KEY (problem_id, stage)
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS refetch (
+    problem_id TEXT PRIMARY KEY
+);
+"""
+
+# Sort keys that make range() pages stable (updated_at alone has ties: bulk
+# writes stamp a whole batch with one timestamp)
+PAGE_ORDER = {
+    "problems": ("updated_at", "problem_id"),
+    "hints": ("updated_at", "problem_id", "stage"),
+}
+
+
+class ReadReplica:
+    """SQLite mirror of problems/hints with a background sync thread"""
+
+    def __init__(self, client, path: Path = READ_REPLICA_PATH,
+                 poll_interval: float = REPLICA_POLL_INTERVAL,
+                 full_resync: float = REPLICA_FULL_RESYNC):
+        """
+        Args:
+            client: supabase-py Client (source of truth)
+            path: SQLite 파일 경로
+            poll_interval: 증분 동기화 주기(초)
+            full_resync: 전체 재동기화 주기(초)
+        """
+        self.client = client
+        self.path = Path(path)
+        self.poll_interval = poll_interval
+        self.full_resync = full_resync
+
+        self._local = threading.local()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._lock_file = None
+        self.syncing = False  # this worker holds the sync lock
+
+        self.ready = False
+        self.last_sync_at: Optional[float] = None
+        self.last_full_sync_at: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self.syncs = 0
+        self.rows_applied = 0
+        self.reads = 0
+        self.read_misses = 0
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._conn() as conn:
+            conn.executescript(SCHEMA)
+        # A copy from an earlier run is served until the first sync replaces it
+        self.ready = self._get_meta("synced_at") is not None
+
+    def _conn(self) -> sqlite3.Connection:
+        """Per-thread connection (WAL: readers never block the sync writer)"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    # ============================================
+    # 조회
+    # ============================================
+
+    def get_problem(self, problem_id: str) -> Optional[dict]:
+        """Problem row or None (not replicated yet / replica not ready)"""
+        if not self.ready:
+            return None
+        self.reads += 1
+        row = self._conn().execute(
+            "SELECT data FROM problems WHERE problem_id = ?", (problem_id,)
+        ).fetchone()
+        if row is None:
+            self.read_misses += 1
+            return None
+        return json.loads(row[0])
+
+    def get_hints(self, problem_id: str) -> Optional[list]:
+        """Hints ordered by stage, or None if the problem is not in the replica"""
+        if not self.ready:
+            return None
+        conn = self._conn()
+        if conn.execute("SELECT 1 FROM problems WHERE problem_id = ?", (problem_id,)).fetchone() is None:
+            return None
+        rows = conn.execute(
+            "SELECT data FROM hints WHERE problem_id = ? ORDER BY stage", (problem_id,)
+        ).fetchall()
+        return [json.loads(r[0]) for r in rows]
+
+    def forget(self, problem_ids: list):
+        """Drop locally written problems until the next poll re-fetches them"""
+        params = [(problem_id,) for problem_id in problem_ids]
+        with self._conn() as conn:
+            conn.executemany("DELETE FROM problems WHERE problem_id = ?", params)
+            conn.executemany("DELETE FROM hints WHERE problem_id = ?", params)
+            # The row may be older than the watermark: the syncing worker refetches it by id
+            conn.executemany("INSERT OR IGNORE INTO refetch VALUES (?)", params)
+
+    # ============================================
+    # 동기화
+    # ============================================
+
+    def _fetch_all(self, table: str, since: Optional[str] = None, problem_ids: list = None) -> list:
+        rows, start = [], 0
+        while True:
+            query = self.client.table(table).select("*")
+            if since:
+                query = query.gte("updated_at", since)
+            if problem_ids:
+                query = query.in_("problem_id", problem_ids)
+            for column in PAGE_ORDER[table]:
+                query = query.order(column)
+            page = query.range(start, start + PAGE_SIZE - 1).execute().data or []
+            rows.extend(page)
+            if len(page) < PAGE_SIZE:
+                return rows
+            start += PAGE_SIZE
+
+    def _get_meta(self, key: str) -> Optional[str]:
+        row = self._conn().execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    @staticmethod
+    def _watermark(rows: list, current: Optional[str]) -> Optional[str]:
+        stamps = [r["updated_at"] for r in rows if r.get("updated_at")]
+        if current:
+            stamps.append(current)
+        return max(stamps, key=_parse_ts) if stamps else None
+
+    def _apply(self, conn: sqlite3.Connection, problems: list, hints: list):
+        conn.executemany(
+            "INSERT OR REPLACE INTO problems (problem_id, updated_at, data) VALUES (?, ?, ?)",
+            [(p["problem_id"], p.get("updated_at"), json.dumps(p, ensure_ascii=False, default=str))
+             for p in problems],
+        )
+        conn.executemany(
+            "INSERT OR REPLACE INTO hints (problem_id, stage, updated_at, data) VALUES (?, ?, ?, ?)",
+            [(h["problem_id"], h["stage"], h.get("updated_at"), json.dumps(h, ensure_ascii=False, default=str))
+             for h in hints],
+        )
+        self.rows_applied += len(problems) + len(hints)
+
+    def _refetch_ids(self) -> list:
+        return [r[0] for r in self._conn().execute("SELECT problem_id FROM refetch").fetchall()]
+
+    def _commit_sync(self, conn: sqlite3.Connection, refetched: list, p_mark: Optional[str],
+                     h_mark: Optional[str]):
+        conn.executemany("DELETE FROM refetch WHERE problem_id = ?", [(pid,) for pid in refetched])
+        conn.execute("INSERT OR REPLACE INTO meta VALUES ('problems_watermark', ?)", (p_mark,))
+        conn.execute("INSERT OR REPLACE INTO meta VALUES ('hints_watermark', ?)", (h_mark,))
+        conn.execute("INSERT OR REPLACE INTO meta VALUES ('synced_at', ?)", (str(time.time()),))
+
+    def snapshot(self):
+        """Full copy of both tables (atomic swap for readers)"""
+        refetched = self._refetch_ids()
+        problems = self._fetch_all("problems")
+        hints = self._fetch_all("hints")
+
+        with self._conn() as conn:
+            conn.execute("DELETE FROM problems")
+            conn.execute("DELETE FROM hints")
+            self._apply(conn, problems, hints)
+            self._commit_sync(conn, refetched, self._watermark(problems, None), self._watermark(hints, None))
+
+        self.ready = True
+        self.last_full_sync_at = self.last_sync_at = time.time()
+        self.syncs += 1
+        print(f"  [Replica] Snapshot: {len(problems)} problems, {len(hints)} hints")
+
+    def sync(self):
+        """Incremental pull of rows changed since the last watermark"""
+        refetched = self._refetch_ids()
+        p_mark = self._get_meta("problems_watermark")
+        h_mark = self._get_meta("hints_watermark")
+
+        problems = self._fetch_all("problems", _rewind(p_mark))
+        hints = self._fetch_all("hints", _rewind(h_mark))
+        if refetched:
+            problems += self._fetch_all("problems", problem_ids=refetched)
+            hints += self._fetch_all("hints", problem_ids=refetched)
+
+        with self._conn() as conn:
+            self._apply(conn, problems, hints)
+            self._commit_sync(conn, refetched, self._watermark(problems, p_mark), self._watermark(hints, h_mark))
+
+        self.last_sync_at = time.time()
+        self.syncs += 1
+
+    def _acquire_sync_lock(self) -> bool:
+        """Become the syncing worker for this file (non-blocking)"""
+        if self.syncing:
+            return True
+        if fcntl is None:
+            self.syncing = True
+            return True
+        lock_path = self.path.with_name(self.path.name + ".lock")
+        if self._lock_file is None:
+            self._lock_file = open(lock_path, "a")
+        try:
+            fcntl.flock(self._lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            return False  # Another worker syncs; this one only reads
+        self.syncing = True
+        print(f"  [Replica] This worker syncs {self.path.name} (lock: {lock_path.name})")
+        return True
+
+    def _release_sync_lock(self):
+        if self._lock_file is not None:
+            self._lock_file.close()  # Closing drops the flock
+            self._lock_file = None
+        self.syncing = False
+
+    def _run(self):
+        while not self._stop.is_set():
+            if not self._acquire_sync_lock():
+                # Reader: serve the syncing worker's copy once it has one
+                if not self.ready:
+                    self.ready = self._get_meta("synced_at") is not None
+                self._stop.wait(self.poll_interval)
+                continue
+            try:
+                due_full = (
+                    self.last_full_sync_at is None
+                    or time.time() - self.last_full_sync_at >= self.full_resync
+                )
+                if due_full:
+                    self.snapshot()
+                else:
+                    self.sync()
+                self.last_error = None
+            except Exception as e:
+                self.last_error = str(e)
+                if _is_missing_column(e):
+                    print(f"  [Replica] Disabled: updated_at missing, run sql/add_replica_sync.sql ({e})")
+                    self.ready = False
+                    break
+                print(f"  [Replica] Sync failed (serving last good copy): {e}")
+            self._stop.wait(self.poll_interval)
+        self._release_sync_lock()
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="read-replica", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+        self._release_sync_lock()
+
+    def stats(self) -> dict:
+        """Replica lag and counters for /health"""
+        conn = self._conn()
+        synced_at = self._get_meta("synced_at")
+        return {
+            "ready": self.ready,
+            "syncing": self.syncing,
+            "path": str(self.path),
+            "lag_seconds": round(time.time() - float(synced_at), 1) if synced_at else None,
+            "problems": conn.execute("SELECT COUNT(*) FROM problems").fetchone()[0],
+            "hints": conn.execute("SELECT COUNT(*) FROM hints").fetchone()[0],
+            "source_watermark": self._get_meta("problems_watermark"),
+            "syncs": self.syncs,
+            "rows_applied": self.rows_applied,
+            "reads": self.reads,
+            "read_misses": self.read_misses,
+            "last_error": self.last_error,
+        }
+
+
+def _is_missing_column(error: Exception) -> bool:
+    """PostgREST: column does not exist (sql/add_replica_sync.sql not applied)"""
+    text = str(error)
+    return "42703" in text or ("updated_at" in text and "does not exist" in text)
+
+
+def _parse_ts(value: str) -> datetime:
+    parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    # timestamptz columns are always offset-aware; treat naive values as UTC
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def _rewind(watermark: Optional[str]) -> Optional[str]:
+    """Watermark minus REPLICA_OVERLAP (rows committed late with older timestamps)"""
+    if not watermark:
+        return None
+    return (_parse_ts(watermark) - timedelta(seconds=REPLICA_OVERLAP)).isoformat()
+
+
+# ============================================
+# 공유 인스턴스 (워커 프로세스당 1개)
+# ============================================
+
+_replica: Optional[ReadReplica] = None
+
+
+def start_replica(client) -> Optional[ReadReplica]:
+    """Create and start the shared replica (no-op if READ_REPLICA_ENABLED is off)"""
+    global _replica
+    if not READ_REPLICA_ENABLED or _replica is not None:
+        return _replica
+
+    _replica = ReadReplica(client)
+    add_invalidation_listener(_replica.forget)
+    _replica.start()
+    return _replica
+
+
+def get_replica() -> Optional[ReadReplica]:
+    return _replica
+
+
+def stop_replica():
+    global _replica
+    if _replica is not None:
+        _replica.stop()
+        _replica = None
+
+
+def get_replica_stats() -> Optional[dict]:
+    return _replica.stats() if _replica else None
@@ -0,0 +1,465 @@
+"""
+Storage Client
+Single entry point for object uploads (problem images, cards, formula images)
+
+- Pluggable backends: Supabase Storage REST, local filesystem
+  (STORAGE_BACKEND=local serves objects from the FastAPI app, no network needed)
+- Pooled keep-alive HTTP session sized to the upload worker count
+- Uniform timeout / retry policy (jittered backoff on 429/5xx)
+- Streaming uploads from file handles (no full read into memory)
+- Per-operation latency metrics
+
+Usage:
+    from src.storage_client import get_storage_client
+
+    storage = get_storage_client()
+    result = storage.upload_bytes(card_bytes, "2026_CSAT_Q01_card.png")
+    result = storage.upload_path("output/2026_CSAT_Q01.png")
+    results = storage.upload_many([(path, remote_path), ...])
+"""
+
+import os
+import time
+import hashlib
+import threading
+from abc import ABC, abstractmethod
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import BinaryIO, List, Optional, Tuple, Union
+
+import requests
+from requests.adapters import HTTPAdapter
+from dotenv import load_dotenv
+
+try:
+    from .http_transport import RETRYABLE_STATUS, backoff_delay as _backoff_delay
+except ImportError:
+    from http_transport import RETRYABLE_STATUS, backoff_delay as _backoff_delay
+
+load_dotenv()
+
+DEFAULT_BUCKET = "problem-images-v2"
+
+# Backend selection: "supabase" (default) or "local" (offline dev / benchmarking)
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "supabase").lower()
+LOCAL_STORAGE_PATH = Path(os.getenv(
+    "LOCAL_STORAGE_PATH", Path(__file__).resolve().parent.parent / "local_storage"))
+# Local objects are served by the FastAPI app under the same path shape as Supabase
+LOCAL_PUBLIC_PREFIX = "/storage/v1/object/public"
+
+# Upload tuning (override via .env)
+UPLOAD_WORKERS = int(os.getenv("STORAGE_UPLOAD_WORKERS", "8"))
+UPLOAD_MAX_RETRIES = int(os.getenv("STORAGE_UPLOAD_RETRIES", "3"))
+UPLOAD_TIMEOUT = float(os.getenv("STORAGE_UPLOAD_TIMEOUT", "30"))
+
+COPY_CHUNK_SIZE = 1024 * 1024  # 1MB
+
+CONTENT_TYPES = {
+    ".png": "image/png",
+    ".jpg": "image/jpeg",
+    ".jpeg": "image/jpeg",
+    ".gif": "image/gif",
+    ".webp": "image/webp",
+    ".pdf": "application/pdf",
+}
+
+Body = Union[bytes, BinaryIO]
+
+
+def guess_content_type(path: Union[str, Path]) -> str:
+    """MIME type from file extension"""
+    return CONTENT_TYPES.get(Path(path).suffix.lower(), "application/octet-stream")
+
+
+# ============================================
+# 메트릭
+# ============================================
+
+class StorageMetrics:
+    """Thread-safe per-operation latency/error counters"""
+
+    WINDOW = 512  # recent samples kept per operation for percentiles
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._ops = {}
+
+    def record(self, op: str, seconds: float, ok: bool, nbytes: int = 0):
+        with self._lock:
+            stats = self._ops.setdefault(op, {
+                "count": 0, "errors": 0, "bytes": 0,
+                "total_ms": 0.0, "max_ms": 0.0,
+                "recent": deque(maxlen=self.WINDOW),
+            })
+            ms = seconds * 1000
+            stats["count"] += 1
+            stats["errors"] += 0 if ok else 1
+            stats["bytes"] += nbytes
+            stats["total_ms"] += ms
+            stats["max_ms"] = max(stats["max_ms"], ms)
+            stats["recent"].append(ms)
+
+    def snapshot(self) -> dict:
+        """Summary per operation: count, errors, bytes, avg/p50/p95/max latency (ms)"""
+        with self._lock:
+            result = {}
+            for op, stats in self._ops.items():
+                recent = sorted(stats["recent"])
+                result[op] = {
+                    "count": stats["count"],
+                    "errors": stats["errors"],
+                    "bytes": stats["bytes"],
+                    "avg_ms": round(stats["total_ms"] / stats["count"], 1) if stats["count"] else 0,
+                    "p50_ms": round(recent[len(recent) // 2], 1) if recent else 0,
+                    "p95_ms": round(recent[min(len(recent) - 1, int(len(recent) * 0.95))], 1) if recent else 0,
+                    "max_ms": round(stats["max_ms"], 1),
+                }
+            return result
+
+
+# ============================================
+# 백엔드
+# ============================================
+
+class StorageBackend(ABC):
+    """Backend contract: put objects and build public URLs"""
+
+    name = "base"
+
+    @abstractmethod
+    def put(self, bucket: str, remote_path: str, body: Body,
+            content_type: str, upsert: bool = True, cache_control: Optional[str] = None) -> dict:
+        """
+        Store an object (cache_control: Cache-Control the object is served with)
+
+        Returns:
+            dict with success, path, optional etag / error / status_code
+        """
+
+    @abstractmethod
+    def public_url(self, bucket: str, remote_path: str) -> str:
+        ...
+
+    def ensure_bucket(self, bucket: str, public: bool = True) -> bool:
+        return True
+
+
+class SupabaseStorageBackend(StorageBackend):
+    """Supabase Storage REST API over a pooled session"""
+
+    name = "supabase"
+
+    def __init__(
+        self,
+        url: Optional[str] = None,
+        service_key: Optional[str] = None,
+        pool_size: int = UPLOAD_WORKERS,
+        timeout: float = UPLOAD_TIMEOUT,
+        max_retries: int = UPLOAD_MAX_RETRIES,
+    ):
+        self.url = url or os.getenv("SUPABASE_URL")
+        self.service_key = service_key or os.getenv("SUPABASE_SERVICE_KEY")
+
+        if not self.url or not self.service_key:
+            raise ValueError("SUPABASE_URL and SUPABASE_SERVICE_KEY required")
+
+        self.timeout = timeout
+        self.max_retries = max_retries
+
+        # Keep-alive session whose connection pool matches the worker count
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def _headers(self, content_type: str = "application/json") -> dict:
+        return {
+            "Authorization": f"Bearer {self.service_key}",
+            "Content-Type": content_type,
+        }
+
+    def _send(self, method: str, url: str, body: Optional[Body] = None, **kwargs) -> requests.Response:
+        """Send with jittered backoff on 429/5xx and connection errors"""
+        # File handles are rewound to their start position before each attempt
+        start = body.tell() if hasattr(body, "read") else None
+
+        for attempt in range(self.max_retries + 1):
+            if start is not None:
+                body.seek(start)
+            try:
+                response = self.session.request(method, url, data=body, timeout=self.timeout, **kwargs)
+            except requests.RequestException:
+                if attempt >= self.max_retries:
+                    raise
+                time.sleep(_backoff_delay(attempt))
+                continue
+
+            if response.status_code not in RETRYABLE_STATUS or attempt >= self.max_retries:
+                return response
+
+            time.sleep(_backoff_delay(attempt, response.headers.get("Retry-After")))
+
+        return response
+
+    def put(self, bucket, remote_path, body, content_type, upsert=True, cache_control=None):
+        upload_url = f"{self.url}/storage/v1/object/{bucket}/{remote_path}"
+        headers = self._headers(content_type)
+        if upsert:
+            headers["x-upsert"] = "true"  # Overwrite if exists
+        if cache_control:
+            headers["cache-control"] = cache_control
+
+        try:
+            response = self._send("POST", upload_url, body, headers=headers)
+        except requests.RequestException as e:
+            return {"success": False, "error": str(e), "path": remote_path}
+
+        if response.status_code in [200, 201]:
+            return {"success": True, "path": remote_path, "etag": response.headers.get("ETag")}
+
+        return {
+            "success": False,
+            "error": response.text,
+            "status_code": response.status_code,
+            "path": remote_path,
+        }
+
+    def public_url(self, bucket, remote_path):
+        return f"{self.url}/storage/v1/object/public/{bucket}/{remote_path}"
+
+    def ensure_bucket(self, bucket, public=True):
+        check_url = f"{self.url}/storage/v1/bucket/{bucket}"
+        response = self._send("GET", check_url, headers=self._headers())
+
+        if response.status_code == 200:
+            return True
+
+        data = {
+            "id": bucket,
+            "name": bucket,
+            "public": public,
+            "file_size_limit": 10485760  # 10MB
+        }
+        response = self.session.post(
+            f"{self.url}/storage/v1/bucket", headers=self._headers(), json=data, timeout=self.timeout
+        )
+
+        if response.status_code in [200, 201]:
+            print(f"Created bucket '{bucket}'")
+            return True
+
+        print(f"Failed to create bucket: {response.text}")
+        return False
+
+
+class LocalStorageBackend(StorageBackend):
+    """
+    Local filesystem backend: {root}/{bucket}/{remote_path}
+
+    public_base_url is prefixed to "{bucket}/{remote_path}" for public URLs;
+    without it, file:// URLs are returned.
+    """
+
+    name = "local"
+
+    def __init__(self, root: Union[str, Path], public_base_url: Optional[str] = None):
+        self.root = Path(root).resolve()
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.public_base_url = public_base_url.rstrip("/") if public_base_url else None
+
+    def _target(self, bucket: str, remote_path: str) -> Path:
+        target = (self.root / bucket / remote_path).resolve()
+        if self.root not in target.parents:
+            raise ValueError(f"Invalid remote path: {remote_path}")
+        return target
+
+    def put(self, bucket, remote_path, body, content_type, upsert=True, cache_control=None):
+        try:
+            target = self._target(bucket, remote_path)
+        except ValueError as e:
+            return {"success": False, "error": str(e), "path": remote_path}
+
+        if target.exists() and not upsert:
+            return {"success": False, "error": "The resource already exists",
+                    "status_code": 409, "path": remote_path}
+
+        target.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = target.with_name(f".{target.name}.{threading.get_ident()}.tmp")
+        digest = hashlib.md5()
+
+        # Stream into a temp file, then rename (readers never see partial files)
+        with open(tmp_path, "wb") as out:
+            if hasattr(body, "read"):
+                for chunk in iter(lambda: body.read(COPY_CHUNK_SIZE), b""):
+                    digest.update(chunk)
+                    out.write(chunk)
+            else:
+                digest.update(body)
+                out.write(body)
+        os.replace(tmp_path, target)
+
+        return {"success": True, "path": remote_path, "etag": f'"{digest.hexdigest()}"'}
+
+    def public_url(self, bucket, remote_path):
+        if self.public_base_url:
+            return f"{self.public_base_url}/{bucket}/{remote_path}"
+        return (self.root / bucket / remote_path).as_uri()
+
+    def ensure_bucket(self, bucket, public=True):
+        (self.root / bucket).mkdir(parents=True, exist_ok=True)
+        return True
+
+
+# ============================================
+# 클라이언트
+# ============================================
+
+class StorageClient:
+    """Backend-agnostic uploads with bounded parallelism and metrics"""
+
+    def __init__(
+        self,
+        backend: StorageBackend,
+        bucket: str = DEFAULT_BUCKET,
+        max_workers: int = UPLOAD_WORKERS,
+    ):
+        self.backend = backend
+        self.bucket = bucket
+        self.max_workers = max_workers
+        self.metrics = StorageMetrics()
+
+    def _timed(self, op: str, fn, nbytes: int = 0) -> dict:
+        start = time.perf_counter()
+        try:
+            result = fn()
+        except Exception as e:
+            self.metrics.record(op, time.perf_counter() - start, False)
+            return {"success": False, "error": str(e)}
+        self.metrics.record(op, time.perf_counter() - start, result.get("success", False),
+                            nbytes if result.get("success") else 0)
+        return result
+
+    def _finish(self, result: dict, bucket: str) -> dict:
+        if result.get("success"):
+            result["url"] = self.backend.public_url(bucket, result["path"])
+        return result
+
+    def upload_bytes(self, data: bytes, remote_path: str, content_type: str = "image/png",
+                     bucket: Optional[str] = None, upsert: bool = True,
+                     cache_control: Optional[str] = None) -> dict:
+        """
+        Upload in-memory bytes
+
+        Returns:
+            dict with success status, public URL, path and ETag
+        """
+        bucket = bucket or self.bucket
+        result = self._timed(
+            "upload",
+            lambda: self.backend.put(bucket, remote_path, data, content_type, upsert, cache_control),
+            len(data),
+        )
+        result.setdefault("path", remote_path)
+        return self._finish(result, bucket)
+
+    def upload_file(self, fileobj: BinaryIO, remote_path: str, content_type: str = "image/png",
+                    bucket: Optional[str] = None, upsert: bool = True, size: int = 0) -> dict:
+        """Stream an open binary file handle (read in chunks, never fully buffered)"""
+        bucket = bucket or self.bucket
+        result = self._timed(
+            "upload",
+            lambda: self.backend.put(bucket, remote_path, fileobj, content_type, upsert),
+            size,
+        )
+        result.setdefault("path", remote_path)
+        return self._finish(result, bucket)
+
+    def upload_path(self, local_path: Union[str, Path], remote_path: Optional[str] = None,
+                    content_type: Optional[str] = None, bucket: Optional[str] = None,
+                    upsert: bool = True) -> dict:
+        """Stream a local file (remote_path defaults to the filename)"""
+        local_path = Path(local_path)
+        if not local_path.exists():
+            return {"success": False, "error": f"File not found: {local_path}"}
+
+        remote_path = remote_path or local_path.name
+        with open(local_path, "rb") as f:
+            return self.upload_file(
+                f, remote_path, content_type or guess_content_type(local_path),
+                bucket=bucket, upsert=upsert, size=local_path.stat().st_size,
+            )
+
+    def upload_many(self, items: List[Tuple[str, Optional[str]]],
+                    bucket: Optional[str] = None) -> List[dict]:
+        """
+        Upload local files concurrently
+
+        Args:
+            items: List of (local_path, remote_path) pairs; remote_path may be None
+
+        Returns:
+            List of upload results, in the same order as items
+        """
+        if not items:
+            return []
+
+        workers = min(self.max_workers, len(items))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            # executor.map preserves input order
+            return list(executor.map(
+                lambda item: self.upload_path(item[0], item[1], bucket=bucket), items
+            ))
+
+    def public_url(self, remote_path: str, bucket: Optional[str] = None) -> str:
+        return self.backend.public_url(bucket or self.bucket, remote_path)
+
+    def ensure_bucket(self, bucket: Optional[str] = None, public: bool = True) -> bool:
+        bucket = bucket or self.bucket
+        result = self._timed(
+            "ensure_bucket",
+            lambda: {"success": self.backend.ensure_bucket(bucket, public)},
+        )
+        return result["success"]
+
+
+# Process-wide instance so every caller shares one connection pool and one set of metrics
+_shared_client: Optional[StorageClient] = None
+_shared_lock = threading.Lock()
+
+
+def create_storage_client(backend: Optional[str] = None) -> StorageClient:
+    """
+    Build a StorageClient for the configured backend
+
+    Args:
+        backend: "supabase" or "local" (default: STORAGE_BACKEND env var)
+    """
+    backend = (backend or STORAGE_BACKEND).lower()
+
+    if backend == "local":
+        base_url = os.getenv("BASE_URL", "http://localhost:8000").rstrip("/")
+        return StorageClient(LocalStorageBackend(
+            LOCAL_STORAGE_PATH, public_base_url=f"{base_url}{LOCAL_PUBLIC_PREFIX}"
+        ))
+    if backend == "supabase":
+        return StorageClient(SupabaseStorageBackend())
+
+    raise ValueError(f"Unknown STORAGE_BACKEND: {backend} (expected 'supabase' or 'local')")
+
+
+def get_storage_client() -> StorageClient:
+    """Return the shared StorageClient (created on first use)"""
+    global _shared_client
+    if _shared_client is None:
+        with _shared_lock:
+            if _shared_client is None:
+                _shared_client = create_storage_client()
+    return _shared_client
+
+
+def get_storage_metrics() -> dict:
+    """Metrics of the shared client ({} if no upload has happened yet)"""
+    if _shared_client is None:
+        return {}
+    return {"backend": _shared_client.backend.name, "operations": _shared_client.metrics.snapshot()}
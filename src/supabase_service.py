@@ -6,25 +6,83 @@ Supabase 연동 서비스
 """
 
 import re
-from typing import Optional
+import json
+import base64
+import threading
+from itertools import islice
+from typing import Iterator, Optional
 from datetime import datetime
 
-from supabase import create_client, Client
-
-from .config import SUPABASE_URL, SUPABASE_KEY
+import httpx
+from supabase import create_client, Client, ClientOptions
+
+try:
+    from .config import SUPABASE_URL, SUPABASE_KEY, SUPABASE_POOL_SIZE, SUPABASE_TIMEOUT, BULK_CHUNK_SIZE
+    from .problem_cache import (
+        MISSING, get_cached_problem, cache_problem,
+        get_cached_hints, cache_hints, invalidate_problem, invalidate_problems,
+        get_cached_stats, cache_stats,
+        get_cached_collection_version, cache_collection_version,
+    )
+except ImportError:
+    from config import SUPABASE_URL, SUPABASE_KEY, SUPABASE_POOL_SIZE, SUPABASE_TIMEOUT, BULK_CHUNK_SIZE
+    from problem_cache import (
+        MISSING, get_cached_problem, cache_problem,
+        get_cached_hints, cache_hints, invalidate_problem, invalidate_problems,
+        get_cached_stats, cache_stats,
+        get_cached_collection_version, cache_collection_version,
+    )
+
+
+# PostgREST 기본 max-rows (요청당 최대 행 수)
+PAGE_SIZE = 1000
+
+# get_hints_for: in.(...) 필터 1회당 문제 수 / 이 이상이면 hints 전체 스캔
+HINTS_IN_CHUNK = 200
+HINTS_FULL_SCAN_MIN = 1000
+# hints 페이지 정렬 키 (problem_id, stage는 문제당 유일)
+HINTS_ORDER = ("problem_id", "stage")
+
+# 문제 목록 조회 컬럼 프로필 (select 절)
+# 키셋 커서 컬럼(problem_id, year, exam, question_no)은 모든 프로필에 포함
+PROBLEM_FIELDS = {
+    # 관리자 문제 그리드 / 목록 API
+    "list": "problem_id,year,exam,question_no,score,subject,unit,status,"
+            "answer,problem_image_url,notion_page_id",
+    # 대시보드 집계 / 공개 스케줄
+    "admin": "problem_id,year,exam,question_no,status,score,score_verified,"
+             "answer,answer_verified,problem_image_url,difficulty,subject,unit,"
+             "published_at,hint_interval_hours",
+    # 완성도·무결성 검증 (extract_text 제외)
+    "integrity": "problem_id,year,exam,question_no,status,score,score_verified,"
+                 "answer,answer_verified,problem_image_url,subject,unit,solution",
+    # Notion 동기화 등 전체 컬럼
+    "full": "*",
+}
 
 
 class SupabaseService:
     """Supabase 데이터베이스 서비스"""
 
-    def __init__(self, url: Optional[str] = None, key: Optional[str] = None):
+    def __init__(
+        self,
+        url: Optional[str] = None,
+        key: Optional[str] = None,
+        client: Optional[Client] = None,
+    ):
         """
         Args:
             url: Supabase 프로젝트 URL
             key: Supabase anon key
+            client: 이미 생성된 Client (공유 클라이언트 재사용 시)
         """
         self.url = url or SUPABASE_URL
         self.key = key or SUPABASE_KEY
+
+        if client is not None:
+            self.client = client
+            return
+
         self.client: Client = create_client(self.url, self.key)
 
         print("Supabase 연결 성공!")
@@ -52,6 +110,7 @@ class SupabaseService:
             생성된 문제 데이터
         """
         response = self.client.table("problems").insert(problem_data).execute()
+        invalidate_problem(problem_data.get("problem_id"))
 
         if response.data:
             print(f"문제 생성: {problem_data.get('problem_id')}")
@@ -72,10 +131,19 @@ class SupabaseService:
         # updated_at 갱신
         problem_data["updated_at"] = datetime.now().isoformat()
 
-        response = self.client.table("problems").upsert(
-            problem_data,
-            on_conflict="problem_id"
-        ).execute()
+        try:
+            response = self.client.table("problems").upsert(
+                _fit_variants_column(problem_data),
+                on_conflict="problem_id"
+            ).execute()
+        except Exception as e:
+            if not _note_missing_variants_column(e):
+                raise
+            response = self.client.table("problems").upsert(
+                _fit_variants_column(problem_data),
+                on_conflict="problem_id"
+            ).execute()
+        invalidate_problem(problem_data.get("problem_id"))
 
         if response.data:
             print(f"문제 upsert: {problem_data.get('problem_id')}")
@@ -84,39 +152,55 @@ class SupabaseService:
         return None
 
     def get_problem(self, problem_id: str) -> Optional[dict]:
-        """문제 조회"""
+        """문제 조회 (캐시 우선)"""
+        cached = get_cached_problem(problem_id)
+        if cached is not MISSING:
+            return cached
+
         response = self.client.table("problems") \
             .select("*") \
             .eq("problem_id", problem_id) \
             .single() \
             .execute()
 
+        cache_problem(problem_id, response.data)
         return response.data
 
-    def get_problems_by_filter(
+    def get_problems_page(
         self,
         year: Optional[int] = None,
         exam: Optional[str] = None,
         status: Optional[str] = None,
         subject: Optional[str] = None,
         score: Optional[int] = None,
-        limit: int = 500,
-    ) -> list:
+        fields: str = "list",
+        limit: int = 50,
+        cursor: Optional[str] = None,
+    ) -> dict:
         """
-        조건별 문제 목록 조회
+        문제 목록 한 페이지 조회 (키셋 페이지네이션)
+
+        Rows are ordered by (year DESC, exam, question_no, problem_id) and the
+        next page starts strictly after the last row of this one, so each page
+        is an index range scan regardless of how deep it is.
 
         Args:
-            year: 연도 필터
-            exam: 시험 유형 필터 (CSAT, KICE6, KICE9)
-            status: 상태 필터 (needs_review, ready, hold, inactive)
-            subject: 과목 필터 (Math1, Math2)
-            score: 난이도 필터 (2, 3, 4점)
-            limit: 최대 결과 수
+            year/exam/status/subject/score: 필터
+            fields: 컬럼 프로필 (list, admin, integrity, full)
+            limit: 페이지 크기 (최대 PAGE_SIZE)
+            cursor: 이전 페이지의 next_cursor
 
         Returns:
-            문제 목록
+            {"problems": [...], "next_cursor": str | None}
+
+        Raises:
+            ValueError: 알 수 없는 프로필 또는 잘못된 커서
         """
-        query = self.client.table("problems").select("*")
+        if fields not in PROBLEM_FIELDS:
+            raise ValueError(f"Unknown fields profile: {fields} (use {', '.join(PROBLEM_FIELDS)})")
+        limit = max(1, min(limit, PAGE_SIZE))
+
+        query = self.client.table("problems").select(PROBLEM_FIELDS[fields])
 
         if year:
             query = query.eq("year", year)
@@ -128,22 +212,90 @@ class SupabaseService:
             query = query.eq("subject", subject)
         if score:
             query = query.eq("score", score)
+        if cursor:
+            query = query.or_(_keyset_after(*_decode_cursor(cursor)))
 
         response = query.order("year", desc=True) \
             .order("exam") \
             .order("question_no") \
+            .order("problem_id") \
             .limit(limit) \
             .execute()
 
-        return response.data
+        rows = response.data or []
+        next_cursor = _encode_cursor(rows[-1]) if len(rows) == limit else None
+        return {"problems": rows, "next_cursor": next_cursor}
+
+    def iter_problems(
+        self,
+        year: Optional[int] = None,
+        exam: Optional[str] = None,
+        status: Optional[str] = None,
+        subject: Optional[str] = None,
+        score: Optional[int] = None,
+        fields: str = "list",
+        page_size: int = PAGE_SIZE,
+    ) -> Iterator[dict]:
+        """
+        조건에 맞는 모든 문제를 페이지 단위로 순회 (개수 제한 없음)
+
+        Args:
+            year/exam/status/subject/score: 필터
+            fields: 컬럼 프로필 (list, admin, integrity, full)
+            page_size: 요청당 행 수
 
-    def get_problems_to_review(self) -> list:
+        Yields:
+            문제 행 (year DESC, exam, question_no 순)
+        """
+        cursor = None
+        while True:
+            page = self.get_problems_page(
+                year=year, exam=exam, status=status, subject=subject, score=score,
+                fields=fields, limit=page_size, cursor=cursor,
+            )
+            yield from page["problems"]
+            cursor = page["next_cursor"]
+            if not cursor:
+                return
+
+    def get_problems_by_filter(
+        self,
+        year: Optional[int] = None,
+        exam: Optional[str] = None,
+        status: Optional[str] = None,
+        subject: Optional[str] = None,
+        score: Optional[int] = None,
+        limit: Optional[int] = None,
+        fields: str = "full",
+    ) -> list:
+        """
+        조건별 문제 목록 조회
+
+        Args:
+            year: 연도 필터
+            exam: 시험 유형 필터 (CSAT, KICE6, KICE9)
+            status: 상태 필터 (needs_review, ready, hold, inactive)
+            subject: 과목 필터 (Math1, Math2)
+            score: 난이도 필터 (2, 3, 4점)
+            limit: 최대 결과 수 (None이면 전체)
+            fields: 컬럼 프로필 (list, admin, integrity, full)
+
+        Returns:
+            문제 목록
+        """
+        problems = self.iter_problems(
+            year=year, exam=exam, status=status, subject=subject, score=score,
+            fields=fields, page_size=min(limit, PAGE_SIZE) if limit else PAGE_SIZE,
+        )
+        return list(islice(problems, limit)) if limit else list(problems)
+
+    def get_problems_to_review(self, fields: str = "list") -> list:
         """검수 필요한 문제 목록"""
-        return self.get_problems_by_filter(status="needs_review")
+        return list(self.iter_problems(status="needs_review", fields=fields))
 
-    def get_ready_problems(self) -> list:
+    def get_ready_problems(self, fields: str = "list") -> list:
         """발송 가능한 문제 목록"""
-        return self.get_problems_by_filter(status="ready")
+        return list(self.iter_problems(status="ready", fields=fields))
 
     def update_problem(self, problem_id: str, update_data: dict) -> dict:
         """
@@ -162,6 +314,7 @@ class SupabaseService:
             .update(update_data) \
             .eq("problem_id", problem_id) \
             .execute()
+        invalidate_problem(problem_id)
 
         if response.data:
             print(f"문제 업데이트: {problem_id}")
@@ -255,6 +408,7 @@ class SupabaseService:
             hint_data,
             on_conflict="problem_id,stage"
         ).execute()
+        invalidate_problem(problem_id)
 
         if response.data:
             print(f"힌트 생성: {problem_id} 단계 {stage}")
@@ -263,15 +417,264 @@ class SupabaseService:
         return None
 
     def get_hints(self, problem_id: str) -> list:
-        """문제의 힌트 목록 조회"""
+        """문제의 힌트 목록 조회 (캐시 우선)"""
+        cached = get_cached_hints(problem_id)
+        if cached is not MISSING:
+            return cached
+
         response = self.client.table("hints") \
             .select("*") \
             .eq("problem_id", problem_id) \
             .order("stage") \
             .execute()
 
+        cache_hints(problem_id, response.data)
         return response.data
 
+    def get_hints_for(self, problem_ids: list) -> dict:
+        """
+        여러 문제의 힌트를 한 번에 조회 (N+1 쿼리 방지)
+
+        Up to HINTS_FULL_SCAN_MIN problems are fetched with chunked
+        `problem_id=in.(...)` filters; beyond that one paged scan of the whole
+        hints table is cheaper. Cached hint sets are reused and refreshed.
+
+        Args:
+            problem_ids: 문제 ID 목록
+
+        Returns:
+            {problem_id: [hint, ...] (stage 순)} - 힌트 없는 문제는 []
+        """
+        ids = list(dict.fromkeys(problem_ids))
+        result = {pid: [] for pid in ids}
+
+        missing = []
+        for pid in ids:
+            cached = get_cached_hints(pid)
+            if cached is MISSING:
+                missing.append(pid)
+            else:
+                result[pid] = cached
+
+        if not missing:
+            return result
+
+        if len(missing) >= HINTS_FULL_SCAN_MIN:
+            wanted = set(missing)
+            rows = [
+                h for h in self._select_all(lambda: self.client.table("hints").select("*"), HINTS_ORDER)
+                if h.get("problem_id") in wanted
+            ]
+        else:
+            rows = []
+            for i in range(0, len(missing), HINTS_IN_CHUNK):
+                chunk = missing[i:i + HINTS_IN_CHUNK]
+                rows.extend(self._select_all(
+                    lambda: self.client.table("hints").select("*").in_("problem_id", chunk), HINTS_ORDER
+                ))
+
+        for hint in sorted(rows, key=lambda h: h.get("stage") or 0):
+            result[hint["problem_id"]].append(hint)
+        for pid in missing:
+            cache_hints(pid, result[pid])
+
+        return result
+
+    def _select_all(self, make_query, order: tuple) -> list:
+        """
+        Page through a select with range() until a short page (PostgREST max-rows)
+
+        Args:
+            make_query: 페이지마다 새 select 쿼리를 만드는 함수
+            order: 정렬 컬럼 (유일 키여야 페이지 사이 누락/중복 없음)
+        """
+        rows, start = [], 0
+        while True:
+            query = make_query()
+            for column in order:
+                query = query.order(column)
+            page = query.range(start, start + PAGE_SIZE - 1).execute().data or []
+            rows.extend(page)
+            if len(page) < PAGE_SIZE:
+                return rows
+            start += PAGE_SIZE
+
+    # ============================================
+    # 일괄 쓰기 (Bulk)
+    # ============================================
+
+    def bulk_upsert(
+        self,
+        table: str,
+        rows: list,
+        on_conflict: str = "problem_id",
+        chunk_size: int = BULK_CHUNK_SIZE,
+    ) -> dict:
+        """
+        여러 행을 청크 단위 multi-row upsert로 저장
+
+        Rows are grouped by column set first: PostgREST fills columns missing
+        from a row with NULL in a multi-row upsert.
+        A failed chunk is retried row by row to isolate the bad rows.
+
+        Args:
+            table: 테이블 이름
+            rows: 저장할 행 목록
+            on_conflict: 충돌 기준 컬럼 (쉼표 구분)
+            chunk_size: 요청당 최대 행 수
+
+        Returns:
+            {"success", "total", "written", "errors": [{<key>: ..., "error": ...}], "requests"}
+        """
+        key = on_conflict.split(",")[0]
+        result = {"total": len(rows), "written": 0, "errors": [], "requests": 0}
+
+        for group in _group_by(rows, lambda r: tuple(sorted(r))):
+            for chunk in _chunks(group, chunk_size):
+                result["requests"] += 1
+                try:
+                    self.client.table(table).upsert(chunk, on_conflict=on_conflict).execute()
+                    result["written"] += len(chunk)
+                    continue
+                except Exception as e:
+                    if len(chunk) == 1:
+                        result["errors"].append({key: chunk[0].get(key), "error": str(e)[:200]})
+                        continue
+
+                for row in chunk:
+                    result["requests"] += 1
+                    try:
+                        self.client.table(table).upsert(row, on_conflict=on_conflict).execute()
+                        result["written"] += 1
+                    except Exception as e:
+                        result["errors"].append({key: row.get(key), "error": str(e)[:200]})
+
+        result["success"] = not result["errors"]
+        return result
+
+    def bulk_update(
+        self,
+        table: str,
+        rows: list,
+        key: str = "problem_id",
+        chunk_size: int = BULK_CHUNK_SIZE,
+    ) -> dict:
+        """
+        기존 행 일괄 업데이트 (행마다 다른 값 가능, 없는 행은 "not found" 오류)
+
+        Uses the bulk_update_rows RPC (sql/bulk_update_rows.sql): one request
+        per chunk with per-row results. Without the RPC, rows sharing the same
+        values are updated together with `in.(...)` filters.
+
+        Args:
+            table: 테이블 이름 (problems, hints, users)
+            rows: 업데이트할 행 목록 (각 행에 key 컬럼 포함)
+            key: 행 식별 컬럼
+            chunk_size: 요청당 최대 행 수
+
+        Returns:
+            {"success", "total", "written", "errors": [{<key>: ..., "error": ...}], "requests"}
+        """
+        result = {"total": len(rows), "written": 0, "errors": [], "requests": 0}
+
+        for i, chunk in enumerate(_chunks(rows, chunk_size)):
+            result["requests"] += 1
+            try:
+                response = self.client.rpc("bulk_update_rows", {
+                    "p_table": table, "p_key": key, "p_rows": chunk,
+                }).execute()
+            except Exception as e:
+                if i == 0 and _is_missing_function(e):
+                    print("  [Bulk] bulk_update_rows RPC 없음 - 그룹 업데이트로 대체 (sql/bulk_update_rows.sql)")
+                    return self._bulk_update_grouped(table, rows, key, chunk_size)
+                result["errors"].extend({key: r.get(key), "error": str(e)[:200]} for r in chunk)
+                continue
+
+            reported = set()
+            for row in response.data or []:
+                reported.add(row.get("key"))
+                if row.get("ok"):
+                    result["written"] += 1
+                else:
+                    result["errors"].append({key: row.get("key"), "error": row.get("error")})
+            result["errors"].extend(
+                {key: r.get(key), "error": "no result"} for r in chunk if str(r.get(key)) not in reported
+            )
+
+        result["success"] = not result["errors"]
+        return result
+
+    def _bulk_update_grouped(self, table: str, rows: list, key: str, chunk_size: int) -> dict:
+        """RPC fallback: one `update ... where key in (...)` per distinct value set"""
+        result = {"total": len(rows), "written": 0, "errors": [], "requests": 0}
+
+        def values_of(row):
+            return {k: v for k, v in row.items() if k != key}
+
+        for group in _group_by(rows, lambda r: json.dumps(values_of(r), sort_keys=True, default=str)):
+            values = values_of(group[0])
+            for chunk in _chunks(group, chunk_size):
+                ids = [r[key] for r in chunk]
+                result["requests"] += 1
+                try:
+                    response = self.client.table(table).update(values).in_(key, ids).execute()
+                except Exception as e:
+                    result["errors"].extend({key: pid, "error": str(e)[:200]} for pid in ids)
+                    continue
+
+                found = {r.get(key) for r in response.data or []}
+                for pid in ids:
+                    if pid in found:
+                        result["written"] += 1
+                    else:
+                        result["errors"].append({key: pid, "error": "not found"})
+
+        result["success"] = not result["errors"]
+        return result
+
+    def bulk_upsert_problems(self, problems: list, chunk_size: int = BULK_CHUNK_SIZE) -> dict:
+        """
+        문제 일괄 upsert (problem_id 기준, updated_at 갱신 + 캐시 무효화)
+
+        Rows that failed only because image_variants does not exist yet are
+        retried without it (see _fit_variants_column).
+        """
+        now = datetime.now().isoformat()
+        rows = [_fit_variants_column({**p, "updated_at": now}) for p in problems]
+
+        result = self.bulk_upsert("problems", rows, on_conflict="problem_id", chunk_size=chunk_size)
+        missing = {e["problem_id"] for e in result["errors"] if _note_missing_variants_column(e["error"])}
+        if missing:
+            retry = self.bulk_upsert(
+                "problems",
+                [_fit_variants_column(r) for r in rows if r.get("problem_id") in missing],
+                on_conflict="problem_id", chunk_size=chunk_size,
+            )
+            result["written"] += retry["written"]
+            result["requests"] += retry["requests"]
+            result["errors"] = [e for e in result["errors"] if e["problem_id"] not in missing] + retry["errors"]
+            result["success"] = not result["errors"]
+        invalidate_problems([row.get("problem_id") for row in rows])
+
+        print(f"문제 일괄 upsert: {result['written']}/{result['total']} ({result['requests']} requests)")
+        return result
+
+    def bulk_update_problems(self, updates: list, chunk_size: int = BULK_CHUNK_SIZE) -> dict:
+        """
+        문제 일괄 업데이트
+
+        Args:
+            updates: [{"problem_id": ..., <컬럼>: <값>, ...}, ...]
+        """
+        now = datetime.now().isoformat()
+        rows = [{**u, "updated_at": now} for u in updates]
+
+        result = self.bulk_update("problems", rows, key="problem_id", chunk_size=chunk_size)
+        invalidate_problems([row.get("problem_id") for row in rows])
+
+        print(f"문제 일괄 업데이트: {result['written']}/{result['total']} ({result['requests']} requests)")
+        return result
+
     # ============================================
     # 처리 이력 관리
     # ============================================
@@ -304,41 +707,99 @@ class SupabaseService:
     # 통계
     # ============================================
 
-    def get_stats(self) -> dict:
-        """문제 통계 조회"""
-        all_problems = self.client.table("problems") \
-            .select("status, year, exam") \
+    def get_collection_version(self, refresh: bool = False) -> str:
+        """
+        문제 컬렉션 버전 (목록/통계 응답의 ETag 원천)
+
+        "<row count>:<max(updated_at)>" from one single-row query. Every
+        UPDATE bumps updated_at (trigger in sql/add_replica_sync.sql), inserts
+        raise the maximum and deletes change the count, so the version moves
+        whenever a listing could. Cached for COLLECTION_VERSION_TTL seconds and
+        dropped on any problem write from this service.
+
+        Args:
+            refresh: True면 캐시 무시하고 다시 조회
+        """
+        if not refresh:
+            cached = get_cached_collection_version()
+            if cached is not MISSING:
+                return cached
+
+        response = self.client.table("problems") \
+            .select("updated_at", count="exact") \
+            .order("updated_at", desc=True, nullsfirst=False) \
+            .limit(1) \
             .execute()
 
+        latest = response.data[0]["updated_at"] if response.data else None
+        version = f"{response.count or 0}:{latest}"
+        cache_collection_version(version)
+        return version
+
+    def get_stats(self, refresh: bool = False, version: Optional[str] = None) -> dict:
+        """
+        문제 통계 조회 (DB 집계 + STATS_CACHE_TTL 캐시)
+
+        Counts come pre-grouped by (year, exam, status) from the
+        problem_status_counts() RPC (sql/problem_status_counts.sql), so the
+        payload depends on the number of groups, not problems.
+
+        Args:
+            refresh: True면 캐시 무시하고 다시 집계
+            version: 컬렉션 버전 (주면 버전별로 캐시 -> 버전이 바뀐 뒤 이전 집계를 돌려주지 않음)
+        """
+        cache_key = f"problems@{version}" if version else "problems"
+        if not refresh:
+            cached = get_cached_stats(cache_key)
+            if cached is not MISSING:
+                return cached
+
+        try:
+            groups = self.client.rpc("problem_status_counts", {}).execute().data or []
+        except Exception as e:
+            if not _is_missing_function(e):
+                raise
+            # 함수 미설치: 집계 컬럼만 problem_id 순으로 페이지 단위로 받아 Python에서 집계
+            groups = [
+                {**p, "count": 1}
+                for p in self._select_all(
+                    lambda: self.client.table("problems").select("problem_id,status,year,exam"), ("problem_id",)
+                )
+            ]
+
         stats = {
-            "total": len(all_problems.data),
+            "total": 0,
             "by_status": {},
             "by_year": {},
             "by_exam": {},
             "by_year_status": {},
         }
 
-        for problem in all_problems.data:
+        for group in groups:
+            count = group["count"]
+            stats["total"] += count
+
             # 상태별
-            status = problem.get("status", "unknown")
-            stats["by_status"][status] = stats["by_status"].get(status, 0) + 1
+            status = group.get("status", "unknown")
+            stats["by_status"][status] = stats["by_status"].get(status, 0) + count
 
             # 연도별
-            year = problem.get("year")
+            year = group.get("year")
             if year:
-                stats["by_year"][year] = stats["by_year"].get(year, 0) + 1
+                stats["by_year"][year] = stats["by_year"].get(year, 0) + count
 
                 # 연도별 상태 breakdown
                 if year not in stats["by_year_status"]:
                     stats["by_year_status"][year] = {"total": 0}
-                stats["by_year_status"][year]["total"] += 1
-                stats["by_year_status"][year][status] = stats["by_year_status"][year].get(status, 0) + 1
+                stats["by_year_status"][year]["total"] += count
+                stats["by_year_status"][year][status] = stats["by_year_status"][year].get(status, 0) + count
 
             # 시험별
-            exam = problem.get("exam")
+            exam = group.get("exam")
             if exam:
-                stats["by_exam"][exam] = stats["by_exam"].get(exam, 0) + 1
+                stats["by_exam"][exam] = stats["by_exam"].get(exam, 0) + count
 
+        cache_stats(stats, cache_key)
         return stats
 
     def print_stats(self):
@@ -365,10 +826,217 @@ class SupabaseService:
         print("=" * 50)
 
 
+# ============================================
+# 프로세스 공유 클라이언트
+# ============================================
+
+class PoolStats:
+    """HTTP 연결 풀 사용량 카운터"""
+
+    def __init__(self, max_connections: int):
+        self._lock = threading.Lock()
+        self.max_connections = max_connections
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.requests_total = 0
+        self.errors_total = 0
+
+    def enter(self):
+        with self._lock:
+            self.in_flight += 1
+            self.requests_total += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+
+    def exit(self, error: bool = False):
+        with self._lock:
+            self.in_flight -= 1
+            if error:
+                self.errors_total += 1
+
+
+class _InstrumentedTransport(httpx.BaseTransport):
+    """httpx transport wrapper that records pool utilization"""
+
+    def __init__(self, inner: httpx.HTTPTransport, stats: PoolStats):
+        self.inner = inner
+        self.stats = stats
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        self.stats.enter()
+        try:
+            response = self.inner.handle_request(request)
+        except Exception:
+            self.stats.exit(error=True)
+            raise
+        self.stats.exit()
+        return response
+
+    def open_connections(self) -> int:
+        pool = getattr(self.inner, "_pool", None)
+        return len(getattr(pool, "connections", []) or [])
+
+    def close(self):
+        self.inner.close()
+
+
+_shared_service: Optional[SupabaseService] = None
+_shared_transport: Optional[_InstrumentedTransport] = None
+_shared_http: Optional[httpx.Client] = None
+_shared_lock = threading.Lock()
+
+# False once a write found no image_variants column (sql/add_image_variants.sql not applied)
+_variants_column = True
+
+
+def _encode_cursor(row: dict) -> str:
+    """Opaque keyset cursor for the row a page ended on"""
+    key = [row["year"], row["exam"], row["question_no"], row["problem_id"]]
+    return base64.urlsafe_b64encode(json.dumps(key).encode()).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> tuple:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        year, exam, question_no, problem_id = json.loads(base64.urlsafe_b64decode(padded))
+        return int(year), str(exam), int(question_no), str(problem_id)
+    except (ValueError, TypeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+
+def _keyset_after(year: int, exam: str, question_no: int, problem_id: str) -> str:
+    """PostgREST or=() filter: rows after the cursor in (year DESC, exam, question_no, problem_id)"""
+    exam_q = json.dumps(exam)
+    pid_q = json.dumps(problem_id)
+    return (
+        f"year.lt.{year},"
+        f"and(year.eq.{year},exam.gt.{exam_q}),"
+        f"and(year.eq.{year},exam.eq.{exam_q},question_no.gt.{question_no}),"
+        f"and(year.eq.{year},exam.eq.{exam_q},question_no.eq.{question_no},problem_id.gt.{pid_q})"
+    )
+
+
+def _chunks(items: list, size: int):
+    size = max(1, size)
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+def _group_by(items: list, key_fn) -> list:
+    """Group items by key_fn, keeping first-seen order"""
+    groups = {}
+    for item in items:
+        groups.setdefault(key_fn(item), []).append(item)
+    return list(groups.values())
+
+
+def _fit_variants_column(row: dict) -> dict:
+    """
+    image_variants를 DB 스키마에 맞춤
+
+    Rows carry image_variants explicitly (None when no derivatives were
+    built, which clears a stale manifest on re-upload). Until
+    sql/add_image_variants.sql is applied the column does not exist and the
+    key is dropped instead.
+    """
+    if _variants_column or "image_variants" not in row:
+        return row
+    return {k: v for k, v in row.items() if k != "image_variants"}
+
+
+def _note_missing_variants_column(error) -> bool:
+    """Unknown image_variants column error? (remembered: later writes leave the key out)"""
+    global _variants_column
+    text = str(error)
+    if "image_variants" not in text or not ("PGRST204" in text or "42703" in text or "does not exist" in text):
+        return False
+    if _variants_column:
+        print("  [Supabase] image_variants 컬럼 없음 - 제외하고 저장 (sql/add_image_variants.sql)")
+        _variants_column = False
+    return True
+
+
+def _is_missing_function(error: Exception) -> bool:
+    """PostgREST: RPC not found (function not created yet)"""
+    text = str(error)
+    return "PGRST202" in text or "Could not find the function" in text
+
+
+def _create_pooled_client() -> Client:
+    """Supabase Client whose PostgREST calls share one sized httpx pool"""
+    global _shared_transport, _shared_http
+
+    limits = httpx.Limits(
+        max_connections=SUPABASE_POOL_SIZE,
+        max_keepalive_connections=SUPABASE_POOL_SIZE,
+    )
+    _shared_transport = _InstrumentedTransport(
+        httpx.HTTPTransport(limits=limits, http2=False),
+        PoolStats(SUPABASE_POOL_SIZE),
+    )
+    _shared_http = httpx.Client(transport=_shared_transport, timeout=SUPABASE_TIMEOUT)
+
+    try:
+        options = ClientOptions(httpx_client=_shared_http)
+    except TypeError:
+        # supabase-py without httpx_client support: default pool
+        print("[Supabase] httpx_client option unsupported; using default connection pool")
+        options = ClientOptions()
+
+    return create_client(SUPABASE_URL, SUPABASE_KEY, options=options)
+
+
+def init_shared_service() -> SupabaseService:
+    """
+    프로세스 공유 SupabaseService 생성 (FastAPI lifespan에서 1회 호출)
+
+    Returns:
+        공유 SupabaseService
+    """
+    global _shared_service
+    with _shared_lock:
+        if _shared_service is None:
+            _shared_service = SupabaseService(client=_create_pooled_client())
+            print(f"Supabase 연결 성공! (공유 클라이언트, pool={SUPABASE_POOL_SIZE})")
+    return _shared_service
+
+
+def get_shared_service() -> SupabaseService:
+    """공유 SupabaseService 반환 (없으면 생성)"""
+    if _shared_service is None:
+        return init_shared_service()
+    return _shared_service
+
+
+def close_shared_service():
+    """공유 클라이언트의 HTTP 연결 정리 (lifespan 종료 시)"""
+    global _shared_service, _shared_transport, _shared_http
+    with _shared_lock:
+        if _shared_http is not None:
+            _shared_http.close()
+        _shared_service = None
+        _shared_transport = None
+        _shared_http = None
+
+
+def get_pool_stats() -> dict:
+    """공유 클라이언트 연결 풀 사용량 ({} if not initialized)"""
+    if _shared_transport is None:
+        return {}
+    stats = _shared_transport.stats
+    return {
+        "max_connections": stats.max_connections,
+        "open_connections": _shared_transport.open_connections(),
+        "in_flight": stats.in_flight,
+        "peak_in_flight": stats.peak_in_flight,
+        "requests_total": stats.requests_total,
+        "errors_total": stats.errors_total,
+    }
+
+
 # 편의 함수
 def get_supabase_service() -> SupabaseService:
-    """SupabaseService 인스턴스 반환"""
-    return SupabaseService()
+    """공유 SupabaseService 인스턴스 반환"""
+    return get_shared_service()
 
 
 if __name__ == "__main__":
@@ -4,56 +4,51 @@ Uploads images to Supabase Storage for direct public URLs
 """
 
 import os
-import requests
 from pathlib import Path
+from typing import List, Optional, Tuple
 from dotenv import load_dotenv
 
+try:
+    from .storage_client import StorageClient, get_storage_client, guess_content_type
+    from .upload_manifest import UploadManifest, file_sha256
+    from .image_variants import build_many as build_variants_many
+except ImportError:
+    from storage_client import StorageClient, get_storage_client, guess_content_type
+    from upload_manifest import UploadManifest, file_sha256
+    from image_variants import build_many as build_variants_many
+
 load_dotenv()
 
 
 class SupabaseStorageService:
     """Upload and manage files in Supabase Storage"""
 
-    def __init__(self):
-        self.url = os.getenv("SUPABASE_URL")
-        self.service_key = os.getenv("SUPABASE_SERVICE_KEY")
-        self.bucket_name = "problem-images-v2"
-
-        if not self.url or not self.service_key:
-            raise ValueError("SUPABASE_URL and SUPABASE_SERVICE_KEY required")
+    def __init__(self, client: Optional[StorageClient] = None):
+        """
+        Args:
+            client: StorageClient to use (default: shared process-wide client)
+        """
+        self.client = client or get_storage_client()
+        self.bucket_name = self.client.bucket
+        self.max_workers = self.client.max_workers
 
     def create_bucket_if_not_exists(self) -> bool:
         """Create storage bucket if it doesn't exist"""
-        headers = {
-            "Authorization": f"Bearer {self.service_key}",
-            "Content-Type": "application/json"
-        }
-
-        # Check if bucket exists
-        check_url = f"{self.url}/storage/v1/bucket/{self.bucket_name}"
-        response = requests.get(check_url, headers=headers)
-
-        if response.status_code == 200:
-            print(f"Bucket '{self.bucket_name}' already exists")
-            return True
-
-        # Create bucket
-        create_url = f"{self.url}/storage/v1/bucket"
-        data = {
-            "id": self.bucket_name,
-            "name": self.bucket_name,
-            "public": True,
-            "file_size_limit": 10485760  # 10MB
-        }
-
-        response = requests.post(create_url, headers=headers, json=data)
-
-        if response.status_code in [200, 201]:
-            print(f"Created bucket '{self.bucket_name}'")
-            return True
-        else:
-            print(f"Failed to create bucket: {response.text}")
-            return False
+        return self.client.ensure_bucket(self.bucket_name)
+
+    def upload_bytes(self, data: bytes, remote_path: str, content_type: str = "image/png") -> dict:
+        """
+        Upload in-memory bytes to Supabase Storage
+
+        Args:
+            data: File content
+            remote_path: Path in bucket
+            content_type: MIME type
+
+        Returns:
+            dict with success status and public URL
+        """
+        return self.client.upload_bytes(data, remote_path, content_type)
 
     def upload_image(self, local_path: str, remote_path: str = None) -> dict:
         """
@@ -66,64 +61,34 @@ class SupabaseStorageService:
         Returns:
             dict with success status and public URL
         """
-        local_path = Path(local_path)
-
-        if not local_path.exists():
-            return {"success": False, "error": f"File not found: {local_path}"}
-
-        # Use filename if no remote path specified
-        if not remote_path:
-            remote_path = local_path.name
-
-        # Determine content type
-        ext = local_path.suffix.lower()
-        content_types = {
-            ".png": "image/png",
-            ".jpg": "image/jpeg",
-            ".jpeg": "image/jpeg",
-            ".gif": "image/gif",
-            ".webp": "image/webp"
-        }
-        content_type = content_types.get(ext, "application/octet-stream")
-
-        # Upload file
-        upload_url = f"{self.url}/storage/v1/object/{self.bucket_name}/{remote_path}"
-
-        headers = {
-            "Authorization": f"Bearer {self.service_key}",
-            "Content-Type": content_type,
-            "x-upsert": "true"  # Overwrite if exists
-        }
-
-        with open(local_path, "rb") as f:
-            file_data = f.read()
-
-        response = requests.post(upload_url, headers=headers, data=file_data)
-
-        if response.status_code in [200, 201]:
-            # Generate public URL
-            public_url = f"{self.url}/storage/v1/object/public/{self.bucket_name}/{remote_path}"
-            return {
-                "success": True,
-                "url": public_url,
-                "path": remote_path
-            }
-        else:
-            return {
-                "success": False,
-                "error": response.text,
-                "status_code": response.status_code
-            }
+        return self.client.upload_path(local_path, remote_path, guess_content_type(local_path))
 
-    def upload_problem_images(self, output_dir: str = "./output") -> list:
+    def upload_many(self, items: List[Tuple[str, Optional[str]]]) -> List[dict]:
+        """
+        Upload files concurrently over the pooled session
+
+        Args:
+            items: List of (local_path, remote_path) pairs; remote_path may be None
+
+        Returns:
+            List of upload results, in the same order as items
+        """
+        return self.client.upload_many(items)
+
+    def upload_problem_images(self, output_dir: str = "./output", force: bool = False) -> list:
         """
         Upload all problem images from output directory
 
+        Files whose content is unchanged since the last successful upload
+        (per upload_manifest.json in output_dir) are skipped.
+
         Args:
             output_dir: Directory containing problem images
+            force: Ignore the manifest and re-upload everything
 
         Returns:
-            List of upload results
+            List of upload results (skipped files have "skipped": True; successful
+            ones carry "image_variants", None if generating them failed)
         """
         output_path = Path(output_dir)
 
@@ -138,37 +103,94 @@ class SupabaseStorageService:
             print("No PNG images found")
             return []
 
-        print(f"Found {len(images)} images to upload")
-
-        # Create bucket first
-        self.create_bucket_if_not_exists()
-
-        results = []
-        for idx, img_path in enumerate(images, 1):
-            print(f"Uploading [{idx}/{len(images)}]: {img_path.name}")
+        manifest = UploadManifest.load(output_path)
+
+        # Split into unchanged (skip) and new/changed (upload)
+        results = [None] * len(images)
+        pending = []  # (index, key, sha256, size)
+        bytes_saved = 0
+
+        for idx, img_path in enumerate(images):
+            key = manifest.key_for(img_path)
+            sha256 = file_sha256(img_path)
+            size = img_path.stat().st_size
+            remote_path = img_path.name
+
+            if not force and manifest.is_current(key, sha256, remote_path):
+                bytes_saved += size
+                results[idx] = {
+                    "success": True,
+                    "skipped": True,
+                    "url": self.get_public_url(remote_path),
+                    "path": remote_path,
+                }
+            else:
+                pending.append((idx, key, sha256, size))
+
+        print(f"Found {len(images)} images: {len(pending)} to upload, "
+              f"{len(images) - len(pending)} unchanged")
+
+        if pending:
+            # Create bucket first
+            self.create_bucket_if_not_exists()
+            print(f"Uploading with {min(self.max_workers, len(pending))} parallel workers")
+
+            uploaded = self.upload_many([(str(images[idx]), None) for idx, _, _, _ in pending])
+
+            for (idx, key, sha256, size), result in zip(pending, uploaded):
+                results[idx] = result
+                if result["success"]:
+                    manifest.record(key, sha256, size, result["path"], result.get("etag"))
+
+        # Responsive derivatives for new/changed images and any uploaded before variants existed
+        keys = [manifest.key_for(img_path) for img_path in images]
+        missing = [
+            idx for idx, result in enumerate(results)
+            if result["success"] and manifest.variants_for(keys[idx]) is None
+        ]
+        if missing:
+            print(f"Generating responsive variants for {len(missing)} images")
+            variants = build_variants_many([(images[idx].stem, images[idx]) for idx in missing])
+            for idx, v in zip(missing, variants):
+                if v:
+                    manifest.record_variants(keys[idx], v)
+
+        if pending or missing:
+            # Save even after partial failure so a retry only costs the failed files
+            manifest.save()
+
+        for idx, result in enumerate(results):
+            if result["success"]:
+                result["image_variants"] = manifest.variants_for(keys[idx])
 
-            result = self.upload_image(str(img_path))
+        for img_path, result in zip(images, results):
             result["filename"] = img_path.name
-            results.append(result)
 
+            if result.get("skipped"):
+                continue
             if result["success"]:
-                print(f"  [OK] {result['url']}")
+                print(f"  [OK] {img_path.name} -> {result['url']}")
             else:
-                print(f"  [FAIL] {result.get('error', 'Unknown error')}")
+                print(f"  [FAIL] {img_path.name}: {result.get('error', 'Unknown error')}")
 
         success_count = sum(1 for r in results if r["success"])
-        print(f"\nUploaded {success_count}/{len(images)} images")
+        skipped_count = sum(1 for r in results if r.get("skipped"))
+        print(f"\nUploaded {success_count - skipped_count}/{len(pending)} changed images "
+              f"(skipped {skipped_count} unchanged, {bytes_saved / 1024 / 1024:.1f} MB saved)")
 
         return results
 
     def get_public_url(self, remote_path: str) -> str:
         """Get public URL for a file in storage"""
-        return f"{self.url}/storage/v1/object/public/{self.bucket_name}/{remote_path}"
+        return self.client.public_url(remote_path)
 
 
 def upload_and_update_database():
     """Upload images and update database with new URLs"""
-    from supabase import create_client
+    try:
+        from .supabase_service import SupabaseService
+    except ImportError:
+        from supabase_service import SupabaseService
 
     storage = SupabaseStorageService()
 
@@ -176,14 +198,10 @@ def upload_and_update_database():
     storage.create_bucket_if_not_exists()
 
     # Connect to Supabase database
-    supabase = create_client(
-        os.getenv("SUPABASE_URL"),
-        os.getenv("SUPABASE_KEY")
-    )
+    db = SupabaseService()
 
     # Get all problems with local image paths
-    response = supabase.table("problems").select("problem_id,problem_image_url,question_no").execute()
-    problems = response.data
+    problems = list(db.iter_problems(fields="list"))
 
     if not problems:
         print("No problems found in database")
@@ -191,7 +209,7 @@ def upload_and_update_database():
 
     print(f"Found {len(problems)} problems in database")
 
-    updated = 0
+    url_updates = []
     for problem in problems:
         problem_id = problem["problem_id"]
         local_path = problem.get("problem_image_url", "")
@@ -224,21 +242,19 @@ def upload_and_update_database():
         result = storage.upload_image(str(full_path), remote_path)
 
         if result["success"]:
-            public_url = result["url"]
-
-            # Update database with public URL
-            try:
-                supabase.table("problems").update({
-                    "problem_image_url": public_url
-                }).eq("problem_id", problem_id).execute()
-
-                print(f"[OK] {problem_id} -> {public_url}")
-                updated += 1
-            except Exception as e:
-                print(f"[FAIL] {problem_id}: DB update failed - {e}")
+            print(f"[OK] {problem_id} -> {result['url']}")
+            url_updates.append({"problem_id": problem_id, "problem_image_url": result["url"]})
         else:
             print(f"[FAIL] {problem_id}: upload failed - {result.get('error')}")
 
+    # Update database with public URLs (chunked bulk update)
+    updated = 0
+    if url_updates:
+        db_result = db.bulk_update_problems(url_updates)
+        updated = db_result["written"]
+        for err in db_result["errors"]:
+            print(f"[FAIL] {err['problem_id']}: DB update failed - {err['error']}")
+
     print(f"\nUpdated {updated}/{len(problems)} problems with Supabase Storage URLs")
 
 
@@ -0,0 +1,104 @@
+"""
+Upload Manifest
+Tracks which local images are already in Supabase Storage so re-runs
+(e.g. `pipeline.py --upload-only`) only upload new or changed files.
+
+The manifest lives next to split_summary.json:
+    output/2026_CSAT_questions/upload_manifest.json
+
+Entry format (key = path relative to the questions directory):
+    {
+        "2026_CSAT_Q01.png": {
+            "sha256": "...",
+            "size": 123456,
+            "remote_path": "2026_CSAT_Q01.png",
+            "uploaded_at": "2026-02-06T10:00:00",
+            "etag": "\"abc...\"",
+            "variants": {...}            # image_variants manifest (src/image_variants.py)
+        }
+    }
+"""
+
+import os
+import json
+import hashlib
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+MANIFEST_FILENAME = "upload_manifest.json"
+HASH_CHUNK_SIZE = 1024 * 1024  # 1MB
+
+
+def file_sha256(path: Path) -> str:
+    """SHA-256 of a file, read in chunks"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class UploadManifest:
+    """Local record of uploaded files (path -> sha256, remote path, ETag)"""
+
+    def __init__(self, base_dir: Path, entries: Optional[dict] = None):
+        self.base_dir = Path(base_dir)
+        self.path = self.base_dir / MANIFEST_FILENAME
+        self.entries = entries or {}
+
+    @classmethod
+    def load(cls, base_dir) -> "UploadManifest":
+        """Load manifest from base_dir (empty manifest if missing or corrupt)"""
+        path = Path(base_dir) / MANIFEST_FILENAME
+        if path.exists():
+            try:
+                with open(path, encoding="utf-8") as f:
+                    return cls(base_dir, json.load(f).get("files", {}))
+            except (OSError, ValueError) as e:
+                print(f"  [Manifest] Ignoring unreadable manifest {path}: {e}")
+        return cls(base_dir)
+
+    def key_for(self, local_path: Path) -> str:
+        """Manifest key: POSIX path relative to base_dir"""
+        return Path(local_path).resolve().relative_to(self.base_dir.resolve()).as_posix()
+
+    def is_current(self, key: str, sha256: str, remote_path: str) -> bool:
+        """True if this exact content was already uploaded to remote_path"""
+        entry = self.entries.get(key)
+        return bool(
+            entry
+            and entry.get("sha256") == sha256
+            and entry.get("remote_path") == remote_path
+        )
+
+    def record(self, key: str, sha256: str, size: int, remote_path: str, etag: Optional[str] = None):
+        """Record a successful upload"""
+        self.entries[key] = {
+            "sha256": sha256,
+            "size": size,
+            "remote_path": remote_path,
+            "uploaded_at": datetime.now().isoformat(),
+            "etag": etag,
+        }
+
+    def variants_for(self, key: str) -> Optional[dict]:
+        """Responsive variants generated for the recorded upload (None if not yet)"""
+        return (self.entries.get(key) or {}).get("variants")
+
+    def record_variants(self, key: str, variants: dict):
+        if key in self.entries:
+            self.entries[key]["variants"] = variants
+
+    def save(self):
+        """Write manifest atomically (temp file + rename)"""
+        self.base_dir.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(".json.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(
+                {"updated_at": datetime.now().isoformat(), "files": self.entries},
+                f,
+                ensure_ascii=False,
+                indent=2,
+            )
+        os.replace(tmp_path, self.path)
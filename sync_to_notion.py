@@ -51,19 +51,17 @@ def main():
         problem = supabase.get_problem(args.problem_id)
         problems = [problem] if problem else []
     else:
-        problems = supabase.get_problems_by_filter(
-            year=args.year, exam=args.exam, status=args.status
-        )
+        problems = list(supabase.iter_problems(
+            year=args.year, exam=args.exam, status=args.status, fields="full"
+        ))
 
     if not problems:
         print("조회된 문제가 없습니다.")
         return
 
-    # 각 문제에 힌트 조회
-    items = []
-    for p in problems:
-        hints = supabase.get_hints(p["problem_id"])
-        items.append({"problem": p, "hints": hints})
+    # 각 문제에 힌트 조회 (일괄)
+    hints_by_id = supabase.get_hints_for([p["problem_id"] for p in problems])
+    items = [{"problem": p, "hints": hints_by_id[p["problem_id"]]} for p in problems]
 
     # 통계 미리보기
     with_solution = sum(1 for it in items if it["problem"].get("solution"))
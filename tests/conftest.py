@@ -0,0 +1,17 @@
+"""
+Test setup: project root on sys.path, and placeholder settings so src.config /
+server import without a .env (no test talks to Supabase).
+"""
+
+import os
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+os.environ.setdefault("SUPABASE_URL", "http://127.0.0.1:54321")
+os.environ.setdefault("SUPABASE_KEY", "test.anon.key")
+os.environ.setdefault("SUPABASE_SERVICE_KEY", "test.service.key")
+os.environ.setdefault("READ_REPLICA_ENABLED", "false")
+os.environ.setdefault("SESSION_BACKEND", "memory")
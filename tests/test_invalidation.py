@@ -0,0 +1,30 @@
+"""
+Batched problem invalidation: a bulk write publishes once to the cross-worker
+log and drops every row locally and on the other workers
+"""
+
+import src.problem_cache as problem_cache
+from src.problem_cache import InvalidationLog, cache_problem, get_cached_problem, invalidate_problems, MISSING
+
+
+def test_bulk_invalidation_publishes_one_batch(tmp_path, monkeypatch):
+    this_worker = InvalidationLog(str(tmp_path / "invalidations.db"), poll_interval=0)
+    other_worker = InvalidationLog(str(tmp_path / "invalidations.db"), poll_interval=0)
+    monkeypatch.setattr(problem_cache, "_invalidation_log", this_worker)
+
+    batches = []
+    monkeypatch.setattr(problem_cache, "_listeners", [batches.append])
+    publishes = []
+    original_publish = this_worker.publish
+    monkeypatch.setattr(this_worker, "publish", lambda ids: (publishes.append(ids), original_publish(ids)))
+
+    ids = [f"2026_CSAT_Q{n:02d}" for n in range(1, 31)]
+    for pid in ids:
+        cache_problem(pid, {"problem_id": pid})
+
+    invalidate_problems(ids + [ids[0], None])
+
+    assert publishes == [ids]
+    assert batches == [ids]
+    assert all(get_cached_problem(pid) is MISSING for pid in ids)
+    assert other_worker.poll() == ids
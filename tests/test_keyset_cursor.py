@@ -0,0 +1,162 @@
+"""
+Keyset pagination: cursor round-trip and get_problems_page paging over rows
+that share (year, exam, question_no)
+"""
+
+import json
+import random
+
+import pytest
+
+from src.supabase_service import SupabaseService, _decode_cursor, _encode_cursor, _keyset_after
+
+
+def _split_top_level(text: str) -> list:
+    """Split a PostgREST logic list on commas outside parentheses / quotes"""
+    parts, depth, quoted, current = [], 0, False, ""
+    for ch in text:
+        if ch == '"':
+            quoted = not quoted
+        elif not quoted and ch == "(":
+            depth += 1
+        elif not quoted and ch == ")":
+            depth -= 1
+        elif not quoted and depth == 0 and ch == ",":
+            parts.append(current)
+            current = ""
+            continue
+        current += ch
+    return parts + [current]
+
+
+def _condition(expr: str):
+    """Predicate for "col.op.value" or "and(...)" (the subset _keyset_after emits)"""
+    if expr.startswith("and(") and expr.endswith(")"):
+        terms = [_condition(e) for e in _split_top_level(expr[4:-1])]
+        return lambda row: all(t(row) for t in terms)
+    column, op, raw = expr.split(".", 2)
+    value = json.loads(raw) if raw.startswith('"') else int(raw)
+    compare = {
+        "eq": lambda a, b: a == b,
+        "gt": lambda a, b: a > b,
+        "lt": lambda a, b: a < b,
+    }[op]
+    return lambda row: compare(row[column], value)
+
+
+def _condition_list(expr: str) -> list:
+    return [_condition(e) for e in _split_top_level(expr)]
+
+
+class FakeProblemsQuery:
+    """supabase-py select builder over an in-memory problems table"""
+
+    def __init__(self, rows: list):
+        self.rows = rows
+        self.filters = []
+        self.orders = []
+        self.row_limit = None
+
+    def select(self, columns):
+        return self
+
+    def eq(self, column, value):
+        self.filters.append(lambda row: row[column] == value)
+        return self
+
+    def or_(self, expr):
+        terms = _condition_list(expr)
+        self.filters.append(lambda row: any(t(row) for t in terms))
+        return self
+
+    def order(self, column, desc=False):
+        self.orders.append((column, desc))
+        return self
+
+    def limit(self, n):
+        self.row_limit = n
+        return self
+
+    def execute(self):
+        rows = [r for r in self.rows if all(f(r) for f in self.filters)]
+        for column, desc in reversed(self.orders):
+            rows.sort(key=lambda r: r[column], reverse=desc)
+
+        class Response:
+            data = [dict(r) for r in rows[:self.row_limit]]
+
+        return Response
+
+
+class FakeClient:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def table(self, name):
+        return FakeProblemsQuery(self.rows)
+
+
+def _problems() -> list:
+    rows = []
+    for year in (2025, 2026):
+        for exam in ("CSAT", "KICE6", "KICE9"):
+            for question_no in range(1, 6):
+                # Several rows per (year, exam, question_no): only problem_id breaks the tie
+                for suffix in ("", "_a", "_b"):
+                    rows.append({
+                        "problem_id": f"{year}_{exam}_Q{question_no:02d}{suffix}",
+                        "year": year, "exam": exam, "question_no": question_no, "status": "ready",
+                    })
+    random.Random(7).shuffle(rows)
+    return rows
+
+
+def test_cursor_round_trip():
+    row = {"year": 2026, "exam": "KICE6", "question_no": 21, "problem_id": "2026_KICE6_Q21"}
+    assert _decode_cursor(_encode_cursor(row)) == (2026, "KICE6", 21, "2026_KICE6_Q21")
+
+
+def test_cursor_round_trip_keeps_filter_syntax_characters():
+    row = {"year": 2026, "exam": "MOCK,10", "question_no": 3, "problem_id": "a.b(c)"}
+    decoded = _decode_cursor(_encode_cursor(row))
+    assert decoded == (2026, "MOCK,10", 3, "a.b(c)")
+    after = _condition_list(_keyset_after(*decoded))
+    same = {"year": 2026, "exam": "MOCK,10", "question_no": 3, "problem_id": "a.b(d)"}
+    assert any(c(same) for c in after)
+
+
+@pytest.mark.parametrize("cursor", ["", "not-base64!", "WzEsMl0"])
+def test_invalid_cursor_rejected(cursor):
+    with pytest.raises(ValueError):
+        _decode_cursor(cursor)
+
+
+@pytest.mark.parametrize("limit", [1, 2, 3, 4, 7, 30])
+def test_pages_cover_every_row_once_with_duplicate_sort_keys(limit):
+    rows = _problems()
+    service = SupabaseService(client=FakeClient(rows))
+
+    seen, cursor, pages = [], None, 0
+    while True:
+        page = service.get_problems_page(limit=limit, cursor=cursor)
+        seen.extend(p["problem_id"] for p in page["problems"])
+        cursor = page["next_cursor"]
+        pages += 1
+        if not cursor:
+            break
+        assert pages <= len(rows)
+
+    expected = sorted(rows, key=lambda r: (-r["year"], r["exam"], r["question_no"], r["problem_id"]))
+    assert seen == [r["problem_id"] for r in expected]
+
+
+def test_pages_with_filter_stop_after_last_row():
+    rows = _problems()
+    service = SupabaseService(client=FakeClient(rows))
+
+    first = service.get_problems_page(year=2025, exam="KICE9", limit=10)
+    second = service.get_problems_page(year=2025, exam="KICE9", limit=10, cursor=first["next_cursor"])
+
+    ids = [p["problem_id"] for p in first["problems"] + second["problems"]]
+    assert len(ids) == len(set(ids)) == 15
+    assert second["next_cursor"] is None
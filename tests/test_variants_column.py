@@ -0,0 +1,78 @@
+"""
+image_variants on problem writes: written as null when a re-upload has no
+derivatives, and left out only while the column does not exist yet
+"""
+
+import pytest
+
+import src.supabase_service as supabase_service
+from src.image_variants import with_variants
+from src.supabase_service import SupabaseService
+
+MISSING_COLUMN = {
+    "code": "PGRST204", "details": None, "hint": None,
+    "message": "Could not find the 'image_variants' column of 'problems' in the schema cache",
+}
+
+
+class FakeTable:
+    def __init__(self, client):
+        self.client = client
+        self.payload = None
+
+    def upsert(self, payload, on_conflict=None):
+        self.payload = payload
+        return self
+
+    def execute(self):
+        rows = self.payload if isinstance(self.payload, list) else [self.payload]
+        if not self.client.has_variants_column and any("image_variants" in r for r in rows):
+            raise Exception(str(MISSING_COLUMN))
+        self.client.written.extend(rows)
+        return type("Response", (), {"data": rows})()
+
+
+class FakeClient:
+    def __init__(self, has_variants_column: bool):
+        self.has_variants_column = has_variants_column
+        self.written = []
+
+    def table(self, name):
+        return FakeTable(self)
+
+
+@pytest.fixture(autouse=True)
+def reset_column_flag():
+    supabase_service._variants_column = True
+    yield
+    supabase_service._variants_column = True
+
+
+def _row(problem_id: str, variants=None) -> dict:
+    return with_variants({"problem_id": problem_id, "problem_image_url": f"https://cdn.example/{problem_id}.png"}, variants)
+
+
+def test_reupload_without_variants_clears_the_column():
+    client = FakeClient(has_variants_column=True)
+    service = SupabaseService(client=client)
+
+    result = service.bulk_upsert_problems([_row("P1", {"version": "v2", "sizes": []}), _row("P2")])
+
+    assert result["success"]
+    written = {r["problem_id"]: r for r in client.written}
+    assert written["P1"]["image_variants"] == {"version": "v2", "sizes": []}
+    assert "image_variants" in written["P2"] and written["P2"]["image_variants"] is None
+
+
+def test_missing_column_falls_back_to_rows_without_the_key():
+    client = FakeClient(has_variants_column=False)
+    service = SupabaseService(client=client)
+
+    result = service.bulk_upsert_problems([_row("P1", {"version": "v2", "sizes": []}), _row("P2")])
+
+    assert result["success"] and result["written"] == 2 and not result["errors"]
+    assert all("image_variants" not in r for r in client.written)
+
+    # Later writes leave the key out up front
+    service.upsert_problem(_row("P3"))
+    assert "image_variants" not in client.written[-1]
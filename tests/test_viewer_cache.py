@@ -0,0 +1,113 @@
+"""
+Viewer cache: a problem edited through another worker (whose invalidation
+never reaches this worker's caches) must not keep serving the old page or 304
+"""
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from server.dependencies import get_data, get_supabase
+from server.problem_routes import router
+from src.problem_cache import MISSING, cache_problem, get_cached_problem, problem_cache, viewer_cache
+
+PROBLEM_ID = "2026_CSAT_Q21"
+
+
+class SharedDatabase:
+    """The problems table as every worker sees it"""
+
+    def __init__(self):
+        self.rows = {PROBLEM_ID: {
+            "problem_id": PROBLEM_ID, "year": 2026, "exam": "CSAT", "question_no": 21,
+            "score": 4, "problem_image_url": "https://cdn.example/q21.png", "solution": "",
+            "updated_at": "2026-01-01T00:00:00+00:00",
+        }}
+        self.row_reads = 0
+
+    def edit_from_other_worker(self, **values):
+        """UPDATE on another worker: the row and updated_at move, this worker's caches are untouched"""
+        self.rows[PROBLEM_ID] = {**self.rows[PROBLEM_ID], **values, "updated_at": "2026-01-02T00:00:00+00:00"}
+
+
+class FakeSupabase:
+    def __init__(self, db: SharedDatabase):
+        self.db = db
+
+    def get_collection_version(self) -> str:
+        latest = max(row["updated_at"] for row in self.db.rows.values())
+        return f"{len(self.db.rows)}:{latest}"
+
+
+class FakeData:
+    """AsyncDataAccess over the shared table, with the real per-worker row cache"""
+
+    def __init__(self, db: SharedDatabase):
+        self.db = db
+
+    async def get_problem(self, problem_id: str, fresh: bool = False):
+        if not fresh:
+            cached = get_cached_problem(problem_id)
+            if cached is not MISSING:
+                return cached
+        self.db.row_reads += 1
+        row = dict(self.db.rows[problem_id]) if problem_id in self.db.rows else None
+        cache_problem(problem_id, row)
+        return row
+
+    async def get_problem_version(self, problem_id: str):
+        row = self.db.rows.get(problem_id)
+        return row["updated_at"] if row else None
+
+
+@pytest.fixture
+def db():
+    problem_cache.clear()
+    viewer_cache.clear()
+    yield SharedDatabase()
+    problem_cache.clear()
+    viewer_cache.clear()
+
+
+@pytest.fixture
+def client(db):
+    app = FastAPI()
+    app.include_router(router, prefix="/problem")
+    app.dependency_overrides[get_data] = lambda: FakeData(db)
+    app.dependency_overrides[get_supabase] = lambda: FakeSupabase(db)
+    return TestClient(app)
+
+
+def test_unchanged_problem_revalidates_from_cache(client, db):
+    first = client.get(f"/problem/view/{PROBLEM_ID}")
+    assert first.status_code == 200
+
+    for _ in range(3):
+        again = client.get(f"/problem/view/{PROBLEM_ID}", headers={"If-None-Match": first.headers["etag"]})
+        assert again.status_code == 304
+    assert db.row_reads == 1
+
+
+def test_edit_on_other_worker_is_served_after_revalidation(client, db):
+    first = client.get(f"/problem/view/{PROBLEM_ID}")
+    assert "q21.png" in first.text
+
+    db.edit_from_other_worker(problem_image_url="https://cdn.example/q21-fixed.png")
+
+    after = client.get(f"/problem/view/{PROBLEM_ID}", headers={"If-None-Match": first.headers["etag"]})
+    assert after.status_code == 200
+    assert "q21-fixed.png" in after.text
+    assert after.headers["etag"] != first.headers["etag"]
+
+    again = client.get(f"/problem/view/{PROBLEM_ID}", headers={"If-None-Match": after.headers["etag"]})
+    assert again.status_code == 304
+
+
+def test_page_rendered_from_stale_row_cache_is_corrected(client, db):
+    # This worker cached the row (e.g. for /submit) before the other worker's edit
+    cache_problem(PROBLEM_ID, dict(db.rows[PROBLEM_ID]))
+    db.edit_from_other_worker(problem_image_url="https://cdn.example/q21-fixed.png")
+
+    client.get(f"/problem/view/{PROBLEM_ID}")
+    corrected = client.get(f"/problem/view/{PROBLEM_ID}")
+    assert "q21-fixed.png" in corrected.text
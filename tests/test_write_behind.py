@@ -0,0 +1,118 @@
+"""
+WriteBehindQueue: batching, 4xx isolation, upsert merge, journal spill/replay
+"""
+
+import asyncio
+
+import httpx
+
+from server.write_behind import WriteBehindQueue
+
+
+def _status_error(status: int) -> httpx.HTTPStatusError:
+    request = httpx.Request("POST", "http://postgrest/rest/v1/table")
+    return httpx.HTTPStatusError(f"HTTP {status}", request=request, response=httpx.Response(status, request=request))
+
+
+class FakeData:
+    """AsyncDataAccess stand-in: records statements, fails the ones `fail` picks"""
+
+    def __init__(self, fail=None):
+        self.fail = fail or (lambda table, rows: None)
+        self.statements = []
+        self.rows = {}
+
+    async def _write(self, kind, table, rows, **options):
+        self.statements.append((kind, table, len(rows), options))
+        error = self.fail(table, rows)
+        if error:
+            raise error
+        self.rows.setdefault(table, []).extend(rows)
+
+    async def insert(self, table, rows):
+        await self._write("insert", table, rows)
+
+    async def upsert(self, table, rows, on_conflict, returning=True):
+        await self._write("upsert", table, rows, on_conflict=on_conflict, returning=returning)
+
+
+def _flush(queue: WriteBehindQueue, force_replay: bool = False):
+    async def run():
+        queue._flush_lock = asyncio.Lock()
+        if force_replay:
+            queue._journal_retry_at = 0
+        await queue.flush()
+
+    asyncio.run(run())
+
+
+def test_conflict_in_mixed_batch_only_fails_the_bad_row():
+    data = FakeData(fail=lambda table, rows: _status_error(409) if any(r["bad"] for r in rows) else None)
+    queue = WriteBehindQueue(data, journal_path=None)
+    for i in range(5):
+        queue.enqueue("deliveries", {"user_id": i, "bad": i == 2})
+
+    _flush(queue)
+
+    assert [r["user_id"] for r in data.rows["deliveries"]] == [0, 1, 3, 4]
+    assert queue.written == 4
+    assert queue.failed == 1
+    # One batch statement, then one statement per row
+    assert [s[2] for s in data.statements] == [5, 1, 1, 1, 1, 1]
+
+
+def test_user_problems_upserted_and_merged_per_key():
+    data = FakeData()
+    queue = WriteBehindQueue(data, journal_path=None)
+    queue.enqueue("user_problems", {"user_id": "u1", "problem_id": "p1"})
+    queue.enqueue("user_problems", {"user_id": "u1", "problem_id": "p1"})
+    queue.enqueue("user_problems", {"user_id": "u2", "problem_id": "p1"})
+
+    _flush(queue)
+
+    assert data.statements == [
+        ("upsert", "user_problems", 2, {"on_conflict": "user_id,problem_id", "returning": False}),
+    ]
+    assert queue.failed == 0
+
+
+def test_upstream_down_spills_then_replays(tmp_path):
+    journal = tmp_path / "journal.jsonl"
+    down = {"on": True}
+    data = FakeData(fail=lambda table, rows: _status_error(503) if down["on"] else None)
+    queue = WriteBehindQueue(data, journal_path=journal)
+    queue.enqueue("deliveries", {"user_id": 1})
+    queue.enqueue("hint_requests_raw", {"problem_id": "p1", "stage": 2})
+
+    _flush(queue)
+
+    assert queue.spilled == 2
+    assert queue.failed == 0
+    assert queue.journal_rows == 2
+    assert len(journal.read_text(encoding="utf-8").splitlines()) == 2
+    # A new queue (e.g. after a restart) picks the journal up from disk
+    restarted = WriteBehindQueue(data, journal_path=journal)
+    assert restarted.journal_rows == 2
+
+    down["on"] = False
+    _flush(restarted, force_replay=True)
+
+    assert restarted.replayed == 2
+    assert restarted.journal_rows == 0
+    assert data.rows == {"deliveries": [{"user_id": 1}], "hint_requests_raw": [{"problem_id": "p1", "stage": 2}]}
+    assert not journal.exists()
+    assert not journal.with_suffix(".jsonl.replay").exists()
+
+
+def test_replay_failing_again_is_journaled_again(tmp_path):
+    journal = tmp_path / "journal.jsonl"
+    data = FakeData(fail=lambda table, rows: httpx.ConnectError("refused"))
+    queue = WriteBehindQueue(data, journal_path=journal)
+    queue.enqueue("deliveries", {"user_id": 1})
+    _flush(queue)
+
+    _flush(queue, force_replay=True)
+
+    assert queue.replayed == 1
+    assert queue.journal_rows == 1
+    assert len(journal.read_text(encoding="utf-8").splitlines()) == 1
@@ -64,6 +64,45 @@ def upload_single_image(image_path: str, problem_id: str):
         return False
 
 
+def upload_multiple_images(pairs: list) -> int:
+    """
+    여러 이미지를 병렬로 Supabase에 업로드 (공유 연결 풀 사용)
+
+    Args:
+        pairs: (이미지 파일 경로, 문제 ID) 목록
+
+    Returns:
+        성공한 업로드 수
+    """
+    missing = [path for path, _ in pairs if not os.path.exists(path)]
+    for path in missing:
+        print(f"❌ 파일을 찾을 수 없습니다: {path}")
+    pairs = [(path, pid) for path, pid in pairs if path not in missing]
+
+    if not pairs:
+        return 0
+
+    print(f"\n{'='*60}")
+    print(f"이미지 {len(pairs)}개 업로드 중...")
+    print(f"{'='*60}\n")
+
+    storage = SupabaseStorageService()
+    storage.create_bucket_if_not_exists()
+
+    results = storage.upload_many([(path, f"{pid}.png") for path, pid in pairs])
+
+    success = 0
+    for (path, pid), result in zip(pairs, results):
+        if result.get("success"):
+            success += 1
+            print(f"✅ {pid}: {result.get('url')}")
+        else:
+            print(f"❌ {pid} ({os.path.basename(path)}): {result.get('error')}")
+
+    print(f"\n업로드 완료: {success}/{len(pairs)}")
+    return success
+
+
 def main():
     print("\n" + "="*60)
     print("  크롭된 이미지 업로드 도구")
@@ -71,10 +110,11 @@ def main():
 
     if len(sys.argv) < 3:
         print("\n사용법:")
-        print("  python upload_cropped.py <이미지파일경로> <문제ID>")
+        print("  python upload_cropped.py <이미지파일경로> <문제ID> [<이미지파일경로> <문제ID> ...]")
         print("\n예시:")
         print("  python upload_cropped.py Q03_cropped.png 2026_CSAT_Q03")
         print("  python upload_cropped.py myimage.png 2026_CSAT_Q05")
+        print("  python upload_cropped.py Q03.png 2026_CSAT_Q03 Q05.png 2026_CSAT_Q05")
         print()
 
         # Interactive mode
@@ -85,6 +125,15 @@ def main():
         if not image_path or not problem_id:
             print("❌ 입력이 취소되었습니다")
             return
+    elif len(sys.argv) > 3:
+        args = sys.argv[1:]
+        if len(args) % 2 != 0:
+            print("❌ <이미지파일경로> <문제ID> 쌍으로 입력하세요")
+            return
+        pairs = list(zip(args[0::2], args[1::2]))
+        success = upload_multiple_images(pairs)
+        print("\n✅ 완료!" if success == len(pairs) else "\n❌ 일부 업로드 실패\n")
+        return
     else:
         image_path = sys.argv[1]
         problem_id = sys.argv[2]